@@ -1,8 +1,9 @@
 from pathlib import Path
 import datetime
-import hashlib
 import json
 
+from src.ops import canonical_json
+
 EVID_DIR = Path("reports/trial_tasks")
 
 
@@ -12,11 +13,14 @@ def write_evidence(trace_id: str, payload: dict) -> None:
     ts = datetime.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
     body = {"trace_id": trace_id, "created_at": ts + "Z", **payload}
 
-    digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()[:12]
+    # RFC 8785 since the canonicalization line was added; evidence without
+    # it was hashed as json.dumps(body, sort_keys=True)
+    digest = canonical_json.hexdigest(body)[:12]
     md = EVID_DIR / f"{trace_id}_{ts}.md"
     md.write_text(
         "# Task Evidence\n\n"
-        f"- trace_id: {trace_id}\n- created_at: {ts}Z\n- sha256: {digest}\n\n"
+        f"- trace_id: {trace_id}\n- created_at: {ts}Z\n- sha256: {digest}\n"
+        f"- canonicalization: {canonical_json.SCHEME}\n\n"
         "```json\n" + json.dumps(body, indent=2) + "\n```\n"
     )
     jl = EVID_DIR / f"tasks_{ts[:8]}.jsonl"
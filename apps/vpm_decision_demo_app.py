@@ -13,6 +13,7 @@ sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 from core.grounded_answer import grounded_answer
 from core.plan_suggester import suggest_plan
 from guard.validate_json import validate_answer, validate_plan, validate_state_md
+from libs import answer_cache, ssot_scan
 
 SSOT_STATE = Path("STATE/current_state.md")
 REPORTS_DIR = Path("reports")
@@ -189,6 +190,14 @@ with col2:
                 else:
                     if override_rule:
                         st.session_state.pop(override_key, None)
+    cache = answer_cache.get_cache(ssot_scan.REPO_ROOT)
+    if cache is not None:
+        stats = cache.stats()
+        st.caption(
+            f"回答キャッシュ: hit率 {stats['hit_ratio']:.0%}"
+            f"（{stats['hits']}/{stats['hits'] + stats['misses']}）"
+            f"・LLM節約 {stats['saved_llm_seconds']:.1f}s"
+        )
 
 if free_question.strip():
     st.markdown("### 自由質問")
@@ -2,7 +2,7 @@
 """
 使い方:
   python cli.py <objective_id> <メッセージ>
-  python cli.py answer "今のPhaseは？" [--ai] [--budget 2000] [--no-json]
+  python cli.py answer "今のPhaseは？" [--ai] [--budget 2000] [--tokens 600] [--no-json] [--no-cache] [--cache-stats] [--hybrid]
   python cli.py state-update [--ai] [--print] [--decisions-dir PATH]
 """
 
@@ -26,6 +26,7 @@ from guard.validate_json import (
     validate_plan,
     validate_state_md,
 )
+from libs import answer_cache, ssot_scan
 
 
 def _maybe_handle_subcommand() -> bool:
@@ -39,7 +40,11 @@ def _maybe_handle_subcommand() -> bool:
     p_ans.add_argument("question", nargs="+")
     p_ans.add_argument("--ai", action="store_true")
     p_ans.add_argument("--budget", type=int, default=2000)
+    p_ans.add_argument("--tokens", type=int, default=None)
     p_ans.add_argument("--no-json", action="store_true")
+    p_ans.add_argument("--no-cache", action="store_true")
+    p_ans.add_argument("--cache-stats", action="store_true")
+    p_ans.add_argument("--hybrid", action="store_true")
 
     p_state = subparsers.add_parser("state-update", add_help=False)
     p_state.add_argument("--ai", action="store_true")
@@ -72,7 +77,11 @@ def _maybe_handle_subcommand() -> bool:
             question=question_text,
             ai=getattr(ns, "ai", False),
             budget=getattr(ns, "budget", 2000),
+            tokens=getattr(ns, "tokens", None),
             no_json=getattr(ns, "no_json", False),
+            no_cache=getattr(ns, "no_cache", False),
+            cache_stats=getattr(ns, "cache_stats", False),
+            hybrid=getattr(ns, "hybrid", False),
         )
         _handle_answer(args)
         return True
@@ -106,7 +115,14 @@ def _maybe_handle_subcommand() -> bool:
 
 
 def _handle_answer(args: argparse.Namespace) -> None:
-    result = grounded_answer(args.question, use_ai=args.ai, budget=args.budget)
+    result = grounded_answer(
+        args.question,
+        use_ai=args.ai,
+        budget=args.budget,
+        use_cache=not args.no_cache,
+        retrieval="hybrid" if args.hybrid else ssot_scan.RETRIEVAL,
+        token_budget=args.tokens,
+    )
     if args.no_json:
         print(result.get("answer", ""))
         sources = result.get("sources", [])
@@ -118,6 +134,10 @@ def _handle_answer(args: argparse.Namespace) -> None:
             print("unknown_fields:", ", ".join(unknown))
     else:
         print(json.dumps(result, ensure_ascii=False, indent=2))
+    if args.cache_stats:
+        cache = answer_cache.get_cache(ssot_scan.REPO_ROOT)
+        stats = cache.stats() if cache is not None else {"enabled": False}
+        print("answer_cache:", json.dumps(stats), file=sys.stderr)
 
 
 def _handle_state_update(args: argparse.Namespace) -> None:
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+grounded_answer() benchmark: repeated questions with and without the answer cache.
+
+Replays the demo's fixed questions ``--rounds`` times against this repo's
+SSOT. With ``--ai`` the LLM call is simulated by a fixed ``--llm-ms`` delay
+(no network), so the numbers show what a hit saves, not model latency.
+
+Usage:
+  python scripts/bench_answer_cache.py [--rounds 5] [--ai] [--llm-ms 800]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core import grounded_answer as ga  # noqa: E402
+from libs import answer_cache, ssot_scan  # noqa: E402
+
+QUESTIONS = [
+    "今のPhaseと短期ゴールは？",
+    "P2-2のExit Criteriaは満たされている？根拠は？",
+    "次に着手すべきタスクは？根拠（C/G/δ）も添えて。",
+    "失敗時のロールバック手順は？",
+    "証跡はどこに保存されている？",
+]
+
+
+def _run(args, use_cache: bool) -> list:
+    samples = []
+    for _ in range(args.rounds):
+        for q in QUESTIONS:
+            t0 = time.perf_counter()
+            ga.grounded_answer(q, use_ai=args.ai, use_cache=use_cache)
+            samples.append((time.perf_counter() - t0) * 1e3)
+    return samples
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--ai", action="store_true")
+    ap.add_argument("--llm-ms", type=float, default=800.0)
+    args = ap.parse_args()
+
+    if args.ai:
+
+        def fake_llm(system, user):
+            time.sleep(args.llm_ms / 1e3)
+            return {"answer": "GREEN", "sources": [], "confidence": 0.5}
+
+        ga.ask_openai_json = fake_llm
+
+    ga.grounded_answer(QUESTIONS[0], use_ai=False, use_cache=False)  # index warm-up
+    uncached = _run(args, use_cache=False)
+    cached = _run(args, use_cache=True)
+    stats = answer_cache.get_cache(ssot_scan.REPO_ROOT).stats()
+    result = {
+        "questions": len(QUESTIONS),
+        "rounds": args.rounds,
+        "ai": args.ai,
+        "uncached_ms_p50": round(statistics.median(uncached), 2),
+        "cached_ms_p50": round(statistics.median(cached), 2),
+        "uncached_total_s": round(sum(uncached) / 1e3, 2),
+        "cached_total_s": round(sum(cached) / 1e3, 2),
+        "cache": stats,
+    }
+    print(
+        f"{len(QUESTIONS)} questions x {args.rounds}: "
+        f"uncached {result['uncached_total_s']} s, cached {result['cached_total_s']} s "
+        f"(hit ratio {stats['hit_ratio']}, saved LLM {stats['saved_llm_seconds']} s)"
+    )
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Audit sweep throughput: serial per-record verification vs AuditVerifier.
+
+Stores ``--batches`` Merkle-signed batches of ``--batch-size`` records in an
+in-process S3 mock (moto) and verifies the month three ways:
+
+  serial     download_batch() + verify_prov_record() per record, one batch
+             at a time (the batch signature is checked for every record)
+  threads    AuditVerifier(workers=0): concurrent fetches, one signature
+             check per batch
+  processes  AuditVerifier(workers=--workers): verification in a process pool
+
+Usage:
+  python scripts/bench_audit_verifier.py [--batches 50] [--batch-size 100] [--workers 4]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from moto import mock_aws  # noqa: E402
+
+from ops.audit_verifier import AuditVerifier  # noqa: E402
+from ops.prov_logger import ProvLogger  # noqa: E402
+from ops.s3_uploader import S3AuditUploader  # noqa: E402
+from ops.signing import ProvSigner  # noqa: E402
+
+MONTH = "2025-01-15T10:00:00+00:00"
+
+
+def _serial(uploader, public_key_path):
+    signer = ProvSigner(public_key_path=public_key_path)
+    valid = 0
+    for key in AuditVerifier(uploader, public_key_path).iter_keys("audit-logs/"):
+        for record in uploader.download_batch(key):
+            valid += signer.verify_prov_record(record)[0]
+    return valid
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--batches", type=int, default=50)
+    ap.add_argument("--batch-size", type=int, default=100)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = ap.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+    prov = ProvLogger(validation="off")
+    n_records = args.batches * args.batch_size
+    with tempfile.TemporaryDirectory() as tmp, mock_aws():
+        keys = (f"{tmp}/key.pem", f"{tmp}/key.pub")
+        ProvSigner().generate_keypair(*keys)
+        signer = ProvSigner(*keys, mode="merkle")
+        uploader = S3AuditUploader(bucket_name="vpm-audit-logs")
+        for b in range(args.batches):
+            records = [
+                prov.log_admission_decision(f"pod-{b}-{i}", "hyper-swarm", "allow")
+                for i in range(args.batch_size)
+            ]
+            body = uploader._compress_records(signer.batch_sign_records(records))
+            uploader.upload_jsonl(body, f"batch-{b:05d}", len(records), MONTH)
+
+        result = {"batches": args.batches, "records": n_records, "records_per_s": {}}
+        t0 = time.perf_counter()
+        assert _serial(uploader, keys[1]) == n_records
+        result["records_per_s"]["serial"] = round(
+            n_records / (time.perf_counter() - t0)
+        )
+        for mode, workers in (("threads", 0), ("processes", args.workers)):
+            t0 = time.perf_counter()
+            report = AuditVerifier(uploader, keys[1], workers=workers).verify_month(
+                2025, 1
+            )
+            assert report["all_valid"] and report["records"] == n_records, report
+            result["records_per_s"][mode] = round(
+                n_records / (time.perf_counter() - t0)
+            )
+
+    rates = result["records_per_s"]
+    print(
+        "audit sweep records/s: "
+        + ", ".join(f"{mode} {rate}" for mode, rate in rates.items())
+        + f" (processes {rates['processes'] / rates['serial']:.1f}x serial)"
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
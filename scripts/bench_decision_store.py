@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Decision loading benchmark: shared decision store vs per-caller glob + parse.
+
+Writes ``--files`` decision YAMLs to a temp directory and times one
+``plan``/``state-update``-style invocation, which loads the latest N
+decisions ``--calls`` times:
+
+  legacy   glob, stat-sort and yaml.safe_load per call (previous loaders)
+  store    decision_store.latest_decisions (scandir, cached parse)
+
+Usage:
+  python scripts/bench_decision_store.py [--files 5000] [--latest 10] [--calls 3]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from libs import decision_store  # noqa: E402
+
+
+def _legacy(directory: Path, n: int) -> int:
+    files = sorted(
+        directory.glob("D-*.yml"), key=lambda p: p.stat().st_mtime, reverse=True
+    )[:n]
+    return sum(
+        isinstance(yaml.safe_load(p.read_text(encoding="utf-8")), dict) for p in files
+    )
+
+
+def _ms(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    return round(statistics.median(samples), 2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--files", type=int, default=5000)
+    ap.add_argument("--latest", type=int, default=10)
+    ap.add_argument("--calls", type=int, default=3)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for i in range(args.files):
+            (directory / f"D-{i:05d}.yml").write_text(
+                yaml.safe_dump(
+                    {
+                        "id": f"D-{i:05d}",
+                        "decision": f"decision {i} " * 20,
+                        "rationale": "because " * 50,
+                        "links": [f"reports/r{i}.md", "STATE/current_state.md"],
+                    }
+                ),
+                encoding="utf-8",
+            )
+
+        def legacy():
+            for _ in range(args.calls):
+                _legacy(directory, args.latest)
+
+        def cold_store():
+            decision_store._STORES.clear()
+            for _ in range(args.calls):
+                decision_store.latest_decisions(directory, args.latest)
+
+        def warm_store():
+            for _ in range(args.calls):
+                decision_store.latest_decisions(directory, args.latest)
+
+        result = {
+            "files": args.files,
+            "latest": args.latest,
+            "calls": args.calls,
+            "libyaml": decision_store._Loader.__name__,
+            "legacy_ms": _ms(legacy, args.rounds),
+            "store_cold_ms": _ms(cold_store, args.rounds),
+            "store_warm_ms": _ms(warm_store, args.rounds),
+        }
+    print(
+        f"{args.files} decisions, {args.calls} x latest {args.latest}: "
+        f"legacy {result['legacy_ms']} ms, store cold {result['store_cold_ms']} ms, "
+        f"warm {result['store_warm_ms']} ms"
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+EG-Space multi-process stress benchmark.
+
+Spawns N writer processes that each append events and register vec_id ->
+raw_ref mappings against the same egspace/ directory, then checks that no
+mapping or event line was lost and reports aggregate appends/sec.
+
+Usage:
+  python scripts/bench_egspace_concurrency.py [--procs 8] [--per-proc 2000] [--batch 1]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.egspace import store  # noqa: E402
+
+
+def _worker(worker: int, n: int, batch_size: int) -> None:
+    i = 0
+    while i < n:
+        with store.batch():
+            for _ in range(min(batch_size, n - i)):
+                vec_id = f"w{worker}_{i}"
+                store.append_event({"vec_id": vec_id, "role": "Watcher"})
+                store.register_index(vec_id, f"logs/w{worker}.jsonl#L{i}")
+                i += 1
+
+
+def run(procs: int, per_proc: int, batch_size: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            store.ensure_dirs()
+            ctx = multiprocessing.get_context("fork")
+            t0 = time.perf_counter()
+            ps = [
+                ctx.Process(target=_worker, args=(w, per_proc, batch_size))
+                for w in range(procs)
+            ]
+            for p in ps:
+                p.start()
+            for p in ps:
+                p.join()
+            elapsed = time.perf_counter() - t0
+
+            index = store.get_index()
+            with store.EV_FILE.open("r", encoding="utf-8") as f:
+                events = [json.loads(line) for line in f]
+        finally:
+            os.chdir(cwd)
+
+    total = procs * per_proc
+    return {
+        "procs": procs,
+        "batch": batch_size,
+        "appends": total,
+        "appends_per_sec": round(total / elapsed),
+        "lost_mappings": total - len(index),
+        "lost_events": total - len(events),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--procs", type=int, default=8)
+    ap.add_argument("--per-proc", type=int, default=2000)
+    ap.add_argument("--batch", type=int, default=1)
+    args = ap.parse_args()
+
+    result = run(args.procs, args.per_proc, args.batch)
+    print(json.dumps(result, indent=2))
+    if result["lost_mappings"] or result["lost_events"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
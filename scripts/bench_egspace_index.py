@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+EG-Space index benchmark: per-append cost of register_index() vs index size.
+
+For each size N the index is pre-seeded with N mappings (as a compacted
+snapshot), then a fixed number of register_index() calls is timed. With the
+append-only index log the per-append cost should stay flat from 1k to 1M.
+
+Usage:
+  python scripts/bench_egspace_index.py [--sizes 1000,10000,100000,1000000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.egspace import store  # noqa: E402
+
+
+def _seed(n: int) -> None:
+    store.ensure_dirs()
+    seed = {f"seed_{i:08d}": f"logs/2025-01-01/session.jsonl#L{i}" for i in range(n)}
+    store._write_snapshot(seed)
+    store.IDX_LOG.write_text("")
+    store._INDEX_CACHE.clear()
+
+
+def bench(n: int, appends: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            _seed(n)
+            t0 = time.perf_counter()
+            for i in range(appends):
+                store.register_index(f"bench_{i:08d}", "logs/bench.jsonl#latest")
+            elapsed = time.perf_counter() - t0
+
+            t1 = time.perf_counter()
+            size = len(store.get_index())
+            lookup = time.perf_counter() - t1
+        finally:
+            os.chdir(cwd)
+    return {
+        "events": n,
+        "appends": appends,
+        "per_append_us": round(elapsed / appends * 1e6, 2),
+        "cold_get_index_ms": round(lookup * 1e3, 2),
+        "index_size": size,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes", default="1000,10000,100000,1000000")
+    ap.add_argument("--appends", type=int, default=2000)
+    args = ap.parse_args()
+
+    results = [bench(int(s), args.appends) for s in args.sizes.split(",")]
+    for r in results:
+        print(
+            f"N={r['events']:>8}  per-append={r['per_append_us']:>8.2f} us  "
+            f"get_index={r['cold_get_index_ms']:>8.2f} ms"
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
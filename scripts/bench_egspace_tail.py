@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+EG-Space tail benchmark: get_recent_events() latency vs events.jsonl size.
+
+Builds a synthetic events.jsonl of the requested size in a temp directory and
+times get_recent_events(limit). The reverse block reader should make latency
+independent of file size (target: < 5 ms for the last 50 of a 2 GB log).
+
+Usage:
+  python scripts/bench_egspace_tail.py [--sizes-mb 16,256,2048] [--limit 50]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.egspace import store  # noqa: E402
+
+
+def _build(size_bytes: int) -> int:
+    store.ensure_dirs()
+    line = (
+        json.dumps(
+            {
+                "vec_id": "session_20250818_171440_750_9096",
+                "role": "Watcher",
+                "payload": {"input": "x" * 120},
+                "ts": "2025-08-18T12:00:00+00:00",
+            }
+        )
+        + "\n"
+    ).encode()
+    chunk = line * max(1, (8 << 20) // len(line))
+    written = 0
+    with store.EV_FILE.open("wb") as f:
+        while written < size_bytes:
+            f.write(chunk)
+            written += len(chunk)
+    return written
+
+
+def bench(size_mb: int, limit: int, rounds: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            actual = _build(size_mb << 20)
+            samples = []
+            for _ in range(rounds):
+                t0 = time.perf_counter()
+                events = store.get_recent_events(limit)
+                samples.append((time.perf_counter() - t0) * 1e3)
+        finally:
+            os.chdir(cwd)
+    return {
+        "file_mb": round(actual / (1 << 20)),
+        "limit": limit,
+        "returned": len(events),
+        "p50_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--sizes-mb", default="16,256,2048")
+    ap.add_argument("--limit", type=int, default=50)
+    ap.add_argument("--rounds", type=int, default=50)
+    args = ap.parse_args()
+
+    results = [bench(int(s), args.limit, args.rounds) for s in args.sizes_mb.split(",")]
+    for r in results:
+        print(
+            f"size={r['file_mb']:>6} MB  last {r['limit']}: "
+            f"p50={r['p50_ms']:.3f} ms  max={r['max_ms']:.3f} ms"
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
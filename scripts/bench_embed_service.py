@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Embedding startup benchmark: cold vs warm latency of a short CLI invocation.
+
+Each run is a fresh ``python`` process that embeds a handful of texts, as
+egspace_reason_v1 or the daily capture would:
+
+  cold     loads the model in-process (previous try_sbert() behaviour)
+  worker   sends the texts to a running embed_service worker (unix socket)
+
+Also reports in-process warm latency (second call on the loaded singleton).
+Falls back to the hashing embedder when sentence-transformers is missing, so
+the numbers then only show the socket/process overhead.
+
+Usage:
+  python scripts/bench_embed_service.py [--runs 5] [--texts 8] [--model NAME]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.egspace import embed_service, embedder  # noqa: E402
+
+
+def _texts(n: int) -> list[str]:
+    return [f"P3-6b EG-Space reasoning check {i}: canary GREEN 証跡" for i in range(n)]
+
+
+def child(mode: str, model: str, n: int) -> None:
+    texts = _texts(n)
+    t0 = time.perf_counter()
+    if mode == "worker":
+        X = embed_service.remote_encode(texts, model)
+        assert X is not None, "no worker listening"
+    else:
+        X = embed_service.get_encoder(model)(texts)
+    first = time.perf_counter() - t0
+    t1 = time.perf_counter()
+    if mode == "worker":
+        embed_service.remote_encode(texts, model)
+    else:
+        embed_service.get_encoder(model)(texts)
+    second = time.perf_counter() - t1
+    print(json.dumps({"shape": list(X.shape), "first_s": first, "second_s": second}))
+
+
+def _run_child(mode: str, model: str, n: int, sock: Path) -> dict:
+    env = {**os.environ, "EGSPACE_EMB_SOCKET": str(sock)}
+    cmd = [sys.executable, __file__, "--child", mode, "--model", model]
+    t0 = time.perf_counter()
+    out = subprocess.check_output(cmd + ["--texts", str(n)], env=env, cwd=ROOT)
+    wall = time.perf_counter() - t0
+    return {"wall_s": wall, **json.loads(out)}
+
+
+def _summary(runs: list[dict]) -> dict:
+    return {
+        "wall_ms_p50": round(statistics.median(r["wall_s"] for r in runs) * 1e3, 1),
+        "first_embed_ms_p50": round(
+            statistics.median(r["first_s"] for r in runs) * 1e3, 1
+        ),
+        "warm_embed_ms_p50": round(
+            statistics.median(r["second_s"] for r in runs) * 1e3, 2
+        ),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--texts", type=int, default=8)
+    ap.add_argument("--model", default=None)
+    ap.add_argument("--child", choices=["cold", "worker"], help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        child(args.child, args.model, args.texts)
+        return
+
+    model = args.model
+    if model is None:
+        have_sbert = importlib.util.find_spec("sentence_transformers")
+        model = embed_service.SBERT_MODEL if have_sbert else embedder.HASH_NAME
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sock = Path(tmp) / "embed.sock"
+        cold = [_run_child("cold", model, args.texts, sock) for _ in range(args.runs)]
+
+        t0 = time.perf_counter()
+        worker = subprocess.Popen(
+            [sys.executable, "-m", "src.egspace.embed_service", "serve"]
+            + ["--socket", str(sock), "--model", model],
+            cwd=ROOT,
+        )
+        try:
+            while embed_service.ping(sock) is None:
+                if worker.poll() is not None:
+                    raise SystemExit("embedding worker exited during startup")
+                time.sleep(0.05)
+            worker_start = time.perf_counter() - t0
+            warm = [
+                _run_child("worker", model, args.texts, sock) for _ in range(args.runs)
+            ]
+        finally:
+            worker.terminate()
+            worker.wait()
+
+    result = {
+        "model": model,
+        "texts_per_call": args.texts,
+        "cold": _summary(cold),
+        "worker": {**_summary(warm), "worker_startup_ms": round(worker_start * 1e3)},
+    }
+    for mode in ("cold", "worker"):
+        r = result[mode]
+        print(
+            f"{mode:>6}: process wall p50={r['wall_ms_p50']} ms  "
+            f"first embed={r['first_embed_ms_p50']} ms  "
+            f"warm embed={r['warm_embed_ms_p50']} ms"
+        )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
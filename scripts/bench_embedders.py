@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Embedder throughput benchmark: texts/sec for the EG-Space embedding backends.
+
+Backends:
+  hash        vectorized feature-hashing embedder (src/egspace/embedder.py)
+  legacy-rng  previous fallback: one seeded RNG + 384 normals per text
+  sbert       sentence-transformers all-MiniLM-L6-v2 (skipped if unavailable)
+
+Usage:
+  python scripts/bench_embedders.py [--n 5000] [--words 60] [--rounds 3] [--no-sbert]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.egspace import embed_service, embedder  # noqa: E402
+
+
+def legacy_rng(texts):
+    vecs = []
+    for t in texts:
+        rng = np.random.default_rng(
+            int(hashlib.sha256(t.encode()).hexdigest(), 16) % (1 << 32)
+        )
+        v = rng.standard_normal(embedder.EMB_DIM).astype(np.float32)
+        v /= np.linalg.norm(v) + 1e-9
+        vecs.append(v)
+    return np.stack(vecs, 0)
+
+
+def _corpus(n: int, words_per_text: int) -> list[str]:
+    words = (
+        "knative canary rollout promotion gatekeeper spire argocd grafana "
+        "alert evidence report phase verify 証跡 収集 監視 昇格 検証"
+    ).split()
+    rng = np.random.default_rng(0)
+    return [
+        f"# report {i}\n" + " ".join(rng.choice(words, size=words_per_text))
+        for i in range(n)
+    ]
+
+
+def _backends(with_sbert: bool) -> dict:
+    out = {"hash": embedder.emb_hash, "legacy-rng": legacy_rng}
+    if with_sbert:
+        try:
+            enc = embed_service.get_encoder()
+            enc(["warm up"])
+            out["sbert"] = enc
+        except Exception as e:  # noqa: BLE001
+            print(f"sbert unavailable: {e}", file=sys.stderr)
+    return out
+
+
+def bench(embf, texts: list[str], rounds: int) -> dict:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        embf(texts)
+        best = min(best, time.perf_counter() - t0)
+    return {"seconds": round(best, 4), "texts_per_sec": round(len(texts) / best)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--n", type=int, default=5000)
+    ap.add_argument("--words", type=int, default=60, help="words per text")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--no-sbert", action="store_true")
+    args = ap.parse_args()
+
+    texts = _corpus(args.n, args.words)
+    results = {}
+    for name, embf in _backends(not args.no_sbert).items():
+        results[name] = bench(embf, texts, args.rounds)
+        print(f"{name:>10}: {results[name]['texts_per_sec']:>9} texts/sec")
+    print(json.dumps({"n": args.n, "words": args.words, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
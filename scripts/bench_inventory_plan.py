@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Inventory prioritization benchmark: columnar top-k vs per-row load + sort.
+
+Writes a synthetic inventory.csv per size and times ranking the top ``--top``
+rows, the work ``plan`` does before building actions:
+
+  legacy   csv.DictReader, one dataclass and scalar score per row, full sort
+  table    inventory_table.top_entries (numpy columns, partial selection)
+  stream   the same in streaming mode (running top-k per --chunk rows)
+
+Peak traced memory (tracemalloc, measured in a second untimed run) is
+reported per mode.
+
+Usage:
+  python scripts/bench_inventory_plan.py [--rows 10000 100000 1000000] [--top 50]
+"""
+
+import argparse
+import csv
+import datetime as dt
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from core import inventory_table, plan_suggester  # noqa: E402
+from core.inventory_table import InventoryEntry  # noqa: E402
+
+HEADER = [
+    "asset_id",
+    "kind",
+    "name",
+    "owner",
+    "criticality",
+    "status",
+    "due_date",
+    "est_effort",
+    "risk",
+    "target_option",
+    "links",
+]
+
+
+def _write(path: Path, rows: int, today: dt.date) -> None:
+    rng = random.Random(rows)
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(HEADER)
+        for i in range(rows):
+            due = today + dt.timedelta(days=rng.randint(-30, 365))
+            writer.writerow(
+                [
+                    f"A-{i:07d}",
+                    rng.choice(["rehost", "refactor", "replace", "retire"]),
+                    f"asset {i}",
+                    f"team-{i % 40}",
+                    rng.choice("HML"),
+                    "todo",
+                    due.isoformat() if rng.random() < 0.8 else "",
+                    rng.choice("SML"),
+                    rng.choice(["HIGH", "MED", "LOW"]),
+                    "",
+                    f"reports/r{i}.md",
+                ]
+            )
+
+
+def _legacy(path: Path, top: int, today: dt.date):
+    """The pre-columnar plan_suggester._load_inventory, truncated to ``top``."""
+    entries = []
+    with path.open(encoding="utf-8", newline="") as fh:
+        for row in csv.DictReader(fh):
+            asset_id = (row.get("asset_id") or "").strip()
+            if not asset_id or asset_id.startswith("SAMPLE-"):
+                continue
+            raw_due = (row.get("due_date") or "").strip()
+            try:
+                due_date = dt.date.fromisoformat(raw_due) if raw_due else None
+            except ValueError:
+                due_date = None
+            est_effort = (row.get("est_effort") or "M").upper()
+            risk = (row.get("risk") or "MED").upper()
+            links_raw = row.get("links") or ""
+            entries.append(
+                InventoryEntry(
+                    asset_id=asset_id,
+                    kind=row.get("kind") or "",
+                    name=row.get("name") or asset_id,
+                    owner=row.get("owner") or "未設定",
+                    criticality=(row.get("criticality") or "M").upper(),
+                    status=row.get("status") or "",
+                    due_date=due_date,
+                    est_effort=est_effort,
+                    risk=risk,
+                    target_option=(
+                        row.get("target_option") or row.get("kind") or ""
+                    ).lower(),
+                    links=[s.strip() for s in links_raw.split(";") if s.strip()],
+                    score=plan_suggester._compute_score(
+                        criticality=row.get("criticality"),
+                        due_date=due_date,
+                        est_effort=est_effort,
+                        risk=risk,
+                        today=today,
+                    ),
+                )
+            )
+    entries.sort(key=lambda item: item.score, reverse=True)
+    return entries[:top]
+
+
+def _run(fn):
+    """Time ``fn`` untraced, then re-run it under tracemalloc for peak memory."""
+    t0 = time.perf_counter()
+    out = fn()
+    seconds = time.perf_counter() - t0
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, {"seconds": round(seconds, 3), "peak_mb": round(peak / 2**20, 1)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    ap.add_argument("--top", type=int, default=50)
+    ap.add_argument("--chunk", type=int, default=inventory_table.CHUNK_ROWS)
+    ap.add_argument("--skip-legacy-above", type=int, default=1000000)
+    args = ap.parse_args()
+
+    today = dt.date.today()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = Path(tmp) / f"inventory_{rows}.csv"
+            _write(path, rows, today)
+            result = {"rows": rows, "mb": round(path.stat().st_size / 2**20, 1)}
+            table, result["table"] = _run(
+                lambda: inventory_table.top_entries(path, args.top, today, stream=False)
+            )
+            stream, result["stream"] = _run(
+                lambda: inventory_table.top_entries(
+                    path, args.top, today, stream=True, chunk_rows=args.chunk
+                )
+            )
+            assert [e.asset_id for e in stream] == [e.asset_id for e in table]
+            if rows <= args.skip_legacy_above:
+                legacy, result["legacy"] = _run(lambda: _legacy(path, args.top, today))
+                assert [e.asset_id for e in legacy] == [e.asset_id for e in table]
+                result["speedup"] = round(
+                    result["legacy"]["seconds"] / max(result["table"]["seconds"], 1e-9),
+                    1,
+                )
+            path.unlink()
+            results.append(result)
+            print(
+                f"{rows} rows: legacy {result.get('legacy', {}).get('seconds')} s, "
+                f"table {result['table']['seconds']} s, "
+                f"stream {result['stream']['seconds']} s "
+                f"(peak {result['stream']['peak_mb']} MB)"
+            )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Update cycle rerun benchmark: LLM response cache record vs replay.
+
+Runs tools/info_network/run_update_cycle_v1_1.py three times on the same
+synthetic bundle against a local OpenAI-compatible server that answers after
+``--latency`` seconds (large prompts to a real model take tens of seconds):
+
+  cold     --llm-cache record, empty cache (every prompt goes to the server)
+  rerun    --llm-cache record, unchanged inputs (served from the cache)
+  replay   --llm-cache replay, no server and no OPENAI_API_KEY
+
+Usage:
+  python scripts/bench_llm_cache.py [--latency 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from tests.fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+OLD = "hakone-e2:decision:old"
+NEW = "hakone-e2:decision:new"
+
+
+def _responder(body):
+    if "info_source_bundle_v1" in body["messages"][0]["content"]:
+        node = {"id": NEW, "kind": "decision", "title": "New", "summary": "new"}
+        return json.dumps({"aya_output": {"info_nodes": [node], "info_relations": []}})
+    return json.dumps(
+        {
+            "supersedes": [{"new": NEW, "old": [OLD], "confidence": 0.95}],
+            "questions": [],
+            "matches": [{"new": NEW, "existing": [OLD]}],
+        }
+    )
+
+
+def _cycle(tmp: Path, name: str, mode: str, env) -> float:
+    t0 = time.perf_counter()
+    subprocess.run(
+        [
+            sys.executable,
+            "tools/info_network/run_update_cycle_v1_1.py",
+            "--bundle",
+            str(tmp / "bundle.json"),
+            "--canonical-nodes",
+            str(tmp / "nodes.json"),
+            "--canonical-relations",
+            str(tmp / "relations.json"),
+            "--run-dir",
+            str(tmp / name),
+            "--llm-cache",
+            mode,
+            "--llm-cache-dir",
+            str(tmp / "cache"),
+        ],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    return round(time.perf_counter() - t0, 2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--latency", type=float, default=5.0)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_name:
+        tmp = Path(tmp_name)
+        bundle = {
+            "project_id": "hakone-e2",
+            "source_type": "chat",
+            "source_id": "S-1",
+            "raw_text": "We decided to take the new route. " * 2000,
+        }
+        (tmp / "bundle.json").write_text(json.dumps(bundle), encoding="utf-8")
+        old = {"id": OLD, "kind": "decision", "title": "Old", "summary": "old"}
+        (tmp / "nodes.json").write_text(json.dumps([old]), encoding="utf-8")
+        (tmp / "relations.json").write_text("[]", encoding="utf-8")
+        env = {k: v for k, v in os.environ.items() if not k.startswith("LLM_CACHE")}
+
+        with FakeOpenAIServer(latency=args.latency, responder=_responder) as server:
+            online = dict(env, OPENAI_API_KEY="k", OPENAI_BASE_URL=server.base_url)
+            cold = _cycle(tmp, "cold", "record", online)
+            rerun = _cycle(tmp, "rerun", "record", online)
+            requests = server.requests
+        offline = {k: v for k, v in env.items() if k != "OPENAI_API_KEY"}
+        offline["OPENAI_BASE_URL"] = "http://127.0.0.1:9/v1"
+        replay = _cycle(tmp, "replay", "replay", offline)
+
+    result = {
+        "latency_s": args.latency,
+        "cold_s": cold,
+        "rerun_s": rerun,
+        "replay_s": replay,
+        "server_requests": requests,
+    }
+    print(
+        f"update cycle @ {args.latency}s/response: cold {cold} s, "
+        f"cached rerun {rerun} s, offline replay {replay} s "
+        f"({requests} LLM requests total)"
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+LLM client benchmark: per-node blocking calls vs the shared async client.
+
+Starts a local OpenAI-compatible server with ``--latency`` seconds per
+response and issues one JSON-mode completion per node for ``--nodes`` nodes,
+as the info_network tools do when they summarize or classify many nodes:
+
+  legacy   urllib Request/urlopen per call, one at a time (previous tools)
+  tool     tools/info_network call_openai, one at a time (pooled connections)
+  batch    LLMClient.complete_many with LLM_MAX_CONCURRENCY requests in flight
+  dup      the same batch where every node is requested twice (coalescing)
+
+Usage:
+  python scripts/bench_llm_client.py [--nodes 200] [--latency 0.05]
+"""
+
+import argparse
+import importlib.util
+import json
+import sys
+import time
+from pathlib import Path
+from urllib.request import Request, urlopen
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT))
+
+from libs import llm_client  # noqa: E402
+from tests.fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+
+def _legacy_call(base_url: str, messages, model: str) -> str:
+    payload = {
+        "model": model,
+        "messages": messages,
+        "response_format": {"type": "json_object"},
+    }
+    req = Request(
+        f"{base_url}/chat/completions",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Authorization": "Bearer k"},
+    )
+    with urlopen(req, timeout=30) as resp:
+        body = resp.read().decode("utf-8")
+    return json.loads(body)["choices"][0]["message"]["content"]
+
+
+def _load_tool():
+    path = ROOT / "tools" / "info_network" / "suggest_supersedes_v1.py"
+    spec = importlib.util.spec_from_file_location("suggest_supersedes_v1", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return round(time.perf_counter() - t0, 3)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--nodes", type=int, default=200)
+    ap.add_argument("--latency", type=float, default=0.05)
+    ap.add_argument("--model", default="gpt-4o-mini")
+    args = ap.parse_args()
+
+    prompts = [
+        [{"role": "user", "content": f"classify node N-{i:05d}"}]
+        for i in range(args.nodes)
+    ]
+    tool = _load_tool()
+    with FakeOpenAIServer(latency=args.latency) as server:
+        base = server.base_url
+        legacy = _timed(lambda: [_legacy_call(base, m, args.model) for m in prompts])
+        tool_s = _timed(
+            lambda: [tool.call_openai("k", m, args.model, base) for m in prompts]
+        )
+        client = llm_client.LLMClient(base, "k")
+        batch = [
+            {
+                "messages": m,
+                "model": args.model,
+                "response_format": {"type": "json_object"},
+            }
+            for m in prompts
+        ]
+        batch_s = _timed(lambda: client.complete_many(batch))
+        requests_before = server.requests
+        dup_s = _timed(lambda: client.complete_many(batch + batch))
+        dup_requests = server.requests - requests_before
+        stats = client.stats()
+        client.close()
+
+    result = {
+        "nodes": args.nodes,
+        "latency_s": args.latency,
+        "max_concurrency": client.max_concurrency,
+        "legacy_s": legacy,
+        "tool_s": tool_s,
+        "batch_s": batch_s,
+        "dup_s": dup_s,
+        "dup_requests": dup_requests,
+        "legacy_nodes_per_s": round(args.nodes / legacy, 1),
+        "batch_nodes_per_s": round(args.nodes / batch_s, 1),
+        "client": stats,
+    }
+    print(
+        f"{args.nodes} nodes @ {args.latency}s: legacy {legacy} s, "
+        f"tool {tool_s} s, batch {batch_s} s "
+        f"({result['batch_nodes_per_s']} vs {result['legacy_nodes_per_s']} nodes/s); "
+        f"dup batch {dup_s} s with {dup_requests} requests"
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
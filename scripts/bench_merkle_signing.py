@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+ProvSigner.batch_sign_records() throughput, per-record vs Merkle batch signing.
+
+Signs ``--batches`` batches of ``--batch-size`` admission decisions and
+reports records/sec, Ed25519 signatures and signature metadata bytes per
+record, and the cost of verifying a single record:
+
+  record   one Ed25519 signature per record (previous behavior)
+  merkle   one signature per batch over a Merkle root, inclusion proof
+           and chained batch header in each record
+
+Usage:
+  python scripts/bench_merkle_signing.py [--batches 20] [--batch-size 100]
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from ops.prov_logger import ProvLogger  # noqa: E402
+from ops.signing import SIGNING_MODES, ProvSigner  # noqa: E402
+
+
+def _metadata_bytes(records) -> float:
+    total = sum(
+        len(json.dumps(r["vpm:signature"], separators=(",", ":"))) for r in records
+    )
+    return total / len(records)
+
+
+def _run(mode, keys, batches, n_batches):
+    signer = ProvSigner(*keys, mode=mode)
+    verify = (
+        signer.verify_merkle_record if mode == "merkle" else signer.verify_prov_record
+    )
+    t0 = time.perf_counter()
+    signed = [signer.batch_sign_records(batch) for batch in batches]
+    elapsed = time.perf_counter() - t0
+    sample = signed[0]
+    t0 = time.perf_counter()
+    for record in sample:
+        verify(record)
+    verify_us = (time.perf_counter() - t0) / len(sample) * 1e6
+    n_records = sum(len(b) for b in batches)
+    return {
+        "records_per_s": round(n_records / elapsed),
+        "signatures": n_batches if mode == "merkle" else n_records,
+        "metadata_bytes_per_record": round(_metadata_bytes(sample)),
+        "verify_us_per_record": round(verify_us, 1),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--batches", type=int, default=20)
+    ap.add_argument("--batch-size", type=int, default=100)
+    args = ap.parse_args()
+
+    prov = ProvLogger(validation="off")
+    batches = [
+        [
+            prov.log_admission_decision(f"pod-{b}-{i}", "hyper-swarm", "allow")
+            for i in range(args.batch_size)
+        ]
+        for b in range(args.batches)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        keys = (f"{tmp}/key.pem", f"{tmp}/key.pub")
+        ProvSigner().generate_keypair(*keys)
+        result = {
+            "batches": args.batches,
+            "batch_size": args.batch_size,
+            "modes": {
+                mode: _run(mode, keys, batches, args.batches) for mode in SIGNING_MODES
+            },
+        }
+    modes = result["modes"]
+    print(
+        "batch_sign_records records/s: "
+        + ", ".join(f"{m} {modes[m]['records_per_s']}" for m in SIGNING_MODES)
+        + f" (merkle {modes['merkle']['records_per_s'] / modes['record']['records_per_s']:.1f}x)"
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
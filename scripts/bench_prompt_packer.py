@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+grounded_answer() prompt size: character budgets vs the token-budget packer.
+
+Builds the SSOT snippet block for the demo's fixed questions against this
+repo in two modes and reports estimated prompt tokens (libs.prompt_packer)
+and the time to select the snippets:
+
+  chars    grep_snippets() with the --budget character budgets
+  tokens   pack_snippets() with a --tokens budget
+
+Usage:
+  python scripts/bench_prompt_packer.py [--budget 2000] [--tokens 600] [--rounds 5]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from libs import prompt_packer, ssot_scan  # noqa: E402
+
+QUESTIONS = [
+    "今のPhaseと短期ゴールは？",
+    "P2-2のExit Criteriaは満たされている？根拠は？",
+    "次に着手すべきタスクは？根拠（C/G/δ）も添えて。",
+    "失敗時のロールバック手順は？",
+    "証跡はどこに保存されている？",
+]
+
+
+def _measure(select, rounds: int) -> dict:
+    tokens, chars, ms = [], [], []
+    for q in QUESTIONS:
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            text = select(q)
+            ms.append((time.perf_counter() - t0) * 1e3)
+        tokens.append(prompt_packer.estimate_tokens(text))
+        chars.append(len(text))
+    return {
+        "tokens_mean": round(statistics.mean(tokens), 1),
+        "tokens_max": max(tokens),
+        "chars_mean": round(statistics.mean(chars), 1),
+        "select_ms_p50": round(statistics.median(ms), 2),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--budget", type=int, default=2000)
+    ap.add_argument("--tokens", type=int, default=ssot_scan.TOKEN_BUDGET or 600)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+
+    ssot_scan.grep_snippets(QUESTIONS[0])  # index warm-up
+    chars = _measure(
+        lambda q: ssot_scan.grep_snippets(q, budget=args.budget)[0], args.rounds
+    )
+    tokens = _measure(
+        lambda q: ssot_scan.pack_snippets(q, args.tokens).text, args.rounds
+    )
+    result = {
+        "questions": len(QUESTIONS),
+        "char_budget": args.budget,
+        "token_budget": args.tokens,
+        "chars": chars,
+        "tokens": tokens,
+    }
+    print(
+        f"{len(QUESTIONS)} questions: {args.budget}-char budgets "
+        f"{chars['tokens_mean']} tokens avg (max {chars['tokens_max']}), "
+        f"{args.tokens}-token packer {tokens['tokens_mean']} avg "
+        f"(max {tokens['tokens_max']})"
+    )
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
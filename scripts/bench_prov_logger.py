@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+ProvLogger.log_decision() throughput by schema validation mode.
+
+Logs ``--records`` admission decisions per mode and reports records/sec for
+the whole call and for the validation step alone:
+
+  legacy   jsonschema.validate() per record (previous behavior)
+  full     precompiled jsonschema validator
+  fast     checker generated from schema/prov_event.schema.json
+  sample   fast checker on 1% of records
+  off      no validation
+
+Usage:
+  python scripts/bench_prov_logger.py [--records 1000]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+import jsonschema  # noqa: E402
+
+from ops.prov_logger import ProvLogger  # noqa: E402
+
+MODES = ("legacy", "full", "fast", "sample", "off")
+
+
+class _LegacyValidator:
+    def __init__(self, schema):
+        self.schema = schema
+
+    def validate(self, record):
+        jsonschema.validate(record, self.schema)
+
+
+def _logger(mode: str) -> ProvLogger:
+    logger = ProvLogger(validation="full" if mode == "legacy" else mode)
+    if mode == "legacy":
+        logger.validator = _LegacyValidator(logger.schema)
+    return logger
+
+
+def _log_rate(mode: str, n: int) -> float:
+    logger = _logger(mode)
+    t0 = time.perf_counter()
+    for i in range(n):
+        logger.log_admission_decision(f"pod-{i}", "hyper-swarm", "allow")
+    return n / (time.perf_counter() - t0)
+
+
+def _validate_rate(mode: str, n: int) -> float:
+    logger = _logger(mode)
+    record = logger.log_admission_decision("pod", "hyper-swarm", "allow")
+    validate = logger.validator.validate
+    t0 = time.perf_counter()
+    for _ in range(n):
+        validate(record)
+    return n / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--records", type=int, default=1000)
+    args = ap.parse_args()
+
+    result = {"records": args.records, "log_per_s": {}, "validate_per_s": {}}
+    for mode in MODES:
+        result["log_per_s"][mode] = round(_log_rate(mode, args.records))
+        result["validate_per_s"][mode] = round(_validate_rate(mode, args.records))
+    log = result["log_per_s"]
+    print(
+        "log_decision records/s: "
+        + ", ".join(f"{mode} {log[mode]}" for mode in MODES)
+        + f" (fast {log['fast'] / log['legacy']:.1f}x legacy)"
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
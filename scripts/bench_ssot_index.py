@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+SSOT retrieval benchmark: BM25 index vs substring scanning.
+
+Generates a synthetic SSOT tree (STATE + N reports mixing English words and
+Japanese text) in a temp directory, then reports:
+
+  build       full index build time
+  noop        refresh() with nothing changed (stat walk only)
+  one change  refresh() after rewriting a single report
+  query       in-process search + best-window snippet for the top 5 hits
+  cold query  load the committed index from disk + the same query
+  scan        previous approach: read every report, ``lower().find(term)``
+
+Usage:
+  python scripts/bench_ssot_index.py [--reports 20000] [--rounds 20]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from libs import ssot_index  # noqa: E402
+
+WORDS = (
+    "canary promotion rollout knative gatekeeper spire argocd grafana alert "
+    "slo burn rate evidence runner apply verify snapshot phase cluster kind "
+    "istio policy secret rotation dashboard latency p50 p99 error budget"
+).split()
+JA = "証跡 収集 監視 昇格 検証 自動 段階的 失敗 復旧 運用 設計 承認 判断 差分".split()
+QUESTIONS = [
+    "canary 昇格の証跡は？",
+    "error budget burn rate alert",
+    "argocd rotation secret policy",
+    "監視 ダッシュボード latency p99",
+]
+
+
+def _make_tree(root: Path, n: int, words_per_report: int) -> None:
+    rng = random.Random(0)
+    (root / "STATE").mkdir()
+    (root / "STATE" / "current_state.md").write_text(
+        "phase=P4 canary GREEN\n", encoding="utf-8"
+    )
+    reports = root / "reports"
+    reports.mkdir()
+    vocab = WORDS + JA + [f"term{i}" for i in range(5000)]
+    for i in range(n):
+        body = " ".join(rng.choice(vocab) for _ in range(words_per_report))
+        (reports / f"report_{i:06d}.md").write_text(
+            f"# report {i}\n{body}\n", encoding="utf-8"
+        )
+
+
+def _scan(root: Path, question: str) -> int:
+    terms = [t for t in question.lower().split() if t]
+    hits = 0
+    for path in (root / "reports").glob("*.md"):
+        text = path.read_text(encoding="utf-8", errors="ignore").lower()
+        if any(text.find(t) != -1 for t in terms):
+            hits += 1
+    return hits
+
+
+def _query(index: ssot_index.SSOTIndex, question: str) -> int:
+    query = index.query_terms(question)
+    hits = index.search(query, limit=5)
+    for hit in hits:
+        index.snippet(hit.doc, query, 300)
+    return len(hits)
+
+
+def _p50_ms(fn, rounds: int) -> float:
+    samples = []
+    for i in range(rounds):
+        t0 = time.perf_counter()
+        fn(QUESTIONS[i % len(QUESTIONS)])
+        samples.append((time.perf_counter() - t0) * 1e3)
+    return round(statistics.median(samples), 2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--reports", type=int, default=20000)
+    ap.add_argument("--words", type=int, default=400, help="words per report")
+    ap.add_argument("--rounds", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _make_tree(root, args.reports, args.words)
+        corpus_mb = sum(p.stat().st_size for p in root.rglob("*.md")) / (1 << 20)
+
+        t0 = time.perf_counter()
+        index = ssot_index.build(root)
+        build_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        index = ssot_index.refresh(root, current=index)
+        noop_s = time.perf_counter() - t0
+
+        (root / "reports" / "report_000000.md").write_text(
+            "# report 0\nrewritten canary evidence\n", encoding="utf-8"
+        )
+        t0 = time.perf_counter()
+        index = ssot_index.refresh(root, current=index)
+        one_s = time.perf_counter() - t0
+
+        result = {
+            "reports": args.reports,
+            "corpus_mb": round(corpus_mb, 1),
+            "build_s": round(build_s, 2),
+            "noop_refresh_ms": round(noop_s * 1e3, 1),
+            "one_change_refresh_s": round(one_s, 2),
+            "index_mb": round(
+                sum(p.stat().st_size for p in (root / ".ssot_index").iterdir())
+                / (1 << 20),
+                1,
+            ),
+            "query_ms_p50": _p50_ms(lambda q: _query(index, q), args.rounds),
+            "cold_query_ms_p50": _p50_ms(
+                lambda q: _query(ssot_index.SSOTIndex.load(root), q),
+                max(args.rounds // 4, 1),
+            ),
+            "scan_ms_p50": _p50_ms(lambda q: _scan(root, q), min(args.rounds, 3)),
+        }
+    print(
+        f"{result['reports']} reports ({result['corpus_mb']} MB): "
+        f"build {result['build_s']} s, "
+        f"no-op refresh {result['noop_refresh_ms']} ms, "
+        f"1-file refresh {result['one_change_refresh_s']} s, query {result['query_ms_p50']} ms, "
+        f"cold query {result['cold_query_ms_p50']} ms, "
+        f"scan {result['scan_ms_p50']} ms"
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    os.environ.setdefault("SSOT_INDEX_REFRESH_SEC", "3600")
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Hybrid retrieval benchmark: BM25 + passage-vector re-ranking at scale.
+
+Generates a synthetic SSOT tree whose reports split into ``--passages``
+passages in total, builds the BM25 and vector indexes (hashing embedder
+unless --model is given), then reports per-query latency of:
+
+  bm25     BM25 search only (previous grep_snippets ranking)
+  flat     hybrid search with a flat cosine scan
+  ivf      hybrid search with the IVF index (nprobe = SSOT_IVF_NPROBE)
+
+Query embedding is included in the hybrid timings. Also reports the time to
+update the vector index after one report changed.
+
+Usage:
+  python scripts/bench_ssot_vectors.py [--passages 100000] [--rounds 200]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "src"))
+
+from libs import ssot_index, ssot_vectors  # noqa: E402
+
+sys.path.insert(0, str(ROOT / "scripts"))
+from bench_ssot_index import JA, QUESTIONS, WORDS  # noqa: E402
+
+PER_REPORT = 10
+
+
+def _make_tree(root: Path, n_passages: int) -> None:
+    rng = random.Random(0)
+    (root / "STATE").mkdir()
+    (root / "STATE" / "current_state.md").write_text("phase=P4\n", encoding="utf-8")
+    reports = root / "reports"
+    reports.mkdir()
+    vocab = WORDS + JA + [f"term{i}" for i in range(5000)]
+    for i in range(n_passages // PER_REPORT):
+        paras = []
+        for _ in range(PER_REPORT):
+            line = " ".join(rng.choice(vocab) for _ in range(110))
+            paras.append(line[: ssot_vectors.PASSAGE_CHARS - 2])
+        (reports / f"report_{i:06d}.md").write_text(
+            "\n".join(paras) + "\n", encoding="utf-8"
+        )
+
+
+def _pct(samples, q):
+    return round(float(np.percentile(samples, q)) * 1e3, 2)
+
+
+def _time(fn, rounds):
+    samples = []
+    for i in range(rounds):
+        t0 = time.perf_counter()
+        fn(QUESTIONS[i % len(QUESTIONS)])
+        samples.append(time.perf_counter() - t0)
+    return {"p50_ms": _pct(samples, 50), "p95_ms": _pct(samples, 95)}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--passages", type=int, default=100000)
+    ap.add_argument("--rounds", type=int, default=200)
+    ap.add_argument("--model", default="hash")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        _make_tree(root, args.passages)
+        t0 = time.perf_counter()
+        index = ssot_index.build(root)
+        bm25_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        vectors = ssot_vectors.update(index, model=args.model)
+        vec_build = time.perf_counter() - t0
+        emb, _ = ssot_vectors.resolve_embedder(args.model)
+
+        def hybrid(vecs):
+            def run(q):
+                qvec = np.asarray(emb([q])[0], dtype=np.float32)
+                ssot_vectors.hybrid_search(
+                    index, vecs, index.query_terms(q), qvec, categories=("reports",)
+                )
+
+            return run
+
+        flat = ssot_vectors.VectorIndex(
+            vectors.vec_dir, vectors.meta, dict(vectors.arrays)
+        )
+        flat._lists = None
+        result = {
+            "passages": len(vectors),
+            "ivf_nlist": (vectors.meta["ivf"] or {}).get("nlist"),
+            "bm25_build_s": round(bm25_build, 1),
+            "vector_build_s": round(vec_build, 1),
+            "bm25": _time(
+                lambda q: index.search(index.query_terms(q), limit=5), args.rounds
+            ),
+            "flat": _time(hybrid(flat), args.rounds),
+            "ivf": _time(hybrid(vectors), args.rounds),
+        }
+
+        (root / "reports" / "report_000000.md").write_text(
+            "canary rollback evidence\n", encoding="utf-8"
+        )
+        index = ssot_index.refresh(root, current=index)
+        t0 = time.perf_counter()
+        ssot_vectors.update(index, model=args.model, current=vectors)
+        result["one_change_update_s"] = round(time.perf_counter() - t0, 2)
+
+    print(
+        f"{result['passages']} passages: bm25 p95 {result['bm25']['p95_ms']} ms, "
+        f"hybrid flat p95 {result['flat']['p95_ms']} ms, "
+        f"hybrid ivf p95 {result['ivf']['p95_ms']} ms, "
+        f"1-file update {result['one_change_update_s']} s"
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
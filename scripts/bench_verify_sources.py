@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+verify_sources() benchmark: line-offset index vs counting lines per call.
+
+Writes a few synthetic reports to a temp directory and validates a plan-sized
+batch of ``path:Lx-Ly`` citations against them:
+
+  count     previous approach: iterate each cited file to count its lines
+  cold      first call in a fresh process (offsets loaded from .ssot_index)
+  warm      repeated call in the same process (cached line index)
+  cited     cited_text() for every citation (zero-copy slices, then decode)
+
+Usage:
+  python scripts/bench_verify_sources.py [--files 5] [--lines 200000] [--cites 40]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from libs import ssot_scan  # noqa: E402
+
+
+def _count_lines(root: Path, sources) -> int:
+    cache = {}
+    for source in sources:
+        path = root / source.split(":")[0]
+        if path not in cache:
+            with path.open("r", encoding="utf-8", errors="ignore") as fh:
+                cache[path] = sum(1 for _ in fh)
+    return len(cache)
+
+
+def _ms(fn, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    return round(statistics.median(samples), 2)
+
+
+def child(root: str, sources) -> None:
+    ssot_scan.REPO_ROOT = Path(root)
+    ssot_scan.LINE_INDEX_DIR = Path(root) / ".ssot_index" / "lines"
+    t0 = time.perf_counter()
+    ok, errors = ssot_scan.verify_sources(sources)
+    assert ok, errors
+    print(json.dumps({"ms": (time.perf_counter() - t0) * 1e3}))
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--files", type=int, default=5)
+    ap.add_argument("--lines", type=int, default=200000)
+    ap.add_argument("--cites", type=int, default=40)
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        child(args.child[0], json.loads(args.child[1]))
+        return
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "reports").mkdir()
+        for i in range(args.files):
+            (root / "reports" / f"r{i}.md").write_text(
+                "".join(
+                    f"- item {n}: canary evidence 証跡\n" for n in range(args.lines)
+                ),
+                encoding="utf-8",
+            )
+        sources = []
+        for _ in range(args.cites):
+            start = rng.randrange(1, args.lines - 10)
+            sources.append(
+                f"reports/r{rng.randrange(args.files)}.md:L{start}-L{start + 5}"
+            )
+        mb = sum(p.stat().st_size for p in root.rglob("*.md")) / (1 << 20)
+
+        ssot_scan.REPO_ROOT = root
+        ssot_scan.LINE_INDEX_DIR = root / ".ssot_index" / "lines"
+        cmd = [sys.executable, __file__, "--child", str(root), json.dumps(sources)]
+        first = json.loads(subprocess.check_output(cmd))["ms"]
+        cold = [json.loads(subprocess.check_output(cmd))["ms"] for _ in range(3)]
+        result = {
+            "files": args.files,
+            "corpus_mb": round(mb, 1),
+            "citations": len(sources),
+            "count_ms": _ms(lambda: _count_lines(root, sources), args.rounds),
+            "first_ms": round(first, 2),
+            "cold_ms": round(statistics.median(cold), 2),
+            "warm_ms": _ms(lambda: ssot_scan.verify_sources(sources), args.rounds),
+            "cited_ms": _ms(
+                lambda: [ssot_scan.cited_text(s) for s in sources], args.rounds
+            ),
+        }
+    print(
+        f"{result['citations']} citations over {result['corpus_mb']} MB: "
+        f"count {result['count_ms']} ms, first {result['first_ms']} ms, "
+        f"cold {result['cold_ms']} ms, warm {result['warm_ms']} ms, "
+        f"cited_text {result['cited_ms']} ms"
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,17 @@
 import os
+import sys
 import json
 import glob
-import hashlib
 import time
 import numpy as np
 from datetime import datetime, timezone
-import psycopg
 
-EMB_DIM = 384
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.egspace.embed_cache import cached_embedder  # noqa: E402
+from src.egspace import embed_service, embedder  # noqa: E402
+from src.egspace import pgvector_store  # noqa: E402
 
-
-def try_sbert():
-    try:
-        from sentence_transformers import SentenceTransformer
-
-        m = SentenceTransformer("all-MiniLM-L6-v2")
-
-        def emb(texts):
-            X = m.encode(texts, normalize_embeddings=True)
-            return np.asarray(X, dtype=np.float32)
-
-        return emb, "sbert:all-MiniLM-L6-v2"
-    except Exception:
-        return None, None
-
-
-def emb_hash(texts):
-    vecs = []
-    for t in texts:
-        rng = np.random.default_rng(
-            int(hashlib.sha256(t.encode()).hexdigest(), 16) % (1 << 32)
-        )
-        v = rng.standard_normal(EMB_DIM).astype(np.float32)
-        v /= np.linalg.norm(v) + 1e-9
-        vecs.append(v)
-    return np.stack(vecs, 0), "hashing-fallback"
+EMB_DIM = embedder.EMB_DIM
 
 
 def load_corpus():
@@ -70,31 +47,14 @@ def load_corpus():
 
 
 def upsert(conn, items, embf):
-    with conn.cursor() as cur:
-        cur.execute(
-            f"""
-CREATE TABLE IF NOT EXISTS items(
-  id bigserial PRIMARY KEY,
-  kind text, path text, ts timestamptz,
-  txt text,
-  emb vector({EMB_DIM}),
-  UNIQUE(kind,path)
-);"""
-        )
-        texts = [t for *_, t in items]
-        if not texts:
-            return 0
-        V = embf(texts)
-        for (kind, path, ts, txt), v in zip(items, V):
-            cur.execute(
-                """INSERT INTO items(kind,path,ts,txt,emb)
-                           VALUES(%s,%s,%s,%s,%s)
-                           ON CONFLICT(kind,path) DO UPDATE
-                           SET ts=EXCLUDED.ts, txt=EXCLUDED.txt, emb=EXCLUDED.emb""",
-                (kind, path, ts, txt, list(map(float, v))),
-            )
-        conn.commit()
-    return len(items)
+    pgvector_store.ensure_schema(
+        conn, EMB_DIM, index=os.environ.get("EGSPACE_VECTOR_INDEX") or None
+    )
+    texts = [t for *_, t in items]
+    if not texts:
+        return 0
+    V = embf(texts)
+    return pgvector_store.bulk_upsert(conn, items, V, EMB_DIM)
 
 
 def cosine(a, b):
@@ -142,16 +102,26 @@ def compute(conn, goal_text, embf):
 
 
 def main():
-    embf, name = try_sbert()
+    embf, name = embed_service.sbert_embedder()
     if embf is None:
-        embf, name = emb_hash
+        embf, name = embedder.hashing_embedder()
+    # compute() re-embeds the rows upsert() just embedded; serve those from cache
+    embf = cached_embedder(embf, name)
     items, goal = load_corpus()
-    conn = psycopg.connect(
-        "host=127.0.0.1 port=5432 dbname=egspace user=egspace password=egspace-pass"
-    )
+    conn = pgvector_store.get_conn()
     n = upsert(conn, items, embf)
-    out = compute(conn, goal, embf)
-    result = {"embeddings": name, "count": n, "goal": goal, **out}
+    if os.environ.get("EGSPACE_SERVER_SIDE") == "1":
+        # centroid + ranking in Postgres; only the top/bottom rows come back
+        out = pgvector_store.rank_server_side(conn, embf([goal])[0])
+    else:
+        out = compute(conn, goal, embf)
+    result = {
+        "embeddings": name,
+        "count": n,
+        "goal": goal,
+        **out,
+        "embed_cache": embf.cache.stats(),
+    }
     # evidence を直接出力（パスは環境変数）
     evid_path = os.environ.get("EVID_PATH")
     if evid_path:
@@ -1,37 +1,15 @@
+import os
+import sys
 import json
 import glob
 import numpy as np
-import psycopg
-import hashlib
 
-EMB_DIM = 384
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.egspace.embed_cache import cached_embedder  # noqa: E402
+from src.egspace import embed_service, embedder  # noqa: E402
+from src.egspace import pgvector_store  # noqa: E402
 
-
-def try_sbert():
-    try:
-        from sentence_transformers import SentenceTransformer
-
-        m = SentenceTransformer("all-MiniLM-L6-v2")
-
-        def emb(txts):
-            X = m.encode(txts, normalize_embeddings=True)
-            return np.asarray(X, dtype=np.float32)
-
-        return emb, "sbert"
-    except Exception:
-        return None, None
-
-
-def emb_hash(txts):
-    V = []
-    for t in txts:
-        rng = np.random.default_rng(
-            int(hashlib.sha256(t.encode()).hexdigest(), 16) % (1 << 32)
-        )
-        v = rng.standard_normal(EMB_DIM).astype(np.float32)
-        v /= np.linalg.norm(v) + 1e-9
-        V.append(v)
-    return np.stack(V, 0), "hash"
+EMB_DIM = embedder.EMB_DIM
 
 
 def latest_green_text():
@@ -46,12 +24,13 @@ def latest_green_text():
 
 
 def compute_from_db():
-    embf, name = try_sbert()
+    embf, name = embed_service.sbert_embedder()
     if embf is None:
-        embf, name = emb_hash, "hash"
-    conn = psycopg.connect(
-        "host=127.0.0.1 port=5432 dbname=egspace user=egspace password=egspace-pass"
-    )
+        embf, name = embedder.hashing_embedder()
+    embf = cached_embedder(embf, name)
+    conn = pgvector_store.get_conn()
+    if os.environ.get("EGSPACE_SERVER_SIDE") == "1":
+        return compute_server_side(conn, embf, name)
     cur = conn.cursor()
     cur.execute("SELECT kind,path,txt,emb FROM items")
     rows = cur.fetchall()
@@ -97,6 +76,23 @@ def compute_from_db():
         "stat": {"delta": round(delta, 4)},
         "closer": top_pos,
         "farther": top_neg,
+        "embed_cache": embf.cache.stats(),
+    }
+
+
+def compute_server_side(conn, embf, name):
+    Gtxt = latest_green_text()
+    out = pgvector_store.rank_server_side(conn, embf([Gtxt])[0])
+    if not out["ranking"]:
+        raise RuntimeError("no items in pgvector")
+    return {
+        "ok": True,
+        "embeddings": name,
+        "goal": Gtxt,
+        "stat": out["stat"],
+        "closer": out["ranking"][:3],
+        "farther": out["ranking"][3:],
+        "embed_cache": embf.cache.stats(),
     }
 
 
@@ -39,6 +39,7 @@ def ask_openai(obj_id: str, user_msg: str) -> str:
     :param user_msg: ユーザ入力
     :return: アシスタントの返答テキスト
     """
+    from libs.llm_client import get_client
     from src.core.logger import append_log
 
     session_id = str(uuid4())
@@ -61,25 +62,23 @@ def ask_openai(obj_id: str, user_msg: str) -> str:
         }
     )
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[{"role": "user", "content": user_msg}],
-    )
+    response = get_client().chat([{"role": "user", "content": user_msg}], model)
+    content = response["choices"][0]["message"]["content"]
 
     # 受信ログ
     append_log(
         {
             "role": "assistant",
-            "content": response.choices[0].message.content,
+            "content": content,
             "session_id": session_id,
             "msg_id": str(uuid4()),
             "parent_id": msg_id,
             "objective": obj_id or "vpm-mini",
             "channel": "chat-ui",
             "model": model,
-            "tokens_out": response.usage.completion_tokens,
+            "tokens_out": (response.get("usage") or {}).get("completion_tokens"),
             "elapsed_ms": int((time.time() - start_ts) * 1000),
         }
     )
 
-    return response.choices[0].message.content
+    return content
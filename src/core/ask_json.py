@@ -6,6 +6,8 @@ import json
 import logging
 from typing import Any, Dict
 
+from libs.llm_client import chat_completion
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,38 +24,24 @@ def ask_openai_json(
     Errors are caught and converted into {"error": "..."} so that callers can
     perform a graceful fallback without raising.
     """
-    client = _resolve_client()
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"},
-            messages=[
+        payload = chat_completion(
+            [
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
             ],
+            "gpt-4o-mini",
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"},
         )
     except Exception as exc:  # pragma: no cover - network failure path
         logger.warning("OpenAI JSON completion failed: %s", exc)
         return {"error": f"{exc.__class__.__name__}: {exc}"}
 
-    message = response.choices[0].message if response.choices else None
-    payload = getattr(message, "content", None) or "{}"
+    payload = payload or "{}"
     try:
         return json.loads(payload)
     except json.JSONDecodeError as exc:
         logger.warning("Failed to decode JSON payload: %s", exc)
         return {"error": f"JSONDecodeError: {exc}"}
-
-
-def _resolve_client():
-    try:
-        from core import get_openai_client  # type: ignore
-    except Exception as exc:  # pragma: no cover - import edge case
-        logger.warning("Falling back to direct OpenAI client: %s", exc)
-        from openai import OpenAI
-
-        return OpenAI()
-    else:
-        return get_openai_client()
@@ -4,10 +4,12 @@ from __future__ import annotations
 
 import logging
 import re
+import time
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 from core.ask_json import ask_openai_json
+from libs import answer_cache, prompt_packer, ssot_scan
 from libs.ssot_scan import grep_snippets, verify_sources
 
 logger = logging.getLogger(__name__)
@@ -17,12 +19,67 @@ STATE_PATH = REPO_ROOT / "STATE" / "current_state.md"
 INVENTORY_PATH = REPO_ROOT / "inventory" / "inventory.csv"
 
 
-def grounded_answer(question: str, use_ai: bool, budget: int = 2000) -> Dict[str, Any]:
+def grounded_answer(
+    question: str,
+    use_ai: bool,
+    budget: int = 2000,
+    use_cache: bool = True,
+    retrieval: str = ssot_scan.RETRIEVAL,
+    token_budget: Optional[int] = None,
+) -> Dict[str, Any]:
     """
     Answer a question using SSOT snippets. Falls back to rule-based logic
     if ``use_ai`` is False or when the LLM path fails.
+
+    Snippets fill the character ``budget`` unless a ``token_budget`` is
+    given (or $SSOT_PROMPT_TOKENS sets ssot_scan.TOKEN_BUDGET), in which
+    case they are packed into that many estimated prompt tokens. The result
+    reports the snippet tokens as ``context_tokens``.
+
+    Answers are cached per question, budget, mode and snippet contents, and
+    dropped as soon as a cited source changes (see libs.answer_cache).
+    ``retrieval="hybrid"`` re-ranks snippets by embedding similarity.
     """
-    joined_text, snippets = grep_snippets(question, budget=budget)
+    if token_budget is None:
+        token_budget = ssot_scan.TOKEN_BUDGET
+    if token_budget > 0:
+        joined_text, snippets, tokens = ssot_scan.pack_snippets(
+            question, token_budget, retrieval
+        )
+        key_budget = f"{token_budget} tokens"
+    else:
+        joined_text, snippets = grep_snippets(
+            question, budget=budget, retrieval=retrieval
+        )
+        tokens = prompt_packer.estimate_tokens(joined_text)
+        key_budget = budget
+    cache = answer_cache.get_cache(ssot_scan.REPO_ROOT) if use_cache else None
+    key = answer_cache.make_key(question, key_budget, use_ai, joined_text)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    started = time.perf_counter()
+    result, ok = _answer(question, use_ai, joined_text, snippets)
+    result["context_tokens"] = tokens
+    if cache is not None and ok:
+        deps = result["sources"] + [item["path"] for item in snippets]
+        if not use_ai:
+            deps.append(str(STATE_PATH))
+        cache.put(
+            key,
+            result,
+            answer_cache.file_deps(ssot_scan.REPO_ROOT, deps),
+            llm_seconds=time.perf_counter() - started if use_ai else 0.0,
+        )
+    return result
+
+
+def _answer(
+    question: str, use_ai: bool, joined_text: str, snippets: List[Dict[str, str]]
+) -> Tuple[Dict[str, Any], bool]:
+    """Build the answer; the flag is False for failed (uncacheable) LLM calls."""
     base_sources = _collect_sources(snippets)
 
     result = {
@@ -37,7 +94,7 @@ def grounded_answer(question: str, use_ai: bool, budget: int = 2000) -> Dict[str
         result["confidence"] = 0.4
         if not result["sources"]:
             result["sources"] = _default_sources()
-        return result
+        return result, True
 
     system_message = (
         "You answer strictly from the supplied SSOT snippets. "
@@ -57,7 +114,7 @@ def grounded_answer(question: str, use_ai: bool, budget: int = 2000) -> Dict[str
         result["sources"] = []
         result["confidence"] = 0.0
         result["unknown_fields"] = []
-        return result
+        return result, False
 
     normalized = _normalize_payload(payload, base_sources)
     result.update(normalized)
@@ -70,7 +127,7 @@ def grounded_answer(question: str, use_ai: bool, budget: int = 2000) -> Dict[str
         result["confidence"] = min(float(result.get("confidence", 0.3)), 0.3)
         result["unknown_fields"] = errors
 
-    return result
+    return result, True
 
 
 def _collect_sources(snippets: List[Dict[str, str]]) -> List[str]:
@@ -0,0 +1,257 @@
+"""
+Columnar inventory loading and vectorized priority scoring.
+
+The migration inventory CSV is read with ``csv.reader`` in chunks of
+CHUNK_ROWS rows into an :class:`InventoryTable`: the columns that feed the
+priority score are encoded once per distinct value into small numpy arrays,
+scored with numpy and reduced to the top ``k`` rows with ``np.partition``.
+Only those rows are decoded into ``InventoryEntry`` records.
+
+By default ``top_entries`` streams: it keeps just the running top ``k``
+between chunks, so memory is bounded by one chunk for CSVs of any size and
+larger than RAM. ``stream=False`` scores the whole file as one table.
+
+Ranking matches a stable descending sort on score: ties keep file order.
+"""
+
+from __future__ import annotations
+
+import csv
+import datetime as dt
+from itertools import islice
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+CRITICALITY_SCORE = {"H": 3, "M": 2, "L": 1}
+RISK_SCORE = {"HIGH": 3, "MED": 2, "MEDIUM": 2, "LOW": 1}
+EFFORT_SCORE = {"S": 3, "M": 2, "L": 1}
+
+CHUNK_ROWS = 65536
+
+_NO_DATE = np.iinfo(np.int32).min
+_EPOCH = dt.date(1970, 1, 1)
+
+
+@dataclass(slots=True)
+class InventoryEntry:
+    asset_id: str
+    kind: str
+    name: str
+    owner: str
+    criticality: str
+    status: str
+    due_date: Optional[dt.date]
+    est_effort: str
+    risk: str
+    target_option: str
+    links: List[str]
+    score: float
+
+
+def _scores(values: Sequence[str], default: str, table: Dict[str, int]) -> np.ndarray:
+    """Score code of each raw value (unknown values score 2)."""
+    lut = {v: table.get((v or default).upper(), 2) for v in set(values)}
+    return np.fromiter(map(lut.__getitem__, values), dtype=np.int8, count=len(values))
+
+
+def _days(values: Sequence[str]) -> np.ndarray:
+    """ISO dates as days since the epoch (_NO_DATE for empty/invalid)."""
+    lut = {}
+    for raw in set(values):
+        try:
+            lut[raw] = (dt.date.fromisoformat(raw.strip()) - _EPOCH).days
+        except ValueError:
+            lut[raw] = _NO_DATE
+    return np.fromiter(map(lut.__getitem__, values), dtype=np.int32, count=len(values))
+
+
+class InventoryTable:
+    """
+    Score columns of one chunk (or all) of the inventory as numpy arrays,
+    plus the raw CSV rows, which are only decoded for the selected entries.
+    """
+
+    def __init__(
+        self,
+        fields: Dict[str, int],
+        rows: List[List[str]],
+        columns: Dict[str, np.ndarray],
+        row: np.ndarray,
+    ):
+        self.fields = fields
+        self.rows = rows
+        self.columns = columns
+        # File-order index of each row, used to break score ties
+        self.row = row
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def from_rows(
+        cls, header: List[str], rows: List[List[str]], row0: int = 0
+    ) -> "InventoryTable":
+        fields = {name: i for i, name in enumerate(header)}
+        width = len(header)
+        rows = [r if len(r) >= width else r + [""] * (width - len(r)) for r in rows]
+
+        keep = None
+        if "asset_id" in fields:
+            ids = [r[fields["asset_id"]].strip() for r in rows]
+            keep = [i for i, a in enumerate(ids) if a and not a.startswith("SAMPLE-")]
+        if keep is None or not keep:
+            rows, order = [], np.zeros(0, dtype=np.int64)
+        elif len(keep) == len(rows):
+            order = np.arange(row0, row0 + len(rows), dtype=np.int64)
+        else:
+            rows = [rows[i] for i in keep]
+            order = row0 + np.asarray(keep, dtype=np.int64)
+
+        transposed = list(zip(*rows)) if rows else []
+
+        def col(name: str) -> Sequence[str]:
+            i = fields.get(name)
+            if i is None or not transposed:
+                return [""] * len(rows)
+            return transposed[i]
+
+        columns = {
+            "criticality": _scores(col("criticality"), "M", CRITICALITY_SCORE),
+            "est_effort": _scores(col("est_effort"), "M", EFFORT_SCORE),
+            "risk": _scores(col("risk"), "MED", RISK_SCORE),
+            "due_days": _days(col("due_date")),
+        }
+        return cls(fields, rows, columns, order)
+
+    @classmethod
+    def concat(cls, tables: List["InventoryTable"]) -> "InventoryTable":
+        if len(tables) == 1:
+            return tables[0]
+        return cls(
+            tables[0].fields,
+            [r for t in tables for r in t.rows],
+            {
+                k: np.concatenate([t.columns[k] for t in tables])
+                for k in tables[0].columns
+            },
+            np.concatenate([t.row for t in tables]),
+        )
+
+    def take(self, idx: np.ndarray) -> "InventoryTable":
+        return InventoryTable(
+            self.fields,
+            [self.rows[i] for i in idx],
+            {k: v[idx] for k, v in self.columns.items()},
+            self.row[idx],
+        )
+
+    def scores(self, today: dt.date) -> np.ndarray:
+        """Vectorized plan_suggester._compute_score over all rows."""
+        c = self.columns
+        score = c["criticality"].astype(np.float64)
+        has_due = c["due_days"] != _NO_DATE
+        days_until = c["due_days"].astype(np.int64) - (today - _EPOCH).days
+        # <=0 -> 5, <=7 -> 4, <=30 -> 3, <=90 -> 2, else 1
+        deadline = 5 - np.searchsorted([0, 7, 30, 90], days_until, side="left")
+        score += np.where(has_due, deadline, 0)
+        score += np.maximum(0, 4 - c["est_effort"].astype(np.int64))
+        score += c["risk"]
+        return score
+
+    def top_k(self, k: int, scores: np.ndarray) -> np.ndarray:
+        """Indices of the ``k`` best rows, best first, ties in file order."""
+        n = len(self)
+        if k <= 0 or n == 0:
+            return np.zeros(0, dtype=np.int64)
+        if k < n:
+            kth = np.partition(scores, n - k)[n - k]
+            above = np.flatnonzero(scores > kth)
+            ties = np.flatnonzero(scores == kth)
+            ties = ties[np.argsort(self.row[ties], kind="stable")][: k - len(above)]
+            cand = np.concatenate([above, ties])
+        else:
+            cand = np.arange(n)
+        return cand[np.lexsort((self.row[cand], -scores[cand]))]
+
+    def entry(self, i: int, score: float) -> InventoryEntry:
+        raw = self.rows[i]
+        fields = self.fields
+
+        def get(name: str) -> str:
+            j = fields.get(name)
+            return raw[j] if j is not None else ""
+
+        asset_id = get("asset_id").strip()
+        due = int(self.columns["due_days"][i])
+        return InventoryEntry(
+            asset_id=asset_id,
+            kind=get("kind"),
+            name=get("name") or asset_id,
+            owner=get("owner") or "未設定",
+            criticality=(get("criticality") or "M").upper(),
+            status=get("status"),
+            due_date=None if due == _NO_DATE else _EPOCH + dt.timedelta(days=due),
+            est_effort=(get("est_effort") or "M").upper(),
+            risk=(get("risk") or "MED").upper(),
+            target_option=(get("target_option") or get("kind")).lower(),
+            links=[link.strip() for link in get("links").split(";") if link.strip()],
+            score=float(score),
+        )
+
+
+def read_chunks(path: Path, chunk_rows: int = CHUNK_ROWS) -> Iterator[InventoryTable]:
+    """Yield the inventory CSV as InventoryTable chunks of ``chunk_rows`` rows."""
+    with Path(path).open(encoding="utf-8", newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if header is None:
+            return
+        row0 = 0
+        while True:
+            rows = list(islice(reader, chunk_rows))
+            if not rows:
+                return
+            yield InventoryTable.from_rows(header, rows, row0)
+            row0 += len(rows)
+
+
+def load_table(path: Path) -> Optional[InventoryTable]:
+    """The whole inventory as one table (None for an empty file)."""
+    tables = list(read_chunks(path))
+    return InventoryTable.concat(tables) if tables else None
+
+
+def top_entries(
+    path: Path,
+    k: int,
+    today: Optional[dt.date] = None,
+    stream: bool = True,
+    chunk_rows: int = CHUNK_ROWS,
+) -> List[InventoryEntry]:
+    """
+    The ``k`` highest-priority inventory rows as entries, best first.
+
+    ``stream`` keeps only the running top ``k`` between chunks instead of
+    holding every row until the end.
+    """
+    today = today or dt.date.today()
+    if not stream:
+        table = load_table(path)
+        if table is None:
+            return []
+        scores = table.scores(today)
+        return [table.entry(i, scores[i]) for i in table.top_k(k, scores)]
+
+    best: Optional[InventoryTable] = None
+    best_scores = np.zeros(0)
+    for chunk in read_chunks(path, chunk_rows):
+        merged = InventoryTable.concat([best, chunk] if best is not None else [chunk])
+        scores = np.concatenate([best_scores, chunk.scores(today)])
+        top = merged.top_k(k, scores)
+        best, best_scores = merged.take(top), scores[top]
+    if best is None:
+        return []
+    return [best.entry(i, best_scores[i]) for i in range(len(best))]
@@ -2,17 +2,21 @@
 
 from __future__ import annotations
 
-import csv
 import datetime as dt
 import json
 import logging
-from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence
 
-import yaml
-
 from core.ask_json import ask_openai_json
+from core.inventory_table import (
+    CRITICALITY_SCORE,
+    EFFORT_SCORE,
+    RISK_SCORE,
+    InventoryEntry,
+    top_entries,
+)
+from libs.decision_store import latest_decisions
 from libs.ssot_scan import verify_sources
 
 logger = logging.getLogger(__name__)
@@ -24,11 +28,8 @@ DECISIONS_DIR = REPO_ROOT / "reports" / "decisions"
 
 MAX_DECISIONS = 10
 AI_BUDGET_CHARS = 2000
-
-
-CRITICALITY_SCORE = {"H": 3, "M": 2, "L": 1}
-RISK_SCORE = {"HIGH": 3, "MED": 2, "MEDIUM": 2, "LOW": 1}
-EFFORT_SCORE = {"S": 3, "M": 2, "L": 1}
+# Inventory rows offered to the model in the AI plan prompt
+AI_INVENTORY_ITEMS = 50
 
 DOD_MAP = {
     "rehost": [
@@ -59,26 +60,10 @@ DOD_MAP = {
 }
 
 
-@dataclass
-class InventoryEntry:
-    asset_id: str
-    kind: str
-    name: str
-    owner: str
-    criticality: str
-    status: str
-    due_date: Optional[dt.date]
-    est_effort: str
-    risk: str
-    target_option: str
-    links: List[str]
-    score: float
-
-
 def suggest_plan(use_ai: bool = False, limit: int = 5) -> Dict[str, Any]:
     """Return prioritized next actions based on inventory/STATE/decisions."""
 
-    inventory = _load_inventory()
+    inventory = _load_inventory(max(limit, AI_INVENTORY_ITEMS))
     decisions = _load_decisions()
     short_goal = _extract_short_goal()
 
@@ -105,49 +90,11 @@ def suggest_plan(use_ai: bool = False, limit: int = 5) -> Dict[str, Any]:
     return ai_plan
 
 
-def _load_inventory() -> List[InventoryEntry]:
+def _load_inventory(top: int) -> List[InventoryEntry]:
+    """The ``top`` highest-scoring inventory rows, best first."""
     if not INVENTORY_PATH.exists():
         return []
-
-    entries: List[InventoryEntry] = []
-    with INVENTORY_PATH.open(encoding="utf-8", newline="") as fh:
-        reader = csv.DictReader(fh)
-        today = dt.date.today()
-        for row in reader:
-            asset_id = (row.get("asset_id") or "").strip()
-            if not asset_id or asset_id.startswith("SAMPLE-"):
-                continue
-            due_date = _parse_date(row.get("due_date") or "")
-            est_effort = (row.get("est_effort") or "M").upper()
-            risk = (row.get("risk") or "MED").upper()
-            target_option = (row.get("target_option") or row.get("kind") or "").lower()
-            score = _compute_score(
-                criticality=row.get("criticality"),
-                due_date=due_date,
-                est_effort=est_effort,
-                risk=risk,
-                today=today,
-            )
-            links_raw = row.get("links") or ""
-            links = [link.strip() for link in links_raw.split(";") if link.strip()]
-            entries.append(
-                InventoryEntry(
-                    asset_id=asset_id,
-                    kind=row.get("kind") or "",
-                    name=row.get("name") or asset_id,
-                    owner=row.get("owner") or "未設定",
-                    criticality=(row.get("criticality") or "M").upper(),
-                    status=row.get("status") or "",
-                    due_date=due_date,
-                    est_effort=est_effort,
-                    risk=risk,
-                    target_option=target_option,
-                    links=links,
-                    score=score,
-                )
-            )
-    entries.sort(key=lambda item: item.score, reverse=True)
-    return entries
+    return top_entries(INVENTORY_PATH, top)
 
 
 def _compute_score(
@@ -158,6 +105,7 @@ def _compute_score(
     risk: str,
     today: dt.date,
 ) -> float:
+    """Score of one row; InventoryTable.scores is the vectorized form."""
     score = float(CRITICALITY_SCORE.get((criticality or "M").upper(), 2))
 
     if due_date:
@@ -181,42 +129,17 @@ def _compute_score(
     return score
 
 
-def _parse_date(raw: str) -> Optional[dt.date]:
-    raw = raw.strip()
-    if not raw:
-        return None
-    try:
-        return dt.date.fromisoformat(raw)
-    except ValueError:
-        return None
-
-
 def _load_decisions(max_items: int = MAX_DECISIONS) -> List[Dict[str, Any]]:
-    if not DECISIONS_DIR.exists():
-        return []
-    files = sorted(
-        DECISIONS_DIR.glob("D-*.yml"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )[:max_items]
-    decisions: List[Dict[str, Any]] = []
-    for path in files:
-        try:
-            data = yaml.safe_load(path.read_text(encoding="utf-8"))
-        except Exception as exc:
-            logger.warning("Failed to load decision %s: %s", path, exc)
-            continue
-        if not isinstance(data, dict):
-            continue
-        item = {
-            "id": data.get("id") or path.stem,
-            "decision": data.get("decision"),
-            "rationale": data.get("rationale"),
-            "links": data.get("links") or [],
-            "path": str(path.relative_to(REPO_ROOT)),
+    return [
+        {
+            "id": entry["id"],
+            "decision": entry["decision"],
+            "rationale": entry["rationale"],
+            "links": entry["links"] or [],
+            "path": str(entry["path"].relative_to(REPO_ROOT)),
         }
-        decisions.append(item)
-    return decisions
+        for entry in latest_decisions(DECISIONS_DIR, max_items)
+    ]
 
 
 def _extract_short_goal() -> str:
@@ -360,7 +283,7 @@ def _request_ai_plan(
             "risk": entry.risk,
             "target_option": entry.target_option,
         }
-        for entry in inventory[:50]
+        for entry in inventory[:AI_INVENTORY_ITEMS]
     ]
 
     decision_snippet = [
@@ -9,6 +9,8 @@ from typing import Any, Dict, List, Sequence
 
 import yaml
 
+from libs.decision_store import latest_decisions
+
 try:  # pragma: no cover - optional dependency from Step1
     from core.ask_json import ask_openai_json
 except Exception:  # pragma: no cover - fallback when LLM support is unavailable
@@ -62,34 +64,16 @@ def _resolve_decisions_dir(decisions_dir: str | Path) -> Path:
 def _load_decision_entries(
     decisions_path: Path, max_items: int
 ) -> List[Dict[str, Any]]:
-    if not decisions_path.exists():
-        return []
-
-    candidates = sorted(
-        decisions_path.glob("D-*.yml"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-    entries: List[Dict[str, Any]] = []
-    for path in candidates[:max_items]:
-        try:
-            data = yaml.safe_load(path.read_text(encoding="utf-8"))
-        except Exception as exc:  # pragma: no cover - corrupted file
-            logger.warning("Failed to load decision file %s: %s", path, exc)
-            continue
-        if not isinstance(data, dict):
-            logger.warning("Unsupported decision format in %s", path)
-            continue
-        entries.append(
-            {
-                "path": path,
-                "id": data.get("id") or path.stem,
-                "decision": data.get("decision") or "",
-                "rationale": data.get("rationale") or "",
-                "links": _normalise_links(data.get("links")),
-            }
-        )
-    return entries
+    return [
+        {
+            "path": entry["path"],
+            "id": entry["id"],
+            "decision": entry["decision"] or "",
+            "rationale": entry["rationale"] or "",
+            "links": _normalise_links(entry["links"]),
+        }
+        for entry in latest_decisions(decisions_path, max_items)
+    ]
 
 
 def _normalise_links(raw: Any) -> List[str]:
@@ -0,0 +1,352 @@
+"""Columnar, memory-mappable snapshot of egspace/events.jsonl.
+
+Layout under ``egspace/columnar/``:
+
+- ``ts.f64``       event ts as epoch seconds (NaN when missing)
+- ``role.i32``     dictionary codes into ``role.dict.jsonl``
+- ``session.i32``  dictionary codes into ``session.dict.jsonl`` (-1 = none)
+- ``vec_id.i32``   dictionary codes into ``vec_id.dict.jsonl`` (-1 = none)
+- ``offset.i64`` / ``length.i32``  byte range of the raw record in the source
+- ``meta.json``    row count, source bytes covered, source inode
+
+Column files are raw little-endian arrays opened with ``np.memmap`` and only
+grow by appends; ``meta.json`` is the commit point, so rows past its count
+are ignored by readers and trimmed by the next refresh().
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from src.egspace import store
+from src.egspace.partitions import to_epoch
+
+COL_DIR = store.EG_DIR / "columnar"
+
+COLUMNS = {
+    "ts": np.dtype("<f8"),
+    "role": np.dtype("<i4"),
+    "session": np.dtype("<i4"),
+    "vec_id": np.dtype("<i4"),
+    "offset": np.dtype("<i8"),
+    "length": np.dtype("<i4"),
+}
+DICT_COLUMNS = ("role", "session", "vec_id")
+SUFFIX = {"f8": "f64", "i4": "i32", "i8": "i64"}
+
+
+def _col_path(name: str) -> Path:
+    return COL_DIR / f"{name}.{SUFFIX[COLUMNS[name].str[1:]]}"
+
+
+def _dict_path(name: str) -> Path:
+    return COL_DIR / f"{name}.dict.jsonl"
+
+
+def _read_meta() -> dict:
+    try:
+        return json.loads((COL_DIR / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"count": 0, "covered": 0, "ino": None, "dict_sizes": {}}
+
+
+def _write_meta(meta: dict) -> None:
+    tmp = COL_DIR / f"meta.json.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(meta), encoding="utf-8")
+    os.replace(tmp, COL_DIR / "meta.json")
+
+
+def _load_dict(name: str, size: int) -> list[str]:
+    values = []
+    try:
+        with open(_dict_path(name), "r", encoding="utf-8") as f:
+            for line in f:
+                if len(values) >= size:
+                    break
+                values.append(json.loads(line))
+    except OSError:
+        pass
+    return values
+
+
+class ColumnarSnapshot:
+    """Read-only view over the committed rows of the columnar snapshot."""
+
+    def __init__(self, meta: dict | None = None):
+        self.meta = meta or _read_meta()
+        n = self.meta["count"]
+        self.columns = {}
+        for name, dtype in COLUMNS.items():
+            path = _col_path(name)
+            if n and path.exists():
+                self.columns[name] = np.memmap(path, dtype=dtype, mode="r", shape=(n,))
+            else:
+                self.columns[name] = np.empty(0, dtype=dtype)
+        self._dicts: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return self.meta["count"]
+
+    def __getattr__(self, name):
+        columns = self.__dict__.get("columns", {})
+        if name in columns:
+            return columns[name]
+        raise AttributeError(name)
+
+    def dictionary(self, name: str) -> list[str]:
+        if name not in self._dicts:
+            size = self.meta["dict_sizes"].get(name, 0)
+            self._dicts[name] = _load_dict(name, size)
+        return self._dicts[name]
+
+    def code(self, name: str, value: str) -> int:
+        """Dictionary code of ``value`` in column ``name`` (-2 if absent)."""
+        try:
+            return self.dictionary(name).index(value)
+        except ValueError:
+            return -2
+
+    def mask(self, role=None, since=None, until=None, session_id=None) -> np.ndarray:
+        """Boolean row mask; ``since``/``until`` are inclusive."""
+        m = np.ones(len(self), dtype=bool)
+        if role is not None:
+            m &= self.columns["role"] == self.code("role", role)
+        if session_id is not None:
+            m &= self.columns["session"] == self.code("session", str(session_id))
+        if since is not None:
+            m &= self.columns["ts"] >= to_epoch(since)
+        if until is not None:
+            m &= self.columns["ts"] <= to_epoch(until)
+        return m
+
+    def count(self, **filters) -> int:
+        if not filters:
+            return len(self)
+        return int(np.count_nonzero(self.mask(**filters)))
+
+    def role_counts(self) -> dict[str, int]:
+        roles = self.dictionary("role")
+        counts = np.bincount(self.columns["role"], minlength=len(roles))
+        return {roles[i]: int(c) for i, c in enumerate(counts) if c}
+
+    def latest(self, n: int, **filters) -> np.ndarray:
+        """Row numbers of the ``n`` most recent matching events, oldest first."""
+        rows = np.flatnonzero(self.mask(**filters)) if filters else np.arange(len(self))
+        if n <= 0 or len(rows) <= n:
+            picked = rows
+        else:
+            ts = np.nan_to_num(self.columns["ts"][rows], nan=-np.inf)
+            picked = rows[np.argpartition(ts, len(rows) - n)[len(rows) - n :]]
+        ts = np.nan_to_num(self.columns["ts"][picked], nan=-np.inf)
+        return picked[np.lexsort((picked, ts))]
+
+    def vec_ids(self, rows) -> list[str]:
+        values = self.dictionary("vec_id")
+        return [values[c] if c >= 0 else "" for c in self.columns["vec_id"][rows]]
+
+    def events(self, rows, src: Path | None = None) -> list[dict]:
+        """Decode only the raw records for ``rows`` using the stored offsets."""
+        src = Path(src) if src is not None else store.EV_FILE
+        out = []
+        with open(src, "rb") as f:
+            for r in rows:
+                f.seek(int(self.columns["offset"][r]))
+                out.append(json.loads(f.read(int(self.columns["length"][r]))))
+        return out
+
+
+class _DictEncoder:
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.values = _load_dict(name, size)
+        self.codes = {v: i for i, v in enumerate(self.values)}
+        self.new: list[str] = []
+
+    def encode(self, value) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+            self.new.append(value)
+        return code
+
+
+def _reset() -> None:
+    for name in COLUMNS:
+        _col_path(name).unlink(missing_ok=True)
+    for name in DICT_COLUMNS:
+        _dict_path(name).unlink(missing_ok=True)
+    (COL_DIR / "meta.json").unlink(missing_ok=True)
+
+
+def _trim(meta: dict) -> None:
+    """Drop rows/dictionary entries written after the last committed meta."""
+    for name, dtype in COLUMNS.items():
+        path = _col_path(name)
+        if path.exists():
+            os.truncate(path, meta["count"] * dtype.itemsize)
+    for name in DICT_COLUMNS:
+        path = _dict_path(name)
+        size = meta["dict_sizes"].get(name, 0)
+        if not path.exists():
+            continue
+        with open(path, "rb+") as f:
+            keep = 0
+            for _ in range(size):
+                line = f.readline()
+                if not line:
+                    break
+                keep += len(line)
+            f.truncate(keep)
+
+
+def refresh(src: Path | None = None, chunk_rows: int = 65536) -> ColumnarSnapshot:
+    """Bring the snapshot up to date with the JSONL source and return it.
+
+    Only bytes past ``meta["covered"]`` are parsed. A source that shrank or
+    was replaced (different inode) triggers a full rebuild.
+    """
+    src = Path(src) if src is not None else store.EV_FILE
+    COL_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(COL_DIR / "_lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        with store._flock(fd):
+            return _refresh_locked(src, chunk_rows)
+    finally:
+        os.close(fd)
+
+
+def _refresh_locked(src: Path, chunk_rows: int) -> ColumnarSnapshot:
+    meta = _read_meta()
+    try:
+        st = src.stat()
+    except FileNotFoundError:
+        return ColumnarSnapshot(meta)
+
+    if meta["ino"] not in (None, st.st_ino) or st.st_size < meta["covered"]:
+        _reset()
+        meta = _read_meta()
+    _trim(meta)
+    if st.st_size == meta["covered"]:
+        return ColumnarSnapshot(meta)
+
+    encoders = {
+        name: _DictEncoder(name, meta["dict_sizes"].get(name, 0))
+        for name in DICT_COLUMNS
+    }
+    buffers = {name: [] for name in COLUMNS}
+    pos = meta["covered"]
+    count = meta["count"]
+
+    def flush():
+        for name, dtype in COLUMNS.items():
+            if buffers[name]:
+                with open(_col_path(name), "ab") as out:
+                    out.write(np.asarray(buffers[name], dtype=dtype).tobytes())
+                buffers[name].clear()
+        for name, enc in encoders.items():
+            if enc.new:
+                with open(_dict_path(name), "a", encoding="utf-8") as out:
+                    out.writelines(
+                        json.dumps(v, ensure_ascii=False) + "\n" for v in enc.new
+                    )
+                enc.new.clear()
+
+    with open(src, "rb") as f:
+        f.seek(pos)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # record still being written
+            start, pos = pos, pos + len(line)
+            body = line.rstrip(b"\r\n")
+            if not body.strip():
+                continue
+            ev = store._decode(body)
+            if not isinstance(ev, dict):
+                continue
+            try:
+                ts = to_epoch(ev["ts"]) if ev.get("ts") is not None else np.nan
+            except (TypeError, ValueError):
+                ts = np.nan
+            buffers["ts"].append(ts)
+            buffers["role"].append(encoders["role"].encode(ev.get("role") or ""))
+            buffers["session"].append(encoders["session"].encode(ev.get("session_id")))
+            buffers["vec_id"].append(
+                encoders["vec_id"].encode(ev.get("vec_id") or ev.get("id"))
+            )
+            buffers["offset"].append(start)
+            buffers["length"].append(len(body))
+            count += 1
+            if len(buffers["ts"]) >= chunk_rows:
+                flush()
+    flush()
+
+    meta = {
+        "count": count,
+        "covered": pos,
+        "ino": st.st_ino,
+        "source": str(src),
+        "dict_sizes": {name: len(enc.values) for name, enc in encoders.items()},
+    }
+    _write_meta(meta)
+    return ColumnarSnapshot(meta)
+
+
+def open_snapshot() -> ColumnarSnapshot:
+    """Open the last committed snapshot without refreshing it."""
+    return ColumnarSnapshot()
+
+
+def count_events(src: Path | None = None) -> int:
+    """Committed row count plus complete lines appended since, without writing.
+
+    A snapshot of a source that shrank or was replaced is ignored and the
+    whole source is counted instead.
+    """
+    src = Path(src) if src is not None else store.EV_FILE
+    meta = _read_meta()
+    try:
+        st = src.stat()
+    except FileNotFoundError:
+        return 0
+    if meta["ino"] not in (None, st.st_ino) or st.st_size < meta["covered"]:
+        meta = {"count": 0, "covered": 0}
+    count = meta["count"]
+    with open(src, "rb") as f:
+        f.seek(meta["covered"])
+        for line in f:
+            if line.endswith(b"\n") and line.strip():
+                count += 1
+    return count
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Refresh the EG-Space columnar snapshot")
+    ap.add_argument("--src", default=str(store.EV_FILE))
+    args = ap.parse_args()
+
+    snap = refresh(Path(args.src))
+    latest = snap.latest(5)
+    print(
+        json.dumps(
+            {
+                "count": len(snap),
+                "covered_bytes": snap.meta["covered"],
+                "roles": snap.role_counts(),
+                "latest_vec_ids": snap.vec_ids(latest),
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
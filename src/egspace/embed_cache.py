@@ -0,0 +1,244 @@
+"""Persistent, content-addressed embedding cache.
+
+Embeddings are keyed by ``sha256(text)`` plus the embedder name and stored as
+rows of a memory-mapped float32 matrix (``vectors.f32``); ``index.json``
+maps keys to rows together with an LRU clock. Once ``max_rows`` is reached
+the least recently used rows are evicted and their slots reused.
+
+Several processes may share one cache directory: lookups and the
+allocate/write/save step run under an exclusive flock(2) on ``_lock`` and
+start by re-reading ``index.json``, so no two writers hand out the same row.
+The embedding model itself is called outside the lock.
+
+Typical use keeps the existing ``(emb_fn, name)`` contract::
+
+    embf = cached_embedder(embf, name)
+    V = embf(texts)              # only new/changed texts hit the model
+    out["embed_cache"] = embf.cache.stats()
+"""
+
+import hashlib
+import json
+import os
+import re
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: single-process use only
+    fcntl = None
+
+CACHE_DIR = Path(os.getenv("EGSPACE_EMB_CACHE", "egspace/emb_cache"))
+MAX_ROWS = int(os.getenv("EGSPACE_EMB_CACHE_ROWS", "50000"))
+
+
+def text_key(text: str, model: str) -> str:
+    return f"{model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+
+class EmbeddingCache:
+    def __init__(self, model: str, path=None, max_rows: int = MAX_ROWS, dim=None):
+        self.model = model
+        if path is None:
+            path = CACHE_DIR / re.sub(r"[^A-Za-z0-9_.-]", "_", model)
+        self.path = Path(path)
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.clock = 0
+        # key -> [row, last_used]
+        self.rows: dict[str, list] = {}
+        # High-water mark of row slots handed out so far
+        self.allocated = 0
+        self.capacity = 0
+        self.vectors = None
+        # key -> clock of hits not yet written to index.json
+        self._touched: dict[str, int] = {}
+        # index.json is replaced atomically, so a snapshot needs no lock
+        self._reload()
+
+    # -- storage -----------------------------------------------------------
+
+    @property
+    def _vec_path(self) -> Path:
+        return self.path / "vectors.f32"
+
+    @property
+    def _index_path(self) -> Path:
+        return self.path / "index.json"
+
+    def _read_index(self) -> dict:
+        try:
+            return json.loads(self._index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        """Hold the cache lock, with the index re-read from disk."""
+        fd = os.open(self.path / "_lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            self._reload()
+            yield
+        finally:
+            os.close(fd)  # releases the flock
+
+    def _reload(self) -> None:
+        meta = self._read_index()
+        if not meta:
+            return
+        self.dim = meta.get("dim") or self.dim
+        self.clock = max(self.clock, meta.get("clock", 0))
+        self.rows = meta.get("rows", {})
+        self.allocated = meta.get("allocated", len(self.rows))
+        # Recent hits of this instance still count for LRU order
+        for k, used in self._touched.items():
+            entry = self.rows.get(k)
+            if entry is not None:
+                entry[1] = max(entry[1], used)
+        capacity = max(meta.get("capacity", 0), 1)
+        if self.dim and (self.vectors is None or capacity > self.capacity):
+            self._open(capacity)
+
+    def _open(self, capacity: int) -> None:
+        capacity = min(capacity, self.max_rows)
+        size = capacity * self.dim * 4
+        with open(self._vec_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self.vectors = np.memmap(
+            self._vec_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim)
+        )
+        self.capacity = capacity
+
+    def _alloc(self, n: int, protect: set) -> list[int]:
+        """Return ``n`` free row slots, growing or evicting LRU rows."""
+        slots = []
+        need = n
+        if self.allocated < self.max_rows:
+            start = self.allocated
+            grow = min(need, self.max_rows - start)
+            if start + grow > self.capacity:
+                self.vectors.flush()
+                self._open(max(start + grow, self.capacity * 2))
+            slots.extend(range(start, start + grow))
+            self.allocated += grow
+            need -= grow
+        if need:
+            victims = sorted(
+                (k for k in self.rows if k not in protect),
+                key=lambda k: self.rows[k][1],
+            )[:need]
+            for k in victims:
+                slots.append(self.rows.pop(k)[0])
+            self.evictions += len(victims)
+        return slots
+
+    def save(self) -> None:
+        if self.vectors is not None:
+            self.vectors.flush()
+        meta = {
+            "model": self.model,
+            "dim": self.dim,
+            "capacity": self.capacity,
+            "clock": self.clock,
+            "allocated": self.allocated,
+            "rows": self.rows,
+        }
+        tmp = self._index_path.with_name(f"index.json.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self._index_path)
+        self._touched.clear()
+
+    # -- lookup ------------------------------------------------------------
+
+    def embed(self, texts: list[str], embf) -> np.ndarray:
+        """Return embeddings for ``texts``, calling ``embf`` only on misses."""
+        keys = [text_key(t, self.model) for t in texts]
+        out = None
+        missing: dict[str, str] = {}
+        with self._locked():
+            self.clock += 1
+            hit_pos = []
+            for i, (k, t) in enumerate(zip(keys, texts)):
+                entry = self.rows.get(k)
+                if entry is not None:
+                    entry[1] = self._touched[k] = self.clock
+                    hit_pos.append(i)
+                    self.hits += 1
+                elif k not in missing:
+                    missing[k] = t
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            if self.dim is not None:
+                out = np.empty((len(texts), self.dim), dtype=np.float32)
+                if hit_pos:
+                    rows = [self.rows[keys[i]][0] for i in hit_pos]
+                    out[hit_pos] = self.vectors[rows]
+        if not missing:
+            return out if out is not None else np.empty((0, 0), dtype=np.float32)
+
+        V = np.asarray(embf(list(missing.values())), dtype=np.float32)
+        fresh = dict(zip(missing, V))
+        with self._locked():
+            if self.dim is None:
+                self.dim = V.shape[1]
+                self._open(min(max(len(missing), 1024), self.max_rows))
+            # Another process may have stored some of them meanwhile
+            new = []
+            for k in missing:
+                if k in self.rows:
+                    self.rows[k][1] = self.clock
+                else:
+                    new.append(k)
+            # Rows needed by this call must survive eviction
+            protect = set(keys)
+            slots = self._alloc(len(new), protect)
+            for k, slot in zip(new, slots):
+                self.vectors[slot] = fresh[k]
+                self.rows[k] = [slot, self.clock]
+            self.save()
+
+        if out is None:
+            out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for i, k in enumerate(keys):
+            if k in fresh:
+                out[i] = fresh[k]
+        return out
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "model": self.model,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+            "rows": len(self.rows),
+            "max_rows": self.max_rows,
+        }
+
+
+def cached_embedder(embf, model: str, cache: EmbeddingCache | None = None):
+    """Wrap ``embf`` so it reads through an EmbeddingCache for ``model``.
+
+    The wrapper keeps the ``embf(texts) -> float32 matrix`` contract and
+    exposes the cache as ``.cache``.
+    """
+    cache = cache or EmbeddingCache(model)
+
+    def emb(texts):
+        return cache.embed(list(texts), embf)
+
+    emb.cache = cache
+    return emb
@@ -0,0 +1,230 @@
+"""Shared SBERT embedding service for the EG-Space scripts.
+
+- get_encoder() loads a model at most once per process (lazy import of
+  sentence-transformers/torch, thread-safe singleton per model name).
+- sbert_embedder() returns the scripts' ``(emb_fn, name)`` pair once the
+  model is known to load (in the worker if one is listening, otherwise in
+  this process), and ``(None, None)`` on any failure so callers fall back
+  to the hashing embedder.
+- serve() runs a long-lived worker on a unix socket. When it is listening,
+  sbert_embedder() sends texts there instead of loading the model, so many
+  short CLI invocations share one warm model::
+
+      python -m src.egspace.embed_service serve &
+      python scripts/egspace_reason_v1.py
+
+Wire format: one JSON request line per call, answered by a JSON header line
+(``{"shape": [n, dim]}`` or ``{"error": ...}``) followed by ``n * dim``
+little-endian float32 values.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from src.egspace import embedder
+except ImportError:  # only src/ on sys.path (imported as egspace.embed_service)
+    from egspace import embedder
+
+SBERT_MODEL = os.getenv("EGSPACE_SBERT_MODEL", "all-MiniLM-L6-v2")
+BATCH_SIZE = int(os.getenv("EGSPACE_EMB_BATCH", "64"))
+# 0 keeps torch's default intra-op thread count
+THREADS = int(os.getenv("EGSPACE_EMB_THREADS", "0"))
+SOCKET = Path(os.getenv("EGSPACE_EMB_SOCKET", "egspace/embed.sock"))
+CONNECT_TIMEOUT = 1.0
+
+_ENCODERS: dict = {}
+_LOAD_LOCK = threading.Lock()
+
+
+def space_name(model: str) -> str:
+    """Embedding-space name used for cache keys and script output."""
+    return model if model == embedder.HASH_NAME else f"sbert:{model}"
+
+
+def _load(model: str):
+    if model == embedder.HASH_NAME:
+        return embedder.emb_hash
+
+    from sentence_transformers import SentenceTransformer
+
+    if THREADS > 0:
+        import torch
+
+        torch.set_num_threads(THREADS)
+    m = SentenceTransformer(model)
+
+    def encode(texts):
+        X = m.encode(list(texts), batch_size=BATCH_SIZE, normalize_embeddings=True)
+        return np.asarray(X, dtype=np.float32)
+
+    return encode
+
+
+def get_encoder(model: str = SBERT_MODEL):
+    """Return the process-wide encoder for ``model``, loading it on first use."""
+    enc = _ENCODERS.get(model)
+    if enc is None:
+        with _LOAD_LOCK:
+            enc = _ENCODERS.get(model)
+            if enc is None:
+                enc = _ENCODERS[model] = _load(model)
+    return enc
+
+
+# -- worker client ---------------------------------------------------------
+
+
+def _request(req: dict, path: Path | None = None):
+    """Send one request to the worker; None when no worker is listening."""
+    path = Path(path or SOCKET)
+    if not path.exists():
+        return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(CONNECT_TIMEOUT)
+        try:
+            s.connect(str(path))
+        except (ConnectionRefusedError, FileNotFoundError, socket.timeout):
+            return None  # stale socket file
+        s.settimeout(None)
+        s.sendall(json.dumps(req, ensure_ascii=False).encode("utf-8") + b"\n")
+        with s.makefile("rb") as f:
+            head = json.loads(f.readline() or b"null")
+            if head is None:
+                return None
+            if "error" in head:
+                raise RuntimeError(f"embedding worker: {head['error']}")
+            if "shape" not in head:
+                return head
+            n, dim = head["shape"]
+            buf = f.read(n * dim * 4)
+    if len(buf) != n * dim * 4:
+        raise RuntimeError("embedding worker: truncated response")
+    return np.frombuffer(buf, dtype="<f4").reshape(n, dim).copy()
+
+
+def ping(path: Path | None = None) -> dict | None:
+    """Worker status (loaded models, pid) or None if none is listening."""
+    return _request({"op": "ping"}, path)
+
+
+def remote_encode(texts, model: str = SBERT_MODEL, path: Path | None = None):
+    """Embed ``texts`` in the worker; None if no worker is listening."""
+    return _request({"op": "encode", "model": model, "texts": list(texts)}, path)
+
+
+def sbert_embedder(model: str = SBERT_MODEL):
+    """``(emb_fn, name)`` for SBERT, or ``(None, None)`` if it is unavailable.
+
+    The model is loaded here, by a running worker or otherwise in this
+    process, so a missing package, model download or broken torch install
+    surfaces as ``(None, None)`` rather than as an error halfway through a
+    run. ``emb_fn`` prefers the worker while it is listening.
+    """
+    try:
+        status = ping()
+        if status is None:
+            get_encoder(model)
+        elif model not in status.get("models", []):
+            remote_encode(["warmup"], model)
+    except Exception:
+        return None, None
+
+    def emb(texts):
+        X = remote_encode(texts, model)
+        if X is None:
+            X = get_encoder(model)(texts)
+        return X
+
+    return emb, space_name(model)
+
+
+# -- worker ----------------------------------------------------------------
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                req = json.loads(line)
+                if req.get("op") == "ping":
+                    self._send_json({"pid": os.getpid(), "models": list(_ENCODERS)})
+                    continue
+                enc = get_encoder(req.get("model") or SBERT_MODEL)
+                with self.server.encode_lock:
+                    X = enc(req["texts"])
+            except Exception as e:  # noqa: BLE001 - reported to the client
+                self._send_json({"error": f"{type(e).__name__}: {e}"})
+                continue
+            X = np.ascontiguousarray(X, dtype="<f4")
+            self._send_json({"shape": list(X.shape)})
+            self.wfile.write(X.tobytes())
+
+    def _send_json(self, obj):
+        self.wfile.write(json.dumps(obj).encode("utf-8") + b"\n")
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, handler):
+        super().__init__(path, handler)
+        # One batch at a time; torch already parallelizes inside encode()
+        self.encode_lock = threading.Lock()
+
+
+def make_server(path: Path | None = None, preload=(SBERT_MODEL,)) -> _Server:
+    """Bind the worker socket (replacing a stale one) and preload models."""
+    path = Path(path or SOCKET)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        if ping(path) is not None:
+            raise RuntimeError(f"embedding worker already listening on {path}")
+        path.unlink()
+    for model in preload:
+        get_encoder(model)
+    return _Server(str(path), _Handler)
+
+
+def serve(path: Path | None = None, preload=(SBERT_MODEL,)) -> None:
+    path = Path(path or SOCKET)
+    server = make_server(path, preload)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="EG-Space embedding worker")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("serve", help="run the worker in the foreground")
+    sp.add_argument("--socket", default=str(SOCKET))
+    sp.add_argument(
+        "--model",
+        action="append",
+        help=f"model to preload (repeatable; default {SBERT_MODEL})",
+    )
+    pp = sub.add_parser("ping", help="check whether a worker is listening")
+    pp.add_argument("--socket", default=str(SOCKET))
+    args = ap.parse_args()
+
+    if args.cmd == "serve":
+        serve(Path(args.socket), preload=args.model or [SBERT_MODEL])
+    else:
+        status = ping(Path(args.socket))
+        print(json.dumps(status))
+        sys.exit(0 if status is not None else 1)
+
+
+if __name__ == "__main__":
+    main()
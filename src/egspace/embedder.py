@@ -0,0 +1,89 @@
+"""Shared embedders for the EG-Space scripts.
+
+Every embedder follows the scripts' ``(emb_fn, name)`` contract:
+``emb_fn(texts) -> float32 matrix (len(texts), EMB_DIM)`` with L2-normalized
+rows, and ``name`` identifying the vector space (it is part of the
+embedding cache key, so it changes whenever the vectors would).
+
+The hashing embedder needs only numpy. It hashes the UTF-8 byte n-grams of
+the lower-cased text (3 and 6 bytes: ASCII trigrams and word-ish 6-grams,
+one and two Japanese characters) into EMB_DIM signed buckets, so texts
+sharing vocabulary land close to each other, unlike the old
+one-random-vector-per-string fallback. All texts of a batch are hashed
+together as one byte array; there is no per-text or per-token Python work
+beyond ``lower().encode()``. Texts are cut at MAX_CHARS characters.
+"""
+
+import numpy as np
+
+EMB_DIM = 384
+NGRAMS = (3, 6)
+HASH_NAME = f"hashing-v2:{EMB_DIM}"
+
+# Like SBERT's max_seq_length: only the head of long reports is embedded
+MAX_CHARS = 4096
+BLOCK_BYTES = 1 << 20
+
+_PRIME = np.uint32(0x01000193)
+
+
+def _fmix32(h: np.ndarray) -> np.ndarray:
+    """MurmurHash3 finalizer so both the bucket and sign bits are well mixed."""
+    h ^= h >> np.uint32(16)
+    h *= np.uint32(0x85EBCA6B)
+    h ^= h >> np.uint32(13)
+    h *= np.uint32(0xC2B2AE35)
+    h ^= h >> np.uint32(16)
+    return h
+
+
+def _hash_block(data: list[bytes], dim: int) -> np.ndarray:
+    """Signed bucket counts, shape ``(len(data), dim, 2)`` for ``+``/``-``."""
+    lens = np.fromiter(map(len, data), dtype=np.int64, count=len(data))
+    buf = np.frombuffer(b"".join(data), dtype=np.uint8).astype(np.uint32)
+    row = np.repeat(np.arange(len(data), dtype=np.uint32), lens)
+    size = len(data) * dim * 2
+    counts = np.zeros(size, dtype=np.int64)
+    if len(buf) < 3:
+        return counts.reshape(len(data), dim, 2)
+
+    # FNV-style combine of every 3-byte window (uint32 arithmetic wraps);
+    # 6-byte windows reuse two adjacent 3-byte hashes
+    h3 = buf[:-2] * _PRIME
+    h3 ^= buf[1:-1]
+    h3 *= _PRIME
+    h3 ^= buf[2:]
+    grams = {3: h3, 6: h3[:-3] * _PRIME ^ h3[3:]}
+    for n in NGRAMS:
+        h = _fmix32(grams[n] ^ np.uint32(n))
+        # Multiply-shift maps the hash onto 2*dim slots: slot // 2 is the
+        # bucket and slot & 1 the sign, so collisions cancel out on average
+        h >>= np.uint32(16)
+        h *= np.uint32(2 * dim)
+        h >>= np.uint32(16)
+        h += row[: len(h)] * np.uint32(2 * dim)
+        # Windows straddling two texts go to an overflow slot
+        h[row[: len(h)] != row[n - 1 :]] = size
+        counts += np.bincount(h, minlength=size + 1)[:size]
+    return counts.reshape(len(data), dim, 2)
+
+
+def emb_hash(texts, dim: int = EMB_DIM) -> np.ndarray:
+    """Vectorized, deterministic byte-n-gram feature-hashing embedder."""
+    # Pad with spaces so n-grams at the edges mark word boundaries
+    data = [f" {(t or '')[:MAX_CHARS]} ".lower().encode("utf-8") for t in texts]
+    X = np.zeros((len(data), dim), dtype=np.float32)
+    # Hash ~BLOCK_BYTES at a time to keep the temporaries cache-sized
+    start = size = 0
+    for i, d in enumerate(data):
+        size += len(d)
+        if size >= BLOCK_BYTES or i == len(data) - 1:
+            c = _hash_block(data[start : i + 1], dim)
+            X[start : i + 1] = c[..., 0] - c[..., 1]
+            start, size = i + 1, 0
+    X /= np.linalg.norm(X, axis=1, keepdims=True) + 1e-9
+    return X
+
+
+def hashing_embedder():
+    return emb_hash, HASH_NAME
@@ -0,0 +1,321 @@
+"""Time- and role-partitioned EG-Space layout.
+
+Events live under ``egspace/date=YYYY-MM-DD/role=<role>/part-N.jsonl``. Each
+partition directory carries a small ``_manifest.json`` with the event count,
+min/max ts, per-session counts, the highest ingest ID per date and the
+committed byte size of every part.
+The manifest is the commit point: readers never look past a part's recorded
+``bytes``, and a writer rolls back any uncommitted tail it finds.
+
+Enabled for src.egspace.store and vpm_mini.egspace with
+EGSPACE_PARTITIONED=true; existing events.jsonl data can be converted with
+build_partitions().
+"""
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator
+
+from src.egspace import store
+
+PARTITIONED = os.getenv("EGSPACE_PARTITIONED", "false").lower() == "true"
+MANIFEST = "_manifest.json"
+PART_MAX_BYTES = 64 << 20
+
+_ROLE_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+# Stable IDs handed out by vpm_mini.egspace ingest
+_EVENT_ID = re.compile(r"E:(\d{4}-\d{2}-\d{2})#(\d+)")
+
+
+def _event_ts(event: dict) -> float:
+    """Return the event timestamp as epoch seconds (ISO strings accepted)."""
+    return to_epoch(event.get("ts"))
+
+
+def to_epoch(value) -> float:
+    """Epoch seconds for a datetime, number or ISO string (None means now)."""
+    if value is None:
+        return datetime.now(timezone.utc).timestamp()
+    if isinstance(value, datetime):
+        dt = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    if isinstance(value, (int, float)):
+        return float(value)
+    dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _date_of(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _role_key(role) -> str:
+    return _ROLE_UNSAFE.sub("_", str(role or "unknown")) or "unknown"
+
+
+def partition_dir(date_str: str, role) -> Path:
+    return store.EG_DIR / f"date={date_str}" / f"role={_role_key(role)}"
+
+
+def _read_manifest(pdir: Path) -> dict | None:
+    try:
+        return json.loads((pdir / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(pdir: Path, manifest: dict) -> None:
+    tmp = pdir / f"{MANIFEST}.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, pdir / MANIFEST)
+
+
+def _new_manifest(date_str: str, role: str) -> dict:
+    return {
+        "date": date_str,
+        "role": role,
+        "count": 0,
+        "min_ts": None,
+        "max_ts": None,
+        "sessions": {},
+        "ids": {},
+        "parts": [],
+    }
+
+
+def _commit_partition(pdir: Path, date_str: str, role: str, rows: list) -> None:
+    """Append ``rows`` of (ts, event) to one partition and update its manifest."""
+    pdir.mkdir(parents=True, exist_ok=True)
+    fd = os.open(pdir / "_lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        with store._flock(fd):
+            manifest = _read_manifest(pdir) or _new_manifest(date_str, role)
+            parts = manifest["parts"]
+            if not parts or parts[-1]["bytes"] >= PART_MAX_BYTES:
+                parts.append(
+                    {
+                        "file": f"part-{len(parts)}.jsonl",
+                        "count": 0,
+                        "bytes": 0,
+                        "min_ts": None,
+                        "max_ts": None,
+                    }
+                )
+            part = parts[-1]
+            part_path = pdir / part["file"]
+
+            # Roll back bytes a crashed writer appended but never committed
+            if part_path.exists() and part_path.stat().st_size != part["bytes"]:
+                os.truncate(part_path, part["bytes"])
+
+            data = b"".join(
+                (json.dumps(ev, ensure_ascii=False) + "\n").encode("utf-8")
+                for _, ev in rows
+            )
+            store._append_bytes(part_path, data, locked=True)
+
+            lo = min(ts for ts, _ in rows)
+            hi = max(ts for ts, _ in rows)
+            for target in (part, manifest):
+                target["count"] += len(rows)
+                target["min_ts"] = (
+                    lo if target["min_ts"] is None else min(target["min_ts"], lo)
+                )
+                target["max_ts"] = (
+                    hi if target["max_ts"] is None else max(target["max_ts"], hi)
+                )
+            part["bytes"] += len(data)
+            ids = manifest.setdefault("ids", {})
+            for _, ev in rows:
+                sid = ev.get("session_id")
+                if sid is not None:
+                    sessions = manifest["sessions"]
+                    sessions[str(sid)] = sessions.get(str(sid), 0) + 1
+                m = _EVENT_ID.fullmatch(str(ev.get("id", "")))
+                if m:
+                    ids[m[1]] = max(ids.get(m[1], 0), int(m[2]))
+            _write_manifest(pdir, manifest)
+    finally:
+        os.close(fd)
+
+
+def append_partitioned(events: list[dict]) -> None:
+    """Append events to their date/role partitions, one commit per partition."""
+    groups: dict[tuple, list] = {}
+    for ev in events:
+        ts = _event_ts(ev)
+        key = (_date_of(ts), _role_key(ev.get("role")))
+        groups.setdefault(key, []).append((ts, ev))
+    for (date_str, role), rows in sorted(groups.items()):
+        _commit_partition(partition_dir(date_str, role), date_str, role, rows)
+
+
+def iter_manifests(
+    role=None, since=None, until=None, session_id=None
+) -> Iterator[tuple[Path, dict]]:
+    """Yield (partition dir, manifest) pairs that may hold matching events.
+
+    Pruning uses directory names first (date, role) and then the manifest's
+    min/max ts and session counts, so no event data is read here.
+    """
+    lo = to_epoch(since) if since is not None else None
+    hi = to_epoch(until) if until is not None else None
+    lo_date = _date_of(lo) if lo is not None else None
+    hi_date = _date_of(hi) if hi is not None else None
+    role_dir = f"role={_role_key(role)}" if role is not None else None
+
+    if not store.EG_DIR.exists():
+        return
+    for ddir in sorted(store.EG_DIR.glob("date=*")):
+        date_str = ddir.name[len("date=") :]
+        if lo_date and date_str < lo_date or hi_date and date_str > hi_date:
+            continue
+        for pdir in sorted(ddir.glob("role=*")):
+            if role_dir and pdir.name != role_dir:
+                continue
+            manifest = _read_manifest(pdir)
+            if not manifest or not manifest["count"]:
+                continue
+            if lo is not None and manifest["max_ts"] < lo:
+                continue
+            if hi is not None and manifest["min_ts"] > hi:
+                continue
+            if session_id is not None and str(session_id) not in manifest["sessions"]:
+                continue
+            yield pdir, manifest
+
+
+def _iter_part(pdir: Path, part: dict) -> Iterator[dict]:
+    """Yield committed events of one part (ignores any uncommitted tail)."""
+    remaining = part["bytes"]
+    with open(pdir / part["file"], "rb") as f:
+        for line in f:
+            if remaining <= 0:
+                break
+            remaining -= len(line)
+            if line.strip():
+                ev = store._decode(line)
+                if ev is not None:
+                    yield ev
+
+
+def query_events(
+    role=None, since=None, until=None, session_id=None, limit: int | None = None
+) -> list[dict]:
+    """Query partitioned events by role, time range and session.
+
+    ``since``/``until`` accept epoch seconds, ISO strings or datetimes and
+    are inclusive. Results are ordered by ts; with ``limit`` only the most
+    recent ``limit`` matches are returned.
+    """
+    lo = to_epoch(since) if since is not None else None
+    hi = to_epoch(until) if until is not None else None
+
+    rows = []
+    for pdir, manifest in iter_manifests(role, since, until, session_id):
+        for part in manifest["parts"]:
+            if not part["count"]:
+                continue
+            if lo is not None and part["max_ts"] < lo:
+                continue
+            if hi is not None and part["min_ts"] > hi:
+                continue
+            for ev in _iter_part(pdir, part):
+                if session_id is not None and ev.get("session_id") != session_id:
+                    continue
+                ts = _event_ts(ev)
+                if lo is not None and ts < lo or hi is not None and ts > hi:
+                    continue
+                rows.append((ts, ev))
+
+    rows.sort(key=lambda r: r[0])
+    if limit is not None and limit > 0:
+        rows = rows[-limit:]
+    return [ev for _, ev in rows]
+
+
+def recent_events(limit: int = 50) -> list[dict]:
+    """Return the latest ``limit`` events, reading only the newest partitions."""
+    if limit <= 0:
+        return query_events()
+    if not store.EG_DIR.exists():
+        return []
+
+    rows = []
+    for ddir in sorted(store.EG_DIR.glob("date=*"), reverse=True):
+        for pdir in sorted(ddir.glob("role=*")):
+            manifest = _read_manifest(pdir)
+            if not manifest:
+                continue
+            taken = 0
+            for part in reversed(manifest["parts"]):
+                with open(pdir / part["file"], "rb") as f:
+                    for line in store._iter_lines_reverse(f, 0, part["bytes"]):
+                        ev = store._decode(line)
+                        if ev is None:
+                            continue
+                        rows.append((_event_ts(ev), ev))
+                        taken += 1
+                        if taken >= limit:
+                            break
+                if taken >= limit:
+                    break
+        # Earlier dates only hold older events
+        if len(rows) >= limit:
+            break
+
+    rows.sort(key=lambda r: r[0])
+    return [ev for _, ev in rows[-limit:]]
+
+
+def partition_stats() -> dict:
+    """Summarize the partitioned store from manifests alone.
+
+    ``total_events`` counts every stored event. ``ingested_events`` and
+    ``latest_id`` only cover events that carry an ingest ID, so role events
+    written by store.append_event() do not shift them.
+    """
+    total = 0
+    partitions = 0
+    last_ids: dict[str, int] = {}
+    for _, manifest in iter_manifests():
+        partitions += 1
+        total += manifest["count"]
+        for date_str, n in manifest.get("ids", {}).items():
+            last_ids[date_str] = max(last_ids.get(date_str, 0), n)
+
+    latest_id = None
+    if last_ids:
+        latest = max(last_ids)
+        latest_id = f"E:{latest}#{last_ids[latest]}"
+    return {
+        "total_events": total,
+        "ingested_events": sum(last_ids.values()),
+        "latest_id": latest_id,
+        "partitions": partitions,
+    }
+
+
+def build_partitions(src: Path | None = None, batch_size: int = 5000) -> int:
+    """Copy a flat events.jsonl into the partitioned layout; return the count."""
+    src = Path(src) if src is not None else store.EV_FILE
+    n = 0
+    buf = []
+    with open(src, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            buf.append(json.loads(line))
+            if len(buf) >= batch_size:
+                append_partitioned(buf)
+                n += len(buf)
+                buf = []
+    if buf:
+        append_partitioned(buf)
+        n += len(buf)
+    return n
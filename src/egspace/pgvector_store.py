@@ -0,0 +1,195 @@
+"""Bulk load and server-side C/G/δ ranking for the pgvector ``items`` table.
+
+- get_conn() reuses one connection per DSN for the life of the process.
+- bulk_upsert() streams all rows through a single COPY into a temp staging
+  table and merges them with one INSERT ... SELECT ... ON CONFLICT. When the
+  ``pgvector`` package is installed vectors are sent in binary COPY format;
+  otherwise as ``[x,y,...]`` text literals.
+- rank_server_side() computes the centroid with ``avg(emb)`` and lets
+  Postgres order rows by inner product (``<#>``), optionally backed by an
+  HNSW/IVFFlat index, so only the top/bottom contributors are returned.
+"""
+
+import os
+import weakref
+from datetime import datetime
+
+import numpy as np
+
+DSN = os.getenv(
+    "EGSPACE_DSN",
+    "host=127.0.0.1 port=5432 dbname=egspace user=egspace password=egspace-pass",
+)
+EMB_DIM = 384
+
+_CONNS: dict[str, object] = {}
+# connection -> True when pgvector's binary adapters are registered on it
+_BINARY: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_conn(dsn: str | None = None):
+    """Return a live connection for ``dsn``, opening it only once."""
+    import psycopg
+
+    dsn = dsn or DSN
+    conn = _CONNS.get(dsn)
+    if conn is None or conn.closed:
+        conn = psycopg.connect(dsn)
+        _register_vector(conn)
+        _CONNS[dsn] = conn
+    return conn
+
+
+def _register_vector(conn) -> bool:
+    try:
+        from pgvector.psycopg import register_vector
+    except ImportError:
+        return False
+    try:
+        register_vector(conn)
+    except Exception:
+        # vector extension not created yet; ensure_schema() retries
+        conn.rollback()
+        return False
+    _BINARY[conn] = True
+    return True
+
+
+def _binary(conn) -> bool:
+    return _BINARY.get(conn, False)
+
+
+def vec_literal(v) -> str:
+    return "[" + ",".join(f"{x:.7g}" for x in np.asarray(v, dtype=np.float32)) + "]"
+
+
+def _param(conn, v):
+    v = np.asarray(v, dtype=np.float32)
+    return v if _binary(conn) else vec_literal(v)
+
+
+def _ts(value):
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+def _parse_vec(value) -> np.ndarray:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return np.array(value.strip("[]").split(","), dtype=np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def ensure_schema(conn, dim: int = EMB_DIM, index: str | None = None) -> None:
+    """Create the items table (and optionally an ANN index on ``emb``)."""
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        cur.execute(
+            f"""
+CREATE TABLE IF NOT EXISTS items(
+  id bigserial PRIMARY KEY,
+  kind text, path text, ts timestamptz,
+  txt text,
+  emb vector({dim}),
+  UNIQUE(kind,path)
+);"""
+        )
+        if index == "hnsw":
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS items_emb_hnsw "
+                "ON items USING hnsw (emb vector_ip_ops)"
+            )
+        elif index == "ivfflat":
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS items_emb_ivfflat "
+                "ON items USING ivfflat (emb vector_ip_ops) WITH (lists = 100)"
+            )
+    conn.commit()
+    if not _binary(conn):
+        _register_vector(conn)
+
+
+def bulk_upsert(conn, items, V, dim: int = EMB_DIM) -> int:
+    """Upsert ``(kind, path, ts, txt)`` items with embeddings ``V`` in bulk."""
+    if not items:
+        return 0
+    binary = _binary(conn)
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""CREATE TEMP TABLE IF NOT EXISTS items_stage(
+  kind text, path text, ts timestamptz, txt text, emb vector({dim})
+) ON COMMIT DELETE ROWS"""
+        )
+        fmt = " (FORMAT BINARY)" if binary else ""
+        with cur.copy(
+            f"COPY items_stage (kind,path,ts,txt,emb) FROM STDIN{fmt}"
+        ) as copy:
+            if binary:
+                copy.set_types(["text", "text", "timestamptz", "text", "vector"])
+            for (kind, path, ts, txt), v in zip(items, V):
+                copy.write_row((kind, path, _ts(ts), txt, _param(conn, v)))
+        cur.execute(
+            """INSERT INTO items(kind,path,ts,txt,emb)
+               SELECT DISTINCT ON (kind,path) kind,path,ts,txt,emb
+               FROM items_stage
+               ON CONFLICT(kind,path) DO UPDATE
+               SET ts=EXCLUDED.ts, txt=EXCLUDED.txt, emb=EXCLUDED.emb"""
+        )
+    conn.commit()
+    return len(items)
+
+
+def _unit(v) -> np.ndarray:
+    v = np.asarray(v, dtype=np.float32)
+    return v / (np.linalg.norm(v) + 1e-9)
+
+
+def rank_server_side(conn, goal_vec, k: int = 3) -> dict:
+    """C/G/δ stat and top/bottom ``k`` contributors computed in Postgres.
+
+    Matches the client-side compute(): C is the normalized mean embedding,
+    G the normalized goal embedding and each row's contribution is
+    ``emb·G - emb·C = emb·(G - C)``.
+    """
+    with conn.cursor() as cur:
+        cur.execute("SELECT avg(emb), count(*) FROM items")
+        centroid, n = cur.fetchone()
+    if not n:
+        return {"stat": {"delta": None}, "ranking": []}
+
+    C = _unit(_parse_vec(centroid))
+    G = _unit(goal_vec)
+    d = G - C
+
+    sql = """SELECT kind, path, txt,
+                    -(emb <#> %(d)s::vector),
+                    -(emb <#> %(g)s::vector),
+                    -(emb <#> %(c)s::vector)
+             FROM items
+             ORDER BY emb <#> %(q)s::vector
+             LIMIT %(k)s"""
+    params = {
+        "d": _param(conn, d),
+        "g": _param(conn, G),
+        "c": _param(conn, C),
+        "k": k,
+    }
+    ranking = []
+    with conn.cursor() as cur:
+        # ascending negative inner product: largest emb·q first
+        for q in (d, -d):
+            cur.execute(sql, {**params, "q": _param(conn, q)})
+            for kind, path, txt, contrib, sim_g, sim_c in cur.fetchall():
+                ranking.append(
+                    {
+                        "kind": kind,
+                        "path": path,
+                        "delta_sim": round(float(contrib), 4),
+                        "simG": round(float(sim_g), 4),
+                        "simC": round(float(sim_c), 4),
+                        "preview": (txt or "")[:140].replace("\n", " "),
+                    }
+                )
+    return {"stat": {"delta": round(float(np.linalg.norm(d)), 4)}, "ranking": ranking}
@@ -1,20 +1,154 @@
 import json
+import os
+import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:  # non-POSIX: single-process use only
+    fcntl = None
+
 EG_DIR = Path("egspace")
 EV_FILE = EG_DIR / "events.jsonl"
+# Legacy full-rewrite index; migrated into the snapshot/log pair on first open.
 IDX_FILE = EG_DIR / "index.json"
+IDX_SNAPSHOT = EG_DIR / "index.snapshot.json"
+IDX_LOG = EG_DIR / "index.log.jsonl"
+IDX_LOCK = EG_DIR / "index.lock"
+
+# Writer mode: serialize appends/compaction across processes with flock(2).
+# Set EGSPACE_FSYNC=true to fsync every committed batch as well.
+LOCKING = os.getenv("EGSPACE_LOCKING", "true").lower() == "true"
+FSYNC = os.getenv("EGSPACE_FSYNC", "false").lower() == "true"
+
+# The log is folded into the snapshot once it outgrows the snapshot itself
+# (and this floor), which keeps compaction amortized O(1) per append.
+COMPACT_MIN_BYTES = 1 << 20
+
+# Block size used when reading events.jsonl backwards from the end.
+TAIL_BLOCK_SIZE = 64 * 1024
+
+# Per-directory cache: resolved log path -> {"sig", "offset", "index"}
+_INDEX_CACHE: dict[str, dict] = {}
+
+# Per-thread group-commit buffers opened by batch()
+_local = threading.local()
+
+
+def _partitions():
+    """Return the partitions module if the partitioned layout is enabled."""
+    from src.egspace import partitions
+
+    return partitions if partitions.PARTITIONED else None
 
 
 def ensure_dirs():
     """Ensure egspace directory and files exist."""
     EG_DIR.mkdir(exist_ok=True)
-    if not EV_FILE.exists():
-        EV_FILE.write_text("")
-    if not IDX_FILE.exists():
-        IDX_FILE.write_text("{}")
+    # touch() never truncates, so racing processes cannot clobber appends
+    EV_FILE.touch(exist_ok=True)
+    if not IDX_SNAPSHOT.exists():
+        with _index_lock():
+            if not IDX_SNAPSHOT.exists():
+                _migrate_legacy_index()
+    IDX_LOG.touch(exist_ok=True)
+
+
+@contextmanager
+def _flock(fd: int, exclusive: bool = True):
+    if fcntl is None or not LOCKING:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _index_lock(exclusive: bool = True):
+    """Hold the index lock (index log appends, compaction, snapshot reads)."""
+    fd = os.open(IDX_LOCK, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        with _flock(fd, exclusive):
+            yield
+    finally:
+        os.close(fd)
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        n = os.write(fd, view)
+        view = view[n:]
+
+
+def _append_bytes(path: Path, data: bytes, locked: bool = False) -> None:
+    """Append whole lines to ``path`` with a single O_APPEND write.
+
+    The file itself is flock()ed unless the caller already holds the
+    index lock (``locked=True``).
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if locked:
+            _write_all(fd, data)
+        else:
+            with _flock(fd):
+                _write_all(fd, data)
+        if FSYNC:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def batch():
+    """Group-commit EG-Space appends made by this thread inside the block.
+
+    append_event() and register_index() calls are buffered and written on
+    exit with one locked write per file (and one fsync with
+    EGSPACE_FSYNC). Buffered records are not visible to readers until the
+    block exits.
+    """
+    if getattr(_local, "pending", None) is not None:
+        yield  # nested: the outermost block commits
+        return
+    _local.pending = {"events": [], "index": [], "partitioned": []}
+    try:
+        yield
+    finally:
+        pending, _local.pending = _local.pending, None
+        _commit(pending)
+
+
+def _commit(pending: dict) -> None:
+    ensure_dirs()
+    if pending["events"]:
+        _append_bytes(EV_FILE, b"".join(pending["events"]))
+    if pending["partitioned"]:
+        _partitions().append_partitioned(pending["partitioned"])
+    if pending["index"]:
+        with _index_lock():
+            _append_bytes(IDX_LOG, b"".join(pending["index"]), locked=True)
+        _maybe_compact()
 
 
 def new_vec_id(prefix="session") -> str:
@@ -31,43 +165,195 @@ def new_vec_id(prefix="session") -> str:
     return vid
 
 
+def _migrate_legacy_index() -> None:
+    """Copy vec_id -> raw_ref entries from index.json into the snapshot.
+
+    index.json is shared with the date counters written by
+    vpm_mini.egspace (and may be a tracked file), so it is only read, never
+    rewritten; its string-valued entries are ignored from then on.
+    """
+    legacy = {}
+    if IDX_FILE.exists():
+        try:
+            legacy = json.loads(IDX_FILE.read_text() or "{}")
+        except Exception:
+            legacy = {}
+    if not isinstance(legacy, dict):
+        legacy = {}
+
+    mappings = {k: v for k, v in legacy.items() if isinstance(v, str)}
+    _write_snapshot(mappings)
+
+
+def _write_snapshot(d: dict) -> None:
+    """Atomically replace the index snapshot (temp file, fsync, rename)."""
+    tmp = IDX_SNAPSHOT.with_name(f"{IDX_SNAPSHOT.name}.{os.getpid()}.tmp")
+    data = json.dumps(d, ensure_ascii=False, separators=(",", ":")).encode()
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        _write_all(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, IDX_SNAPSHOT)
+    _fsync_dir(IDX_SNAPSHOT.parent)
+
+
+def _snapshot_sig() -> tuple:
+    try:
+        st = IDX_SNAPSHOT.stat()
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        return (0, 0, 0)
+
+
+def _replay_log(index: dict, offset: int) -> int:
+    """Apply index log records after ``offset``; return the new offset.
+
+    A trailing partial line (writer still mid-append) is left for the next
+    call. Returns -1 if the log shrank below ``offset``.
+    """
+    try:
+        f = IDX_LOG.open("rb")
+    except FileNotFoundError:
+        return 0
+    with f:
+        if offset > os.fstat(f.fileno()).st_size:
+            return -1
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                rec = json.loads(line)
+                index[rec["vec_id"]] = rec["raw_ref"]
+            except Exception:
+                continue
+    return offset
+
+
 def _load_index() -> dict:
-    """Load index.json as dictionary."""
+    """Load the index as snapshot + replayed append log.
+
+    The result is cached per directory; later calls only decode the log
+    bytes written since the previous call. A shared index lock keeps a
+    concurrent compaction from swapping files mid-read.
+    """
     ensure_dirs()
+    with _index_lock(exclusive=False):
+        return _load_index_locked()
+
+
+def _load_index_locked() -> dict:
+    key = str(IDX_LOG.resolve())
+    sig = _snapshot_sig()
+    cached = _INDEX_CACHE.get(key)
+
+    if cached is not None and cached["sig"] == sig:
+        offset = _replay_log(cached["index"], cached["offset"])
+        if offset >= 0:
+            cached["offset"] = offset
+            return cached["index"]
+
     try:
-        content = IDX_FILE.read_text() or "{}"
-        return json.loads(content)
+        index = json.loads(IDX_SNAPSHOT.read_text() or "{}")
     except Exception:
-        return {}
+        index = {}
+    offset = max(_replay_log(index, 0), 0)
+    _INDEX_CACHE[key] = {"sig": sig, "offset": offset, "index": index}
+    return index
+
+
+def compact_index() -> None:
+    """Fold the index log into a fresh snapshot and truncate the log.
+
+    Runs under the exclusive index lock so no append can land between the
+    snapshot and the truncate. Replaying the log over the snapshot is
+    idempotent, so a crash between the rename and the truncate loses nothing.
+    """
+    ensure_dirs()
+    with _index_lock():
+        _compact_locked()
 
 
-def _save_index(d: dict):
-    """Save dictionary to index.json."""
-    IDX_FILE.write_text(json.dumps(d, ensure_ascii=False, indent=2))
+def _compact_locked() -> None:
+    index = _load_index_locked()
+    _write_snapshot(index)
+    os.truncate(IDX_LOG, 0)
+    _INDEX_CACHE[str(IDX_LOG.resolve())] = {
+        "sig": _snapshot_sig(),
+        "offset": 0,
+        "index": index,
+    }
+
+
+def _needs_compaction() -> bool:
+    try:
+        log_size = IDX_LOG.stat().st_size
+        snap_size = IDX_SNAPSHOT.stat().st_size
+    except FileNotFoundError:
+        return False
+    return log_size > max(COMPACT_MIN_BYTES, snap_size)
+
+
+def _maybe_compact() -> None:
+    if not _needs_compaction():
+        return
+    with _index_lock():
+        # Another process may have compacted while we waited
+        if _needs_compaction():
+            _compact_locked()
 
 
 def append_event(event: dict) -> str:
     """Append event to events.jsonl and return vec_id."""
-    ensure_dirs()
-
     # Ensure vec_id exists
     if "vec_id" not in event:
         event["vec_id"] = new_vec_id()
 
     vec_id = event["vec_id"]
+    pending = getattr(_local, "pending", None)
+
+    partitions = _partitions()
+    if partitions is not None:
+        if pending is not None:
+            pending["partitioned"].append(event)
+        else:
+            ensure_dirs()
+            partitions.append_partitioned([event])
+        return vec_id
 
-    # Append to events file
-    with EV_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    line = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+    if pending is not None:
+        pending["events"].append(line)
+        return vec_id
+
+    # Append to events file as one whole-line write
+    ensure_dirs()
+    _append_bytes(EV_FILE, line)
 
     return vec_id
 
 
 def register_index(vec_id: str, raw_ref: str) -> None:
-    """Register vec_id -> raw_ref mapping in index."""
-    index = _load_index()
-    index[vec_id] = raw_ref
-    _save_index(index)
+    """Register vec_id -> raw_ref mapping in index.
+
+    Appends a single record to the index log; the full index is only
+    rewritten by compaction.
+    """
+    rec = json.dumps({"vec_id": vec_id, "raw_ref": raw_ref}, ensure_ascii=False)
+    line = (rec + "\n").encode("utf-8")
+
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        pending["index"].append(line)
+        return
+
+    ensure_dirs()
+    with _index_lock():
+        _append_bytes(IDX_LOG, line, locked=True)
+    _maybe_compact()
 
 
 def get_today_raw_ref() -> str:
@@ -76,23 +362,114 @@ def get_today_raw_ref() -> str:
     return f"logs/{today}/session.jsonl#latest"
 
 
-def get_recent_events(limit: int = 50) -> list[dict]:
-    """Get recent events from events.jsonl."""
+def _iter_lines_reverse(f, start: int, end: int):
+    """Yield complete lines of ``f`` between ``start`` and ``end``, newest first.
+
+    Reads fixed-size blocks backwards from ``end`` so only the tail that is
+    actually consumed gets touched.
+    """
+    pos = end
+    carry = b""
+    while pos > start:
+        step = min(TAIL_BLOCK_SIZE, pos - start)
+        pos -= step
+        f.seek(pos)
+        buf = f.read(step) + carry
+        lines = buf.split(b"\n")
+        # lines[0] may be cut mid-record unless we reached ``start``
+        carry = lines.pop(0) if pos > start else b""
+        for line in reversed(lines):
+            if line.strip():
+                yield line
+    if carry.strip():
+        yield carry
+
+
+def _last_newline_end(f, start: int, end: int) -> int:
+    """Return the offset just past the last newline in [start, end)."""
+    pos = end
+    while pos > start:
+        step = min(TAIL_BLOCK_SIZE, pos - start)
+        f.seek(pos - step)
+        buf = f.read(step)
+        i = buf.rfind(b"\n")
+        if i >= 0:
+            return pos - step + i + 1
+        pos -= step
+    return start
+
+
+def _decode(line: bytes):
+    try:
+        return json.loads(line)
+    except Exception:
+        return None
+
+
+def get_recent_events(limit: int = 50, cursor: int | None = None) -> list[dict]:
+    """Get recent events from events.jsonl.
+
+    Seeks from the end of the file and decodes only the last ``limit``
+    records. With ``cursor`` (a byte offset from read_events_since()), only
+    events written at or after that offset are considered.
+
+    In the partitioned layout only the newest partitions are read and
+    ``cursor`` does not apply.
+    """
     ensure_dirs()
+    partitions = _partitions()
+    if partitions is not None:
+        return partitions.recent_events(limit)
     if not EV_FILE.exists():
         return []
 
+    try:
+        with EV_FILE.open("rb") as f:
+            end = os.fstat(f.fileno()).st_size
+            start = min(max(cursor or 0, 0), end)
+            # Drop a trailing record that is still being written
+            end = _last_newline_end(f, start, end)
+            events = []
+            for line in _iter_lines_reverse(f, start, end):
+                ev = _decode(line)
+                if ev is not None:
+                    events.append(ev)
+                    if 0 < limit <= len(events):
+                        break
+    except OSError:
+        return []
+    events.reverse()
+    return events
+
+
+def read_events_since(cursor: int = 0) -> tuple[list[dict], int]:
+    """Read events appended after byte offset ``cursor``.
+
+    Returns the events and the cursor to pass on the next poll. A partially
+    written last line is not consumed.
+    """
+    ensure_dirs()
     events = []
     try:
-        with EV_FILE.open("r", encoding="utf-8") as f:
+        with EV_FILE.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if cursor > size:
+                # events.jsonl was replaced or truncated; start over
+                cursor = 0
+            f.seek(cursor)
             for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                cursor += len(line)
                 if line.strip():
-                    events.append(json.loads(line))
-        return events[-limit:] if limit > 0 else events
-    except Exception:
-        return []
+                    ev = _decode(line)
+                    if ev is not None:
+                        events.append(ev)
+    except OSError:
+        pass
+    return events, cursor
 
 
 def get_index() -> dict:
     """Get the current index mapping vec_id -> raw_ref."""
-    return _load_index()
+    return dict(_load_index())
@@ -0,0 +1,234 @@
+"""
+Answer cache for grounded question answering.
+
+Entries are keyed on the normalized question, the budget, the AI flag and a
+fingerprint of the exact SSOT snippets the answer was built from. Each entry
+also records ``(mtime_ns, size)`` of every file it depends on (cited sources
+and files read directly); a lookup re-stats them and drops the entry as soon
+as one changed, so an answer never outlives its evidence.
+
+Entries live in an in-process LRU. When ``ANSWER_CACHE_DB`` names a SQLite
+file, entries are also written there and shared across processes (CLI runs,
+Streamlit sessions).
+
+Environment:
+  ANSWER_CACHE=0         disable caching
+  ANSWER_CACHE_SIZE      in-memory entries (default 256)
+  ANSWER_CACHE_DB        path of the shared SQLite store (default: none)
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("ANSWER_CACHE", "1") != "0"
+MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+DB_PATH = os.getenv("ANSWER_CACHE_DB", "")
+
+KEY_VERSION = 1
+
+_SPACES = re.compile(r"\s+")
+
+Deps = List[Tuple[str, int, int]]
+
+
+def normalize_question(question: str) -> str:
+    """NFKC, case-folded, whitespace-collapsed form of ``question``."""
+    text = unicodedata.normalize("NFKC", question).casefold()
+    return _SPACES.sub(" ", text).strip()
+
+
+def make_key(
+    question: str, budget: Union[int, str], use_ai: bool, snippets_text: str
+) -> str:
+    snippets_digest = hashlib.sha256(snippets_text.encode("utf-8")).hexdigest()
+    raw = json.dumps(
+        [
+            KEY_VERSION,
+            normalize_question(question),
+            budget,
+            bool(use_ai),
+            snippets_digest,
+        ],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def file_deps(root: Path, paths: Iterable[str]) -> Deps:
+    """``(path, mtime_ns, size)`` for each path (``:Lx-Ly`` suffixes dropped)."""
+    deps: Dict[str, Tuple[int, int]] = {}
+    for raw in paths:
+        rel = str(raw).split(":", 1)[0].strip()
+        if not rel or rel in deps:
+            continue
+        deps[rel] = _stat(Path(root) / rel)
+    return [(rel, mtime, size) for rel, (mtime, size) in deps.items()]
+
+
+def _stat(path: Path) -> Tuple[int, int]:
+    try:
+        st = path.stat()
+    except OSError:
+        return -1, -1  # missing: creating the file invalidates the entry
+    return st.st_mtime_ns, st.st_size
+
+
+class AnswerCache:
+    """LRU answer cache with dependency checks and an optional SQLite store."""
+
+    def __init__(
+        self,
+        root: Path,
+        max_entries: int = MAX_ENTRIES,
+        db_path: Optional[str] = DB_PATH,
+    ):
+        self.root = Path(root)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self._db = self._open_db(Path(db_path))
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self.saved_llm_seconds = 0.0
+
+    @staticmethod
+    def _open_db(path: Path) -> Optional[sqlite3.Connection]:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "key TEXT PRIMARY KEY, entry TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            db.commit()
+        except sqlite3.Error as exc:
+            logger.warning("Answer cache store unavailable (%s): %s", path, exc)
+            return None
+        return db
+
+    def _valid(self, entry: Dict[str, Any]) -> bool:
+        return all(
+            _stat(self.root / rel) == (mtime, size)
+            for rel, mtime, size in entry["deps"]
+        )
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached result, or None on miss/invalidation."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._db_get(key)
+            if entry is not None and not self._valid(entry):
+                self.invalidated += 1
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.hits += 1
+            self.saved_llm_seconds += entry["llm_seconds"]
+            return copy.deepcopy(entry["result"])
+
+    def put(
+        self,
+        key: str,
+        result: Dict[str, Any],
+        deps: Deps,
+        llm_seconds: float = 0.0,
+    ) -> None:
+        entry = {
+            "result": copy.deepcopy(result),
+            "deps": [list(d) for d in deps],
+            "llm_seconds": float(llm_seconds),
+        }
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO answers VALUES (?, ?, ?)",
+                        (key, json.dumps(entry, ensure_ascii=False), time.time()),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as exc:
+                    logger.warning("Failed to store cached answer: %s", exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM answers")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidated": self.invalidated,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "saved_llm_seconds": round(self.saved_llm_seconds, 3),
+        }
+
+    def _remember(self, key: str, entry: Dict[str, Any]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self._db is not None:
+            try:
+                self._db.execute("DELETE FROM answers WHERE key = ?", (key,))
+                self._db.commit()
+            except sqlite3.Error as exc:
+                logger.warning("Failed to drop cached answer: %s", exc)
+
+    def _db_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT entry FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Failed to read cached answer: %s", exc)
+            return None
+        return json.loads(row[0]) if row else None
+
+
+_CACHE: Optional[AnswerCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache(root: Path) -> Optional[AnswerCache]:
+    """Process-wide cache for ``root`` (None when ANSWER_CACHE=0)."""
+    global _CACHE
+    if not ENABLED:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None or _CACHE.root != Path(root):
+            _CACHE = AnswerCache(root)
+        return _CACHE
@@ -0,0 +1,140 @@
+"""
+Shared, parse-once store for decision logs (``reports/decisions/D-*.yml``).
+
+plan_suggester and state_drafter both want "the latest N decisions by
+mtime". A :class:`DecisionStore` per directory keeps ``(mtime_ns, size)`` of
+every decision file from a single ``scandir`` pass, an ordering by mtime that
+is only re-sorted when a file was added, removed or modified, and the parsed
+entry of each file keyed by its mtime. Files are parsed lazily, with the
+libyaml ``CSafeLoader`` when PyYAML was built with it, and only once per
+version for the lifetime of the process.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DECISION_PREFIX = "D-"
+DECISION_SUFFIX = ".yml"
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def load_yaml(text: str) -> Any:
+    """``yaml.safe_load`` equivalent using libyaml when available."""
+    return yaml.load(text, Loader=_Loader)
+
+
+class _File(NamedTuple):
+    mtime_ns: int
+    size: int
+
+
+class DecisionStore:
+    """Decision files of one directory, newest first, parsed on demand."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self._files: Dict[str, _File] = {}
+        self._order: List[str] = []
+        # name -> (version, entry or None for unusable files)
+        self._parsed: Dict[str, Tuple[_File, Optional[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+        self.parses = 0
+
+    def refresh(self) -> None:
+        """Re-stat the directory; re-sort only if something changed."""
+        files: Dict[str, _File] = {}
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    name = entry.name
+                    if not (
+                        name.startswith(DECISION_PREFIX)
+                        and name.endswith(DECISION_SUFFIX)
+                    ):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    files[name] = _File(st.st_mtime_ns, st.st_size)
+        except OSError:
+            files = {}
+        if files != self._files:
+            self._files = files
+            self._order = sorted(files, key=lambda n: (-files[n].mtime_ns, n))
+            for name in list(self._parsed):
+                if name not in files:
+                    del self._parsed[name]
+
+    def latest(self, max_items: int) -> List[Dict[str, Any]]:
+        """
+        Up to ``max_items`` newest usable entries as dicts with ``path``
+        (Path), ``id`` (defaulting to the file stem) and the raw
+        ``decision``, ``rationale`` and ``links`` values.
+
+        Like the previous per-caller loaders, the newest ``max_items`` files
+        are considered and unreadable or non-mapping files among them are
+        skipped.
+        """
+        with self._lock:
+            self.refresh()
+            entries = []
+            for name in self._order[:max_items]:
+                entry = self._entry(name)
+                if entry is not None:
+                    entries.append(dict(entry))
+            return entries
+
+    def _entry(self, name: str) -> Optional[Dict[str, Any]]:
+        version = self._files[name]
+        cached = self._parsed.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        path = self.directory / name
+        entry = None
+        try:
+            data = load_yaml(path.read_text(encoding="utf-8"))
+        except Exception as exc:  # corrupted or unreadable file
+            logger.warning("Failed to load decision %s: %s", path, exc)
+        else:
+            if isinstance(data, dict):
+                entry = {
+                    "path": path,
+                    "id": data.get("id") or path.stem,
+                    "decision": data.get("decision"),
+                    "rationale": data.get("rationale"),
+                    "links": data.get("links"),
+                }
+            else:
+                logger.warning("Unsupported decision format in %s", path)
+        self.parses += 1
+        self._parsed[name] = (version, entry)
+        return entry
+
+
+_STORES: Dict[Path, DecisionStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_store(directory: Path) -> DecisionStore:
+    """Process-wide store for ``directory``."""
+    key = Path(directory).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = _STORES[key] = DecisionStore(key)
+        return store
+
+
+def latest_decisions(directory: Path, max_items: int) -> List[Dict[str, Any]]:
+    return get_store(directory).latest(max_items)
@@ -0,0 +1,153 @@
+"""
+Line-offset index for cited SSOT files.
+
+A source such as ``reports/x.md:L10-L20`` is checked and sliced through a
+:class:`LineIndex`: the file is memory-mapped and the byte offset of every
+line start is kept in a numpy array, so the line count and the byte span of
+any range are O(1) lookups and the cited text is a zero-copy ``memoryview``
+over the mapping.
+
+Indexes are cached per process and invalidated when the file's mtime or size
+changes. Offsets of files of at least PERSIST_MIN_BYTES are also saved under
+``cache_dir`` (``.ssot_index/lines/``), so short-lived CLI processes do not
+rescan large reports.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Smaller files are scanned on demand; a scan costs less than a cache read
+PERSIST_MIN_BYTES = 256 * 1024
+# Process cache size (files)
+MAX_CACHED = 512
+
+_HEADER = 2  # saved arrays start with (mtime_ns, size)
+
+
+class LineIndex:
+    """Line starts of one file version, plus its read-only mapping."""
+
+    def __init__(self, path: Path, mtime_ns: int, size: int, starts: np.ndarray):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.starts = starts
+        self._buf: Optional[memoryview] = None
+
+    @classmethod
+    def scan(cls, path: Path, st: os.stat_result) -> "LineIndex":
+        index = cls(path, st.st_mtime_ns, st.st_size, np.zeros(0, dtype=np.int64))
+        buf = index.buffer()
+        index.size = len(buf)  # the file may have changed since stat()
+        nl = np.flatnonzero(np.frombuffer(buf, dtype=np.uint8) == 0x0A)
+        starts = np.concatenate([[0], nl + 1]).astype(np.int64)
+        if index.size == 0 or starts[-1] == index.size:
+            # No line after a trailing newline (or in an empty file)
+            starts = starts[:-1]
+        index.starts = starts
+        return index
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def buffer(self) -> memoryview:
+        """Read-only view of the whole file (mapped on first use)."""
+        if self._buf is None:
+            if self.size == 0:
+                self._buf = memoryview(b"")
+            else:
+                with open(self.path, "rb") as fh:
+                    mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                self._buf = memoryview(mm)
+        return self._buf
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Byte offsets of 1-based lines ``start``..``end`` (inclusive)."""
+        if start < 1 or end < start or end > len(self.starts):
+            raise IndexError(f"line range L{start}-L{end} out of bounds")
+        hi = self.starts[end] if end < len(self.starts) else self.size
+        return int(self.starts[start - 1]), int(hi)
+
+    def lines(self, start: int, end: Optional[int] = None) -> memoryview:
+        """Zero-copy bytes of lines ``start``..``end`` (line breaks included)."""
+        lo, hi = self.span(start, start if end is None else end)
+        return self.buffer()[lo:hi]
+
+
+_CACHE: Dict[Path, LineIndex] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_file(cache_dir: Path, path: Path) -> Path:
+    digest = hashlib.sha1(os.fsencode(str(path))).hexdigest()[:20]
+    return cache_dir / f"{digest}.npy"
+
+
+def _load_saved(cache_file: Path, path: Path, st: os.stat_result):
+    try:
+        saved = np.load(cache_file, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if len(saved) < _HEADER or (int(saved[0]), int(saved[1])) != (
+        st.st_mtime_ns,
+        st.st_size,
+    ):
+        return None
+    return LineIndex(path, st.st_mtime_ns, st.st_size, saved[_HEADER:])
+
+
+def _save(cache_file: Path, index: LineIndex) -> None:
+    header = np.array([index.mtime_ns, index.size], dtype=np.int64)
+    tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "wb") as fh:
+            np.save(fh, np.concatenate([header, index.starts]))
+        os.replace(tmp, cache_file)
+    except OSError as exc:
+        logger.debug("Unable to save line index for %s: %s", index.path, exc)
+        tmp.unlink(missing_ok=True)
+
+
+def get_line_index(path: Path, cache_dir: Optional[Path] = None) -> LineIndex:
+    """
+    Return the line index of ``path``, rebuilding it if the file changed.
+
+    Raises OSError if the file cannot be read.
+    """
+    path = Path(path)
+    st = path.stat()
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+        if cached is not None and (cached.mtime_ns, cached.size) == (
+            st.st_mtime_ns,
+            st.st_size,
+        ):
+            return cached
+
+    index = None
+    cache_file = None
+    if cache_dir is not None and st.st_size >= PERSIST_MIN_BYTES:
+        cache_file = _cache_file(Path(cache_dir), path)
+        index = _load_saved(cache_file, path, st)
+    if index is None:
+        index = LineIndex.scan(path, st)
+        if cache_file is not None:
+            _save(cache_file, index)
+
+    with _CACHE_LOCK:
+        if len(_CACHE) >= MAX_CACHED and path not in _CACHE:
+            _CACHE.pop(next(iter(_CACHE)))
+        _CACHE[path] = index
+    return index
@@ -0,0 +1,179 @@
+"""
+Content-addressed on-disk cache of chat completion responses.
+
+The key is the SHA-256 of the exact request body the shared LLM client sends
+(model, messages, response_format and every sampling parameter, serialized
+with sorted keys), so any change to a prompt or its inputs is a miss. Entries
+are ``<dir>/<key[:2]>/<key>.json``; a hit refreshes the entry's mtime and,
+once the directory grows past the size cap, the least recently used entries
+are evicted.
+
+Modes:
+  off      no caching (default)
+  record   serve hits from the cache, call the API on a miss and store it
+  replay   serve hits only; a miss is an error and nothing goes to the network
+
+Environment:
+  LLM_CACHE_MODE     off | record | replay
+  LLM_CACHE_DIR      cache directory (default <repo>/.llm_cache)
+  LLM_CACHE_MAX_MB   size cap in MiB (default 256)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+MODES = ("off", "record", "replay")
+KEY_VERSION = 1
+DEFAULT_MAX_MB = 256
+
+
+def mode_from_env() -> str:
+    mode = os.getenv("LLM_CACHE_MODE", "off").strip().lower() or "off"
+    if mode not in MODES:
+        raise ValueError(f"Invalid LLM_CACHE_MODE: {mode!r} (expected {MODES})")
+    return mode
+
+
+def replaying() -> bool:
+    """True when responses must come from the cache (no API key needed)."""
+    return mode_from_env() == "replay"
+
+
+def request_key(body: bytes) -> str:
+    return hashlib.sha256(f"{KEY_VERSION}:".encode("ascii") + body).hexdigest()
+
+
+class LLMCache:
+    """Response files under ``directory`` with LRU eviction by total size."""
+
+    def __init__(
+        self,
+        directory: Path,
+        mode: str = "record",
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+    ):
+        if mode not in MODES or mode == "off":
+            raise ValueError(f"Invalid cache mode: {mode!r}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self._bytes: Optional[int] = None  # scanned on first write
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            data = entry["response"].encode("utf-8")
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring unreadable LLM cache entry %s: %s", path, exc)
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)  # recency for eviction
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def put(self, key: str, model: str, response: bytes) -> None:
+        path = self._path(key)
+        entry = {
+            "key": key,
+            "model": model,
+            "created": time.time(),
+            "response": response.decode("utf-8"),
+        }
+        raw = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(raw)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning("Failed to store LLM response in cache: %s", exc)
+            tmp.unlink(missing_ok=True)
+            return
+        with self._lock:
+            self.stored += 1
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._bytes += len(raw)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """``(mtime, size, path)`` of every entry."""
+        entries = []
+        try:
+            shards = list(os.scandir(self.directory))
+        except OSError:
+            return entries
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard.path) as it:
+                for entry in it:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            self.evicted += 1
+        self._bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stored": self.stored,
+            "evicted": self.evicted,
+        }
+
+
+def from_env() -> Optional[LLMCache]:
+    """Cache configured by LLM_CACHE_* (None when LLM_CACHE_MODE=off)."""
+    mode = mode_from_env()
+    if mode == "off":
+        return None
+    directory = os.getenv("LLM_CACHE_DIR", "").strip() or REPO_ROOT / ".llm_cache"
+    max_mb = float(os.getenv("LLM_CACHE_MAX_MB", str(DEFAULT_MAX_MB)))
+    return LLMCache(Path(directory), mode, int(max_mb * 1024 * 1024))
@@ -0,0 +1,470 @@
+"""
+Shared OpenAI-compatible chat completions client.
+
+One :class:`LLMClient` per ``(base_url, api_key)`` serves every caller in the
+process (core.ask_json, core.ask_openai, tools/info_network, tools/kai):
+
+* keep-alive HTTP connections are pooled per client instead of opening a new
+  connection for every call;
+* at most ``max_concurrency`` requests per model are in flight, and an
+  optional token bucket caps the request rate across all models;
+* 408/409/429/5xx responses, timeouts and dropped connections are retried
+  with jittered exponential backoff (``Retry-After`` is honoured);
+* identical requests that are in flight at the same time are sent once and
+  the response is shared;
+* with a :class:`~libs.llm_cache.LLMCache` (``LLM_CACHE_MODE`` for
+  :func:`get_client`), responses are recorded to and replayed from disk.
+
+The client runs its own event loop in a daemon thread and performs blocking
+``http.client`` I/O in a thread pool, so it needs only the standard library.
+Async code awaits :meth:`LLMClient.achat` / :meth:`LLMClient.acomplete`; sync
+code calls :meth:`LLMClient.complete`, or :meth:`LLMClient.complete_many` to
+issue a batch concurrently.
+
+Environment:
+  OPENAI_BASE_URL       API root (default https://api.openai.com/v1)
+  OPENAI_API_KEY        bearer token
+  OPENAI_TIMEOUT_SEC    per-request timeout in seconds (default 300)
+  LLM_MAX_CONCURRENCY   in-flight requests per model (default 8)
+  LLM_RATE_PER_SEC      request rate limit, 0 = unlimited (default 0)
+  LLM_MAX_RETRIES       attempts per request (default 3)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from libs.llm_cache import LLMCache, from_env, request_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_TIMEOUT_SEC = 300.0
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", "0"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_CAP_SEC = 10.0
+
+RETRY_STATUS = {408, 409, 429}
+# A reused keep-alive connection may have been closed by the server
+_STALE = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class LLMError(RuntimeError):
+    """A chat completion failed; ``retriable`` tells whether retrying may help."""
+
+    def __init__(
+        self, message: str, status: Optional[int] = None, retriable: bool = False
+    ):
+        super().__init__(message)
+        self.status = status
+        self.retriable = retriable
+
+
+def _timeout_from_env() -> float:
+    raw = os.getenv("OPENAI_TIMEOUT_SEC", "").strip()
+    try:
+        value = float(raw) if raw else DEFAULT_TIMEOUT_SEC
+    except ValueError:
+        return DEFAULT_TIMEOUT_SEC
+    return value if value > 0 else DEFAULT_TIMEOUT_SEC
+
+
+class _ConnectionPool:
+    """Idle keep-alive connections to one host, reused LIFO."""
+
+    def __init__(self, base_url: str, size: int):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid base URL: {base_url!r}")
+        self._cls = (
+            http.client.HTTPSConnection
+            if parts.scheme == "https"
+            else http.client.HTTPConnection
+        )
+        self._host = parts.hostname
+        self._port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self._size = size
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _get(self, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                conn = self._idle.pop()
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.timeout = timeout
+                return conn, True
+            self.opened += 1
+        return self._cls(self._host, self._port, timeout=timeout), False
+
+    def _put(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self._size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self, path: str, body: bytes, headers: Dict[str, str], timeout: float
+    ) -> Tuple[int, Optional[str], bytes]:
+        """POST ``body``; returns ``(status, Retry-After, response body)``."""
+        while True:
+            conn, reused = self._get(timeout)
+            try:
+                conn.request("POST", self.prefix + path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except _STALE:
+                conn.close()
+                if reused:
+                    continue  # retry once per stale connection, not an attempt
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._put(conn)
+            return resp.status, resp.getheader("Retry-After"), data
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class TokenBucket:
+    """Request rate limiter; ``acquire`` must be awaited on a single loop."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._stamp) * self.rate
+            )
+            self._stamp = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _backoff(attempt: int, retry_after: Optional[str]) -> float:
+    if retry_after:
+        try:
+            return min(BACKOFF_CAP_SEC, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    ceiling = min(BACKOFF_CAP_SEC, BACKOFF_BASE_SEC * 2 ** (attempt - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def _content(response: Dict[str, Any]) -> str:
+    try:
+        return response["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError) as exc:
+        raise LLMError(f"Unexpected OpenAI response: {response!r:.500}") from exc
+
+
+class LLMClient:
+    """Pooled, rate-limited, coalescing chat completions client."""
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        *,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        rate_per_sec: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        cache: Optional[LLMCache] = None,
+    ):
+        self.base_url = (
+            base_url or os.getenv("OPENAI_BASE_URL", "").strip() or DEFAULT_BASE_URL
+        ).rstrip("/")
+        self.api_key = (
+            api_key if api_key is not None else os.getenv("OPENAI_API_KEY", "")
+        )
+        self.timeout = timeout or _timeout_from_env()
+        self.max_concurrency = max_concurrency or MAX_CONCURRENCY
+        rate = RATE_PER_SEC if rate_per_sec is None else rate_per_sec
+        self.max_retries = max(1, max_retries or MAX_RETRIES)
+        self._pool = _ConnectionPool(self.base_url, self.max_concurrency * 4)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency * 4, thread_name_prefix="llm-client"
+        )
+        self._bucket = TokenBucket(rate) if rate > 0 else None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.calls = 0
+        self.requests = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.failures = 0
+        self.cache = cache
+
+    # -- event loop -------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=loop.run_forever, name="llm-client-loop", daemon=True
+                )
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def close(self) -> None:
+        with _CLIENTS_LOCK:
+            if _CLIENTS.get((self.base_url, self.api_key)) is self:
+                del _CLIENTS[(self.base_url, self.api_key)]
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout=5)
+            loop.close()
+        self._executor.shutdown(wait=False)
+        self._pool.close()
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    # -- public API -------------------------------------------------------
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        *,
+        timeout: Optional[float] = None,
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """Full chat completion response (decoded JSON)."""
+        payload = {"model": model, "messages": messages, **params}
+        return await asyncio.wrap_future(self._submit(self._chat(payload, timeout)))
+
+    async def acomplete(
+        self, messages: List[Dict[str, str]], model: str, **kwargs: Any
+    ) -> str:
+        """Content of the first choice."""
+        return _content(await self.achat(messages, model, **kwargs))
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        *,
+        timeout: Optional[float] = None,
+        **params: Any,
+    ) -> Dict[str, Any]:
+        """Blocking :meth:`achat`."""
+        payload = {"model": model, "messages": messages, **params}
+        return self._submit(self._chat(payload, timeout)).result()
+
+    def complete(
+        self, messages: List[Dict[str, str]], model: str, **kwargs: Any
+    ) -> str:
+        """Blocking :meth:`acomplete`."""
+        return _content(self.chat(messages, model, **kwargs))
+
+    def complete_many(
+        self,
+        batch: Iterable[Dict[str, Any]],
+        *,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Run several completions concurrently; each item holds ``messages``,
+        ``model`` and optional request parameters (and ``timeout``). Results
+        keep the input order; with ``return_exceptions`` failures are returned
+        in place instead of raised.
+        """
+
+        async def one(item: Dict[str, Any]) -> str:
+            item = dict(item)
+            timeout = item.pop("timeout", None)
+            return _content(await self._chat(item, timeout))
+
+        async def run():
+            return await asyncio.gather(
+                *(one(item) for item in batch), return_exceptions=return_exceptions
+            )
+
+        return self._submit(run()).result()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "failures": self.failures,
+            "connections_opened": self._pool.opened,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    # -- internals (run on the client loop) --------------------------------
+
+    async def _chat(
+        self, payload: Dict[str, Any], timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        self.calls += 1
+        body = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        key = request_key(body)
+        data = self.cache.get(key) if self.cache is not None else None
+        if data is None:
+            if self.cache is not None and self.cache.mode == "replay":
+                self.failures += 1
+                raise LLMError(
+                    f"No recorded response for request {key[:16]} "
+                    f"(model={payload.get('model')}, LLM_CACHE_MODE=replay)"
+                )
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                future = asyncio.ensure_future(
+                    self._fetch(key, body, str(payload.get("model")), timeout)
+                )
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._inflight.pop(key, None))
+            # Every caller decodes its own copy of the shared response body
+            data = await asyncio.shield(future)
+        try:
+            return json.loads(data)
+        except json.JSONDecodeError as exc:
+            raise LLMError(f"Unexpected OpenAI response: {data[:500]!r}") from exc
+
+    async def _fetch(
+        self, key: str, body: bytes, model: str, timeout: Optional[float]
+    ) -> bytes:
+        data = await self._send(body, model, timeout or self.timeout)
+        if self.cache is not None:
+            try:
+                json.loads(data)
+            except json.JSONDecodeError:
+                pass  # not worth replaying; the caller gets the error
+            else:
+                self.cache.put(key, model, data)
+        return data
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        sem = self._semaphores.get(model)
+        if sem is None:
+            sem = self._semaphores[model] = asyncio.Semaphore(self.max_concurrency)
+        return sem
+
+    async def _send(self, body: bytes, model: str, timeout: float) -> bytes:
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, self.max_retries + 1):
+            where = f"model={model}, attempt={attempt}/{self.max_retries}"
+            retry_after = None
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            async with self._semaphore(model):
+                self.requests += 1
+                try:
+                    status, retry_after, data = await loop.run_in_executor(
+                        self._executor,
+                        self._pool.request,
+                        "/chat/completions",
+                        body,
+                        headers,
+                        timeout,
+                    )
+                except (socket.timeout, TimeoutError) as exc:
+                    err = LLMError(
+                        f"OpenAI timeout ({where}, timeout={timeout}s): {exc}",
+                        retriable=True,
+                    )
+                except (http.client.HTTPException, OSError) as exc:
+                    err = LLMError(
+                        f"OpenAI connection error ({where}): {exc}", retriable=True
+                    )
+                else:
+                    if 200 <= status < 300:
+                        return data
+                    detail = data.decode("utf-8", errors="replace")[:1000]
+                    err = LLMError(
+                        f"OpenAI HTTPError ({where}): {status} {detail}",
+                        status=status,
+                        retriable=status in RETRY_STATUS or status >= 500,
+                    )
+            if not err.retriable or attempt == self.max_retries:
+                self.failures += 1
+                raise err
+            delay = _backoff(attempt, retry_after)
+            self.retries += 1
+            logger.warning("%s; retrying in %.1fs", err, delay)
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+
+_CLIENTS: Dict[Tuple[str, str], LLMClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_client(
+    base_url: Optional[str] = None, api_key: Optional[str] = None
+) -> LLMClient:
+    """
+    Process-wide client for ``base_url``/``api_key`` (env defaults), with the
+    response cache configured by LLM_CACHE_MODE/LLM_CACHE_DIR.
+    """
+    base = (
+        base_url or os.getenv("OPENAI_BASE_URL", "").strip() or DEFAULT_BASE_URL
+    ).rstrip("/")
+    key = api_key if api_key is not None else os.getenv("OPENAI_API_KEY", "")
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get((base, key))
+        if client is None:
+            client = _CLIENTS[(base, key)] = LLMClient(base, key, cache=from_env())
+        return client
+
+
+def chat_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    *,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    **kwargs: Any,
+) -> str:
+    """Blocking completion through the shared client; returns the content."""
+    return get_client(base_url, api_key).complete(messages, model, **kwargs)
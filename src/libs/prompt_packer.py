@@ -0,0 +1,171 @@
+"""
+Token-budgeted packing of retrieved snippets into an LLM prompt.
+
+Character budgets are a poor proxy for prompt size: a Japanese character is
+about one token while English averages about four characters per token. This
+module estimates tokens locally, drops duplicate windows and fills a token
+budget greedily by relevance score per token.
+
+Token estimates use a fast approximation (ASCII letters ~4 chars/token,
+digits ~3, any non-ASCII char 1 token), which errs on the high side so packed
+prompts stay within budget. With ``PROMPT_TOKENIZER=tiktoken`` and tiktoken
+installed, the BPE encoding named by ``PROMPT_TOKENIZER_ENCODING`` (default
+o200k_base) is used instead. Both are memoized per text.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER = os.getenv("PROMPT_TOKENIZER", "approx")
+TOKENIZER_ENCODING = os.getenv("PROMPT_TOKENIZER_ENCODING", "o200k_base")
+# Joined parts are separated by a blank line
+SEPARATOR = "\n\n"
+SEPARATOR_TOKENS = 1
+# Windows that do not fit whole are truncated only if this much budget is left
+MIN_PARTIAL_TOKENS = 24
+
+_APPROX = re.compile(
+    r"(?P<alpha>[A-Za-z]+)|(?P<digit>[0-9]+)|(?P<space>\s+)"
+    r"|(?P<wide>[^\x00-\x7f]+)|(?P<punct>[\x21-\x2f\x3a-\x40\x5b-\x60\x7b-\x7e]+)"
+)
+
+
+class Window(NamedTuple):
+    path: str
+    start: int
+    text: str
+    score: float
+
+
+class Packed(NamedTuple):
+    text: str
+    snippets: List[Dict[str, str]]
+    tokens: int
+
+
+def _approx_tokens(text: str) -> int:
+    total = 0
+    for m in _APPROX.finditer(text):
+        kind, n = m.lastgroup, m.end() - m.start()
+        if kind == "alpha":
+            total += math.ceil(n / 4)
+        elif kind == "digit":
+            total += math.ceil(n / 3)
+        elif kind == "space":
+            # A single space merges into the next word; line breaks do not
+            total += 1 if n > 1 or m.group() != " " else 0
+        elif kind == "wide":
+            total += n
+        else:
+            total += math.ceil(n / 2)
+    return total
+
+
+@lru_cache(maxsize=1)
+def _counter() -> Callable[[str], int]:
+    if TOKENIZER == "tiktoken":
+        try:
+            import tiktoken
+
+            encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except (ImportError, ValueError) as exc:
+            logger.warning("tiktoken unavailable, approximating tokens: %s", exc)
+    elif TOKENIZER != "approx":
+        logger.warning("Unknown PROMPT_TOKENIZER %r, approximating tokens", TOKENIZER)
+    return _approx_tokens
+
+
+@lru_cache(maxsize=8192)
+def estimate_tokens(text: str) -> int:
+    """Estimated prompt tokens for ``text`` (see the module docstring)."""
+    return _counter()(text) if text else 0
+
+
+def dedupe(windows: Iterable[Window]) -> List[Window]:
+    """
+    Drop windows that overlap a better-scoring window of the same file, and
+    windows whose text (whitespace-normalized) was already seen. Input order
+    is kept.
+    """
+    windows = list(windows)
+    kept: List[Optional[Window]] = [None] * len(windows)
+    spans: Dict[str, List[tuple]] = {}
+    seen_text = set()
+    ranked = sorted(range(len(windows)), key=lambda i: -windows[i].score)
+    for i in ranked:
+        w = windows[i]
+        norm = " ".join(w.text.split())
+        if not norm or norm in seen_text:
+            continue
+        end = w.start + len(w.text)
+        if any(s < end and w.start < e for s, e in spans.get(w.path, ())):
+            continue
+        seen_text.add(norm)
+        spans.setdefault(w.path, []).append((w.start, end))
+        kept[i] = w
+    return [w for w in kept if w is not None]
+
+
+def _part(window: Window, text: Optional[str] = None) -> str:
+    return f"[{window.path}]\n{window.text if text is None else text}"
+
+
+def _truncate(window: Window, max_tokens: int) -> str:
+    """Longest prefix of the window text whose part fits ``max_tokens``."""
+    lo, hi = 0, len(window.text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(_part(window, window.text[:mid].rstrip())) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return window.text[:lo].rstrip()
+
+
+def pack(windows: Sequence[Window], token_budget: int) -> Packed:
+    """
+    Fill ``token_budget`` with the windows that give the most score per token.
+
+    Windows are deduplicated first and each costs the tokens of its
+    ``[path]`` header, text and separator. The best window that does not fit
+    whole is cut to the remaining budget. The packed parts keep the input
+    order, so callers pass windows in the order the prompt should read.
+    """
+    windows = dedupe(windows)
+    cost = [estimate_tokens(_part(w)) + SEPARATOR_TOKENS for w in windows]
+    order = sorted(
+        range(len(windows)), key=lambda i: -windows[i].score / max(cost[i], 1)
+    )
+    # The first part has no separator before it
+    remaining = token_budget + SEPARATOR_TOKENS
+    chosen: Dict[int, str] = {}
+    for i in order:
+        if remaining <= 0:
+            break
+        if cost[i] <= remaining:
+            chosen[i] = windows[i].text
+            remaining -= cost[i]
+        elif remaining - SEPARATOR_TOKENS >= MIN_PARTIAL_TOKENS:
+            text = _truncate(windows[i], remaining - SEPARATOR_TOKENS)
+            if text:
+                chosen[i] = text
+                remaining -= estimate_tokens(_part(windows[i], text)) + SEPARATOR_TOKENS
+
+    parts: List[str] = []
+    snippets: List[Dict[str, str]] = []
+    tokens = 0
+    for i in sorted(chosen):
+        part = _part(windows[i], chosen[i])
+        parts.append(part)
+        snippets.append({"path": windows[i].path, "snippet": chosen[i]})
+        tokens += estimate_tokens(part) + (SEPARATOR_TOKENS if len(parts) > 1 else 0)
+    return Packed(SEPARATOR.join(parts), snippets, tokens)
@@ -0,0 +1,830 @@
+"""
+Persistent, incrementally refreshed BM25 inverted index over the SSOT corpus.
+
+Corpus (paths relative to the repository root):
+
+- ``STATE/current_state.md``                    category ``state``
+- ``reports/decisions/D-*.yml``                 category ``decisions``
+- ``reports/**`` text files (md/yml/txt/csv/json) category ``reports``
+- ``inventory/inventory.csv``                   category ``inventory``
+- ``docs/**/*.md``                              category ``docs``
+
+Tokens are lower-cased ASCII words plus character bi-grams of non-ASCII
+(Japanese) runs, each with its character offset in the source file. Files
+longer than CHUNK_CHARS are split at line breaks into several documents, so
+large reports are searchable and length-normalized per chunk. The postings
+are stored as CSR arrays under ``.ssot_index/`` (or ``$SSOT_INDEX_DIR``)::
+
+    term_ptr[t]..term_ptr[t+1]    postings of term t (sorted by doc id)
+    post_doc / post_tf            doc id and term frequency per posting
+    pos_ptr[p]..pos_ptr[p+1]      character offsets of posting p
+
+``meta.json`` holds the documents and a manifest of
+``path -> (category, mtime, size, sha256)``; it is the commit point, written
+after the arrays of a new generation, so readers never see a half-written
+index. refresh() re-reads only files whose mtime/size changed and
+re-tokenizes only those whose content hash changed; the tokens of all other
+files are recovered from the committed postings.
+
+``python -m libs.ssot_index watch`` keeps the index current (inotify on
+Linux, polling elsewhere); while it runs, get_index() only reloads on new
+commits instead of walking the corpus. When the index directory is not
+writable, get_index() keeps the refreshed index in memory only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import select
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIRNAME = ".ssot_index"
+TOKENIZER_VERSION = 2
+TEXT_SUFFIXES = {".md", ".yml", ".yaml", ".txt", ".csv", ".json"}
+CHUNK_CHARS = 32 * 1024
+MAX_FILE_BYTES = 8 * 1024 * 1024
+# How often get_index() re-stats the corpus when no watcher is running
+REFRESH_INTERVAL = float(os.getenv("SSOT_INDEX_REFRESH_SEC", "5"))
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+CATEGORIES = ("state", "decisions", "reports", "inventory", "docs")
+
+_TOKEN = re.compile(r"[A-Za-z0-9_]+|[^\x00-\x7f\s、。，．・：；「」『』（）【】！？]+")
+_ARRAYS = ("term_ptr", "post_doc", "post_tf", "pos_ptr", "positions", "doc_len")
+
+
+class Hit(NamedTuple):
+    doc: int
+    score: float
+
+
+def tokenize(text: str) -> List[Tuple[str, int]]:
+    """Return ``(term, char_offset)`` pairs for ``text``."""
+    out: List[Tuple[str, int]] = []
+    for m in _TOKEN.finditer(text):
+        tok, start = m.group(), m.start()
+        if tok.isascii():
+            out.append((tok.lower(), start))
+        elif len(tok) == 1:
+            out.append((tok, start))
+        else:
+            out.extend((tok[i : i + 2], start + i) for i in range(len(tok) - 1))
+    return out
+
+
+def chunks(text: str, size: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """Split ``text`` into ``(start, chunk)`` pieces of about CHUNK_CHARS."""
+    size = size or CHUNK_CHARS
+    start = 0
+    while True:
+        end = min(start + size, len(text))
+        if end < len(text):
+            # Prefer a line break in the second half of the chunk
+            nl = text.rfind("\n", start + size // 2, end)
+            if nl != -1:
+                end = nl + 1
+        yield start, text[start:end]
+        if end >= len(text):
+            return
+        start = end
+
+
+def _walk(top: str, rel: str) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Depth-first ``(relpath, entry)`` for files under ``top``, sorted."""
+    try:
+        entries = sorted(os.scandir(top), key=lambda e: e.name)
+    except OSError:
+        return
+    for entry in entries:
+        sub = f"{rel}/{entry.name}"
+        if entry.is_dir():
+            yield from _walk(entry.path, sub)
+        elif entry.is_file():
+            yield sub, entry
+
+
+def _single(root: Path, rel: str, category: str):
+    try:
+        st = (root / rel).stat()
+    except OSError:
+        return
+    yield rel, category, st
+
+
+def iter_corpus(root: Path) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """Yield ``(relpath, category, stat)`` for every SSOT file under ``root``."""
+    root = Path(root)
+    yield from _single(root, "STATE/current_state.md", "state")
+
+    reports = []
+    for rel, entry in _walk(str(root / "reports"), "reports"):
+        if os.path.splitext(rel)[1].lower() not in TEXT_SUFFIXES:
+            continue
+        parent, name = rel.rsplit("/", 1)
+        category = "reports"
+        if parent == "reports/decisions" and name.startswith("D-"):
+            if not name.endswith(".yml"):
+                continue
+            category = "decisions"
+        try:
+            reports.append((rel, category, entry.stat()))
+        except OSError:
+            continue
+    # Decisions before other reports, as in the grep_snippets priority
+    yield from (r for r in reports if r[1] == "decisions")
+    yield from (r for r in reports if r[1] == "reports")
+
+    yield from _single(root, "inventory/inventory.csv", "inventory")
+
+    for rel, entry in _walk(str(root / "docs"), "docs"):
+        if rel.endswith(".md"):
+            try:
+                yield rel, "docs", entry.stat()
+            except OSError:
+                continue
+
+
+def _watch_dirs(root: Path) -> List[Path]:
+    dirs = [root / "STATE", root / "inventory"]
+    for top in (root / "reports", root / "docs"):
+        if top.is_dir():
+            dirs.append(top)
+            dirs.extend(p for p in top.rglob("*") if p.is_dir())
+    return [d for d in dirs if d.is_dir()]
+
+
+class SSOTIndex:
+    """Read-side view of a committed index (arrays are memory-mapped)."""
+
+    def __init__(
+        self,
+        root: Path,
+        index_dir: Path,
+        meta: Dict,
+        arrays: Dict[str, np.ndarray],
+        terms: Optional[List[str]] = None,
+    ):
+        self.root = Path(root)
+        self.index_dir = Path(index_dir)
+        self.meta = meta
+        self.docs: List[Dict] = meta["docs"]
+        self.files: Dict[str, Dict] = meta["files"]
+        self.arrays = arrays
+        self.avgdl = float(meta["avgdl"]) or 1.0
+        # None for an index that only lives in memory (see refresh())
+        self.meta_mtime_ns: Optional[int] = 0
+        self._terms = terms
+        self._vocab: Optional[Dict[str, int]] = None
+        self._doc_cat = np.array(
+            [CATEGORIES.index(d["category"]) for d in self.docs], dtype=np.int8
+        )
+        self._doc_mtime = np.array([d["mtime"] for d in self.docs], dtype=np.float64)
+        self._doc_chunk = np.array([d["chunk"] for d in self.docs], dtype=np.int32)
+        paths = {p: i for i, p in enumerate(self.files)}
+        self._doc_file = np.array([paths[d["path"]] for d in self.docs], np.int32)
+
+    # -- loading -------------------------------------------------------------
+
+    @classmethod
+    def load(
+        cls, root: Path, index_dir: Optional[Path] = None
+    ) -> Optional["SSOTIndex"]:
+        index_dir = Path(index_dir or index_dir_for(root))
+        meta_path = index_dir / "meta.json"
+        try:
+            mtime_ns = meta_path.stat().st_mtime_ns
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if meta.get("tokenizer") != TOKENIZER_VERSION:
+            return None
+        gen = meta["generation"]
+        try:
+            arrays = {
+                name: np.load(index_dir / f"{gen}.{name}.npy", mmap_mode="r")
+                for name in _ARRAYS
+            }
+        except (OSError, ValueError):
+            return None
+        index = cls(root, index_dir, meta, arrays)
+        index.meta_mtime_ns = mtime_ns
+        return index
+
+    @property
+    def vocab(self) -> Dict[str, int]:
+        if self._vocab is None:
+            self._vocab = {t: i for i, t in enumerate(self.terms())}
+        return self._vocab
+
+    def terms(self) -> List[str]:
+        if self._terms is not None:
+            return self._terms
+        path = self.index_dir / f"{self.meta['generation']}.vocab.json"
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # -- queries -------------------------------------------------------------
+
+    def query_terms(self, question: str) -> Dict[int, float]:
+        """Known query term ids mapped to their BM25 idf."""
+        n = len(self.docs)
+        ptr = self.arrays["term_ptr"]
+        out: Dict[int, float] = {}
+        for term, _ in tokenize(question):
+            tid = self.vocab.get(term)
+            if tid is None or tid in out:
+                continue
+            df = int(ptr[tid + 1] - ptr[tid])
+            out[tid] = math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+        return out
+
+    def scores(self, query: Dict[int, float]) -> np.ndarray:
+        a = self.arrays
+        scores = np.zeros(len(self.docs))
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * a["doc_len"] / self.avgdl)
+        for tid, idf in query.items():
+            lo, hi = int(a["term_ptr"][tid]), int(a["term_ptr"][tid + 1])
+            docs = a["post_doc"][lo:hi]
+            tf = a["post_tf"][lo:hi].astype(np.float64)
+            scores[docs] += idf * tf * (BM25_K1 + 1.0) / (tf + norm[docs])
+        return scores
+
+    def _category_mask(self, categories: Optional[Iterable[str]]) -> np.ndarray:
+        if categories is None:
+            return np.ones(len(self.docs), dtype=bool)
+        codes = [CATEGORIES.index(c) for c in categories]
+        return np.isin(self._doc_cat, codes)
+
+    def search(
+        self,
+        query: Dict[int, float],
+        categories: Optional[Iterable[str]] = None,
+        limit: int = 10,
+    ) -> List[Hit]:
+        """Best-scoring documents (score > 0, one chunk per file), best first."""
+        if not query or not self.docs:
+            return []
+        scores = self.scores(query)
+        scores[~self._category_mask(categories)] = 0.0
+        cand = np.flatnonzero(scores > 0)
+        # Ties go to the most recently modified file
+        cand = cand[np.lexsort((-self._doc_mtime[cand], -scores[cand]))]
+        _, first = np.unique(self._doc_file[cand], return_index=True)
+        cand = cand[np.sort(first)][:limit]
+        return [Hit(int(d), float(scores[d])) for d in cand]
+
+    def recent(self, categories: Optional[Iterable[str]] = None, limit: int = 10):
+        """First chunks of the most recently modified files, as zero-score hits."""
+        cand = np.flatnonzero(self._category_mask(categories) & (self._doc_chunk == 0))
+        cand = cand[np.argsort(-self._doc_mtime[cand], kind="stable")][:limit]
+        return [Hit(int(d), 0.0) for d in cand]
+
+    def _positions(self, doc: int, query: Dict[int, float]):
+        a = self.arrays
+        pos, weight = [], []
+        for tid, idf in query.items():
+            lo, hi = int(a["term_ptr"][tid]), int(a["term_ptr"][tid + 1])
+            k = lo + int(np.searchsorted(a["post_doc"][lo:hi], doc))
+            if k < hi and a["post_doc"][k] == doc:
+                p = a["positions"][a["pos_ptr"][k] : a["pos_ptr"][k + 1]]
+                pos.append(p)
+                weight.append(np.full(len(p), idf))
+        if not pos:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(pos).astype(np.int64), np.concatenate(weight)
+
+    def best_window(self, doc: int, query: Dict[int, float], width: int) -> int:
+        """Start offset of the ``width``-char window with most query weight."""
+        return self.windows(doc, query, width)[0][0]
+
+    def windows(
+        self,
+        doc: int,
+        query: Dict[int, float],
+        width: int,
+        limit: int = 1,
+        lead: float = 0.25,
+    ) -> List[Tuple[int, float]]:
+        """
+        Up to ``limit`` non-overlapping ``(start, weight)`` windows of ``width``
+        chars, most query weight (summed idf of matches) first. ``lead`` is the
+        share of the unmatched width placed before the first match. A document
+        with no matches yields its chunk start with zero weight.
+        """
+        pos, weight = self._positions(doc, query)
+        if not len(pos) or width <= 0:
+            return [(int(self.docs[doc]["start"]), 0.0)]
+        order = np.argsort(pos, kind="stable")
+        pos, weight = pos[order], weight[order]
+        csum = np.concatenate([[0.0], np.cumsum(weight)])
+        end = np.searchsorted(pos, pos + width, side="left")
+        totals = csum[end] - csum[np.arange(len(pos))]
+        out: List[Tuple[int, float]] = []
+        for i in np.argsort(-totals, kind="stable"):
+            span = int(pos[end[i] - 1] - pos[i])
+            # Center the matched span, leaving some leading context
+            start = max(int(pos[i]) - int(max(width - span, 0) * lead), 0)
+            if any(abs(start - s) < width for s, _ in out):
+                continue
+            out.append((start, float(totals[i])))
+            if len(out) >= limit:
+                break
+        return out
+
+    def snippet(self, doc: int, query: Dict[int, float], width: int) -> str:
+        if width <= 0:
+            return ""
+        path = self.root / self.docs[doc]["path"]
+        try:
+            text = path.read_text(encoding="utf-8", errors="ignore")
+        except OSError as exc:
+            logger.warning("Failed to read %s: %s", path, exc)
+            return ""
+        start = self.best_window(doc, query, width)
+        return text[start : start + width].strip()
+
+
+# -- building ------------------------------------------------------------------
+
+
+def index_dir_for(root: Path) -> Path:
+    """``$SSOT_INDEX_DIR`` if set, else ``<root>/.ssot_index``."""
+    env = os.getenv("SSOT_INDEX_DIR")
+    return Path(env) if env else Path(root) / INDEX_DIRNAME
+
+
+def build(root: Path, index_dir: Optional[Path] = None) -> SSOTIndex:
+    """Tokenize the whole corpus and commit a new index generation."""
+    return refresh(root, index_dir, force=True)
+
+
+def refresh(
+    root: Path,
+    index_dir: Optional[Path] = None,
+    force: bool = False,
+    current: Optional[SSOTIndex] = None,
+    memory_fallback: bool = False,
+) -> SSOTIndex:
+    """
+    Bring the index up to date with the corpus and return it.
+
+    Only files whose mtime or size changed are read, and only those whose
+    sha256 changed are re-tokenized. ``current`` (an already loaded index)
+    is returned as-is when nothing changed. ``index.meta["refresh"]`` records
+    what the last refresh did. With ``memory_fallback``, an OSError while
+    persisting is logged and the new index is returned without committing it.
+    """
+    root = Path(root)
+    index_dir = Path(index_dir or index_dir_for(root))
+    try:
+        index_dir.mkdir(parents=True, exist_ok=True)
+        with _build_lock(index_dir):
+            return _refresh_locked(root, index_dir, force, current)
+    except OSError as exc:
+        if not memory_fallback:
+            raise
+        logger.warning(
+            "Cannot persist SSOT index in %s, keeping it in memory: %s", index_dir, exc
+        )
+        return _refresh_locked(root, index_dir, force, current, persist=False)
+
+
+@contextmanager
+def _build_lock(index_dir: Path):
+    """Serialize builders so one never deletes another's generation files."""
+    fd = os.open(index_dir / "lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _refresh_locked(
+    root: Path,
+    index_dir: Path,
+    force: bool,
+    current: Optional[SSOTIndex],
+    persist: bool = True,
+) -> SSOTIndex:
+    t0 = time.perf_counter()
+    old = None
+    if not force:
+        old = current
+        try:
+            on_disk = (index_dir / "meta.json").stat().st_mtime_ns
+        except OSError:
+            on_disk = None
+        if old is None or old.meta_mtime_ns != on_disk:
+            old = SSOTIndex.load(root, index_dir)
+    old_files = old.files if old is not None else {}
+
+    files: Dict[str, Dict] = {}
+    changed: List[Tuple[str, str]] = []  # (rel, text)
+    touched = 0
+    for rel, category, st in iter_corpus(root):
+        path = root / rel
+        prev = old_files.get(rel)
+        if (
+            prev is not None
+            and prev["category"] == category
+            and prev["mtime"] == st.st_mtime
+            and prev["size"] == st.st_size
+        ):
+            files[rel] = prev
+            continue
+        if st.st_size > MAX_FILE_BYTES:
+            logger.warning(
+                "Skipping %s (size %s bytes exceeds limit)", path, st.st_size
+            )
+            continue
+        try:
+            data = path.read_bytes()
+        except OSError as exc:
+            logger.warning("Unable to index %s: %s", path, exc)
+            continue
+        entry = {
+            "category": category,
+            "mtime": st.st_mtime,
+            "size": st.st_size,
+            "sha256": hashlib.sha256(data).hexdigest(),
+        }
+        files[rel] = entry
+        if prev is not None and (prev["category"], prev["sha256"]) == (
+            category,
+            entry["sha256"],
+        ):
+            touched += 1
+        else:
+            changed.append((rel, data.decode("utf-8", errors="ignore")))
+
+    removed = [rel for rel in old_files if rel not in files]
+    stats = {
+        "changed": len(changed),
+        "removed": len(removed),
+        "touched": touched,
+    }
+    if old is not None and not changed and not removed:
+        if touched:
+            meta = dict(old.meta, files=files)
+            meta["docs"] = [dict(d, mtime=files[d["path"]]["mtime"]) for d in old.docs]
+            meta["refresh"] = dict(stats, seconds=time.perf_counter() - t0)
+            if not persist:
+                return _in_memory(root, index_dir, meta, old.arrays, old._terms)
+            _write_meta(index_dir, meta)
+            return SSOTIndex.load(root, index_dir)
+        old.meta["refresh"] = dict(stats, seconds=time.perf_counter() - t0)
+        return old
+
+    terms, doc_ids, offsets, docs, vocab = _kept_tokens(old, files, changed)
+    n_kept = sum(len(t) for t in terms)
+    for rel, text in changed:
+        entry = files[rel]
+        for n, (start, chunk) in enumerate(chunks(text)):
+            tokens = tokenize(chunk)
+            terms.append(
+                np.array([vocab.setdefault(t, len(vocab)) for t, _ in tokens], np.int32)
+            )
+            offsets.append(np.array([o + start for _, o in tokens], np.int32))
+            doc_ids.append(np.full(len(tokens), len(docs), np.int32))
+            docs.append(
+                {
+                    "path": rel,
+                    "category": entry["category"],
+                    "mtime": entry["mtime"],
+                    "length": len(tokens),
+                    "chunk": n,
+                    "start": start,
+                }
+            )
+
+    arrays, term_list = _postings(
+        np.concatenate(terms or [np.empty(0, np.int32)]),
+        np.concatenate(doc_ids or [np.empty(0, np.int32)]),
+        np.concatenate(offsets or [np.empty(0, np.int32)]),
+        list(vocab),
+        sorted_prefix=n_kept,
+    )
+    lengths = np.array([d["length"] for d in docs], dtype=np.float64)
+    arrays["doc_len"] = lengths
+    # Manifest order follows the corpus walk
+    meta = {
+        "tokenizer": TOKENIZER_VERSION,
+        "generation": f"g{time.time_ns():x}",
+        "built_at": time.time(),
+        "avgdl": float(lengths.mean()) if len(docs) else 0.0,
+        "docs": docs,
+        "files": files,
+        "refresh": dict(stats, seconds=time.perf_counter() - t0),
+    }
+    if not persist:
+        return _in_memory(root, index_dir, meta, arrays, term_list)
+    _commit(index_dir, meta, arrays, term_list)
+    return SSOTIndex.load(root, index_dir)
+
+
+def _in_memory(
+    root: Path, index_dir: Path, meta: Dict, arrays: Dict, terms: Optional[List[str]]
+) -> SSOTIndex:
+    index = SSOTIndex(root, index_dir, meta, arrays, terms)
+    # Matches a missing meta.json, so the next refresh builds on this one
+    index.meta_mtime_ns = None
+    return index
+
+
+def _kept_tokens(old: Optional[SSOTIndex], files: Dict, changed: List):
+    """Token triples, docs and vocab of the unchanged files in ``old``."""
+    if old is None:
+        return [], [], [], [], {}
+    stale = {rel for rel, _ in changed}
+    keep = [
+        i
+        for i, d in enumerate(old.docs)
+        if d["path"] in files and d["path"] not in stale
+    ]
+    remap = np.full(len(old.docs) + 1, -1, dtype=np.int64)
+    remap[keep] = np.arange(len(keep))
+
+    a = old.arrays
+    tf = np.asarray(a["post_tf"])
+    post_term = np.repeat(
+        np.arange(len(a["term_ptr"]) - 1, dtype=np.int32), np.diff(a["term_ptr"])
+    )
+    tok_doc = remap[np.repeat(np.asarray(a["post_doc"]), tf)]
+    mask = tok_doc >= 0
+    docs = [dict(old.docs[i], mtime=files[old.docs[i]["path"]]["mtime"]) for i in keep]
+    vocab = {t: i for i, t in enumerate(old.terms())}
+    return (
+        [np.repeat(post_term, tf)[mask]],
+        [tok_doc[mask].astype(np.int32)],
+        [np.asarray(a["positions"])[mask]],
+        docs,
+        vocab,
+    )
+
+
+def _postings(
+    terms: np.ndarray,
+    docs: np.ndarray,
+    offsets: np.ndarray,
+    vocab: List[str],
+    sorted_prefix: int = 0,
+) -> Tuple[Dict[str, np.ndarray], List[str]]:
+    """CSR postings from one ``(term, doc, offset)`` triple per token.
+
+    The first ``sorted_prefix`` triples (tokens recovered from the previous
+    generation) must already be in ``(term, doc, offset)`` order with doc ids
+    below all others; only the rest is fully sorted, then the two runs are
+    merged by a stable sort on term. Terms without postings (left over from
+    removed files) are dropped, so the returned vocabulary is compact.
+    """
+    counts = np.bincount(terms, minlength=len(vocab))
+    live = counts > 0
+    new_id = np.cumsum(live) - 1
+    terms = new_id[terms]
+    vocab = [t for t, keep in zip(vocab, live) if keep]
+
+    n = sorted_prefix
+    order = np.concatenate(
+        [np.arange(n), n + np.lexsort((offsets[n:], docs[n:], terms[n:]))]
+    )
+    order = order[np.argsort(terms[order], kind="stable")]
+    terms, docs, offsets = terms[order], docs[order], offsets[order]
+    new_posting = np.ones(len(terms), dtype=bool)
+    new_posting[1:] = (terms[1:] != terms[:-1]) | (docs[1:] != docs[:-1])
+    starts = np.flatnonzero(new_posting)
+
+    pos_ptr = np.append(starts, len(terms)).astype(np.int64)
+    term_ptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+    term_ptr[1:] = np.cumsum(np.bincount(terms[starts], minlength=len(vocab)))
+    arrays = {
+        "term_ptr": term_ptr,
+        "post_doc": docs[starts].astype(np.int32),
+        "post_tf": np.diff(pos_ptr).astype(np.int32),
+        "pos_ptr": pos_ptr,
+        "positions": offsets.astype(np.int32),
+    }
+    return arrays, vocab
+
+
+def _write_meta(index_dir: Path, meta: Dict) -> None:
+    tmp = index_dir / f"meta.json.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, index_dir / "meta.json")
+
+
+def _commit(
+    index_dir: Path, meta: Dict, arrays: Dict, terms: Optional[List[str]] = None
+) -> None:
+    gen = meta["generation"]
+    for name, arr in arrays.items():
+        np.save(index_dir / f"{gen}.{name}.npy", arr)
+    if terms is not None:
+        (index_dir / f"{gen}.vocab.json").write_text(
+            json.dumps(terms, ensure_ascii=False), encoding="utf-8"
+        )
+    _write_meta(index_dir, meta)
+    # Drop older generations; open memmaps keep their inodes alive
+    for path in index_dir.iterdir():
+        if path.name.startswith("g") and not path.name.startswith(f"{gen}."):
+            path.unlink(missing_ok=True)
+
+
+# -- serving -------------------------------------------------------------------
+
+_CACHE: Dict[Path, Tuple[SSOTIndex, float]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def watcher_alive(index_dir: Path) -> bool:
+    """True if a ``watch`` process is keeping ``index_dir`` current."""
+    try:
+        info = json.loads((Path(index_dir) / "watcher.json").read_text("utf-8"))
+        os.kill(int(info["pid"]), 0)
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    return True
+
+
+def get_index(root: Path, index_dir: Optional[Path] = None) -> SSOTIndex:
+    """
+    Return an up-to-date index for ``root``.
+
+    The index is loaded once per process. While a watcher is running it
+    only re-checks ``meta.json`` for new commits; otherwise the corpus is
+    refreshed incrementally at most every REFRESH_INTERVAL seconds. Refreshes
+    run outside the cache lock, so readers of a current index never wait on
+    one, and an index that cannot be persisted is kept in memory.
+    """
+    root = Path(root)
+    key = Path(index_dir or index_dir_for(root))
+    with _CACHE_LOCK:
+        cached = _CACHE.get(key)
+    current = cached[0] if cached else None
+    now = time.monotonic()
+    if watcher_alive(key):
+        try:
+            on_disk = (key / "meta.json").stat().st_mtime_ns
+        except OSError:
+            on_disk = None
+        if current is not None and current.meta_mtime_ns == on_disk:
+            return current
+        index = SSOTIndex.load(root, key) or refresh(root, key, memory_fallback=True)
+    elif current is not None and now - cached[1] < REFRESH_INTERVAL:
+        return current
+    else:
+        index = refresh(root, key, current=current, memory_fallback=True)
+    with _CACHE_LOCK:
+        _CACHE[key] = (index, now)
+    return index
+
+
+class _Inotify:
+    """Minimal ctypes inotify wrapper; any event just triggers a refresh()."""
+
+    # IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    # | IN_DELETE_SELF | IN_MOVE_SELF
+    MASK = 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+
+    def __init__(self, libc, fd: int):
+        self.libc = libc
+        self.fd = fd
+
+    @classmethod
+    def create(cls) -> Optional["_Inotify"]:
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        return cls(libc, fd) if fd >= 0 else None
+
+    def add(self, dirs: Iterable[Path]) -> None:
+        # Re-adding an existing watch is a cheap no-op; this also picks up
+        # directories created since the last call.
+        for d in dirs:
+            self.libc.inotify_add_watch(self.fd, os.fsencode(str(d)), self.MASK)
+
+    def wait(self, timeout: float) -> bool:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        os.read(self.fd, 64 * 1024)
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def watch(
+    root: Path,
+    index_dir: Optional[Path] = None,
+    interval: float = 2.0,
+    debounce: float = 0.3,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """Keep the index current until ``stop`` is set (inotify, else polling)."""
+    root = Path(root)
+    index_dir = Path(index_dir or index_dir_for(root))
+    index_dir.mkdir(parents=True, exist_ok=True)
+    stop = stop or threading.Event()
+    notifier = _Inotify.create()
+    marker = index_dir / "watcher.json"
+    marker.write_text(
+        json.dumps({"pid": os.getpid(), "mode": "inotify" if notifier else "poll"}),
+        encoding="utf-8",
+    )
+    try:
+        index = refresh(root, index_dir)
+        while not stop.is_set():
+            if notifier is not None:
+                notifier.add(_watch_dirs(root))
+                if not notifier.wait(interval):
+                    continue
+                # Let bursts of writes settle before re-reading
+                while notifier.wait(debounce):
+                    pass
+            else:
+                stop.wait(interval)
+            index = refresh(root, index_dir, current=index)
+            if index.meta["refresh"]["changed"] or index.meta["refresh"]["removed"]:
+                logger.info("SSOT index refreshed: %s", index.meta["refresh"])
+    finally:
+        marker.unlink(missing_ok=True)
+        if notifier is not None:
+            notifier.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SSOT BM25 index")
+    parser.add_argument("--root", default=str(Path(__file__).resolve().parents[2]))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build", help="rebuild the index from scratch")
+    sub.add_parser("refresh", help="re-index changed files only")
+    w = sub.add_parser("watch", help="keep the index current")
+    w.add_argument("--interval", type=float, default=2.0)
+    q = sub.add_parser("search", help="rank SSOT files for a question")
+    q.add_argument("question")
+    q.add_argument("--limit", type=int, default=5)
+    q.add_argument("--width", type=int, default=200)
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if args.cmd in ("build", "refresh"):
+        index = build(root) if args.cmd == "build" else refresh(root)
+        print(
+            json.dumps(
+                {
+                    "docs": len(index),
+                    "files": len(index.files),
+                    "terms": len(index.arrays["term_ptr"]) - 1,
+                    **index.meta["refresh"],
+                }
+            )
+        )
+        return
+    if args.cmd == "watch":
+        logging.basicConfig(level=logging.INFO)
+        try:
+            watch(root, interval=args.interval)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    index = get_index(root)
+    query = index.query_terms(args.question)
+    for hit in index.search(query, limit=args.limit):
+        print(f"{hit.score:7.3f}  {index.docs[hit.doc]['path']}")
+        print("    " + index.snippet(hit.doc, query, args.width).replace("\n", " "))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,15 @@ grounded question answering.
 from __future__ import annotations
 
 import logging
+import os
 import re
+from functools import partial
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from libs import line_index, prompt_packer, ssot_index, ssot_vectors
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +23,34 @@ STATE_PATH = REPO_ROOT / "STATE" / "current_state.md"
 INVENTORY_PATH = REPO_ROOT / "inventory" / "inventory.csv"
 DECISIONS_DIR = REPO_ROOT / "reports" / "decisions"
 REPORTS_DIR = REPO_ROOT / "reports"
+LINE_INDEX_DIR = ssot_index.index_dir_for(REPO_ROOT) / "lines"
 
 MAX_REPORT_FILES = 10
-REPORT_SIZE_LIMIT = 128 * 1024  # bytes
+# grep_snippets() ranking: "bm25" or "hybrid" (BM25 + embedding cosine)
+RETRIEVAL = os.getenv("SSOT_RETRIEVAL", "bm25")
+
+# grep_snippets() character budget per category, in priority order
+CATEGORY_BUDGETS = [
+    ("state", 1200),
+    ("decisions", 400),
+    ("reports", 300),
+    ("inventory", 100),
+]
+# docs/ is reference material and shares the reports budget
+CATEGORY_SOURCES = {
+    "state": ("state",),
+    "decisions": ("decisions",),
+    "reports": ("reports", "docs"),
+    "inventory": ("inventory",),
+}
+# Files per category = category budget // MIN_SNIPPET_CHARS (at least one)
+MIN_SNIPPET_CHARS = 150
+# pack_snippets(): prompt token budget for grounded_answer() (0, the default,
+# keeps the caller's character budget) and the candidate window size; each
+# file offers category budget // PACK_WINDOW_CHARS windows (at least one)
+TOKEN_BUDGET = int(os.getenv("SSOT_PROMPT_TOKENS", "0"))
+PACK_WINDOW_CHARS = 400
+PACK_LINE_CONTEXT = 80
 
 SOURCE_PATTERN = re.compile(
     r"^(?P<path>[^:]+)(?::L(?P<start>\d+)(?:-L?(?P<end>\d+))?)?$"
@@ -27,111 +58,96 @@ SOURCE_PATTERN = re.compile(
 
 
 def list_ssot_targets() -> List[Path]:
-    """Return SSOT files in priority order if they exist."""
-    targets: List[Path] = []
-
-    if STATE_PATH.exists():
-        targets.append(STATE_PATH)
-
-    if DECISIONS_DIR.exists():
-        decision_files = sorted(
-            DECISIONS_DIR.glob("D-*.yml"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True,
-        )
-        targets.extend(decision_files)
-
-    if REPORTS_DIR.exists():
-        report_files: List[Path] = []
-        for candidate in sorted(
-            REPORTS_DIR.glob("*.md"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True,
-        ):
-            if len(report_files) >= MAX_REPORT_FILES:
-                break
-            try:
-                size = candidate.stat().st_size
-            except OSError as exc:
-                logger.warning("Unable to inspect %s: %s", candidate, exc)
-                continue
-            if size > REPORT_SIZE_LIMIT:
-                logger.warning(
-                    "Skipping %s (size %s bytes exceeds limit)",
-                    candidate,
-                    size,
-                )
-                continue
-            report_files.append(candidate)
-        targets.extend(report_files)
-
-    if INVENTORY_PATH.exists():
-        targets.append(INVENTORY_PATH)
+    """
+    Return SSOT files in priority order if they exist.
 
-    return targets
+    Uses the index manifest, so no per-call directory walk or stat. Reports
+    of any size are listed; large files are searched in chunks.
+    """
+    files = ssot_index.get_index(REPO_ROOT).files
+
+    def newest(category: str, top_level_md: bool = False) -> List[str]:
+        rels = [
+            rel
+            for rel, entry in files.items()
+            if entry["category"] == category
+            and (
+                not top_level_md
+                or (Path(rel).parent == Path("reports") and rel.endswith(".md"))
+            )
+        ]
+        return sorted(rels, key=lambda rel: files[rel]["mtime"], reverse=True)
+
+    rels = newest("state") + newest("decisions")
+    rels += newest("reports", top_level_md=True)[:MAX_REPORT_FILES]
+    rels += newest("inventory")
+    return [REPO_ROOT / rel for rel in rels]
 
 
 def grep_snippets(
-    question: str, budget: int = 2000
+    question: str,
+    budget: int = 2000,
+    retrieval: str = RETRIEVAL,
+    token_budget: Optional[int] = None,
 ) -> Tuple[str, List[Dict[str, str]]]:
     """
-    Collect small snippets from SSOT files using a rough relevance heuristic.
+    Collect small snippets from SSOT files ranked by the BM25 index.
+
+    Each category gets its usual share of ``budget``; within a category the
+    best-scoring files contribute their best-scoring window. Categories with
+    no matching file fall back to their most recently modified files.
+
+    With ``retrieval="hybrid"`` files are ranked by their best passage under
+    BM25 fused with embedding cosine (libs.ssot_vectors), so paraphrased
+    questions still find their evidence; the budget logic is unchanged.
+
+    With ``token_budget`` the snippets are packed by estimated tokens
+    instead (see pack_snippets()) and ``budget`` is ignored.
 
     Returns:
         joined text (<= budget chars) and a list of {path, snippet}.
     """
+    if token_budget:
+        packed = pack_snippets(question, token_budget, retrieval)
+        return packed.text, packed.snippets
 
     def remaining_budget(current: int) -> int:
         return max(budget - current, 0)
 
-    terms = [t.lower() for t in re.split(r"\W+", question) if t]
+    index = ssot_index.get_index(REPO_ROOT)
+    query = index.query_terms(question)
+    rank = _hybrid_ranker(index, question, query) if retrieval == "hybrid" else None
     snippets: List[Dict[str, str]] = []
     joined_parts: List[str] = []
     used = 0
 
-    category_budgets = [
-        ("state", 1200),
-        ("decisions", 400),
-        ("reports", 300),
-        ("inventory", 100),
-    ]
-
-    targets = list_ssot_targets()
-    by_category: Dict[str, List[Path]] = {
-        "state": [],
-        "decisions": [],
-        "reports": [],
-        "inventory": [],
-    }
-    for path in targets:
-        if path == STATE_PATH:
-            by_category["state"].append(path)
-        elif DECISIONS_DIR in path.parents:
-            by_category["decisions"].append(path)
-        elif path.parent == REPORTS_DIR:
-            by_category["reports"].append(path)
-        elif path == INVENTORY_PATH:
-            by_category["inventory"].append(path)
-
-    for category, category_budget in category_budgets:
-        paths = by_category.get(category, [])
-        if not paths:
-            continue
-
+    for category, category_budget in CATEGORY_BUDGETS:
         category_remaining = min(category_budget, remaining_budget(used))
         if category_remaining <= 0:
             break
 
-        for idx, path in enumerate(paths):
+        sources = CATEGORY_SOURCES[category]
+        limit = max(category_budget // MIN_SNIPPET_CHARS, 1)
+        hits = [
+            (hit.path, partial(ssot_vectors.snippet, REPO_ROOT, hit))
+            for hit in (rank(sources, limit) if rank is not None else [])
+        ]
+        if not hits:
+            hits = [
+                (index.docs[hit.doc]["path"], partial(index.snippet, hit.doc, query))
+                for hit in index.search(query, categories=sources, limit=limit)
+                or index.recent(categories=sources, limit=limit)
+            ]
+
+        for idx, (rel_path, make_snippet) in enumerate(hits):
             if category_remaining <= 0 or remaining_budget(used) <= 0:
                 break
-            slots_left = len(paths) - idx
+            slots_left = len(hits) - idx
             share = max(category_remaining // slots_left, 1)
             allowed = min(share, remaining_budget(used))
-            snippet = _extract_snippet(path, terms, allowed)
+            snippet = make_snippet(allowed)
             if not snippet:
                 continue
-            rel_path = str(path.relative_to(REPO_ROOT))
             snippets.append({"path": rel_path, "snippet": snippet})
             joined_parts.append(f"[{rel_path}]\n{snippet}")
             snippet_len = len(snippet)
@@ -146,6 +162,89 @@ def grep_snippets(
     return joined_text, snippets
 
 
+def pack_snippets(
+    question: str, token_budget: int, retrieval: str = RETRIEVAL
+) -> prompt_packer.Packed:
+    """
+    Pack the most relevant SSOT windows into ``token_budget`` estimated tokens.
+
+    Candidates come from the same per-category searches as grep_snippets():
+    the best windows of each matching file scored by BM25 (or the hybrid
+    passage score), and the start of the most recent files, at zero score,
+    for categories without a match. libs.prompt_packer removes overlapping
+    and duplicate windows and keeps those with the best score per token; the
+    prompt lists them in category priority order.
+    """
+    index = ssot_index.get_index(REPO_ROOT)
+    query = index.query_terms(question)
+    rank = _hybrid_ranker(index, question, query) if retrieval == "hybrid" else None
+    texts: Dict[str, str] = {}
+    windows: List[prompt_packer.Window] = []
+
+    def add(rel_path: str, start: int, score: float) -> None:
+        if rel_path not in texts:
+            try:
+                texts[rel_path] = (REPO_ROOT / rel_path).read_text(
+                    encoding="utf-8", errors="ignore"
+                )
+            except OSError as exc:
+                logger.warning("Failed to read %s: %s", rel_path, exc)
+                texts[rel_path] = ""
+        text = texts[rel_path]
+        # Start at the beginning of the line when it is close
+        line = text.rfind("\n", max(start - PACK_LINE_CONTEXT, 0), start)
+        start = line + 1 if line != -1 else start
+        raw = text[start : start + PACK_WINDOW_CHARS]
+        text = raw.strip()
+        if text:
+            start += len(raw) - len(raw.lstrip())
+            windows.append(prompt_packer.Window(rel_path, start, text, score))
+
+    for category, category_budget in CATEGORY_BUDGETS:
+        sources = CATEGORY_SOURCES[category]
+        limit = max(category_budget // MIN_SNIPPET_CHARS, 1)
+        per_file = max(category_budget // PACK_WINDOW_CHARS, 1)
+        passages = rank(sources, limit) if rank is not None else []
+        for hit in passages:
+            add(hit.path, hit.start, hit.score)
+        if passages:
+            continue
+        hits = index.search(query, categories=sources, limit=limit)
+        for hit in hits:
+            # Matches lead the window, so a truncated window keeps them
+            found = index.windows(hit.doc, query, PACK_WINDOW_CHARS, per_file, lead=0.0)
+            best = found[0][1] or 1.0
+            for start, weight in sorted(found):
+                add(index.docs[hit.doc]["path"], start, hit.score * weight / best)
+        if not hits:
+            for hit in index.recent(categories=sources, limit=limit):
+                doc = index.docs[hit.doc]
+                add(doc["path"], int(doc["start"]), 0.0)
+
+    return prompt_packer.pack(windows, token_budget)
+
+
+def _hybrid_ranker(index: ssot_index.SSOTIndex, question: str, query: Dict):
+    """``rank(categories, limit)`` over hybrid passage hits, or None if unavailable."""
+    try:
+        vectors, emb = ssot_vectors.get_vectors(index)
+        qvec = np.asarray(emb([question])[0], dtype=np.float32)
+    except (ImportError, RuntimeError, OSError) as exc:
+        logger.warning(
+            "Hybrid retrieval unavailable, using BM25: %s: %s",
+            type(exc).__name__,
+            exc,
+        )
+        return None
+
+    def rank(categories, limit):
+        return ssot_vectors.hybrid_search(
+            index, vectors, query, qvec, categories=categories, limit=limit
+        )
+
+    return rank
+
+
 def verify_sources(sources: Iterable[str]) -> Tuple[bool, List[str]]:
     """Validate that each source refers to an existing file and optional line range."""
     errors: List[str] = []
@@ -154,8 +253,6 @@ def verify_sources(sources: Iterable[str]) -> Tuple[bool, List[str]]:
     if not isinstance(sources, Iterable):
         return False, ["sources must be iterable"]
 
-    line_cache: Dict[Path, int] = {}
-
     for raw in sources:
         if not isinstance(raw, str):
             errors.append("source must be a string")
@@ -186,45 +283,39 @@ def verify_sources(sources: Iterable[str]) -> Tuple[bool, List[str]]:
             if start < 1 or end < start:
                 errors.append(f"invalid line range in source: {source}")
                 continue
-            total_lines = line_cache.get(resolved)
-            if total_lines is None:
-                try:
-                    with resolved.open("r", encoding="utf-8", errors="ignore") as fh:
-                        total_lines = sum(1 for _ in fh)
-                except OSError as exc:
-                    errors.append(f"unable to read {source}: {exc}")
-                    continue
-                line_cache[resolved] = total_lines
+            try:
+                total_lines = len(line_index.get_line_index(resolved, LINE_INDEX_DIR))
+            except OSError as exc:
+                errors.append(f"unable to read {source}: {exc}")
+                continue
             if end > total_lines:
                 errors.append(f"line range out of bounds: {source}")
 
     return len(errors) == 0, errors
 
 
-def _extract_snippet(path: Path, terms: List[str], budget: int) -> str:
+def cited_text(source: str) -> Optional[str]:
+    """
+    Return the text a ``path[:Lx[-Ly]]`` source refers to, or None if the
+    source is invalid (see verify_sources()). Only the cited lines are
+    decoded; without a line range the whole file is returned.
+    """
+    match = SOURCE_PATTERN.match(source.strip())
+    if not match:
+        return None
+    resolved = (REPO_ROOT / match.group("path")).resolve()
     try:
-        text = path.read_text(encoding="utf-8", errors="ignore")
-    except OSError as exc:
-        logger.warning("Failed to read %s: %s", path, exc)
-        return ""
-
-    if not text:
-        return ""
-
-    budget = max(budget, 0)
-    if budget == 0:
-        return ""
-
-    lower_text = text.lower()
-    snippet = ""
-    for term in terms:
-        idx = lower_text.find(term)
-        if idx != -1:
-            start = max(idx - budget // 4, 0)
-            snippet = text[start : start + budget]
-            break
-
-    if not snippet:
-        snippet = text[:budget]
-
-    return snippet.strip()
+        resolved.relative_to(REPO_ROOT)
+        index = line_index.get_line_index(resolved, LINE_INDEX_DIR)
+    except (ValueError, OSError):
+        return None
+    start_str = match.group("start")
+    if not start_str:
+        return str(index.buffer(), "utf-8", errors="ignore")
+    start = int(start_str)
+    end = int(match.group("end") or start)
+    try:
+        view = index.lines(start, end)
+    except IndexError:
+        return None
+    return str(view, "utf-8", errors="ignore")
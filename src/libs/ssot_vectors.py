@@ -0,0 +1,488 @@
+"""
+Passage vector index over the SSOT corpus, for hybrid (BM25 + cosine) retrieval.
+
+Each file of the BM25 index manifest (see libs.ssot_index) is split at line
+breaks into passages of about PASSAGE_CHARS and embedded with the EG-Space
+embedders: SBERT (worker or in-process) when available, otherwise the
+384-d hashing embedder. ``SSOT_VECTOR_MODEL`` pins either (``hash``, a
+sentence-transformers model name, or ``auto``).
+
+Arrays live under ``.ssot_index/vectors/`` and are committed like the BM25
+index (generation files first, ``meta.json`` last)::
+
+    vecs        (n, dim) float32, L2-normalized
+    p_file      file id per passage (passages of one file are contiguous)
+    p_start/p_end  character span of the passage in the file
+    assign      IVF list per passage (only with an IVF index)
+    centroids   (nlist, dim) spherical k-means centroids
+
+Updates are incremental: rows of files whose sha256 is unchanged are kept,
+only changed files are re-embedded, and new rows are assigned to the existing
+IVF lists. The coarse quantizer is retrained when the corpus has doubled
+since it was trained. Below IVF_MIN_ROWS the search is a flat scan.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from libs import ssot_index
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DIRNAME = "vectors"
+MODEL = os.getenv("SSOT_VECTOR_MODEL", "auto")
+PASSAGE_CHARS = 800
+EMBED_BATCH = 256
+
+# IVF kicks in at this many passages; nlist ~ sqrt(n), NPROBE lists searched
+IVF_MIN_ROWS = 20000
+IVF_NPROBE = int(os.getenv("SSOT_IVF_NPROBE", "8"))
+KMEANS_ITERS = 8
+
+# Hybrid ranking: candidate counts and the cosine weight in the fused score
+BM25_CANDIDATES = 50
+ANN_CANDIDATES = 50
+HYBRID_ALPHA = float(os.getenv("SSOT_HYBRID_ALPHA", "0.6"))
+
+_ARRAYS = ("vecs", "p_file", "p_start", "p_end")
+_IVF_ARRAYS = ("assign", "centroids")
+
+
+class PassageHit(NamedTuple):
+    row: int
+    path: str
+    start: int
+    end: int
+    score: float
+
+
+def resolve_embedder(model: Optional[str] = None) -> Tuple[Callable, str]:
+    """``(emb_fn, space_name)`` for ``model`` (see the module docstring)."""
+    # Same src/ root as libs, so no repository-root sys.path entry is needed
+    from egspace import embed_service, embedder
+
+    model = model or MODEL
+    if model == "hash":
+        return embedder.hashing_embedder()
+    if model == "auto":
+        emb, name = embed_service.sbert_embedder()
+        return (emb, name) if emb is not None else embedder.hashing_embedder()
+    emb, name = embed_service.sbert_embedder(model)
+    if emb is None:
+        raise RuntimeError(f"embedding model {model!r} is not available")
+    return emb, name
+
+
+def passages(text: str) -> List[Tuple[int, int]]:
+    """``(start, end)`` character spans of the passages of ``text``."""
+    return [
+        (start, start + len(chunk))
+        for start, chunk in ssot_index.chunks(text, PASSAGE_CHARS)
+        if chunk.strip()
+    ]
+
+
+class VectorIndex:
+    """Read-side view of a committed vector index (arrays memory-mapped)."""
+
+    def __init__(self, vec_dir: Path, meta: Dict, arrays: Dict[str, np.ndarray]):
+        self.vec_dir = vec_dir
+        self.meta = meta
+        self.files: List[List[str]] = meta["files"]  # [rel, sha256, category]
+        self.arrays = arrays
+        self.meta_mtime_ns = 0
+        p_file = np.asarray(arrays["p_file"])
+        self.file_ptr = np.searchsorted(p_file, np.arange(len(self.files) + 1))
+        self._file_id = {f[0]: i for i, f in enumerate(self.files)}
+        cats = np.array(
+            [ssot_index.CATEGORIES.index(f[2]) for f in self.files], dtype=np.int8
+        )
+        self._row_cat = cats[p_file] if len(p_file) else np.zeros(0, np.int8)
+        self._lists: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        if "assign" in arrays:
+            assign = np.asarray(arrays["assign"])
+            order = np.argsort(assign, kind="stable").astype(np.int32)
+            ptr = np.searchsorted(
+                assign[order], np.arange(len(arrays["centroids"]) + 1)
+            )
+            self._lists = (ptr, order)
+
+    @classmethod
+    def load(cls, vec_dir: Path) -> Optional["VectorIndex"]:
+        meta_path = vec_dir / "meta.json"
+        try:
+            mtime_ns = meta_path.stat().st_mtime_ns
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        gen = meta["generation"]
+        names = _ARRAYS + (_IVF_ARRAYS if meta.get("ivf") else ())
+        try:
+            arrays = {
+                name: np.load(vec_dir / f"{gen}.{name}.npy", mmap_mode="r")
+                for name in names
+            }
+        except (OSError, ValueError):
+            return None
+        index = cls(vec_dir, meta, arrays)
+        index.meta_mtime_ns = mtime_ns
+        return index
+
+    def __len__(self) -> int:
+        return len(self.arrays["p_file"])
+
+    def rows_of(self, rel: str) -> np.ndarray:
+        fid = self._file_id.get(rel)
+        if fid is None:
+            return np.zeros(0, dtype=np.int64)
+        return np.arange(self.file_ptr[fid], self.file_ptr[fid + 1])
+
+    def ann(
+        self, qvec: np.ndarray, mask: Optional[np.ndarray], limit: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Top ``limit`` rows by cosine (IVF-probed when available)."""
+        vecs = self.arrays["vecs"]
+        if self._lists is not None:
+            ptr, order = self._lists
+            qc = np.asarray(self.arrays["centroids"]) @ qvec
+            nprobe = min(IVF_NPROBE, len(qc))
+            probe = np.argpartition(-qc, nprobe - 1)[:nprobe]
+            rows = np.concatenate([order[ptr[c] : ptr[c + 1]] for c in probe])
+            rows.sort()  # sequential reads from the memmap
+            if mask is not None:
+                rows = rows[mask[rows]]
+            sims = vecs[rows] @ qvec
+        else:
+            # Scoring every row beats gathering a masked copy first
+            sims = vecs @ qvec
+            rows = np.arange(len(self)) if mask is None else np.flatnonzero(mask)
+            sims = sims[rows]
+        if not len(rows):
+            return rows, sims
+        k = min(limit, len(rows))
+        top = np.argpartition(-sims, k - 1)[:k]
+        return rows[top], sims[top]
+
+
+# -- hybrid search ---------------------------------------------------------------
+
+
+def hybrid_search(
+    index: ssot_index.SSOTIndex,
+    vectors: VectorIndex,
+    query: Dict[int, float],
+    qvec: np.ndarray,
+    categories: Optional[Iterable[str]] = None,
+    limit: int = 10,
+) -> List[PassageHit]:
+    """
+    Best passage per file, ranked by ``alpha * cosine + (1 - alpha) * lexical``.
+
+    Candidates are the passages of the top BM25 files plus the nearest
+    passages by cosine, so paraphrases without shared terms still surface.
+    The lexical score of a passage is the idf weight of the query-term
+    occurrences inside it, normalized to the best candidate.
+    """
+    mask = None
+    if categories is not None:
+        codes = [ssot_index.CATEGORIES.index(c) for c in categories]
+        mask = np.isin(vectors._row_cat, codes)
+
+    lexical: Dict[int, float] = {}
+    for hit in index.search(query, categories=categories, limit=BM25_CANDIDATES):
+        doc = index.docs[hit.doc]
+        rows = vectors.rows_of(doc["path"])
+        if not len(rows):
+            continue
+        pos, weight = index._positions(hit.doc, query)
+        order = np.argsort(pos, kind="stable")
+        pos, csum = pos[order], np.concatenate([[0.0], np.cumsum(weight[order])])
+        starts = np.asarray(vectors.arrays["p_start"])[rows]
+        ends = np.asarray(vectors.arrays["p_end"])[rows]
+        w = csum[np.searchsorted(pos, ends)] - csum[np.searchsorted(pos, starts)]
+        for row, value in zip(rows.tolist(), w.tolist()):
+            lexical[row] = max(lexical.get(row, 0.0), value)
+
+    ann_rows, _ = vectors.ann(qvec, mask, ANN_CANDIDATES)
+    cand = np.union1d(np.fromiter(lexical, dtype=np.int64), ann_rows)
+    if not len(cand):
+        return []
+    cos = np.asarray(vectors.arrays["vecs"])[cand] @ qvec
+    lex = np.array([lexical.get(int(r), 0.0) for r in cand])
+    if lex.max() > 0:
+        lex /= lex.max()
+    scores = HYBRID_ALPHA * cos + (1.0 - HYBRID_ALPHA) * lex
+
+    p_file = np.asarray(vectors.arrays["p_file"])[cand]
+    order = np.argsort(-scores, kind="stable")
+    _, first = np.unique(p_file[order], return_index=True)
+    best = order[np.sort(first)][:limit]
+    a = vectors.arrays
+    return [
+        PassageHit(
+            int(cand[i]),
+            vectors.files[int(p_file[i])][0],
+            int(a["p_start"][cand[i]]),
+            int(a["p_end"][cand[i]]),
+            float(scores[i]),
+        )
+        for i in best
+    ]
+
+
+def snippet(root: Path, hit: PassageHit, width: int) -> str:
+    """Up to ``width`` chars starting at the passage (extending past its end)."""
+    if width <= 0:
+        return ""
+    path = Path(root) / hit.path
+    try:
+        text = path.read_text(encoding="utf-8", errors="ignore")
+    except OSError as exc:
+        logger.warning("Failed to read %s: %s", path, exc)
+        return ""
+    return text[hit.start : hit.start + width].strip()
+
+
+# -- building --------------------------------------------------------------------
+
+
+def update(
+    index: ssot_index.SSOTIndex,
+    model: Optional[str] = None,
+    current: Optional[VectorIndex] = None,
+    embedder: Optional[Tuple[Callable, str]] = None,
+) -> VectorIndex:
+    """
+    Bring the vector index in line with ``index`` (re-embedding changes only).
+
+    ``embedder`` is a resolved ``(emb_fn, space_name)`` pair (default:
+    resolve_embedder(model)). Vectors from another embedding space are
+    rebuilt even when the BM25 generation is unchanged, since e.g. SBERT
+    and the hashing embedder share a dimension but not a space.
+    """
+    emb, space = embedder or resolve_embedder(model)
+    vec_dir = index.index_dir / VECTOR_DIRNAME
+    vec_dir.mkdir(parents=True, exist_ok=True)
+    with ssot_index._build_lock(vec_dir):
+        old = current
+        if old is None or old.meta_mtime_ns != _meta_mtime(vec_dir):
+            old = VectorIndex.load(vec_dir)
+        if old is not None and old.meta["model"] != space:
+            logger.info(
+                "Embedding model changed (%s -> %s), rebuilding",
+                old.meta["model"],
+                space,
+            )
+            old = None
+        if (
+            old is not None
+            and old.meta["source_generation"] == index.meta["generation"]
+        ):
+            return old
+        return _update_locked(index, vec_dir, emb, space, old)
+
+
+def _meta_mtime(vec_dir: Path) -> Optional[int]:
+    try:
+        return (vec_dir / "meta.json").stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _update_locked(
+    index: ssot_index.SSOTIndex,
+    vec_dir: Path,
+    emb: Callable,
+    space: str,
+    old: Optional[VectorIndex],
+) -> VectorIndex:
+    t0 = time.perf_counter()
+    old_sha = {f[0]: (i, f[1]) for i, f in enumerate(old.files)} if old else {}
+    files: List[List[str]] = []
+    kept_rows: List[np.ndarray] = []
+    kept_file: List[np.ndarray] = []
+    texts: List[str] = []
+    new_meta: List[Tuple[int, int, int]] = []  # (file id, start, end)
+    for rel, entry in index.files.items():
+        fid = len(files)
+        prev = old_sha.get(rel)
+        if prev is not None and prev[1] == entry["sha256"]:
+            rows = old.rows_of(rel)
+            kept_rows.append(rows)
+            kept_file.append(np.full(len(rows), fid, dtype=np.int32))
+            files.append([rel, entry["sha256"], entry["category"]])
+            continue
+        try:
+            text = (index.root / rel).read_text(encoding="utf-8", errors="ignore")
+        except OSError as exc:
+            logger.warning("Unable to embed %s: %s", rel, exc)
+            continue
+        files.append([rel, entry["sha256"], entry["category"]])
+        for start, end in passages(text):
+            texts.append(text[start:end])
+            new_meta.append((fid, start, end))
+
+    kept = np.concatenate(kept_rows) if kept_rows else np.zeros(0, dtype=np.int64)
+    dim = old.arrays["vecs"].shape[1] if old is not None else None
+    new_vecs = [
+        np.asarray(emb(texts[i : i + EMBED_BATCH]), dtype=np.float32)
+        for i in range(0, len(texts), EMBED_BATCH)
+    ]
+    if new_vecs:
+        dim = new_vecs[0].shape[1]
+    vecs = np.concatenate(
+        ([np.asarray(old.arrays["vecs"])[kept]] if old is not None else [])
+        + new_vecs
+        + [np.zeros((0, dim or 0), dtype=np.float32)]
+    )
+    vecs /= np.linalg.norm(vecs, axis=1, keepdims=True) + 1e-9
+    nm = np.array(new_meta, dtype=np.int64).reshape(-1, 3)
+
+    def column(name: str, new: np.ndarray) -> np.ndarray:
+        old_part = np.asarray(old.arrays[name])[kept] if old is not None else []
+        return np.concatenate([old_part, new]).astype(np.int32)
+
+    arrays = {
+        "vecs": vecs,
+        "p_file": np.concatenate(kept_file + [nm[:, 0]]).astype(np.int32),
+        "p_start": column("p_start", nm[:, 1]),
+        "p_end": column("p_end", nm[:, 2]),
+    }
+    ivf = None
+    if len(vecs) >= IVF_MIN_ROWS:
+        trained = old.meta.get("ivf") if old is not None else None
+        if trained and len(vecs) < 2 * trained["trained_rows"]:
+            centroids = np.asarray(old.arrays["centroids"])
+            assign = np.concatenate(
+                [
+                    np.asarray(old.arrays["assign"])[kept],
+                    _assign(vecs[len(kept) :], centroids),
+                ]
+            )
+            ivf = trained
+        else:
+            nlist = max(int(math.sqrt(len(vecs))), 1)
+            centroids = _kmeans(vecs, nlist)
+            assign = _assign(vecs, centroids)
+            ivf = {"nlist": nlist, "trained_rows": len(vecs)}
+        arrays["assign"] = assign.astype(np.int32)
+
+    # Group rows by file (kept rows precede new ones of later files)
+    order = np.argsort(arrays["p_file"], kind="stable")
+    arrays = {k: v[order] for k, v in arrays.items()}
+    if ivf is not None:
+        arrays["centroids"] = centroids.astype(np.float32)
+
+    meta = {
+        "model": space,
+        "generation": f"g{time.time_ns():x}",
+        "source_generation": index.meta["generation"],
+        "files": files,
+        "ivf": ivf,
+        "update": {
+            "embedded": len(texts),
+            "kept": int(len(kept)),
+            "seconds": time.perf_counter() - t0,
+        },
+    }
+    ssot_index._commit(vec_dir, meta, arrays)
+    return VectorIndex.load(vec_dir)
+
+
+def _assign(vecs: np.ndarray, centroids: np.ndarray, block: int = 16384) -> np.ndarray:
+    out = np.empty(len(vecs), dtype=np.int32)
+    for i in range(0, len(vecs), block):
+        out[i : i + block] = np.argmax(vecs[i : i + block] @ centroids.T, axis=1)
+    return out
+
+
+def _kmeans(vecs: np.ndarray, k: int, seed: int = 0) -> np.ndarray:
+    """Spherical k-means on a sample of at most 64 rows per centroid."""
+    rng = np.random.default_rng(seed)
+    sample = vecs[rng.choice(len(vecs), min(len(vecs), 64 * k), replace=False)]
+    centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+    for _ in range(KMEANS_ITERS):
+        assign = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        empty = ~np.bincount(assign, minlength=k).astype(bool)
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = sums / (np.linalg.norm(sums, axis=1, keepdims=True) + 1e-9)
+    return centroids
+
+
+# -- serving -----------------------------------------------------------------------
+
+_CACHE: Dict[Path, Tuple[VectorIndex, Callable, str]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def get_vectors(
+    index: ssot_index.SSOTIndex, model: Optional[str] = None
+) -> Tuple[VectorIndex, Callable]:
+    """
+    Up-to-date vector index for ``index`` and its query embedder.
+
+    Embedding the corpus happens outside the cache lock, so queries against
+    an index that is already current are never held up by a rebuild;
+    concurrent rebuilds of one index are serialized by update()'s build lock.
+
+    Raises:
+        RuntimeError: if the vectors are not in the query embedder's space
+    """
+    with _CACHE_LOCK:
+        cached = _CACHE.get(index.index_dir)
+    if (
+        cached is not None
+        and cached[0].meta["source_generation"] == index.meta["generation"]
+    ):
+        return cached[0], cached[1]
+    emb, space = resolve_embedder(model)
+    vectors = update(
+        index, model, current=cached[0] if cached else None, embedder=(emb, space)
+    )
+    if vectors.meta["model"] != space:
+        # Cosine across embedding spaces is meaningless, even at equal dims
+        raise RuntimeError(
+            f"vector index is in {vectors.meta['model']!r}, queries in {space!r}"
+        )
+    with _CACHE_LOCK:
+        _CACHE[index.index_dir] = (vectors, emb, space)
+    return vectors, emb
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SSOT passage vector index")
+    parser.add_argument("--root", default=str(Path(__file__).resolve().parents[2]))
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("update", help="embed changed files")
+    q = sub.add_parser("search", help="hybrid search")
+    q.add_argument("question")
+    q.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    index = ssot_index.get_index(Path(args.root))
+    vectors, emb = get_vectors(index)
+    if args.cmd == "update":
+        print(json.dumps({"passages": len(vectors), **vectors.meta["update"]}))
+        return
+    qvec = np.asarray(emb([args.question])[0], dtype=np.float32)
+    query = index.query_terms(args.question)
+    for hit in hybrid_search(index, vectors, query, qvec, limit=args.limit):
+        print(f"{hit.score:6.3f}  {hit.path}:{hit.start}-{hit.end}")
+        print("    " + snippet(index.root, hit, 200).replace("\n", " "))
+
+
+if __name__ == "__main__":
+    main()
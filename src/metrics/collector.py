@@ -80,6 +80,24 @@ class MetricsCollector:
 
     def _count_egspace_events(self) -> int:
         """Count total events in EG-Space"""
+        try:
+            from src.egspace import partitions
+
+            # Same switch as vpm_mini.egspace.get_stats()
+            if partitions.PARTITIONED:
+                return partitions.partition_stats()["total_events"]
+        except ImportError:
+            pass
+
+        try:
+            from src.egspace import columnar
+
+            # Read-only: committed rows plus the events.jsonl tail since then
+            if columnar.COL_DIR.exists():
+                return columnar.count_events()
+        except ImportError:
+            pass
+
         events_file = Path("egspace/events.jsonl")
         if not events_file.exists():
             return 0
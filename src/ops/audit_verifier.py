@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+
+import argparse
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from ops import merkle
+from ops.signing import MERKLE_SCHEME, ProvSigner
+
+# Failed records listed per batch in the report (all are counted)
+MAX_FAILURES_PER_BATCH = 20
+
+# Per-process signer, set up by _init_worker()
+_worker_signer: Optional[ProvSigner] = None
+
+
+def iter_records(body: bytes) -> Iterator[Dict[str, Any]]:
+    """Decode a stored batch (gzip or plain JSONL) one record at a time"""
+    raw = io.BytesIO(body)
+    stream = gzip.GzipFile(fileobj=raw, mode="rb") if body[:2] == b"\x1f\x8b" else raw
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def check_batch(
+    records: Iterable[Dict[str, Any]],
+    signer: ProvSigner,
+    keep_results: bool = False,
+    max_failures: int = MAX_FAILURES_PER_BATCH,
+) -> Dict[str, Any]:
+    """
+    Verify every record of one stored batch
+
+    Merkle-signed records are checked against their inclusion proof, with
+    each batch header signature verified once. Every Merkle tree in the batch
+    must also be complete: all ``size`` leaf indices present exactly once, so
+    dropped or duplicated records are caught even though each remaining
+    record verifies on its own.
+
+    Args:
+        records: Signed PROV records
+        signer: ProvSigner with the public key
+        keep_results: Include a result for every record ("results")
+        max_failures: Failed records listed in "failures"
+
+    Returns:
+        Dictionary with record counts, "valid", "failures", the batch
+        "headers" seen and optionally "results"
+    """
+    verified_headers: set = set()
+    trees: Dict[str, Dict[str, Any]] = {}
+    result: Dict[str, Any] = {
+        "records": 0,
+        "valid_records": 0,
+        "invalid_records": 0,
+        "unsigned_records": 0,
+        "failures": [],
+        "headers": [],
+    }
+    if keep_results:
+        result["results"] = []
+
+    for index, record in enumerate(records):
+        result["records"] += 1
+        sig_meta = record.get("vpm:signature")
+        if not sig_meta:
+            valid, message = False, "No signature found"
+            result["unsigned_records"] += 1
+        elif sig_meta.get("scheme") == MERKLE_SCHEME:
+            valid, message = signer.verify_merkle_record(record, verified_headers)
+            root = (sig_meta.get("batch") or {}).get("root")
+            tree = trees.setdefault(root, {"header": None, "leaves": [], "invalid": 0})
+            if valid:
+                tree["header"] = sig_meta["batch"]
+                tree["leaves"].append(sig_meta["leaf_index"])
+            else:
+                tree["invalid"] += 1
+        else:
+            valid, message = signer.verify_prov_record(record)
+
+        if valid:
+            result["valid_records"] += 1
+        else:
+            result["invalid_records"] += 1
+            if len(result["failures"]) < max_failures:
+                result["failures"].append({"record_index": index, "message": message})
+        if keep_results:
+            result["results"].append(
+                {"record_index": index, "valid": valid, "message": message}
+            )
+
+    incomplete = 0
+    for tree in trees.values():
+        header, leaves = tree["header"], tree["leaves"]
+        if header is None:
+            continue  # no record verified, already reported
+        result["headers"].append(header)
+        # Records that failed verification are reported on their own
+        missing = header["size"] - len(set(leaves)) - tree["invalid"]
+        duplicated = len(leaves) - len(set(leaves))
+        if missing > 0 or duplicated:
+            incomplete += 1
+            result["failures"].append(
+                {
+                    "record_index": None,
+                    "message": (
+                        f"Batch {header['sequence']}: {missing} of {header['size']}"
+                        f" records missing, {duplicated} duplicated"
+                    ),
+                }
+            )
+    result["valid"] = not result["invalid_records"] and not incomplete
+    return result
+
+
+def _init_worker(public_key_path: str) -> None:
+    global _worker_signer
+    _worker_signer = ProvSigner(public_key_path=public_key_path, mode="merkle")
+
+
+def _verify_body(public_key_path: str, body: bytes) -> Dict[str, Any]:
+    if _worker_signer is None:
+        _init_worker(public_key_path)
+    return check_batch(iter_records(body), _worker_signer)
+
+
+class AuditVerifier:
+    """
+    Bulk verifier for audit batches stored by S3AuditUploader
+
+    Batch objects are listed page by page and downloaded by a pool of
+    ``fetch_workers`` threads. Each body goes to a pool of ``workers``
+    processes, which decompress it line by line and verify the signatures
+    (see check_batch()). At most ``fetch_workers`` bodies are in memory at
+    once. Batch headers from the whole sweep are then checked for an
+    unbroken hash chain.
+
+    Args:
+        uploader: S3AuditUploader for the audit bucket
+        public_key_path: Ed25519 public key (PEM) of the signer
+        workers: Verification processes (default: CPU count; 0 verifies in
+            the fetch threads)
+        fetch_workers: Concurrent downloads (default: 2 per worker)
+    """
+
+    def __init__(
+        self,
+        uploader,
+        public_key_path: str,
+        workers: Optional[int] = None,
+        fetch_workers: Optional[int] = None,
+    ):
+        self.uploader = uploader
+        self.public_key_path = public_key_path
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.fetch_workers = fetch_workers or max(2 * self.workers, 4)
+
+    def iter_keys(self, prefix: str = "audit-logs/") -> Iterator[str]:
+        """Keys of the stored batches under ``prefix``"""
+        paginator = self.uploader.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.uploader.bucket_name, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+
+    def _fetch(self, s3_key: str) -> bytes:
+        response = self.uploader.s3_client.get_object(
+            Bucket=self.uploader.bucket_name, Key=s3_key
+        )
+        return response["Body"].read()
+
+    def verify_month(
+        self, year: int, month: int, previous: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Verify every batch stored for one month
+
+        Args:
+            previous: verify_month() report of the month before; when given,
+                this month's first batch must chain to its last batch
+
+        Returns:
+            verify_prefix() report for the month
+        """
+        report = self.verify_prefix(f"audit-logs/year={year:04d}/month={month:02d}/")
+        if previous is not None:
+            report["chain_breaks"] += _link_breaks(previous, report)
+            report["all_valid"] = report["all_valid"] and not report["chain_breaks"]
+        return report
+
+    def verify_prefix(self, prefix: str = "audit-logs/") -> Dict[str, Any]:
+        """
+        Verify every batch stored under ``prefix``
+
+        Returns:
+            Summary report; "all_valid" is False if any record fails, a
+            batch is incomplete or unreadable, or the batch chain is broken.
+            "chain_start" (first sequence and its prev_root) and "chain_end"
+            (last sequence and root) let adjacent prefixes be linked; both
+            are None without signed batches.
+        """
+        started = time.monotonic()
+        report: Dict[str, Any] = {
+            "prefix": prefix,
+            "batches": 0,
+            "records": 0,
+            "valid_records": 0,
+            "invalid_records": 0,
+            "unsigned_records": 0,
+            "signed_batches": 0,
+            "failed_batches": [],
+            "errors": [],
+        }
+        headers: Dict[tuple, Dict[str, Any]] = {}
+
+        pool = None
+        if self.workers:
+            pool = ProcessPoolExecutor(
+                self.workers, initializer=_init_worker, initargs=(self.public_key_path,)
+            )
+        signer = ProvSigner(public_key_path=self.public_key_path, mode="merkle")
+
+        def verify(s3_key: str) -> Dict[str, Any]:
+            body = self._fetch(s3_key)
+            if pool is None:
+                return check_batch(iter_records(body), signer)
+            return pool.submit(_verify_body, self.public_key_path, body).result()
+
+        try:
+            with ThreadPoolExecutor(self.fetch_workers) as fetchers:
+                futures = {
+                    fetchers.submit(verify, key): key for key in self.iter_keys(prefix)
+                }
+                for future in as_completed(futures):
+                    s3_key = futures.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        report["errors"].append({"s3_key": s3_key, "error": str(e)})
+                        continue
+                    report["batches"] += 1
+                    for field in (
+                        "records",
+                        "valid_records",
+                        "invalid_records",
+                        "unsigned_records",
+                    ):
+                        report[field] += result[field]
+                    for header in result["headers"]:
+                        # The same batch stored twice is not a chain fork
+                        headers[(header["sequence"], header["root"])] = header
+                    if not result["valid"]:
+                        report["failed_batches"].append(
+                            {
+                                "s3_key": s3_key,
+                                "invalid_records": result["invalid_records"],
+                                "failures": result["failures"],
+                            }
+                        )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        report["signed_batches"] = len(headers)
+        report["chain_breaks"] = merkle.chain_breaks(list(headers.values()))
+        ordered = sorted(headers.values(), key=lambda h: h["sequence"])
+        report["chain_start"] = (
+            {"sequence": ordered[0]["sequence"], "prev_root": ordered[0]["prev_root"]}
+            if ordered
+            else None
+        )
+        report["chain_end"] = (
+            {"sequence": ordered[-1]["sequence"], "root": ordered[-1]["root"]}
+            if ordered
+            else None
+        )
+        report["all_valid"] = not (
+            report["failed_batches"] or report["errors"] or report["chain_breaks"]
+        )
+        elapsed = time.monotonic() - started
+        report["elapsed_seconds"] = round(elapsed, 3)
+        report["records_per_second"] = (
+            round(report["records"] / elapsed) if elapsed else 0
+        )
+        report["verified_at"] = datetime.now(timezone.utc).isoformat()
+        return report
+
+
+def _link_breaks(previous: Dict[str, Any], report: Dict[str, Any]) -> List[str]:
+    """Chain problems between the end of ``previous`` and the start of ``report``"""
+    end, start = previous.get("chain_end"), report.get("chain_start")
+    if end is None or start is None:
+        return []
+    if start["sequence"] != end["sequence"] + 1:
+        return [
+            f"Missing batches {end['sequence'] + 1}..{start['sequence'] - 1}"
+            f" between {previous['prefix']} and {report['prefix']}"
+        ]
+    if start["prev_root"] != end["root"]:
+        return [
+            f"Batch {start['sequence']} does not chain to batch {end['sequence']}"
+            f" of {previous['prefix']}"
+        ]
+    return []
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Usage: PYTHONPATH=src python -m ops.audit_verifier --month 2025-01"""
+    from ops.config import ProvOpsConfig
+    from ops.s3_uploader import S3AuditUploader
+
+    ap = argparse.ArgumentParser(description="Verify stored PROV audit batches")
+    scope = ap.add_mutually_exclusive_group()
+    scope.add_argument("--month", help="YYYY-MM, e.g. 2025-01")
+    scope.add_argument("--prefix", default="audit-logs/")
+    ap.add_argument("--public-key", help="default: $SIGNING_PUBLIC_KEY_PATH")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    config = ProvOpsConfig.from_env()
+    verifier = AuditVerifier(
+        S3AuditUploader(**config.get_s3_config()),
+        args.public_key or config.signing_public_key_path,
+        workers=args.workers,
+    )
+    if args.month:
+        year, month = (int(part) for part in args.month.split("-"))
+        report = verifier.verify_month(year, month)
+    else:
+        report = verifier.verify_prefix(args.prefix)
+    print(json.dumps(report, indent=2))
+    return 0 if report["all_valid"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
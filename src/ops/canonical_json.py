@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+from json.encoder import encode_basestring
+from typing import Any, Callable, Dict, List
+
+# RFC 8785 (JSON Canonicalization Scheme) encoder used wherever a digest of
+# JSON data is computed: record signing and Merkle leaves (ops.signing),
+# entity hashes (ops.prov_logger) and task evidence (app.core.evidence).
+#
+# - no whitespace; object keys sorted by their UTF-16 code units
+# - strings as UTF-8, escaping only '"', '\' and control characters
+#   (json's C-accelerated encode_basestring does exactly that)
+# - numbers formatted like ECMAScript's Number.prototype.toString; integers
+#   must fit in an IEEE 754 double (|n| <= 2**53 - 1) and NaN/Infinity are
+#   rejected
+#
+# For the ASCII, string and integer data PROV records hold this is
+# byte-for-byte what json.dumps(sort_keys=True, separators=(",", ":"))
+# produced before, so existing digests and signatures stay valid.
+SCHEME = "RFC8785"
+MAX_SAFE_INTEGER = 2**53 - 1
+
+# update() hands the encoded text to the hash whenever this many pieces have
+# accumulated
+FLUSH_PIECES = 4096
+
+
+# Key sets whose order is cached. PROV records reuse a handful of fixed
+# shapes (the @context, entity/activity/agent bodies, relations); objects
+# keyed by generated ids never repeat, so the cache simply stops growing
+# once full rather than evicting the fixed shapes.
+MAX_SHAPES = 1024
+_SHAPES: Dict[tuple, tuple] = {}
+
+
+def _key_error(key: Any) -> TypeError:
+    return TypeError(f"Object keys must be strings, not {type(key).__name__}")
+
+
+def _shape(keys: tuple) -> tuple:
+    """Sorted (key, encoded prefix) pairs for one set of object keys"""
+    shape = _SHAPES.get(keys)
+    if shape is not None:
+        return shape
+    for key in keys:
+        if type(key) is not str:
+            raise _key_error(key)
+    if all(key.isascii() for key in keys):
+        ordered = sorted(keys)
+    else:
+        # UTF-16 code unit order differs from code point order above U+FFFF
+        ordered = sorted(keys, key=lambda k: k.encode("utf-16-be"))
+    shape = tuple(
+        (key, ("{" if i == 0 else ",") + encode_basestring(key) + ":")
+        for i, key in enumerate(ordered)
+    )
+    if len(_SHAPES) < MAX_SHAPES:
+        _SHAPES[keys] = shape
+    return shape
+
+
+def _number(value: Any) -> str:
+    if isinstance(value, int):
+        if -MAX_SAFE_INTEGER <= value <= MAX_SAFE_INTEGER:
+            return str(int(value))
+        raise ValueError(f"Integer {value} cannot be represented exactly in JSON")
+    value = float(value)
+    if value != value or value in (float("inf"), float("-inf")):
+        raise ValueError(f"{value} is not a valid JSON number")
+    if value == 0:
+        return "0"
+    if value.is_integer() and abs(value) <= MAX_SAFE_INTEGER:
+        return str(int(value))
+    # repr() gives the shortest round-tripping digits, as ECMAScript does;
+    # only the layout differs
+    mantissa, _, exp = repr(value).partition("e")
+    sign = "-" if mantissa.startswith("-") else ""
+    whole, _, frac = mantissa.lstrip("-").partition(".")
+    digits = (whole + frac).lstrip("0")
+    # Decimal point position relative to the first significant digit
+    n = len(whole) + int(exp or 0) - (len(whole + frac) - len(digits))
+    digits = digits.rstrip("0")
+    k = len(digits)
+    if k <= n <= 21:
+        return sign + digits + "0" * (n - k)
+    if 0 < n <= 21:
+        return sign + digits[:n] + "." + digits[n:]
+    if -6 < n <= 0:
+        return sign + "0." + "0" * -n + digits
+    e = n - 1
+    head = digits[0] + ("." + digits[1:] if k > 1 else "")
+    return f"{sign}{head}e{'+' if e >= 0 else '-'}{abs(e)}"
+
+
+def _encode(value: Any, append: Callable[[str], None]) -> None:
+    kind = type(value)
+    if kind is dict:
+        if len(value) == 1:
+            # Mostly id-keyed containers: nothing to sort or cache
+            for key, item in value.items():
+                if type(key) is not str:
+                    raise _key_error(key)
+                append("{" + encode_basestring(key) + ":")
+                if type(item) is str:
+                    append(encode_basestring(item) + "}")
+                else:
+                    _encode(item, append)
+                    append("}")
+            return
+        if not value:
+            append("{}")
+            return
+        for key, prefix in _shape(tuple(value)):
+            item = value[key]
+            if type(item) is str:
+                append(prefix + encode_basestring(item))
+            else:
+                append(prefix)
+                _encode(item, append)
+        append("}")
+    elif kind is str:
+        append(encode_basestring(value))
+    elif kind is list or kind is tuple:
+        if not value:
+            append("[]")
+            return
+        sep = "["
+        for item in value:
+            if type(item) is str:
+                append(sep + encode_basestring(item))
+            else:
+                append(sep)
+                _encode(item, append)
+            sep = ","
+        append("]")
+    elif value is True:
+        append("true")
+    elif value is False:
+        append("false")
+    elif value is None:
+        append("null")
+    elif isinstance(value, (int, float)):
+        append(_number(value))
+    elif isinstance(value, str):
+        append(encode_basestring(value))
+    elif isinstance(value, dict):
+        _encode(dict(value), append)
+    elif isinstance(value, (list, tuple)):
+        _encode(list(value), append)
+    else:
+        raise TypeError(f"Object of type {kind.__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> str:
+    """Canonical JSON text of ``value``"""
+    out: List[str] = []
+    _encode(value, out.append)
+    return "".join(out)
+
+
+def dumpb(value: Any) -> bytes:
+    """Canonical JSON of ``value`` as UTF-8 bytes"""
+    return dumps(value).encode("utf-8")
+
+
+def update(hasher: Any, value: Any) -> None:
+    """
+    Feed the canonical JSON of ``value`` into a hashlib object
+
+    Members of a top-level object or array are encoded one at a time and
+    handed to the hash every FLUSH_PIECES pieces, so a large document is
+    never held as one string.
+    """
+    out: List[str] = []
+    append = out.append
+    kind = type(value)
+    if kind is dict and value:
+        members = _shape(tuple(value))
+        close = "}"
+    elif (kind is list or kind is tuple) and value:
+        members = [("[" if i == 0 else ",", item) for i, item in enumerate(value)]
+        close = "]"
+    else:
+        _encode(value, append)
+        hasher.update("".join(out).encode("utf-8"))
+        return
+    for first, second in members:
+        if close == "}":
+            append(second)
+            _encode(value[first], append)
+        else:
+            append(first)
+            _encode(second, append)
+        if len(out) >= FLUSH_PIECES:
+            hasher.update("".join(out).encode("utf-8"))
+            out.clear()
+    append(close)
+    hasher.update("".join(out).encode("utf-8"))
+
+
+def _hasher(algorithm: str) -> Any:
+    # hashlib.sha256() is noticeably cheaper than hashlib.new("sha256")
+    constructor = getattr(hashlib, algorithm, None)
+    return constructor() if constructor is not None else hashlib.new(algorithm)
+
+
+def digest(value: Any, algorithm: str = "sha256") -> bytes:
+    """Digest of the canonical JSON of ``value``"""
+    hasher = _hasher(algorithm)
+    update(hasher, value)
+    return hasher.digest()
+
+
+def hexdigest(value: Any, algorithm: str = "sha256") -> str:
+    """Hex digest of the canonical JSON of ``value``"""
+    hasher = _hasher(algorithm)
+    update(hasher, value)
+    return hasher.hexdigest()
+
+
+def legacy_dumps(value: Any) -> str:
+    """
+    The encoding signatures used before SCHEME was recorded
+
+    Differs from dumps() only for non-ASCII text (escaped as \\uXXXX),
+    floats, integers beyond 2**53 and the order of non-BMP keys.
+    """
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
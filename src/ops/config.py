@@ -19,6 +19,8 @@ class ProvOpsConfig:
     # Digital Signing Configuration
     signing_private_key_path: str
     signing_public_key_path: str
+    signing_mode: str
+    chain_state_path: str
 
     # PROV Schema Configuration
     prov_schema_path: str
@@ -34,6 +36,12 @@ class ProvOpsConfig:
     batch_timeout_seconds: int
     compression_enabled: bool
 
+    # Pipeline Configuration (ops.prov_pipeline)
+    spool_dir: str
+    queue_max_batches: int
+    sign_workers: int
+    upload_max_retries: int
+
     # SPIFFE/SPIRE Configuration
     spiffe_socket_path: str
     vpm_trust_domain: str
@@ -62,6 +70,10 @@ class ProvOpsConfig:
             signing_public_key_path=os.getenv(
                 "SIGNING_PUBLIC_KEY_PATH", "/config/keys/signing_key.pub"
             ),
+            signing_mode=os.getenv("PROV_SIGNING_MODE", "merkle"),
+            chain_state_path=os.getenv(
+                "PROV_CHAIN_STATE_PATH", "/var/lib/prov/chain.json"
+            ),
             # PROV Schema Configuration
             prov_schema_path=os.getenv(
                 "PROV_SCHEMA_PATH", "/app/schema/prov_event.schema.json"
@@ -78,11 +90,16 @@ class ProvOpsConfig:
             batch_timeout_seconds=int(os.getenv("BATCH_TIMEOUT_SECONDS", "300")),
             compression_enabled=os.getenv("COMPRESSION_ENABLED", "true").lower()
             == "true",
+            # Pipeline Configuration
+            spool_dir=os.getenv("PROV_SPOOL_DIR", "/var/spool/prov"),
+            queue_max_batches=int(os.getenv("PROV_QUEUE_MAX_BATCHES", "8")),
+            sign_workers=int(os.getenv("PROV_SIGN_WORKERS", "2")),
+            upload_max_retries=int(os.getenv("PROV_UPLOAD_MAX_RETRIES", "5")),
             # SPIFFE/SPIRE Configuration
             spiffe_socket_path=os.getenv(
                 "SPIFFE_SOCKET_PATH", "/tmp/spire-agent/public/api.sock"
             ),
-            vmp_trust_domain=os.getenv("VPM_TRUST_DOMAIN", "vpm-mini.local"),
+            vpm_trust_domain=os.getenv("VPM_TRUST_DOMAIN", "vpm-mini.local"),
             # Application Configuration
             app_name=os.getenv("APP_NAME", "vpm-prov-ops"),
             app_version=os.getenv("APP_VERSION", "1.0.0"),
@@ -117,6 +134,14 @@ class ProvOpsConfig:
         if self.batch_timeout_seconds <= 0:
             errors.append("Batch timeout must be positive")
 
+        if self.queue_max_batches <= 0 or self.sign_workers <= 0:
+            errors.append("Pipeline queue size and sign workers must be positive")
+
+        if self.signing_mode not in ("merkle", "record"):
+            errors.append(
+                f"Invalid signing mode: {self.signing_mode}. Must be merkle or record"
+            )
+
         # Validate log level
         valid_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
         if self.log_level.upper() not in valid_levels:
@@ -141,6 +166,8 @@ class ProvOpsConfig:
         return {
             "private_key_path": self.signing_private_key_path,
             "public_key_path": self.signing_public_key_path,
+            "mode": self.signing_mode,
+            "chain_path": self.chain_state_path,
         }
 
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import hashlib
+from typing import Any, Dict, List, Sequence
+
+# Domain separation between leaves and inner nodes (as in RFC 6962), so an
+# inner node can never be passed off as a record
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(content_hash: bytes) -> bytes:
+    """Merkle leaf for a record's SHA-256 content hash"""
+    return hashlib.sha256(LEAF_PREFIX + content_hash).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    """Merkle inner node over two children"""
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+def build_levels(leaves: Sequence[bytes]) -> List[List[bytes]]:
+    """
+    Build a Merkle tree bottom-up
+
+    A node without a right sibling is carried up to the next level unchanged,
+    so the shape depends only on the number of leaves.
+
+    Args:
+        leaves: Leaf hashes in record order
+
+    Returns:
+        Tree levels from the leaves (first) to the root (last)
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [
+            node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def inclusion_proof(levels: List[List[bytes]], index: int) -> List[bytes]:
+    """
+    Sibling hashes on the path from leaf ``index`` to the root
+
+    Levels where the node has no sibling contribute nothing; the verifier
+    knows which those are from the leaf index and tree size.
+    """
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def root_from_proof(
+    leaf: bytes, index: int, size: int, proof: Sequence[bytes]
+) -> bytes:
+    """
+    Recompute the root from a leaf and its inclusion proof
+
+    Raises:
+        ValueError: if the index is out of range or the proof has the wrong length
+    """
+    if not 0 <= index < size:
+        raise ValueError(f"Leaf index {index} out of range for {size} leaves")
+    node, remaining = leaf, list(proof)
+    while size > 1:
+        if index ^ 1 < size:
+            if not remaining:
+                raise ValueError("Inclusion proof too short")
+            sibling = remaining.pop(0)
+            node = node_hash(sibling, node) if index % 2 else node_hash(node, sibling)
+        index //= 2
+        size = (size + 1) // 2
+    if remaining:
+        raise ValueError("Inclusion proof too long")
+    return node
+
+
+def chain_breaks(headers: Sequence[Dict[str, Any]]) -> List[str]:
+    """
+    Check that batch headers form an unbroken hash chain
+
+    Args:
+        headers: Batch headers (``vpm:signature["batch"]``), in any order
+
+    Returns:
+        One message per gap, fork or broken link; empty if the chain is intact
+    """
+    problems = []
+    ordered = sorted(headers, key=lambda h: h["sequence"])
+    for prev, header in zip(ordered, ordered[1:]):
+        if header["sequence"] == prev["sequence"]:
+            problems.append(f"Duplicate batch sequence {header['sequence']}")
+        elif header["sequence"] != prev["sequence"] + 1:
+            problems.append(
+                f"Missing batches {prev['sequence'] + 1}..{header['sequence'] - 1}"
+            )
+        elif header["prev_root"] != prev["root"]:
+            problems.append(
+                f"Batch {header['sequence']} does not chain to batch {prev['sequence']}"
+            )
+    return problems
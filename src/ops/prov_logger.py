@@ -2,31 +2,44 @@
 
 import json
 import uuid
-import hashlib
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 from pathlib import Path
 import jsonschema
 
+from ops import canonical_json
+from ops.prov_validation import RecordValidator
+
 
 class ProvLogger:
-    def __init__(self, schema_path: Optional[str] = None):
+    def __init__(
+        self,
+        schema_path: Optional[str] = None,
+        validation: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+    ):
+        """
+        Args:
+            schema_path: PROV event JSON Schema (default: schema/prov_event.schema.json)
+            validation: Record validation mode, see ops.prov_validation
+                (default: $PROV_VALIDATION or "fast"; tests use "full")
+            sample_rate: Share of records validated in "sample" mode
+        """
         self.schema_path = schema_path or str(
             Path(__file__).parent.parent.parent / "schema" / "prov_event.schema.json"
         )
         self.context_path = str(
             Path(__file__).parent.parent.parent / "schema" / "prov_context.json"
         )
-        self._load_schema()
+        self._load_schema(validation, sample_rate)
         self._load_context()
 
-    def _load_schema(self):
-        """Load PROV event JSON Schema for validation"""
-        try:
-            with open(self.schema_path, "r") as f:
-                self.schema = json.load(f)
-        except FileNotFoundError:
-            raise RuntimeError(f"PROV schema not found at {self.schema_path}")
+    def _load_schema(
+        self, validation: Optional[str] = None, sample_rate: Optional[float] = None
+    ):
+        """Load the PROV event JSON Schema and its (shared) compiled validators"""
+        self.validator = RecordValidator(self.schema_path, validation, sample_rate)
+        self.schema = self.validator.schema
 
     def _load_context(self):
         """Load PROV JSON-LD context"""
@@ -41,9 +54,14 @@ class ProvLogger:
         """Generate unique identifier for PROV records"""
         return f"{prefix}:{uuid.uuid4()}"
 
-    def _generate_entity_hash(self, content: str) -> str:
-        """Generate SHA-256 hash for entity content"""
-        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+    def _generate_entity_hash(self, content: Any) -> str:
+        """
+        Generate SHA-256 hash of the canonical JSON of entity content
+
+        Entities recorded without "canonicalization" were hashed as
+        json.dumps(content) (unsorted keys, default separators).
+        """
+        return canonical_json.hexdigest(content)
 
     def _current_timestamp(self) -> str:
         """Get current timestamp in ISO 8601 format"""
@@ -75,10 +93,9 @@ class ProvLogger:
             entities[entity_id] = {
                 "type": "Entity",
                 "label": input_data.get("label", f"Input Entity {idx+1}"),
-                "hash": self._generate_entity_hash(
-                    json.dumps(input_data.get("content", ""))
-                ),
+                "hash": self._generate_entity_hash(input_data.get("content", "")),
                 "algorithm": "sha256",
+                "canonicalization": canonical_json.SCHEME,
             }
             if "uri" in input_data:
                 entities[entity_id]["uri"] = input_data["uri"]
@@ -88,10 +105,9 @@ class ProvLogger:
             entities[entity_id] = {
                 "type": "Entity",
                 "label": output_data.get("label", f"Output Entity {idx+1}"),
-                "hash": self._generate_entity_hash(
-                    json.dumps(output_data.get("content", ""))
-                ),
+                "hash": self._generate_entity_hash(output_data.get("content", "")),
                 "algorithm": "sha256",
+                "canonicalization": canonical_json.SCHEME,
             }
             if "uri" in output_data:
                 entities[entity_id]["uri"] = output_data["uri"]
@@ -183,7 +199,7 @@ class ProvLogger:
 
         # Validate against schema
         try:
-            jsonschema.validate(prov_record, self.schema)
+            self.validator.validate(prov_record)
         except jsonschema.ValidationError as e:
             raise ValueError(f"Generated PROV record failed schema validation: {e}")
 
@@ -0,0 +1,522 @@
+#!/usr/bin/env python3
+
+import gzip
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Spool file suffixes, in pipeline order
+OPEN_SUFFIX = ".open.jsonl"  # write-ahead segment receiving records
+READY_SUFFIX = ".ready.jsonl"  # sealed segment waiting to be signed
+BATCH_SUFFIXES = (".batch.jsonl.gz", ".batch.jsonl")  # signed, waiting to upload
+LOCK_NAME = ".lock"
+
+_STOP = object()
+
+
+class ProvPipeline:
+    """
+    Background log -> sign -> compress -> upload pipeline for PROV records
+
+    ``submit()`` appends each record to a write-ahead segment in the spool
+    directory, so a record is on disk before the call returns. A segment is
+    sealed once it holds ``batch_size`` records or its first record is
+    ``batch_timeout_seconds`` old, and goes onto a bounded queue of
+    ``queue_size`` batches; when signing falls behind, submitters block on
+    that queue (backpressure, counted in ``stats()``). A pool of
+    ``sign_workers`` threads signs sealed segments with
+    ``ProvSigner.batch_sign_records`` and streams them into gzip JSONL batch
+    files, and an uploader thread sends those to the object store with
+    retries. Spool files are deleted only after the next stage has its own
+    durable copy, so nothing is lost on a crash or while the store is down:
+    ``start()`` picks up whatever a previous run left behind.
+
+    Writes are flushed to the OS per record and fsynced when a segment is
+    sealed and when a batch file is written.
+    """
+
+    def __init__(
+        self,
+        signer,
+        uploader,
+        spool_dir: str,
+        batch_size: int = 100,
+        batch_timeout_seconds: float = 300,
+        compression_enabled: bool = True,
+        queue_size: int = 8,
+        sign_workers: int = 2,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+        retry_backoff_max: float = 30.0,
+    ):
+        """
+        Args:
+            signer: ProvSigner with a private key
+            uploader: S3AuditUploader (or any object with ``upload_jsonl``)
+            spool_dir: Local directory for write-ahead segments and batches
+            batch_size: Records per batch
+            batch_timeout_seconds: Max age of a partial batch before it is sealed
+            compression_enabled: gzip batch files (plain JSONL otherwise)
+            queue_size: Sealed batches waiting for signing before submit() blocks
+            sign_workers: Signing threads
+            max_retries: Upload attempts per round before the batch is requeued
+            retry_backoff: First retry delay in seconds (doubles per attempt)
+            retry_backoff_max: Retry delay cap in seconds
+        """
+        if batch_size <= 0 or queue_size <= 0 or sign_workers <= 0:
+            raise ValueError("batch_size, queue_size and sign_workers must be positive")
+        self.signer = signer
+        self.uploader = uploader
+        self.spool_dir = Path(spool_dir)
+        self.batch_size = batch_size
+        self.batch_timeout_seconds = batch_timeout_seconds
+        self.compression_enabled = compression_enabled
+        self.queue_size = queue_size
+        self.sign_workers = sign_workers
+        self.max_retries = max(max_retries, 1)
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+
+        # Guards the open segment; held by submitters blocked on the queue,
+        # so the worker threads never take it
+        self._lock = threading.Lock()
+        # Guards metrics and the pending count
+        self._mlock = threading.Lock()
+        self._idle = threading.Condition(self._mlock)
+        self._sealed: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._uploads: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._lock_fd: Optional[int] = None
+        self._open_file = None
+        self._open_path: Optional[Path] = None
+        self._open_count = 0
+        self._open_since = 0.0
+        self._opened = threading.Event()
+        # Sealed batches not yet uploaded (flush() waits for zero)
+        self._pending = 0
+        self._counts: Dict[str, int] = {}
+        self._metrics = {
+            "submitted": 0,
+            "sealed_batches": 0,
+            "signed_batches": 0,
+            "signed_records": 0,
+            "sign_errors": 0,
+            "uploaded_batches": 0,
+            "uploaded_records": 0,
+            "upload_retries": 0,
+            "upload_errors": 0,
+            "backpressure_waits": 0,
+            "backpressure_seconds": 0.0,
+            "recovered_batches": 0,
+        }
+        self.last_error: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config, signer=None, uploader=None) -> "ProvPipeline":
+        """Build a pipeline from a ProvOpsConfig"""
+        if signer is None:
+            from ops.signing import ProvSigner
+
+            signer = ProvSigner(**config.get_signing_config())
+        if uploader is None:
+            from ops.s3_uploader import S3AuditUploader
+
+            uploader = S3AuditUploader(**config.get_s3_config())
+        return cls(
+            signer,
+            uploader,
+            config.spool_dir,
+            batch_size=config.batch_size,
+            batch_timeout_seconds=config.batch_timeout_seconds,
+            compression_enabled=config.compression_enabled,
+            queue_size=config.queue_max_batches,
+            sign_workers=config.sign_workers,
+            max_retries=config.upload_max_retries,
+        )
+
+    # -- lifecycle -------------------------------------------------------------
+
+    def start(self) -> "ProvPipeline":
+        """Start the worker threads and resume batches left in the spool"""
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_spool()
+        self._stop.clear()
+        targets = [self._seal_loop, self._upload_loop]
+        targets += [self._sign_loop] * self.sign_workers
+        for target in targets:
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._recover()
+        return self
+
+    def __enter__(self) -> "ProvPipeline":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Seal the current segment and wait until every batch is uploaded
+
+        A batch that failed to sign counts as done; it stays in the spool
+        (see ``stats()["sign_errors"]``) for the next ``start()``.
+        """
+        with self._lock:
+            self._seal_locked()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """
+        Flush (for up to ``timeout`` seconds) and stop the threads
+
+        Returns False if some batches are still spooled (for example, the
+        object store is down); they are uploaded by the next ``start()``.
+        """
+        drained = self.flush(timeout)
+        self._stop.set()
+        self._opened.set()
+        for _ in range(self.sign_workers):
+            self._sealed.put(_STOP)
+        self._uploads.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        return drained
+
+    # -- submit / seal ---------------------------------------------------------
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """
+        Durably enqueue one unsigned PROV record
+
+        Blocks while ``queue_size`` sealed batches are waiting for signing.
+        """
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._open_file is None:
+                seg_id = f"{time.time_ns():020d}-{uuid.uuid4().hex[:12]}"
+                self._open_path = self.spool_dir / f"{seg_id}{OPEN_SUFFIX}"
+                self._open_file = open(self._open_path, "a", encoding="utf-8")
+                self._open_since = time.monotonic()
+                self._opened.set()
+            self._open_file.write(line)
+            self._open_file.flush()
+            self._open_count += 1
+            self._count("submitted")
+            if self._open_count >= self.batch_size:
+                self._seal_locked()
+
+    def _seal_locked(self) -> None:
+        """Seal the open segment (caller holds ``self._lock``)"""
+        if self._open_file is None:
+            return
+        self._open_file.flush()
+        os.fsync(self._open_file.fileno())
+        self._open_file.close()
+        ready = self._ready_path(self._open_path)
+        os.replace(self._open_path, ready)
+        self._open_file = None
+        self._open_path = None
+        self._open_count = 0
+        with self._mlock:
+            self._pending += 1
+            self._metrics["sealed_batches"] += 1
+        self._enqueue(ready)
+
+    def _enqueue(self, ready: Path) -> None:
+        try:
+            self._sealed.put_nowait(ready)
+            return
+        except queue.Full:
+            pass
+        started = time.monotonic()
+        self._sealed.put(ready)
+        self._count("backpressure_waits")
+        self._count("backpressure_seconds", time.monotonic() - started)
+
+    def _seal_loop(self) -> None:
+        """Seal segments that reach ``batch_timeout_seconds`` before ``batch_size``"""
+        while not self._stop.is_set():
+            # Cleared before the check so a segment opened after it wakes us
+            self._opened.clear()
+            with self._lock:
+                due = None
+                if self._open_file is not None:
+                    due = self._open_since + self.batch_timeout_seconds
+                    if time.monotonic() >= due:
+                        self._seal_locked()
+                        continue
+            if due is None:
+                self._opened.wait()
+            else:
+                self._stop.wait(max(due - time.monotonic(), 0))
+
+    # -- sign / compress -------------------------------------------------------
+
+    def _sign_loop(self) -> None:
+        while True:
+            ready = self._sealed.get()
+            if ready is _STOP:
+                return
+            try:
+                self._sign_segment(ready)
+            except Exception as e:
+                # The segment stays spooled and is retried by the next start()
+                logger.error("Failed to sign PROV segment %s: %s", ready, e)
+                self._count("sign_errors")
+                self.last_error = f"sign: {e}"
+                self._done()
+
+    def _sign_segment(self, ready: Path) -> None:
+        records = _read_segment(ready)
+        batch = self._batch_path(ready)
+        if records:
+            # The signer saves its chain head only once the batch file is
+            # durable, so a failed write does not use up a sequence number
+            self.signer.batch_sign_records(
+                records, persist=lambda signed: self._write_batch(batch, signed)
+            )
+        ready.unlink()
+        self._count("signed_batches")
+        self._count("signed_records", len(records))
+        if not records:
+            self._done()
+            return
+        self._counts[batch.name] = len(records)
+        self._uploads.put(batch)
+
+    def _write_batch(self, batch: Path, signed: List[Dict[str, Any]]) -> None:
+        tmp = batch.with_name(batch.name + ".tmp")
+        with open(tmp, "wb") as f:
+            if self.compression_enabled:
+                with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+                    _write_jsonl(gz, signed)
+            else:
+                _write_jsonl(f, signed)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, batch)
+
+    # -- upload ----------------------------------------------------------------
+
+    def _upload_loop(self) -> None:
+        while True:
+            batch = self._uploads.get()
+            if batch is _STOP:
+                return
+            if not self._upload_with_retries(batch):
+                if self._stop.is_set():
+                    continue  # stays spooled for the next start()
+                # Store still down: retry later, after the other batches
+                self._stop.wait(self.retry_backoff_max)
+                self._uploads.put(batch)
+
+    def _upload_with_retries(self, batch: Path) -> bool:
+        delay = self.retry_backoff
+        for attempt in range(self.max_retries):
+            if attempt:
+                self._count("upload_retries")
+                if self._stop.wait(delay):
+                    return False
+                delay = min(delay * 2, self.retry_backoff_max)
+            try:
+                count = self._upload(batch)
+            except FileNotFoundError:
+                logger.warning("Spooled batch %s disappeared", batch.name)
+                self._done()
+                return True
+            except Exception as e:
+                logger.warning("Upload of %s failed: %s", batch.name, e)
+                self._count("upload_errors")
+                self.last_error = f"upload: {e}"
+                continue
+            batch.unlink()
+            self._counts.pop(batch.name, None)
+            self._count("uploaded_batches")
+            self._count("uploaded_records", count)
+            self._done()
+            return True
+        return False
+
+    def _upload(self, batch: Path) -> int:
+        compressed = batch.name.endswith(BATCH_SUFFIXES[0])
+        body = batch.read_bytes()
+        count = self._counts.get(batch.name)
+        if count is None:
+            data = gzip.decompress(body) if compressed else body
+            count = data.count(b"\n")
+        mtime = batch.stat().st_mtime
+        timestamp = datetime.fromtimestamp(mtime, timezone.utc).isoformat()
+        self.uploader.upload_jsonl(
+            body,
+            _segment_id(batch),
+            count,
+            timestamp,
+            compressed=compressed,
+        )
+        return count
+
+    def _count(self, name: str, n: float = 1) -> None:
+        with self._mlock:
+            self._metrics[name] += n
+
+    def _done(self) -> None:
+        with self._idle:
+            self._pending -= 1
+            if not self._pending:
+                self._idle.notify_all()
+
+    # -- spool -----------------------------------------------------------------
+
+    def _ready_path(self, path: Path) -> Path:
+        return path.with_name(_segment_id(path) + READY_SUFFIX)
+
+    def _batch_path(self, path: Path) -> Path:
+        suffix = BATCH_SUFFIXES[0 if self.compression_enabled else 1]
+        return path.with_name(_segment_id(path) + suffix)
+
+    def _lock_spool(self) -> None:
+        """One pipeline per spool directory, so batches are not uploaded twice"""
+        fd = os.open(self.spool_dir / LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                raise RuntimeError(f"PROV spool {self.spool_dir} is in use")
+        self._lock_fd = fd
+
+    def _recover(self) -> None:
+        """Queue segments and batches a previous run left in the spool"""
+        entries = sorted(p for p in self.spool_dir.iterdir() if p.is_file())
+        batches = {_segment_id(p) for p in entries if p.name.endswith(BATCH_SUFFIXES)}
+        advance_chain = getattr(self.signer, "advance_chain", None)
+        if advance_chain is not None:
+            # A crash between writing a batch and saving the chain head
+            # leaves the head behind; catch up before anything is signed
+            for path in entries:
+                if path.name.endswith(BATCH_SUFFIXES):
+                    header = _batch_header(path)
+                    if header is not None:
+                        advance_chain(header)
+        with self._lock:
+            current = self._open_path
+        for path in entries:
+            name = path.name
+            if name.endswith(".tmp"):
+                path.unlink()
+            elif name.endswith((OPEN_SUFFIX, READY_SUFFIX)) and path != current:
+                if _segment_id(path) in batches:
+                    # Crashed after writing the batch, before dropping the segment
+                    path.unlink()
+                    continue
+                ready = self._ready_path(path)
+                if path != ready:
+                    os.replace(path, ready)
+                with self._mlock:
+                    self._pending += 1
+                    self._metrics["recovered_batches"] += 1
+                self._enqueue(ready)
+            elif name.endswith(BATCH_SUFFIXES):
+                with self._mlock:
+                    self._pending += 1
+                    self._metrics["recovered_batches"] += 1
+                self._uploads.put(path)
+
+    # -- metrics ---------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput, backpressure and spool metrics"""
+        spool_batches, spool_bytes = _spool_usage(self.spool_dir)
+        with self._mlock:
+            out = dict(self._metrics)
+            out["pending_batches"] = self._pending
+        out["open_records"] = self._open_count
+        out["backpressure_seconds"] = round(out["backpressure_seconds"], 3)
+        out["queue_depth"] = self._sealed.qsize()
+        out["queue_capacity"] = self.queue_size
+        out["upload_queue_depth"] = self._uploads.qsize()
+        out["spool_batches"] = spool_batches
+        out["spool_bytes"] = spool_bytes
+        out["last_error"] = self.last_error
+        return out
+
+
+def _segment_id(path: Path) -> str:
+    return path.name.split(".", 1)[0]
+
+
+def _read_segment(path: Path) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Only the last line of a segment can be torn by a crash
+                logger.warning("Skipping unreadable line %d in %s", lineno, path)
+    return records
+
+
+def _batch_header(path: Path) -> Optional[Dict[str, Any]]:
+    """Merkle batch header of a batch file, None for per-record signatures"""
+    opener = gzip.open if path.name.endswith(".gz") else open
+    try:
+        with opener(path, "rb") as f:
+            line = f.readline()
+        return json.loads(line)["vpm:signature"].get("batch")
+    except (OSError, ValueError, KeyError, TypeError):
+        logger.warning("Cannot read batch header from %s", path)
+        return None
+
+
+def _write_jsonl(f, records: List[Dict[str, Any]]) -> None:
+    for record in records:
+        f.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+
+
+def _spool_usage(spool_dir: Path) -> Tuple[int, int]:
+    """(batches, bytes) waiting in the spool, segments included"""
+    count = size = 0
+    try:
+        entries = list(os.scandir(spool_dir))
+    except OSError:
+        return 0, 0
+    for entry in entries:
+        if entry.name.endswith(".tmp") or entry.name == LOCK_NAME:
+            continue
+        try:
+            size += entry.stat().st_size
+        except OSError:
+            continue
+        count += 1
+    return count, size
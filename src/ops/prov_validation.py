@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import jsonschema
+
+# Validation modes for generated PROV records:
+#   full    precompiled jsonschema validator on every record (use in tests)
+#   fast    checker generated from the schema on every record; jsonschema
+#           only runs to explain a rejected record
+#   sample  the fast checker on a PROV_VALIDATION_SAMPLE share of records
+#   off     no validation
+VALIDATION_MODES = ("full", "fast", "sample", "off")
+DEFAULT_SAMPLE_RATE = 0.01
+
+# Keywords that only annotate the schema
+_ANNOTATIONS = {"$schema", "$id", "title", "description", "format"}
+_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "boolean": lambda v: isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+Check = Callable[[Any], bool]
+
+
+def _same(a: Any, b: Any) -> bool:
+    """JSON equality: 1 == 1.0 but booleans are not numbers"""
+    return isinstance(a, bool) == isinstance(b, bool) and a == b
+
+
+class UnsupportedSchema(Exception):
+    """The schema uses keywords the fast-path compiler does not handle"""
+
+
+def _compile(schema: Dict[str, Any]) -> Check:
+    """
+    Compile a JSON Schema into a predicate
+
+    Covers the keywords prov_event.schema.json uses (type, required,
+    properties, patternProperties, additionalProperties, const, enum, pattern,
+    oneOf). ``format`` is an annotation, as in jsonschema.validate().
+
+    Raises:
+        UnsupportedSchema: for any other keyword
+    """
+    unknown = (
+        set(schema)
+        - _ANNOTATIONS
+        - {
+            "type",
+            "required",
+            "properties",
+            "patternProperties",
+            "additionalProperties",
+            "const",
+            "enum",
+            "pattern",
+            "oneOf",
+        }
+    )
+    if unknown:
+        raise UnsupportedSchema(", ".join(sorted(unknown)))
+
+    checks: List[Check] = []
+    if "type" in schema:
+        if not isinstance(schema["type"], str) or schema["type"] not in _TYPES:
+            raise UnsupportedSchema(f"type {schema['type']!r}")
+        checks.append(_TYPES[schema["type"]])
+    if "const" in schema:
+        const = schema["const"]
+        checks.append(lambda v: _same(v, const))
+    if "enum" in schema:
+        options = schema["enum"]
+        checks.append(lambda v: any(_same(v, o) for o in options))
+    if "pattern" in schema:
+        search = re.compile(schema["pattern"]).search
+        checks.append(lambda v: not isinstance(v, str) or search(v) is not None)
+    if "oneOf" in schema:
+        branches = [_compile(s) for s in schema["oneOf"]]
+        checks.append(lambda v: sum(1 for b in branches if b(v)) == 1)
+    object_keys = {
+        "required",
+        "properties",
+        "patternProperties",
+        "additionalProperties",
+    }
+    if object_keys & set(schema):
+        checks.append(_compile_object(schema))
+
+    def check(value: Any) -> bool:
+        return all(c(value) for c in checks)
+
+    return check
+
+
+def _compile_object(schema: Dict[str, Any]) -> Check:
+    required = list(schema.get("required", []))
+    properties = {k: _compile(s) for k, s in schema.get("properties", {}).items()}
+    patterns = [
+        (re.compile(p).search, _compile(s))
+        for p, s in schema.get("patternProperties", {}).items()
+    ]
+    additional = schema.get("additionalProperties", True)
+    if additional is not False and additional is not True:
+        raise UnsupportedSchema("additionalProperties schema")
+
+    def check(value: Any) -> bool:
+        if not isinstance(value, dict):
+            return True
+        for key in required:
+            if key not in value:
+                return False
+        for key, item in value.items():
+            matched = False
+            prop = properties.get(key)
+            if prop is not None:
+                matched = True
+                if not prop(item):
+                    return False
+            for search, pattern_check in patterns:
+                if search(key) is not None:
+                    matched = True
+                    if not pattern_check(item):
+                        return False
+            if not matched and additional is False:
+                return False
+        return True
+
+    return check
+
+
+@lru_cache(maxsize=None)
+def _compiled(schema_path: str, mtime_ns: int):
+    """Process-wide (schema, jsonschema validator, fast check or None) per file"""
+    with open(schema_path, "r") as f:
+        schema = json.load(f)
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    try:
+        fast = _compile(schema)
+    except UnsupportedSchema:
+        fast = None
+    return schema, cls(schema), fast
+
+
+class RecordValidator:
+    """
+    Validates generated records against a JSON Schema file
+
+    The jsonschema validator and the fast-path checker are compiled once per
+    schema file and shared by every instance in the process.
+
+    Args:
+        schema_path: Path to the JSON Schema
+        mode: One of VALIDATION_MODES (default: $PROV_VALIDATION or "fast")
+        sample_rate: Share of records checked in "sample" mode
+            (default: $PROV_VALIDATION_SAMPLE or 0.01)
+    """
+
+    def __init__(
+        self,
+        schema_path: str,
+        mode: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+    ):
+        mode = (mode or os.getenv("PROV_VALIDATION", "fast")).strip().lower()
+        if mode not in VALIDATION_MODES:
+            raise ValueError(
+                f"Invalid PROV validation mode: {mode!r} (expected {VALIDATION_MODES})"
+            )
+        if sample_rate is None:
+            sample_rate = float(
+                os.getenv("PROV_VALIDATION_SAMPLE", str(DEFAULT_SAMPLE_RATE))
+            )
+        self.mode = mode
+        self.sample_every = (
+            max(int(round(1 / sample_rate)), 1) if sample_rate > 0 else 0
+        )
+        path = str(Path(schema_path).resolve())
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            raise RuntimeError(f"PROV schema not found at {schema_path}")
+        self.schema, self.validator, self._fast = _compiled(path, mtime_ns)
+        self.seen = 0
+        self.checked = 0
+
+    def validate(self, record: Dict[str, Any]) -> None:
+        """
+        Validate ``record`` according to the mode
+
+        Raises:
+            jsonschema.ValidationError: if the record does not match the schema
+        """
+        self.seen += 1
+        if self.mode == "off":
+            return
+        if self.mode == "sample":
+            if not self.sample_every or (self.seen - 1) % self.sample_every:
+                return
+        self.checked += 1
+        if self.mode == "full" or self._fast is None:
+            self.validator.validate(record)
+        elif not self._fast(record):
+            # Let jsonschema explain the failure (and have the final word)
+            self.validator.validate(record)
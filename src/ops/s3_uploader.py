@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import os
 import json
 import gzip
 from datetime import datetime, timezone
@@ -35,6 +36,7 @@ class S3AuditUploader:
         """
         self.bucket_name = bucket_name
         self.endpoint_url = endpoint_url
+        self.region_name = region_name
 
         # Initialize S3 client
         self.s3_client = boto3.client(
@@ -57,15 +59,16 @@ class S3AuditUploader:
             if error_code == 404:
                 # Bucket doesn't exist, create it
                 try:
-                    if self.endpoint_url:
-                        # MinIO doesn't require region for bucket creation
+                    if self.endpoint_url or self.region_name == "us-east-1":
+                        # MinIO doesn't require region for bucket creation, and
+                        # AWS rejects an explicit us-east-1 constraint
                         self.s3_client.create_bucket(Bucket=self.bucket_name)
                     else:
-                        # AWS S3 requires region specification
+                        # Other AWS S3 regions require region specification
                         self.s3_client.create_bucket(
                             Bucket=self.bucket_name,
                             CreateBucketConfiguration={
-                                "LocationConstraint": "us-east-1"
+                                "LocationConstraint": self.region_name
                             },
                         )
                 except ClientError as create_error:
@@ -76,7 +79,11 @@ class S3AuditUploader:
                 raise RuntimeError(f"Failed to access bucket {self.bucket_name}: {e}")
 
     def _generate_s3_key(
-        self, timestamp: str, batch_id: str, record_type: str = "prov"
+        self,
+        timestamp: str,
+        batch_id: str,
+        record_type: str = "prov",
+        suffix: str = ".json.gz",
     ) -> str:
         """
         Generate hierarchical S3 key for audit log storage
@@ -90,7 +97,7 @@ class S3AuditUploader:
             f"day={dt.day:02d}/"
             f"hour={dt.hour:02d}/"
             f"type={record_type}/"
-            f"{batch_id}.json.gz"
+            f"{batch_id}{suffix}"
         )
 
     def _compress_records(self, records: List[Dict[str, Any]]) -> bytes:
@@ -132,20 +139,54 @@ class S3AuditUploader:
         # Use timestamp from first record, or current time
         timestamp = datetime.now(timezone.utc).isoformat()
         if signed_records and "vpm:signature" in signed_records[0]:
-            timestamp = signed_records[0]["vpm:signature"].get("signed_at", timestamp)
+            sig_meta = signed_records[0]["vpm:signature"]
+            # Merkle-signed records carry the time in their batch header
+            timestamp = sig_meta.get("signed_at") or sig_meta.get("batch", {}).get(
+                "signed_at", timestamp
+            )
 
-        # Generate S3 key
-        s3_key = self._generate_s3_key(timestamp, batch_id)
+        return self.upload_jsonl(
+            self._compress_records(signed_records),
+            batch_id,
+            len(signed_records),
+            timestamp,
+            metadata,
+        )
+
+    def upload_jsonl(
+        self,
+        body: bytes,
+        batch_id: str,
+        record_count: int,
+        timestamp: str,
+        metadata: Optional[Dict[str, str]] = None,
+        compressed: bool = True,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Upload an already serialized JSONL batch (gzip unless ``compressed`` is False)
 
-        # Compress records
-        compressed_data = self._compress_records(signed_records)
+        Args:
+            body: JSONL batch content
+            batch_id: Batch identifier
+            record_count: Number of records in the batch
+            timestamp: ISO 8601 time used for the hierarchical key
+            metadata: Optional metadata to attach to S3 object
+            compressed: Whether ``body`` is gzip-compressed
+
+        Returns:
+            Tuple of (s3_key, upload_metadata)
+        """
+        # Generate S3 key
+        s3_key = self._generate_s3_key(
+            timestamp, batch_id, suffix=".json.gz" if compressed else ".jsonl"
+        )
 
         # Prepare metadata
         object_metadata = {
             "batch-id": batch_id,
-            "record-count": str(len(signed_records)),
+            "record-count": str(record_count),
             "upload-timestamp": datetime.now(timezone.utc).isoformat(),
-            "content-encoding": "gzip",
+            "content-encoding": "gzip" if compressed else "identity",
             "format": "jsonl",
             "schema-version": "1.0",
         }
@@ -153,23 +194,27 @@ class S3AuditUploader:
         if metadata:
             object_metadata.update(metadata)
 
+        put_args = {}
+        if compressed:
+            put_args["ContentEncoding"] = "gzip"
+
         # Upload to S3
         try:
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=s3_key,
-                Body=compressed_data,
+                Body=body,
                 Metadata=object_metadata,
                 ContentType="application/json",
-                ContentEncoding="gzip",
+                **put_args,
             )
 
             upload_info = {
                 "bucket": self.bucket_name,
                 "s3_key": s3_key,
                 "batch_id": batch_id,
-                "record_count": len(signed_records),
-                "compressed_size_bytes": len(compressed_data),
+                "record_count": record_count,
+                "compressed_size_bytes": len(body),
                 "upload_timestamp": object_metadata["upload-timestamp"],
                 "success": True,
             }
@@ -193,9 +238,11 @@ class S3AuditUploader:
             # Download from S3
             response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
 
-            # Decompress
-            compressed_data = response["Body"].read()
-            jsonl_content = gzip.decompress(compressed_data).decode("utf-8")
+            # Decompress (batches uploaded with compression disabled are plain JSONL)
+            data = response["Body"].read()
+            if data[:2] == b"\x1f\x8b":
+                data = gzip.decompress(data)
+            jsonl_content = data.decode("utf-8")
 
             # Parse JSONL
             records = []
@@ -261,56 +308,49 @@ class S3AuditUploader:
         except ClientError as e:
             raise RuntimeError(f"Failed to list batches: {e}")
 
-    def verify_batch_integrity(self, s3_key: str) -> Tuple[bool, Dict[str, Any]]:
+    def verify_batch_integrity(
+        self, s3_key: str, public_key_path: Optional[str] = None
+    ) -> Tuple[bool, Dict[str, Any]]:
         """
         Verify integrity of a stored batch by checking signatures
 
         Args:
             s3_key: S3 key of the batch to verify
+            public_key_path: Signer's Ed25519 public key (PEM)
+                (default: $SIGNING_PUBLIC_KEY_PATH)
 
         Returns:
             Tuple of (all_valid, verification_report)
         """
-        # from .signing import ProvSigner  # Commented out to avoid unused import
+        from ops.audit_verifier import check_batch, iter_records
+        from ops.signing import ProvSigner
 
         try:
-            # Download batch
-            records = self.download_batch(s3_key)
-
-            # Verify each record (requires public key)
-            verification_results = []
-            all_valid = True
-
-            for i, record in enumerate(records):
-                if "vpm:signature" not in record:
-                    verification_results.append(
-                        {
-                            "record_index": i,
-                            "valid": False,
-                            "message": "No signature found",
-                        }
-                    )
-                    all_valid = False
-                else:
-                    # Note: This requires public key to be available
-                    # In production, public key would be stored separately
-                    verification_results.append(
-                        {
-                            "record_index": i,
-                            "valid": True,  # Placeholder - would verify with actual public key
-                            "message": "Signature verification skipped - public key required",
-                        }
-                    )
+            public_key_path = public_key_path or os.getenv("SIGNING_PUBLIC_KEY_PATH")
+            if not public_key_path:
+                raise ValueError("Public key required to verify signatures")
+            signer = ProvSigner(public_key_path=public_key_path, mode="merkle")
+
+            # Download batch and verify each record as it is decompressed
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=s3_key)
+            result = check_batch(
+                iter_records(response["Body"].read()), signer, keep_results=True
+            )
 
             report = {
                 "batch_s3_key": s3_key,
-                "total_records": len(records),
-                "all_signatures_valid": all_valid,
+                "total_records": result["records"],
+                "all_signatures_valid": result["valid"],
                 "verification_timestamp": datetime.now(timezone.utc).isoformat(),
-                "individual_results": verification_results,
+                "individual_results": result["results"],
+                "batch_problems": [
+                    f["message"]
+                    for f in result["failures"]
+                    if f["record_index"] is None
+                ],
             }
 
-            return all_valid, report
+            return result["valid"], report
 
         except Exception as e:
             return False, {
@@ -1,10 +1,12 @@
 #!/usr/bin/env python3
 
 import json
+import os
 import base64
 import hashlib
+import threading
 from datetime import datetime, timezone
-from typing import Dict, Any, Tuple, Optional
+from typing import Callable, Dict, Any, Tuple, Optional
 from pathlib import Path
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric.ed25519 import (
@@ -13,6 +15,17 @@ from cryptography.hazmat.primitives.asymmetric.ed25519 import (
 )
 from cryptography.exceptions import InvalidSignature
 
+from ops import canonical_json, merkle
+
+# batch_sign_records() modes:
+#   merkle  one signature per batch over a Merkle root; each record carries
+#           its inclusion proof and the batch header, chained to the
+#           previous batch's root
+#   record  one signature per record (sign_prov_record)
+SIGNING_MODES = ("merkle", "record")
+MERKLE_SCHEME = "merkle-batch-v1"
+SIGNER_NAME = "vpm-mini-audit-system"
+
 
 class ProvSigner:
     """
@@ -24,11 +37,34 @@ class ProvSigner:
         self,
         private_key_path: Optional[str] = None,
         public_key_path: Optional[str] = None,
+        mode: Optional[str] = None,
+        chain_path: Optional[str] = None,
     ):
+        """
+        Args:
+            private_key_path: Ed25519 private key (PEM), needed for signing
+            public_key_path: Ed25519 public key (PEM), needed for verification
+            mode: batch_sign_records() mode, one of SIGNING_MODES
+                (default: $PROV_SIGNING_MODE or "merkle")
+            chain_path: File persisting the head of the batch hash chain across
+                restarts (default: $PROV_CHAIN_STATE_PATH; in memory only when
+                unset, so a restarted signer would start a new chain at 0)
+        """
+        mode = (mode or os.getenv("PROV_SIGNING_MODE", "merkle")).strip().lower()
+        if mode not in SIGNING_MODES:
+            raise ValueError(
+                f"Invalid PROV signing mode: {mode!r} (expected {SIGNING_MODES})"
+            )
         self.private_key_path = private_key_path
         self.public_key_path = public_key_path
+        self.mode = mode
+        self.chain_path = chain_path or os.getenv("PROV_CHAIN_STATE_PATH")
         self._private_key = None
         self._public_key = None
+        # Head of the batch chain: {"sequence": n, "root": b64} or None
+        self._chain_lock = threading.Lock()
+        self._chain_head: Optional[Dict[str, Any]] = None
+        self._chain_loaded = False
 
     def generate_keypair(
         self, private_key_path: str, public_key_path: str
@@ -102,17 +138,26 @@ class ProvSigner:
 
         return self._public_key
 
-    def _canonical_json(self, data: Dict[str, Any]) -> str:
+    def _canonical_json(self, data: Dict[str, Any], legacy: bool = False) -> str:
         """
         Create canonical JSON representation for consistent signing
-        Uses sorted keys and no extra whitespace
+        RFC 8785 (see ops.canonical_json); ``legacy`` gives the encoding of
+        signatures made before the scheme was recorded
         """
-        return json.dumps(data, sort_keys=True, separators=(",", ":"))
+        if legacy:
+            return canonical_json.legacy_dumps(data)
+        return canonical_json.dumps(data)
 
     def _hash_content(self, content: str) -> bytes:
         """Create SHA-256 hash of content for signing"""
         return hashlib.sha256(content.encode("utf-8")).digest()
 
+    def _content_hash(self, data: Dict[str, Any], legacy: bool = False) -> bytes:
+        """SHA-256 of the canonical JSON, streamed into the hash"""
+        if legacy:
+            return self._hash_content(self._canonical_json(data, legacy=True))
+        return canonical_json.digest(data)
+
     def sign_prov_record(self, prov_record: Dict[str, Any]) -> Dict[str, Any]:
         """
         Sign a PROV record and return signed version with signature metadata
@@ -125,9 +170,8 @@ class ProvSigner:
         """
         private_key = self._load_private_key()
 
-        # Create canonical representation
-        canonical_json = self._canonical_json(prov_record)
-        content_hash = self._hash_content(canonical_json)
+        # Hash the canonical representation
+        content_hash = self._content_hash(prov_record)
 
         # Sign the hash
         signature = private_key.sign(content_hash)
@@ -142,10 +186,11 @@ class ProvSigner:
         signed_record["vpm:signature"] = {
             "algorithm": "Ed25519",
             "hash_algorithm": "SHA-256",
+            "canonicalization": canonical_json.SCHEME,
             "signature": signature_b64,
             "content_hash": content_hash_b64,
             "signed_at": timestamp,
-            "signer": "vpm-mini-audit-system",
+            "signer": SIGNER_NAME,
         }
 
         return signed_record
@@ -167,7 +212,9 @@ class ProvSigner:
             if "vpm:signature" not in signed_record:
                 return False, "No signature found in record"
 
-            sig_meta = signed_record["vmp:signature"]
+            sig_meta = signed_record["vpm:signature"]
+            if sig_meta.get("scheme") == MERKLE_SCHEME:
+                return self.verify_merkle_record(signed_record)
             signature_b64 = sig_meta["signature"]
             content_hash_b64 = sig_meta["content_hash"]
 
@@ -175,9 +222,10 @@ class ProvSigner:
             record_copy = signed_record.copy()
             del record_copy["vpm:signature"]
 
-            # Create canonical representation and hash
-            canonical_json = self._canonical_json(record_copy)
-            computed_hash = self._hash_content(canonical_json)
+            # Hash the canonical representation
+            computed_hash = self._content_hash(
+                record_copy, legacy="canonicalization" not in sig_meta
+            )
 
             # Verify content hash matches
             stored_hash = base64.b64decode(content_hash_b64)
@@ -198,17 +246,198 @@ class ProvSigner:
         except Exception as e:
             return False, f"Verification failed: {str(e)}"
 
-    def batch_sign_records(self, prov_records: list) -> list:
+    def batch_sign_records(
+        self, prov_records: list, persist: Optional[Callable[[list], None]] = None
+    ) -> list:
         """
         Sign multiple PROV records in batch
 
         Args:
             prov_records: List of PROV records to sign
+            persist: Called with the signed records to store them durably
+                (see merkle_sign_records())
 
         Returns:
             List of signed PROV records
         """
-        return [self.sign_prov_record(record) for record in prov_records]
+        if self.mode == "merkle":
+            return self.merkle_sign_records(prov_records, persist)
+        signed = [self.sign_prov_record(record) for record in prov_records]
+        if persist is not None:
+            persist(signed)
+        return signed
+
+    def merkle_sign_records(
+        self, prov_records: list, persist: Optional[Callable[[list], None]] = None
+    ) -> list:
+        """
+        Sign a batch of PROV records with a single signature over a Merkle root
+
+        Leaves are the records' canonical SHA-256 content hashes, in order.
+        The signed batch header holds the root, the tree size, a sequence
+        number and the previous batch's root, so reordering or dropping
+        records, or dropping whole batches, breaks verification.
+
+        The chain head only moves on once ``persist`` has stored the batch.
+        If it raises, the sequence number is not used up and the next batch
+        signed takes it, so a failed write leaves no gap in the chain.
+
+        Args:
+            prov_records: List of PROV records to sign
+            persist: Called with the signed records, under the chain lock,
+                before the chain head is saved
+
+        Returns:
+            List of signed PROV records, each carrying its inclusion proof
+        """
+        if not prov_records:
+            if persist is not None:
+                persist([])
+            return []
+        private_key = self._load_private_key()
+        content_hashes = [self._content_hash(record) for record in prov_records]
+        levels = merkle.build_levels([merkle.leaf_hash(h) for h in content_hashes])
+        root_b64 = base64.b64encode(levels[-1][0]).decode("utf-8")
+
+        with self._chain_lock:
+            head = self._load_chain_head()
+            header = {
+                "sequence": head["sequence"] + 1 if head else 0,
+                "size": len(prov_records),
+                "root": root_b64,
+                "prev_root": head["root"] if head else None,
+                "signed_at": datetime.now(timezone.utc).isoformat(),
+                "signer": SIGNER_NAME,
+                "canonicalization": canonical_json.SCHEME,
+            }
+            signature = private_key.sign(self._header_digest(header))
+
+            signature_b64 = base64.b64encode(signature).decode("utf-8")
+            signed = []
+            for index, (record, content_hash) in enumerate(
+                zip(prov_records, content_hashes)
+            ):
+                signed_record = record.copy()
+                signed_record["vpm:signature"] = {
+                    "algorithm": "Ed25519",
+                    "hash_algorithm": "SHA-256",
+                    "scheme": MERKLE_SCHEME,
+                    "content_hash": base64.b64encode(content_hash).decode("utf-8"),
+                    "leaf_index": index,
+                    "proof": [
+                        base64.b64encode(h).decode("utf-8")
+                        for h in merkle.inclusion_proof(levels, index)
+                    ],
+                    "batch": header,
+                    "signature": signature_b64,
+                }
+                signed.append(signed_record)
+
+            if persist is not None:
+                persist(signed)
+            self._save_chain_head({"sequence": header["sequence"], "root": root_b64})
+        return signed
+
+    def advance_chain(self, header: Dict[str, Any]) -> None:
+        """
+        Move the chain head up to a batch that was stored but not recorded
+
+        A crash between storing a batch and saving the chain head leaves the
+        head one batch behind; pass the stored batch's header on restart so
+        the next batch does not reuse its sequence number.
+        """
+        with self._chain_lock:
+            head = self._load_chain_head()
+            if head is None or header["sequence"] > head["sequence"]:
+                self._save_chain_head(
+                    {"sequence": header["sequence"], "root": header["root"]}
+                )
+
+    def verify_merkle_record(
+        self, signed_record: Dict[str, Any], verified_headers: Optional[set] = None
+    ) -> Tuple[bool, str]:
+        """
+        Verify a record signed by merkle_sign_records()
+
+        Needs the record's inclusion proof and one signature check.
+
+        Args:
+            signed_record: Signed PROV record with signature metadata
+            verified_headers: Cache of batch headers whose signature already
+                checked out; pass the same set for every record of a batch to
+                verify the batch signature only once
+
+        Returns:
+            Tuple of (is_valid, message)
+        """
+        try:
+            public_key = self._load_public_key()
+            sig_meta = signed_record.get("vpm:signature")
+            if not sig_meta:
+                return False, "No signature found in record"
+            if sig_meta.get("scheme") != MERKLE_SCHEME:
+                return False, f"Not a {MERKLE_SCHEME} signature"
+
+            header = sig_meta["batch"]
+            record_copy = signed_record.copy()
+            del record_copy["vpm:signature"]
+            computed_hash = self._content_hash(
+                record_copy, legacy="canonicalization" not in header
+            )
+            if computed_hash != base64.b64decode(sig_meta["content_hash"]):
+                return (
+                    False,
+                    "Content hash mismatch - record may have been tampered with",
+                )
+
+            root = merkle.root_from_proof(
+                merkle.leaf_hash(computed_hash),
+                sig_meta["leaf_index"],
+                header["size"],
+                [base64.b64decode(h) for h in sig_meta["proof"]],
+            )
+            if root != base64.b64decode(header["root"]):
+                return (
+                    False,
+                    "Merkle root mismatch - record or its position was tampered with",
+                )
+
+            digest = self._header_digest(header)
+            cache_key = (digest, sig_meta["signature"])
+            if verified_headers is None or cache_key not in verified_headers:
+                public_key.verify(base64.b64decode(sig_meta["signature"]), digest)
+                if verified_headers is not None:
+                    verified_headers.add(cache_key)
+            return True, "Signature valid - record included in signed batch"
+
+        except InvalidSignature:
+            return False, "Invalid signature - batch header may have been tampered with"
+        except Exception as e:
+            return False, f"Verification failed: {str(e)}"
+
+    def _header_digest(self, header: Dict[str, Any]) -> bytes:
+        return self._content_hash(header, legacy="canonicalization" not in header)
+
+    def _load_chain_head(self) -> Optional[Dict[str, Any]]:
+        """Chain head, read from chain_path on first use (caller holds the lock)"""
+        if not self._chain_loaded:
+            if self.chain_path and os.path.exists(self.chain_path):
+                with open(self.chain_path, "r") as f:
+                    self._chain_head = json.load(f)
+            self._chain_loaded = True
+        return self._chain_head
+
+    def _save_chain_head(self, head: Dict[str, Any]) -> None:
+        self._chain_head = head
+        if not self.chain_path:
+            return
+        Path(self.chain_path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{self.chain_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(head, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.chain_path)
 
     def export_public_key_info(self) -> Dict[str, str]:
         """
@@ -0,0 +1,49 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def prov_full_validation(monkeypatch):
+    """Validate PROV records against the full JSON schema in every test."""
+    monkeypatch.setenv("PROV_VALIDATION", "full")
+
+
+@pytest.fixture(autouse=True)
+def no_deployed_chain_state(monkeypatch):
+    """Keep signers off a deployment's PROV_CHAIN_STATE_PATH."""
+    monkeypatch.delenv("PROV_CHAIN_STATE_PATH", raising=False)
+
+
+@pytest.fixture
+def keys(tmp_path):
+    """Paths of a fresh Ed25519 keypair (private, public)."""
+    pytest.importorskip("cryptography")
+    from ops.signing import ProvSigner
+
+    priv, pub = tmp_path / "key.pem", tmp_path / "key.pub"
+    ProvSigner().generate_keypair(str(priv), str(pub))
+    return str(priv), str(pub)
+
+
+@pytest.fixture
+def uploader(monkeypatch):
+    """S3AuditUploader against a moto-mocked audit bucket."""
+    moto = pytest.importorskip("moto")
+    from ops.s3_uploader import S3AuditUploader
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        yield S3AuditUploader(bucket_name="vpm-audit-logs")
+
+
+@pytest.fixture
+def make_records():
+    """Factory for ``n`` minimal PROV records numbered from ``start``."""
+
+    def make(n, start=0):
+        return [
+            {"@id": f"prov:{i:08x}", "entity": {"entity:x": {"n": i}}}
+            for i in range(start, start + n)
+        ]
+
+    return make
@@ -0,0 +1,96 @@
+"""Local OpenAI-compatible chat completions server for client tests/benchmarks."""
+
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+
+class FakeOpenAIServer:
+    """
+    Serves ``POST /v1/chat/completions`` over keep-alive HTTP/1.1.
+
+    Each reply's content is ``responder(request_body)``, by default
+    ``{"echo": <last message content>}``. ``latency`` delays every response;
+    ``failures`` is a list of status codes returned (in order) before requests
+    start succeeding.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failures: Optional[List[int]] = None,
+        responder: Optional[Callable[[dict], str]] = None,
+    ):
+        self.latency = latency
+        self.responder = responder or (
+            lambda body: json.dumps({"echo": body["messages"][-1]["content"]})
+        )
+        self.failures = list(failures or [])
+        self.requests = 0
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self.bodies: List[dict] = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body are written separately; avoid Nagle stalls
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server._lock:
+                    server.requests += 1
+                    server.active += 1
+                    server.max_active = max(server.max_active, server.active)
+                    server.bodies.append(body)
+                    status = server.failures.pop(0) if server.failures else 200
+                try:
+                    time.sleep(server.latency)
+                    if status != 200:
+                        payload = {"error": {"message": f"injected {status}"}}
+                    else:
+                        content = server.responder(body)
+                        payload = {
+                            "choices": [{"message": {"content": content}}],
+                            "usage": {"completion_tokens": 3},
+                        }
+                    data = json.dumps(payload).encode("utf-8")
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    if status == 429:
+                        self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with server._lock:
+                        server.active -= 1
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
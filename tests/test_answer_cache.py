@@ -0,0 +1,102 @@
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from core import grounded_answer as ga
+from libs import answer_cache, ssot_index, ssot_scan
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    (tmp_path / "STATE").mkdir()
+    (tmp_path / "STATE" / "current_state.md").write_text(
+        "phase=P4 canary GREEN\n", encoding="utf-8"
+    )
+    (tmp_path / "README.md").write_text("overview\n", encoding="utf-8")
+    (tmp_path / "reports").mkdir()
+    (tmp_path / "reports" / "canary.md").write_text(
+        "canary rollout evidence\n", encoding="utf-8"
+    )
+    monkeypatch.setattr(ssot_scan, "REPO_ROOT", tmp_path)
+    monkeypatch.setattr(ssot_index, "REFRESH_INTERVAL", 0)
+    monkeypatch.setattr(answer_cache, "_CACHE", None)
+    monkeypatch.setattr(answer_cache, "DB_PATH", "")
+    return tmp_path
+
+
+def test_cached_ai_answer_invalidated_by_source_change(repo, monkeypatch):
+    """Test that repeated questions skip the LLM until a cited source changes."""
+    calls = []
+
+    def fake_llm(system, user):
+        calls.append(user)
+        time.sleep(0.01)
+        return {
+            "answer": "GREEN",
+            "sources": ["reports/canary.md:L1", "README.md"],
+            "confidence": 0.9,
+        }
+
+    monkeypatch.setattr(ga, "ask_openai_json", fake_llm)
+    first = ga.grounded_answer("canary の状況は？", use_ai=True)
+    first["answer"] = "mutated by caller"
+    again = ga.grounded_answer("  Canary  の状況は?", use_ai=True)
+    assert again["answer"] == "GREEN" and len(calls) == 1
+
+    stats = answer_cache.get_cache(repo).stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+    assert stats["saved_llm_seconds"] > 0
+
+    # README.md is cited but not among the snippets, so the key is unchanged
+    (repo / "README.md").write_text("overview v2\n", encoding="utf-8")
+    ga.grounded_answer("canary の状況は？", use_ai=True)
+    assert len(calls) == 2
+    assert answer_cache.get_cache(repo).stats()["invalidated"] == 1
+
+
+def test_failed_llm_calls_are_not_cached(repo, monkeypatch):
+    """Test that error fallbacks are retried instead of served from cache."""
+    calls = []
+    monkeypatch.setattr(
+        ga, "ask_openai_json", lambda s, u: calls.append(u) or {"error": "timeout"}
+    )
+    ga.grounded_answer("canary", use_ai=True)
+    ga.grounded_answer("canary", use_ai=True)
+    assert len(calls) == 2
+    ga.grounded_answer("canary", use_ai=True, use_cache=False)
+    assert answer_cache.get_cache(repo).stats()["misses"] == 2
+
+
+def test_sqlite_store_shared_and_invalidated(tmp_path):
+    """Test that a second process sees entries and their invalidation."""
+    (tmp_path / "a.md").write_text("a\n", encoding="utf-8")
+    db = tmp_path / "answers.sqlite"
+    writer = answer_cache.AnswerCache(tmp_path, db_path=str(db))
+    reader = answer_cache.AnswerCache(tmp_path, db_path=str(db))
+    deps = answer_cache.file_deps(tmp_path, ["a.md:L1", "missing.md"])
+    writer.put("k", {"answer": "x"}, deps, llm_seconds=1.5)
+
+    assert reader.get("k") == {"answer": "x"}
+    assert reader.stats()["saved_llm_seconds"] == 1.5
+
+    (tmp_path / "missing.md").write_text("now exists\n", encoding="utf-8")
+    assert reader.get("k") is None
+    assert writer.get("k") is None  # dropped from the shared store, then stale
+    assert reader.stats()["invalidated"] == 1
+
+
+def test_lru_eviction(tmp_path):
+    """Test that the in-memory cache keeps the most recently used entries."""
+    cache = answer_cache.AnswerCache(tmp_path, max_entries=2, db_path="")
+    for key in ("a", "b"):
+        cache.put(key, {"answer": key}, [])
+    cache.get("a")
+    cache.put("c", {"answer": "c"}, [])
+    assert cache.get("b") is None
+    assert cache.get("a") == {"answer": "a"}
+    assert answer_cache.make_key(
+        "Ｐｈａｓｅ？", 2000, False, ""
+    ) == answer_cache.make_key("phase?", 2000, False, "")
@@ -0,0 +1,117 @@
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+pytest.importorskip("boto3")
+pytest.importorskip("dateutil")
+pytest.importorskip("moto")
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from ops.audit_verifier import AuditVerifier  # noqa: E402
+from ops.signing import ProvSigner  # noqa: E402
+
+JANUARY = "2025-01-15T10:00:00+00:00"
+FEBRUARY = "2025-02-01T00:00:00+00:00"
+
+
+def _store(uploader, batch_id, records, timestamp=JANUARY):
+    body = uploader._compress_records(records)
+    s3_key, _ = uploader.upload_jsonl(body, batch_id, len(records), timestamp)
+    return s3_key
+
+
+@pytest.fixture
+def stored(keys, uploader, make_records):
+    """Four chained Merkle batches from January and one outside the month."""
+    signer = ProvSigner(*keys, mode="merkle")
+    batches = [signer.batch_sign_records(make_records(5, 5 * b)) for b in range(4)]
+    keys_ = [_store(uploader, f"batch-{b}", batch) for b, batch in enumerate(batches)]
+    _store(uploader, "other", make_records(2), FEBRUARY)
+    return batches, keys_
+
+
+def test_month_sweep_verifies_records_and_chain(keys, uploader, stored):
+    """Test a clean month verifies in a process pool and the chain is intact."""
+    verifier = AuditVerifier(uploader, keys[1], workers=2)
+    report = verifier.verify_month(2025, 1)
+    assert report["all_valid"], report
+    assert (report["batches"], report["records"], report["valid_records"]) == (
+        4,
+        20,
+        20,
+    )
+    assert report["signed_batches"] == 4 and report["chain_breaks"] == []
+    assert report["chain_start"] == {"sequence": 0, "prev_root": None}
+    last = stored[0][3][0]["vpm:signature"]["batch"]
+    assert report["chain_end"] == {"sequence": 3, "root": last["root"]}
+
+    # February holds an unsigned batch
+    report = verifier.verify_month(2025, 2)
+    assert not report["all_valid"] and report["unsigned_records"] == 2
+
+
+def test_month_chains_to_the_previous_month(keys, uploader, make_records):
+    """Test a month's first batch is checked against the previous month's last."""
+    signer = ProvSigner(*keys, mode="merkle")
+    for b in range(3):
+        batch = signer.batch_sign_records(make_records(2, 2 * b))
+        _store(uploader, f"batch-{b}", batch, JANUARY if b < 2 else FEBRUARY)
+    verifier = AuditVerifier(uploader, keys[1], workers=0)
+
+    january = verifier.verify_month(2025, 1)
+    february = verifier.verify_month(2025, 2, previous=january)
+    assert february["all_valid"], february
+    assert february["chain_start"]["prev_root"] == january["chain_end"]["root"]
+
+    forked = dict(january, chain_end=dict(january["chain_end"], root="x"))
+    february = verifier.verify_month(2025, 2, previous=forked)
+    assert not february["all_valid"]
+    assert february["chain_breaks"] == [
+        "Batch 2 does not chain to batch 1 of audit-logs/year=2025/month=01/"
+    ]
+
+
+def test_tampering_dropped_records_and_batches_are_reported(keys, uploader, stored):
+    """Test edited records, dropped records and a dropped batch all fail."""
+    batches, s3_keys = stored
+    edited = copy.deepcopy(batches[0])
+    edited[2]["entity"]["entity:x"]["n"] = 999
+    _store(uploader, "batch-0", edited)
+    _store(uploader, "batch-2", batches[2][:3])
+    uploader.s3_client.delete_object(Bucket=uploader.bucket_name, Key=s3_keys[1])
+
+    report = AuditVerifier(uploader, keys[1], workers=0).verify_month(2025, 1)
+    assert not report["all_valid"]
+    assert report["records"] == 13 and report["invalid_records"] == 1
+    failures = {b["s3_key"]: b["failures"] for b in report["failed_batches"]}
+    assert failures[s3_keys[0]] == [
+        {
+            "record_index": 2,
+            "message": "Content hash mismatch - record may have been tampered with",
+        }
+    ]
+    assert failures[s3_keys[2]][0]["message"] == (
+        "Batch 2: 2 of 5 records missing, 0 duplicated"
+    )
+    assert report["chain_breaks"] == ["Missing batches 1..1"]
+
+
+def test_verify_batch_integrity_checks_signatures(keys, uploader, stored, make_records):
+    """Test the single-batch check verifies both signing modes."""
+    batches, s3_keys = stored
+    ok, report = uploader.verify_batch_integrity(s3_keys[3], public_key_path=keys[1])
+    assert ok and report["total_records"] == 5
+    assert all(r["valid"] for r in report["individual_results"])
+
+    per_record = ProvSigner(*keys, mode="record").batch_sign_records(make_records(3))
+    per_record[1]["entity"]["entity:x"]["n"] = -1
+    s3_key = _store(uploader, "per-record", per_record)
+    ok, report = uploader.verify_batch_integrity(s3_key, public_key_path=keys[1])
+    assert not ok
+    assert [r["valid"] for r in report["individual_results"]] == [True, False, True]
+
+    ok, report = uploader.verify_batch_integrity(s3_keys[3])
+    assert not ok and "Public key required" in report["error"]
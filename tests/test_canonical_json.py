@@ -0,0 +1,213 @@
+import base64
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from ops import canonical_json
+
+# A signed-shape PROV record; its digest is pinned below so that any change
+# to the encoder that would invalidate stored signatures fails this test
+RECORD = {
+    "@context": {
+        "prov": "http://www.w3.org/ns/prov#",
+        "vpm": "https://vpm-mini.local/",
+    },
+    "@id": "prov:0123456789abcdef0123456789abcdef",
+    "entity": {
+        "entity:input-1": {
+            "type": "Entity",
+            "label": "Pod Manifest: web-1",
+            "hash": "sha256:" + "ab" * 32,
+            "algorithm": "sha256",
+        }
+    },
+    "activity": {"activity:decision-1": {"type": "Activity", "startTime": None}},
+    "agent": {"agent:gatekeeper": {"type": "Agent", "count": 3, "ok": True}},
+    "used": {"_:u1": {"prov:activity": "activity:decision-1", "prov:entity": []}},
+}
+RECORD_SHA256 = "fa379ecc6585862da9284e9e8a7e71aca44bc5ca633657ffa8d668108d6c39d3"
+
+# Entity content and task evidence bodies did not use the sorted, compact
+# encoding before, so their digests changed with RFC 8785
+ENTITY_CONTENT = {
+    "kind": "Pod",
+    "name": "web-1",
+    "spec": {"replicas": 2, "image": "nginx:1.27"},
+}
+ENTITY_SHA256_LEGACY = (
+    "c8bab2d62dc6a6fd009ab7f02e9f0a36e15601085cd30d6769ba2500a4665050"
+)
+ENTITY_SHA256 = "6ab781db9bde118b3136b85b538811b264e90357e33e720b126ce39093843f42"
+EVIDENCE_BODY = {
+    "trace_id": "t-1",
+    "created_at": "20250101_000000Z",
+    "task": "deploy",
+    "result": {"status": "ok", "steps": 3},
+}
+EVIDENCE_DIGEST_LEGACY = "51ec3229db6e"
+EVIDENCE_DIGEST = "5faa449424a6"
+
+
+def test_rfc8785_sample():
+    """Test the example from RFC 8785 section 3.2.2."""
+    value = {
+        "numbers": [
+            333333333.33333329,
+            1e30,
+            4.50,
+            2e-3,
+            0.000000000000000000000000001,
+        ],
+        "string": '€$\u000f\nA\'B"\\\\"/',
+        "literals": [None, True, False],
+    }
+    assert canonical_json.dumps(value) == (
+        '{"literals":[null,true,false],'
+        '"numbers":[333333333.3333333,1e+30,4.5,0.002,1e-27],'
+        r'"string":"€$\u000f\nA'
+        "'"
+        r'B\"\\\\\"/"}'
+    )
+
+
+@pytest.mark.parametrize(
+    "number, text",
+    [
+        (0.0, "0"),
+        (-0.0, "0"),
+        (1.0, "1"),
+        (-1.5, "-1.5"),
+        (0.1, "0.1"),
+        (1e-6, "0.000001"),
+        (1e-7, "1e-7"),
+        (1.5e-7, "1.5e-7"),
+        (1e20, "100000000000000000000"),
+        (1e21, "1e+21"),
+        (float(2**68), "295147905179352830000"),
+        (5e-324, "5e-324"),
+        (1.7976931348623157e308, "1.7976931348623157e+308"),
+        (2**53 - 1, "9007199254740991"),
+    ],
+)
+def test_numbers_match_ecmascript(number, text):
+    """Test numbers serialize like ECMAScript Number.prototype.toString."""
+    assert canonical_json.dumps(number) == text
+
+
+def test_keys_sort_by_utf16_code_units():
+    """Test the key ordering example from RFC 8785 section 3.2.3."""
+    keys = ["€", "\r", "דּ", "1", "\U0001f600", "\u0080", "ö"]
+    text = canonical_json.dumps({k: 0 for k in keys})
+    assert list(json.loads(text)) == [
+        "\r",
+        "1",
+        "\u0080",
+        "ö",
+        "€",
+        "\U0001f600",
+        "דּ",
+    ]
+
+
+def test_digests_are_stable_across_encoder_versions():
+    """Test the pinned digest and that it matches the previous json.dumps encoding."""
+    assert canonical_json.hexdigest(RECORD) == RECORD_SHA256
+    legacy = json.dumps(RECORD, sort_keys=True, separators=(",", ":"))
+    assert canonical_json.legacy_dumps(RECORD) == legacy
+    assert canonical_json.dumps(RECORD) == legacy
+    assert hashlib.sha256(legacy.encode()).hexdigest() == RECORD_SHA256
+
+
+def test_entity_and_evidence_digests_changed_format():
+    """Test the pinned legacy and RFC 8785 digests of entities and evidence."""
+    legacy = hashlib.sha256(json.dumps(ENTITY_CONTENT).encode()).hexdigest()
+    assert legacy == ENTITY_SHA256_LEGACY
+    assert canonical_json.hexdigest(ENTITY_CONTENT) == ENTITY_SHA256
+
+    legacy = json.dumps(EVIDENCE_BODY, sort_keys=True).encode()
+    assert hashlib.sha256(legacy).hexdigest()[:12] == EVIDENCE_DIGEST_LEGACY
+    assert canonical_json.hexdigest(EVIDENCE_BODY)[:12] == EVIDENCE_DIGEST
+
+
+def test_new_digests_record_their_canonicalization(tmp_path, monkeypatch):
+    """Test entity hashes and evidence files say which encoding they hashed."""
+    pytest.importorskip("jsonschema")
+    from ops.prov_logger import ProvLogger
+
+    record = ProvLogger().log_decision(
+        {
+            "decision_id": "d-1",
+            "inputs": [{"label": "manifest", "content": ENTITY_CONTENT}],
+            "agent_spiffe_id": "spiffe://vpm-mini.local/ns/hyper-swarm/sa/gatekeeper",
+        }
+    )
+    (entity,) = record["entity"].values()
+    assert entity["hash"] == ENTITY_SHA256
+    assert (entity["algorithm"], entity["canonicalization"]) == ("sha256", "RFC8785")
+
+    sys.path.append(str(Path(__file__).resolve().parents[1]))
+    from app.core import evidence
+
+    monkeypatch.setattr(evidence, "EVID_DIR", tmp_path)
+    evidence.write_evidence("t-1", {"task": "deploy"})
+    (md,) = tmp_path.glob("t-1_*.md")
+    (jl,) = tmp_path.glob("tasks_*.jsonl")
+    body = json.loads(jl.read_text())
+    text = md.read_text()
+    assert f"- sha256: {canonical_json.hexdigest(body)[:12]}\n" in text
+    assert "- canonicalization: RFC8785\n" in text
+
+
+def test_streamed_digest_matches_full_encoding(monkeypatch):
+    """Test digests of documents larger than one flush equal hashing the whole text."""
+    monkeypatch.setattr(canonical_json, "FLUSH_PIECES", 16)
+    doc = {"records": [dict(RECORD, n=i, text="ü" * i) for i in range(50)]}
+    assert (
+        canonical_json.digest(doc) == hashlib.sha256(canonical_json.dumpb(doc)).digest()
+    )
+
+
+def test_rejects_values_without_a_canonical_form():
+    """Test NaN, unsafe integers and non-string keys are refused."""
+    for bad in (float("nan"), float("inf"), 2**53, {"a": [-(2**60)]}):
+        with pytest.raises(ValueError):
+            canonical_json.dumps(bad)
+    with pytest.raises(TypeError):
+        canonical_json.dumps({1: "one"})
+    with pytest.raises(TypeError):
+        canonical_json.dumps({"when": object()})
+
+
+def test_signatures_from_before_the_scheme_still_verify(tmp_path):
+    """Test records signed with the legacy encoding verify and new ones use RFC 8785."""
+    pytest.importorskip("cryptography")
+    from ops.signing import ProvSigner
+
+    priv, pub = str(tmp_path / "key.pem"), str(tmp_path / "key.pub")
+    ProvSigner().generate_keypair(priv, pub)
+    signer = ProvSigner(priv, pub, mode="record")
+    record = dict(RECORD, label="Entscheidung für Pod", score=0.5)
+
+    # Signature metadata as written before canonicalization was recorded
+    content_hash = hashlib.sha256(canonical_json.legacy_dumps(record).encode()).digest()
+    old = dict(record)
+    old["vpm:signature"] = {
+        "algorithm": "Ed25519",
+        "hash_algorithm": "SHA-256",
+        "signature": base64.b64encode(
+            signer._load_private_key().sign(content_hash)
+        ).decode(),
+        "content_hash": base64.b64encode(content_hash).decode(),
+    }
+    assert signer.verify_prov_record(old)[0]
+
+    new = signer.sign_prov_record(record)
+    assert new["vpm:signature"]["canonicalization"] == "RFC8785"
+    assert new["vpm:signature"]["content_hash"] != old["vpm:signature"]["content_hash"]
+    assert signer.verify_prov_record(new)[0]
+    merkle = ProvSigner(priv, pub, mode="merkle").batch_sign_records([record])
+    assert signer.verify_prov_record(merkle[0])[0]
@@ -0,0 +1,46 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from libs import decision_store
+
+
+def _write(directory: Path, name: str, body: str, mtime: int) -> Path:
+    path = directory / name
+    path.write_text(body, encoding="utf-8")
+    os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+def test_latest_orders_by_mtime_and_parses_once(tmp_path):
+    """Test newest-first ordering, skipping and parse-once caching."""
+    _write(tmp_path, "D-001.yml", "id: D-001\ndecision: adopt knative\n", 1)
+    _write(tmp_path, "D-002.yml", "decision: use spire\nlinks: a.md\n", 3)
+    _write(tmp_path, "D-003.yml", "- not a mapping\n", 2)
+    _write(tmp_path, "notes.yml", "decision: ignored\n", 4)
+    store = decision_store.DecisionStore(tmp_path)
+
+    entries = store.latest(3)
+    assert [e["id"] for e in entries] == ["D-002", "D-001"]
+    assert entries[0]["path"] == tmp_path / "D-002.yml"
+    assert entries[0]["links"] == "a.md"
+    assert store.parses == 3
+
+    entries[0]["id"] = "mutated"
+    assert [e["id"] for e in store.latest(2)] == ["D-002"]  # D-003 is skipped
+    assert store.parses == 3
+
+    _write(tmp_path, "D-001.yml", "id: D-001\ndecision: revised\n", 5)
+    (tmp_path / "D-002.yml").unlink()
+    entries = store.latest(10)
+    assert [e["decision"] for e in entries] == ["revised"]
+    assert store.parses == 4
+
+
+def test_get_store_is_shared(tmp_path):
+    """Test that callers share one store per directory."""
+    assert decision_store.get_store(tmp_path) is decision_store.get_store(
+        tmp_path / "."
+    )
+    assert decision_store.latest_decisions(tmp_path / "missing", 5) == []
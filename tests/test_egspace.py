@@ -1,8 +1,10 @@
 # tests/test_egspace.py
 import json
+from datetime import datetime
 from pathlib import Path
 
-from vpm_mini.egspace import ingest_jsonl, get_stats
+from vpm_mini import egspace
+from vpm_mini.egspace import ingest_jsonl, ingest_dir, get_stats
 
 
 def test_ingest_jsonl(tmp_path, monkeypatch):
@@ -80,3 +82,115 @@ def test_get_stats(tmp_path, monkeypatch):
     stats = get_stats()
     assert stats["total_events"] == 8
     assert stats["latest_id"] == "E:2025-08-17#3"
+
+
+def _write_jsonl(path, events):
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            json.dump(event, f, ensure_ascii=False)
+            f.write("\n")
+
+
+def test_ingest_jsonl_commits_counters_per_batch(tmp_path, monkeypatch):
+    """Test that streaming ingest keeps IDs continuous across batches."""
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / "in.jsonl"
+    _write_jsonl(src, [{"ts": 1723854000.0 + i, "text": str(i)} for i in range(7)])
+
+    processed = ingest_jsonl(str(src), flush_every=3)
+
+    assert [e["id"].split("#")[1] for e in processed] == [str(i) for i in range(1, 8)]
+    lines = Path("egspace/events.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == processed
+    with open("egspace/index.json", "r", encoding="utf-8") as f:
+        index = json.load(f)
+    assert index["2024-08-17"]["count"] == 7
+
+
+def test_interrupted_ingest_never_reuses_ids(tmp_path, monkeypatch):
+    """Test that IDs on disk are always covered by the committed counters."""
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / "in.jsonl"
+    _write_jsonl(src, [{"ts": 1755000000.0, "text": str(i)} for i in range(5)])
+    commit = egspace._commit_counters
+    calls = []
+
+    def failing_commit(*args):
+        calls.append(1)
+        if len(calls) >= 2:
+            raise OSError("disk full")
+        commit(*args)
+
+    monkeypatch.setattr(egspace, "_commit_counters", failing_commit)
+    try:
+        ingest_jsonl(str(src), flush_every=2)
+    except OSError:
+        pass
+    monkeypatch.setattr(egspace, "_commit_counters", commit)
+    ingest_jsonl(str(src), flush_every=2)
+
+    lines = Path("egspace/events.jsonl").read_text(encoding="utf-8").splitlines()
+    ids = [json.loads(line)["id"] for line in lines]
+    assert len(ids) == len(set(ids)) == 7
+
+
+def test_ingest_dir_matches_sequential(tmp_path, monkeypatch):
+    """Test that parallel directory ingest assigns the same IDs as sequential."""
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    day = 86400.0
+    for n in range(4):
+        _write_jsonl(
+            logs / f"2025-08-1{n}.jsonl",
+            [
+                {"ts": 1755000000.0 + (i % 3) * day, "text": f"{n}-{i}"}
+                for i in range(10 + n)
+            ],
+        )
+
+    seq_dir = tmp_path / "seq"
+    seq_dir.mkdir()
+    monkeypatch.chdir(seq_dir)
+    for path in sorted(logs.glob("*.jsonl")):
+        ingest_jsonl(str(path))
+    seq_events = Path("egspace/events.jsonl").read_text(encoding="utf-8")
+    seq_stats = get_stats()
+
+    par_dir = tmp_path / "par"
+    par_dir.mkdir()
+    monkeypatch.chdir(par_dir)
+    result = ingest_dir(str(logs), workers=3)
+
+    assert result == {"files": 4, "events": 46}
+    assert Path("egspace/events.jsonl").read_text(encoding="utf-8") == seq_events
+    assert get_stats() == seq_stats
+
+
+def test_ingest_dir_dates_events_without_ts_once(tmp_path, monkeypatch):
+    """Test that counting and ID assignment agree on the date of ts-less events."""
+
+    class Clock(datetime):
+        """A clock that moves half a day on every call."""
+
+        calls = 0
+
+        @classmethod
+        def now(cls, tz=None):
+            cls.calls += 1
+            return datetime.fromtimestamp(1755000000.0 + cls.calls * 43200, tz)
+
+    logs = tmp_path / "logs"
+    logs.mkdir()
+    for n in range(2):
+        _write_jsonl(logs / f"{n}.jsonl", [{"text": f"{n}-{i}"} for i in range(3)])
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(egspace, "datetime", Clock)
+
+    ingest_dir(str(logs), workers=1)
+
+    lines = Path("egspace/events.jsonl").read_text(encoding="utf-8").splitlines()
+    ids = [json.loads(line)["id"] for line in lines]
+    date = ids[0][2:12]
+    assert ids == [f"E:{date}#{i}" for i in range(1, 7)]
+    with open("egspace/index.json", "r", encoding="utf-8") as f:
+        assert json.load(f)[date]["count"] == 6
@@ -0,0 +1,106 @@
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.egspace import columnar
+from src.egspace.store import EV_FILE, append_event
+
+T0 = 1755000000.0
+
+
+def _append(n, start=0):
+    for i in range(start, start + n):
+        append_event(
+            {
+                "vec_id": f"v_{i}",
+                "role": "Watcher" if i % 2 == 0 else "Curator",
+                "session_id": f"s{i % 3}",
+                "ts": T0 + i,
+                "payload": {"i": i},
+            }
+        )
+
+
+def test_refresh_builds_columns(tmp_path, monkeypatch):
+    """Test building the columnar snapshot and vectorized queries."""
+    monkeypatch.chdir(tmp_path)
+    _append(10)
+
+    snap = columnar.refresh()
+
+    assert len(snap) == 10
+    assert isinstance(snap.ts, np.memmap)
+    assert snap.role_counts() == {"Watcher": 5, "Curator": 5}
+    assert snap.count(role="Watcher") == 5
+    assert snap.count(since=T0 + 7) == 3
+    assert snap.count(role="Curator", session_id="s0") == 2  # v_3, v_9
+    assert snap.vec_ids(snap.latest(3)) == ["v_7", "v_8", "v_9"]
+    assert snap.vec_ids(snap.latest(2, role="Curator")) == ["v_7", "v_9"]
+    assert [e["payload"]["i"] for e in snap.events(snap.latest(2))] == [8, 9]
+
+
+def test_refresh_is_incremental(tmp_path, monkeypatch):
+    """Test that refresh only parses the JSONL tail."""
+    monkeypatch.chdir(tmp_path)
+    _append(5)
+    covered = columnar.refresh().meta["covered"]
+    assert covered == EV_FILE.stat().st_size
+
+    _append(3, start=5)
+    with EV_FILE.open("a") as f:
+        f.write('{"vec_id": "torn"')  # record still being written
+
+    snap = columnar.refresh()
+    assert len(snap) == 8
+    assert snap.meta["covered"] < EV_FILE.stat().st_size
+    assert snap.vec_ids(snap.latest(1)) == ["v_7"]
+    assert len(snap.dictionary("vec_id")) == 8
+
+
+def test_count_events_does_not_refresh(tmp_path, monkeypatch):
+    """Test that count_events adds the uncovered tail without writing."""
+    monkeypatch.chdir(tmp_path)
+    _append(5)
+    columnar.refresh()
+    meta = (columnar.COL_DIR / "meta.json").read_text()
+
+    _append(3, start=5)
+    with EV_FILE.open("a") as f:
+        f.write('{"vec_id": "torn"')
+
+    assert columnar.count_events() == 8
+    assert (columnar.COL_DIR / "meta.json").read_text() == meta
+    assert len(columnar.open_snapshot()) == 5
+
+
+def test_uncommitted_rows_are_trimmed(tmp_path, monkeypatch):
+    """Test that rows written after the last meta commit are discarded."""
+    monkeypatch.chdir(tmp_path)
+    _append(4)
+    columnar.refresh()
+    with open(columnar._col_path("ts"), "ab") as f:
+        f.write(np.zeros(3, dtype="<f8").tobytes())
+
+    _append(1, start=4)
+    snap = columnar.refresh()
+
+    assert len(snap) == 5
+    assert os.path.getsize(columnar._col_path("ts")) == 5 * 8
+    assert snap.vec_ids(np.arange(5)) == [f"v_{i}" for i in range(5)]
+
+
+def test_rebuild_when_source_replaced(tmp_path, monkeypatch):
+    """Test a full rebuild when events.jsonl shrinks."""
+    monkeypatch.chdir(tmp_path)
+    _append(6)
+    columnar.refresh()
+
+    EV_FILE.write_text("")
+    _append(2, start=100)
+    snap = columnar.refresh()
+
+    assert len(snap) == 2
+    assert snap.vec_ids(np.arange(2)) == ["v_100", "v_101"]
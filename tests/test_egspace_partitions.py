@@ -0,0 +1,139 @@
+import sys
+import os
+import json
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.egspace import partitions
+from src.egspace.partitions import (
+    append_partitioned,
+    build_partitions,
+    partition_dir,
+    partition_stats,
+    query_events,
+)
+from src.egspace.store import EV_FILE, append_event, get_recent_events, batch
+from vpm_mini.egspace import get_stats, ingest_jsonl
+
+DAY = 86400.0
+T0 = 1755000000.0  # 2025-08-12T12:00:00Z
+
+
+def ids(events):
+    return [e["vec_id"] for e in events]
+
+
+def _events():
+    return [
+        {"vec_id": "a", "role": "Watcher", "ts": T0, "session_id": "s1"},
+        {"vec_id": "b", "role": "Curator", "ts": T0 + 10, "session_id": "s1"},
+        {"vec_id": "c", "role": "Watcher", "ts": T0 + DAY, "session_id": "s2"},
+        {
+            "vec_id": "d",
+            "role": "Planner",
+            "ts": "2025-08-14T00:00:00+00:00",
+            "session_id": "s2",
+        },
+    ]
+
+
+def test_partition_layout_and_manifest(tmp_path, monkeypatch):
+    """Test that events land in date/role partitions with manifests."""
+    monkeypatch.chdir(tmp_path)
+    append_partitioned(_events())
+
+    pdir = partition_dir("2025-08-12", "Watcher")
+    assert (pdir / "part-0.jsonl").exists()
+    manifest = json.loads((pdir / "_manifest.json").read_text())
+    assert manifest["count"] == 1
+    assert manifest["min_ts"] == manifest["max_ts"] == T0
+    assert manifest["sessions"] == {"s1": 1}
+    assert manifest["parts"][0]["bytes"] == (pdir / "part-0.jsonl").stat().st_size
+
+    stats = partition_stats()
+    assert stats == {
+        "total_events": 4,
+        "ingested_events": 0,
+        "latest_id": None,
+        "partitions": 4,
+    }
+
+
+def test_query_events_prunes_and_filters(tmp_path, monkeypatch):
+    """Test role/time/session queries over partitions."""
+    monkeypatch.chdir(tmp_path)
+    append_partitioned(_events())
+
+    assert ids(query_events()) == ["a", "b", "c", "d"]
+    assert ids(query_events(role="Watcher")) == ["a", "c"]
+    assert ids(query_events(since=T0 + 5)) == ["b", "c", "d"]
+    assert ids(query_events(until="2025-08-12T23:59:59Z")) == ["a", "b"]
+    assert ids(query_events(session_id="s2")) == ["c", "d"]
+    assert ids(query_events(role="Watcher", session_id="s1")) == ["a"]
+    assert ids(query_events(limit=2)) == ["c", "d"]
+
+
+def test_uncommitted_tail_is_ignored_and_rolled_back(tmp_path, monkeypatch):
+    """Test that bytes past the manifest are invisible and later truncated."""
+    monkeypatch.chdir(tmp_path)
+    append_partitioned(_events()[:1])
+    part = partition_dir("2025-08-12", "Watcher") / "part-0.jsonl"
+    with part.open("a") as f:
+        f.write('{"vec_id": "torn", "role": "Watcher", "ts": 1755000001.0}\n')
+
+    assert [e["vec_id"] for e in query_events()] == ["a"]
+
+    append_partitioned([{"vec_id": "e", "role": "Watcher", "ts": T0 + 1}])
+    lines = part.read_text().splitlines()
+    assert [json.loads(line)["vec_id"] for line in lines] == ["a", "e"]
+
+
+def test_store_writes_partitions_when_enabled(tmp_path, monkeypatch):
+    """Test that store.append_event and get_recent_events use partitions."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(partitions, "PARTITIONED", True)
+
+    for ev in _events():
+        append_event(ev)
+    with batch():
+        append_event({"vec_id": "e", "role": "Watcher", "ts": T0 + 3 * DAY})
+
+    assert EV_FILE.read_text() == ""
+    assert [e["vec_id"] for e in get_recent_events(2)] == ["d", "e"]
+    assert [e["vec_id"] for e in get_recent_events(0)] == ["a", "b", "c", "d", "e"]
+
+
+def test_get_stats_from_manifests(tmp_path, monkeypatch):
+    """Test that partitioned ingest is summarized from manifests alone."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(partitions, "PARTITIONED", True)
+
+    src = tmp_path / "in.jsonl"
+    with open(src, "w", encoding="utf-8") as f:
+        for i in range(5):
+            f.write(json.dumps({"ts": T0 + i, "role": "user", "text": str(i)}) + "\n")
+    processed = ingest_jsonl(str(src), flush_every=2)
+
+    # Role events without an ingest ID, on the same and a later date
+    append_event({"vec_id": "r1", "role": "Watcher", "ts": T0 + 10})
+    append_event({"vec_id": "r2", "role": "Watcher", "ts": T0 + DAY})
+
+    assert processed[-1]["id"] == "E:2025-08-12#5"
+    expected = {"total_events": 5, "latest_id": "E:2025-08-12#5"}
+    assert get_stats() == expected
+    assert partition_stats()["total_events"] == 7
+
+    # The flat layout keeps reading index.json even with manifests around
+    monkeypatch.setattr(partitions, "PARTITIONED", False)
+    assert get_stats() == expected
+    assert [e["id"] for e in query_events(role="user")] == [e["id"] for e in processed]
+
+
+def test_build_partitions_from_flat_file(tmp_path, monkeypatch):
+    """Test converting an existing events.jsonl into partitions."""
+    monkeypatch.chdir(tmp_path)
+    for ev in _events():
+        append_event(ev)
+
+    assert build_partitions(batch_size=3) == 4
+    assert [e["vec_id"] for e in query_events()] == ["a", "b", "c", "d"]
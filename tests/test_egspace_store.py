@@ -1,6 +1,7 @@
 import sys
 import os
 import json
+import multiprocessing
 
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -10,9 +11,16 @@ from src.egspace.store import (
     append_event,
     register_index,
     get_today_raw_ref,
+    get_index,
+    get_recent_events,
+    read_events_since,
+    compact_index,
+    batch,
     EG_DIR,
     EV_FILE,
     IDX_FILE,
+    IDX_SNAPSHOT,
+    IDX_LOG,
 )
 from src.roles.watcher import Watcher
 from src.roles.curator import Curator
@@ -33,11 +41,13 @@ def test_ensure_dirs(tmp_path, monkeypatch):
     assert EG_DIR.exists()
     assert EG_DIR.is_dir()
     assert EV_FILE.exists()
-    assert IDX_FILE.exists()
+    assert IDX_SNAPSHOT.exists()
+    assert IDX_LOG.exists()
 
     # Check initial content
     assert EV_FILE.read_text() == ""
-    assert IDX_FILE.read_text() == "{}"
+    assert IDX_SNAPSHOT.read_text() == "{}"
+    assert IDX_LOG.read_text() == ""
 
 
 def test_new_vec_id_uniqueness():
@@ -88,9 +98,7 @@ def test_append_event_and_register_index(tmp_path, monkeypatch):
     register_index(vec_id, raw_ref)
 
     # Check index was updated
-    assert IDX_FILE.exists()
-    with IDX_FILE.open("r") as f:
-        index = json.load(f)
+    index = get_index()
 
     assert vec_id in index
     assert index[vec_id] == raw_ref
@@ -132,8 +140,7 @@ def test_watcher_egspace_integration(tmp_path, monkeypatch):
     assert event["payload"] == payload
 
     # Check that index was updated
-    with IDX_FILE.open("r") as f:
-        index = json.load(f)
+    index = get_index()
 
     assert vec_id in index
     assert "logs/" in index[vec_id]
@@ -198,9 +205,171 @@ def test_multiple_roles_egspace_integration(tmp_path, monkeypatch):
     assert event2["role"] == "Curator"
 
     # Check that index has both entries
-    with IDX_FILE.open("r") as f:
-        index = json.load(f)
+    index = get_index()
 
     assert len(index) == 2
     assert event1["vec_id"] in index
     assert event2["vec_id"] in index
+
+
+def test_register_index_appends_without_rewrite(tmp_path, monkeypatch):
+    """Test that register_index appends one log line per mapping."""
+    monkeypatch.chdir(tmp_path)
+
+    register_index("vec_a", "logs/a.jsonl#L1")
+    snapshot_before = IDX_SNAPSHOT.read_text()
+    register_index("vec_b", "logs/b.jsonl#L2")
+    register_index("vec_a", "logs/a.jsonl#L9")
+
+    assert IDX_SNAPSHOT.read_text() == snapshot_before
+    assert len(IDX_LOG.read_text().splitlines()) == 3
+    assert get_index() == {"vec_a": "logs/a.jsonl#L9", "vec_b": "logs/b.jsonl#L2"}
+
+    # A torn trailing line is ignored until it is completed
+    with IDX_LOG.open("a") as f:
+        f.write('{"vec_id": "vec_c", "raw_')
+    assert "vec_c" not in get_index()
+
+
+def test_compact_index(tmp_path, monkeypatch):
+    """Test that compaction folds the log into the snapshot."""
+    monkeypatch.chdir(tmp_path)
+
+    for i in range(5):
+        register_index(f"vec_{i}", f"logs/x.jsonl#L{i}")
+    compact_index()
+
+    assert IDX_LOG.read_text() == ""
+    assert len(json.loads(IDX_SNAPSHOT.read_text())) == 5
+
+    register_index("vec_5", "logs/x.jsonl#L5")
+    assert len(get_index()) == 6
+
+
+def test_compaction_triggers_automatically(tmp_path, monkeypatch):
+    """Test that the log is compacted once it outgrows the snapshot."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("src.egspace.store.COMPACT_MIN_BYTES", 256)
+
+    for i in range(50):
+        register_index(f"vec_{i}", f"logs/x.jsonl#L{i}")
+
+    assert IDX_LOG.stat().st_size < IDX_SNAPSHOT.stat().st_size
+    assert len(get_index()) == 50
+
+
+def test_legacy_index_migration(tmp_path, monkeypatch):
+    """Test that an existing index.json is migrated on first open."""
+    monkeypatch.chdir(tmp_path)
+    EG_DIR.mkdir()
+    legacy = {
+        "session_old_1": "logs/2025-08-18/session.jsonl#latest",
+        "2025-08-18": {"date": "2025-08-18", "count": 2, "updated_at": ""},
+    }
+    IDX_FILE.write_text(json.dumps(legacy))
+
+    index = get_index()
+
+    assert index == {"session_old_1": "logs/2025-08-18/session.jsonl#latest"}
+    # index.json (date counters, possibly a tracked file) is left untouched
+    assert json.loads(IDX_FILE.read_text()) == legacy
+
+    # Later writes go to the snapshot/log only
+    register_index("vec_new", "logs/x.jsonl#L1")
+    assert get_index()["vec_new"] == "logs/x.jsonl#L1"
+    assert json.loads(IDX_FILE.read_text()) == legacy
+
+
+def test_get_recent_events_tail(tmp_path, monkeypatch):
+    """Test that get_recent_events returns the last N events in order."""
+    monkeypatch.chdir(tmp_path)
+    # Small blocks so records straddle block boundaries
+    monkeypatch.setattr("src.egspace.store.TAIL_BLOCK_SIZE", 16)
+
+    for i in range(20):
+        append_event({"vec_id": f"v_{i}", "role": "Watcher", "text": "x" * i})
+
+    recent = get_recent_events(5)
+    assert [e["vec_id"] for e in recent] == [f"v_{i}" for i in range(15, 20)]
+    assert len(get_recent_events(0)) == 20
+    assert len(get_recent_events(100)) == 20
+
+    # A record still being written is not returned
+    with EV_FILE.open("a") as f:
+        f.write('{"vec_id": "v_20", "ro')
+    assert get_recent_events(1)[0]["vec_id"] == "v_19"
+
+
+def test_read_events_since_cursor(tmp_path, monkeypatch):
+    """Test polling for new events with a byte-offset cursor."""
+    monkeypatch.chdir(tmp_path)
+
+    append_event({"vec_id": "v_0"})
+    events, cursor = read_events_since(0)
+    assert [e["vec_id"] for e in events] == ["v_0"]
+
+    events, cursor2 = read_events_since(cursor)
+    assert events == [] and cursor2 == cursor
+
+    append_event({"vec_id": "v_1"})
+    append_event({"vec_id": "v_2"})
+    assert [e["vec_id"] for e in get_recent_events(10, cursor=cursor)] == [
+        "v_1",
+        "v_2",
+    ]
+    events, cursor = read_events_since(cursor)
+    assert [e["vec_id"] for e in events] == ["v_1", "v_2"]
+    assert cursor == EV_FILE.stat().st_size
+
+
+def _stress_worker(worker: int, n: int) -> None:
+    for i in range(n):
+        vec_id = f"w{worker}_{i}"
+        append_event({"vec_id": vec_id, "role": "Watcher", "pad": "x" * 64})
+        register_index(vec_id, f"logs/w{worker}.jsonl#L{i}")
+
+
+def test_multiprocess_writers_lose_nothing(tmp_path, monkeypatch):
+    """Test that concurrent writer processes keep every mapping and line."""
+    monkeypatch.chdir(tmp_path)
+    # Force frequent compactions racing with appends
+    monkeypatch.setattr("src.egspace.store.COMPACT_MIN_BYTES", 2048)
+
+    ctx = multiprocessing.get_context("fork")
+    workers, per_worker = 6, 200
+    procs = [
+        ctx.Process(target=_stress_worker, args=(w, per_worker)) for w in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+        assert p.exitcode == 0
+
+    index = get_index()
+    expected = {
+        f"w{w}_{i}": f"logs/w{w}.jsonl#L{i}"
+        for w in range(workers)
+        for i in range(per_worker)
+    }
+    assert index == expected
+
+    with EV_FILE.open("r") as f:
+        lines = f.readlines()
+    assert len(lines) == workers * per_worker
+    assert {json.loads(line)["vec_id"] for line in lines} == set(expected)
+
+
+def test_batch_group_commit(tmp_path, monkeypatch):
+    """Test that batch() buffers appends and commits them on exit."""
+    monkeypatch.chdir(tmp_path)
+
+    with batch():
+        for i in range(3):
+            vec_id = append_event({"vec_id": f"b_{i}"})
+            register_index(vec_id, f"logs/b.jsonl#L{i}")
+        assert get_recent_events(10) == []
+        assert get_index() == {}
+
+    assert [e["vec_id"] for e in get_recent_events(10)] == ["b_0", "b_1", "b_2"]
+    assert len(get_index()) == 3
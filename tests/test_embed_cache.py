@@ -0,0 +1,91 @@
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.egspace.embed_cache import EmbeddingCache, cached_embedder
+
+
+class CountingEmbedder:
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.seen = []
+
+    def __call__(self, texts):
+        self.seen.extend(texts)
+        return np.stack(
+            [np.full(self.dim, float(len(t)), dtype=np.float32) for t in texts]
+        )
+
+
+def test_cached_embedder_only_embeds_misses(tmp_path):
+    """Test that repeated texts are served from the cache."""
+    model = CountingEmbedder()
+    embf = cached_embedder(model, "test-model", EmbeddingCache("test-model", tmp_path))
+
+    V1 = embf(["a", "bb", "a"])
+    V2 = embf(["bb", "ccc"])
+
+    assert model.seen == ["a", "bb", "ccc"]
+    assert V1.shape == (3, 8) and V1.dtype == np.float32
+    np.testing.assert_array_equal(V1[1], V2[0])
+    assert V2[1][0] == 3.0
+    stats = embf.cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+
+
+def test_cache_persists_across_instances(tmp_path):
+    """Test that embeddings survive a new process (new cache instance)."""
+    first = CountingEmbedder()
+    EmbeddingCache("m", tmp_path).embed(["x", "yy"], first)
+
+    second = CountingEmbedder()
+    cache = EmbeddingCache("m", tmp_path)
+    V = cache.embed(["yy", "x"], second)
+
+    assert second.seen == []
+    assert [v[0] for v in V] == [2.0, 1.0]
+    assert cache.stats()["hit_ratio"] == 1.0
+
+    # Different model name -> different key space
+    other = CountingEmbedder()
+    EmbeddingCache("m2", tmp_path / "m2").embed(["x"], other)
+    assert other.seen == ["x"]
+
+
+def test_lru_eviction_respects_size_cap(tmp_path):
+    """Test that the least recently used rows are evicted at the cap."""
+    model = CountingEmbedder()
+    cache = EmbeddingCache("m", tmp_path, max_rows=3)
+
+    cache.embed(["a", "b", "c"], model)
+    cache.embed(["a"], model)  # refresh "a"
+    cache.embed(["dddd"], model)  # evicts "b", the LRU entry
+
+    assert cache.stats()["rows"] == 3
+    assert cache.stats()["evictions"] == 1
+    model.seen.clear()
+    V = cache.embed(["a", "c", "dddd", "b"], model)
+    assert "b" in model.seen and "a" not in model.seen
+    assert [v[0] for v in V] == [1.0, 1.0, 4.0, 1.0]
+    assert os.path.getsize(tmp_path / "vectors.f32") <= 3 * 8 * 4
+
+
+def test_writers_sharing_a_cache_dir(tmp_path):
+    """Test that two open caches on one directory never hand out the same row."""
+    model = CountingEmbedder()
+    first = EmbeddingCache("m", tmp_path)
+    second = EmbeddingCache("m", tmp_path)
+
+    first.embed(["a"], model)
+    second.embed(["bb", "a"], model)
+    first.embed(["ccc"], model)
+
+    assert model.seen == ["a", "bb", "ccc"]
+    reopened = EmbeddingCache("m", tmp_path)
+    assert sorted(slot for slot, _ in reopened.rows.values()) == [0, 1, 2]
+    V = reopened.embed(["a", "bb", "ccc"], model)
+    assert [v[0] for v in V] == [1.0, 2.0, 3.0]
+    assert reopened.stats()["hit_ratio"] == 1.0
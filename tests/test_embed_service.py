@@ -0,0 +1,85 @@
+import sys
+import os
+import threading
+
+import numpy as np
+import pytest
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.egspace import embed_service, embedder
+
+
+@pytest.fixture
+def worker(tmp_path):
+    """A hashing-model worker on a temp unix socket."""
+    sock = tmp_path / "embed.sock"
+    server = embed_service.make_server(sock, preload=[embedder.HASH_NAME])
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    yield sock
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_encoder_is_process_singleton(monkeypatch):
+    """Test that a model is loaded once and then reused."""
+    loads = []
+    monkeypatch.setattr(embed_service, "_ENCODERS", {})
+    monkeypatch.setattr(
+        embed_service, "_load", lambda model: loads.append(model) or embedder.emb_hash
+    )
+
+    enc = embed_service.get_encoder("m")
+    assert embed_service.get_encoder("m") is enc
+    assert loads == ["m"]
+
+
+def test_worker_round_trip(worker):
+    """Test that the worker returns the same vectors as in-process encoding."""
+    texts = ["canary GREEN", "証跡の収集", ""]
+    X = embed_service.remote_encode(texts, embedder.HASH_NAME, worker)
+
+    np.testing.assert_array_equal(X, embedder.emb_hash(texts))
+    assert embedder.HASH_NAME in embed_service.ping(worker)["models"]
+
+
+def test_worker_reports_errors(worker):
+    """Test that a failing model load is raised on the client."""
+    with pytest.raises(RuntimeError, match="embedding worker"):
+        embed_service.remote_encode(["x"], "no/such-model-anywhere", worker)
+
+
+def test_no_worker_and_stale_socket(tmp_path):
+    """Test that a missing or stale socket means 'no worker'."""
+    sock = tmp_path / "embed.sock"
+    assert embed_service.ping(sock) is None
+    sock.touch()
+    assert embed_service.remote_encode(["x"], path=sock) is None
+
+
+def test_sbert_embedder_prefers_worker(worker, monkeypatch):
+    """Test that sbert_embedder() uses the worker without loading a model."""
+    calls = []
+    remote = embed_service.remote_encode
+    monkeypatch.setattr(embed_service, "SOCKET", worker)
+    monkeypatch.setattr(
+        embed_service,
+        "remote_encode",
+        lambda *a, **kw: calls.append(a) or remote(*a, **kw),
+    )
+
+    embf, name = embed_service.sbert_embedder(embedder.HASH_NAME)
+    assert name == embedder.HASH_NAME
+    assert embf(["x"]).shape == (1, embedder.EMB_DIM)
+    assert len(calls) == 1
+
+    def broken_load(model):
+        raise OSError(f"cannot download {model}")
+
+    monkeypatch.setattr(embed_service, "_ENCODERS", {})
+    monkeypatch.setattr(embed_service, "_load", broken_load)
+    monkeypatch.setattr(embed_service, "SOCKET", worker.with_name("none.sock"))
+    # Without a worker the model is loaded up front; a failure means no SBERT
+    assert embed_service.sbert_embedder() == (None, None)
+    assert embed_service.sbert_embedder("no/such-model-anywhere") == (None, None)
@@ -0,0 +1,55 @@
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.egspace import embedder
+
+
+def test_emb_hash_shape_and_normalization():
+    """Test that emb_hash returns deterministic unit rows of EMB_DIM."""
+    texts = ["Phase 4 canary promotion", "EG-Space index v1", ""]
+    V = embedder.emb_hash(texts)
+
+    assert V.shape == (3, embedder.EMB_DIM)
+    assert V.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(V[:2], axis=1), 1.0, rtol=1e-5)
+    assert not V[2].any()
+    np.testing.assert_array_equal(V, embedder.emb_hash(texts))
+    assert embedder.emb_hash([]).shape == (0, embedder.EMB_DIM)
+
+
+def test_emb_hash_independent_of_batching(monkeypatch):
+    """Test that a text embeds the same alone, in a batch, or across blocks."""
+    texts = [f"report {i}: canary gate 証跡 {i * 7}" for i in range(50)]
+    together = embedder.emb_hash(texts)
+    monkeypatch.setattr(embedder, "BLOCK_BYTES", 64)
+    np.testing.assert_array_equal(embedder.emb_hash(texts), together)
+    np.testing.assert_array_equal(embedder.emb_hash(texts[7:8])[0], together[7])
+
+
+def test_emb_hash_shared_vocabulary_is_closer():
+    """Test that texts sharing words/characters score higher than unrelated ones."""
+    a, b, c = embedder.emb_hash(
+        [
+            "knative canary rollout promoted to stable",
+            "canary rollout for knative promoted",
+            "grafana dashboard alert thresholds",
+        ]
+    )
+    assert a @ b > 0.5
+    assert a @ b > a @ c
+
+    ja, jb, jc = embedder.emb_hash(
+        ["証跡を収集する", "証跡の収集", "監視ダッシュボード"]
+    )
+    assert ja @ jb > ja @ jc
+
+
+def test_hashing_embedder_contract():
+    """Test that hashing_embedder keeps the (emb_fn, name) contract."""
+    embf, name = embedder.hashing_embedder()
+    assert name == embedder.HASH_NAME
+    assert embf(["x"]).shape == (1, embedder.EMB_DIM)
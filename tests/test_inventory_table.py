@@ -0,0 +1,160 @@
+import csv
+import datetime as dt
+import random
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from core import inventory_table, plan_suggester
+
+HEADER = [
+    "asset_id",
+    "kind",
+    "name",
+    "owner",
+    "criticality",
+    "status",
+    "due_date",
+    "est_effort",
+    "risk",
+    "target_option",
+    "links",
+]
+TODAY = dt.date(2025, 1, 1)
+
+
+def _write_inventory(path: Path, rows) -> Path:
+    with path.open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return path
+
+
+def _random_rows(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        offset = rng.choice([-3, 0, 1, 7, 8, 30, 31, 90, 91, 400])
+        due = (
+            ""
+            if rng.random() < 0.2
+            else (TODAY + dt.timedelta(days=offset)).isoformat()
+        )
+        rows.append(
+            [
+                f"A-{i}",
+                rng.choice(["rehost", "replace", ""]),
+                rng.choice([f"asset {i}", ""]),
+                rng.choice(["ops", ""]),
+                rng.choice(["H", "m", "L", "", "X"]),
+                "todo",
+                rng.choice([due, "not-a-date"]),
+                rng.choice(["S", "M", "l", ""]),
+                rng.choice(["HIGH", "med", "Medium", "LOW", ""]),
+                rng.choice(["Retire", ""]),
+                rng.choice(["a.md; b.md", ""]),
+            ]
+        )
+    return rows
+
+
+def _reference(rows):
+    """The previous DictReader + stable sort loader, as (asset_id, score)."""
+    scored = []
+    for row in rows:
+        record = dict(zip(HEADER, row))
+        try:
+            due = dt.date.fromisoformat(record["due_date"].strip())
+        except ValueError:
+            due = None
+        score = plan_suggester._compute_score(
+            criticality=record["criticality"],
+            due_date=due,
+            est_effort=(record["est_effort"] or "M").upper(),
+            risk=(record["risk"] or "MED").upper(),
+            today=TODAY,
+        )
+        scored.append((record["asset_id"], score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored
+
+
+def test_vectorized_top_k_matches_scalar_scoring(tmp_path):
+    """Test scores and stable tie order against the scalar implementation."""
+    rows = _random_rows(2000)
+    path = _write_inventory(tmp_path / "inventory.csv", rows)
+    expected = _reference(rows)
+
+    for k in (1, 50, 2000, 5000):
+        entries = inventory_table.top_entries(path, k, today=TODAY, stream=False)
+        assert [(e.asset_id, e.score) for e in entries] == expected[:k]
+
+    streamed = inventory_table.top_entries(
+        path, 50, today=TODAY, stream=True, chunk_rows=128
+    )
+    assert [(e.asset_id, e.score) for e in streamed] == expected[:50]
+
+
+def test_entry_fields_and_filtering(tmp_path):
+    """Test defaults, SAMPLE-/blank filtering, short rows and link parsing."""
+    path = _write_inventory(
+        tmp_path / "inventory.csv",
+        [
+            [
+                "SAMPLE-1",
+                "rehost",
+                "sample",
+                "",
+                "H",
+                "",
+                "2020-01-01",
+                "S",
+                "HIGH",
+                "",
+                "",
+            ],
+            ["", "rehost", "blank", "", "H", "", "", "S", "HIGH", "", ""],
+            [
+                "A-1",
+                "Rehost",
+                "",
+                "",
+                "",
+                "todo",
+                "2025-01-05",
+                "",
+                "",
+                "",
+                "x.md; y.md;",
+            ],
+            ["A-2", "replace"],
+        ],
+    )
+    entries = inventory_table.top_entries(path, 10, today=TODAY)
+    assert [e.asset_id for e in entries] == ["A-1", "A-2"]
+
+    first = entries[0]
+    assert first.name == "A-1"
+    assert first.owner == "未設定"
+    assert (first.criticality, first.est_effort, first.risk) == ("M", "M", "MED")
+    assert first.due_date == dt.date(2025, 1, 5)
+    assert first.target_option == "rehost"
+    assert first.links == ["x.md", "y.md"]
+    assert first.score == 2 + 4 + 2 + 2
+
+    second = entries[1]
+    assert second.due_date is None
+    assert second.links == []
+    assert second.score == 2 + 2 + 2
+    assert not hasattr(second, "__dict__")
+
+
+def test_empty_inventory(tmp_path):
+    """Test header-only and empty files."""
+    path = _write_inventory(tmp_path / "inventory.csv", [])
+    assert inventory_table.top_entries(path, 5, stream=False) == []
+    assert inventory_table.top_entries(path, 5, stream=True) == []
+    empty = tmp_path / "empty.csv"
+    empty.write_text("", encoding="utf-8")
+    assert inventory_table.top_entries(empty, 5) == []
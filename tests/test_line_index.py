@@ -0,0 +1,69 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from libs import line_index, ssot_scan
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    monkeypatch.setattr(ssot_scan, "REPO_ROOT", tmp_path)
+    monkeypatch.setattr(ssot_scan, "LINE_INDEX_DIR", tmp_path / ".ssot_index" / "lines")
+    monkeypatch.setattr(line_index, "_CACHE", {})
+    (tmp_path / "reports").mkdir()
+    (tmp_path / "reports" / "r.md").write_text(
+        "line1\n証跡 line2\nline3\nlast", encoding="utf-8"
+    )
+    return tmp_path
+
+
+def test_line_index_spans(tmp_path):
+    """Test line counts and zero-copy line slices, with and without a final newline."""
+    path = tmp_path / "a.txt"
+    for text, count in (("", 0), ("a\n", 1), ("a\nb", 2), ("a\n\nb\n", 3)):
+        path.write_bytes(text.encode())
+        os.utime(path, ns=(count, count))  # force a new version each time
+        assert len(line_index.get_line_index(path)) == count
+
+    index = line_index.get_line_index(path)
+    view = index.lines(2, 3)
+    assert isinstance(view, memoryview) and bytes(view) == b"\nb\n"
+    with pytest.raises(IndexError):
+        index.lines(3, 4)
+
+
+def test_verify_sources_and_cited_text(repo):
+    """Test range checks and cited text through the line index."""
+    ok, errors = ssot_scan.verify_sources(
+        ["reports/r.md", "reports/r.md:L2-L4", "reports/r.md:L5", "reports/r.md:L3-2"]
+    )
+    assert not ok
+    assert errors == [
+        "line range out of bounds: reports/r.md:L5",
+        "invalid line range in source: reports/r.md:L3-2",
+    ]
+    assert ssot_scan.cited_text("reports/r.md:L2") == "証跡 line2\n"
+    assert ssot_scan.cited_text("reports/r.md:L3-L4") == "line3\nlast"
+    assert ssot_scan.cited_text("reports/r.md:L9") is None
+    assert ssot_scan.cited_text("../outside.md") is None
+
+    # An edit is picked up through mtime/size invalidation
+    (repo / "reports" / "r.md").write_text("only\n", encoding="utf-8")
+    assert ssot_scan.verify_sources(["reports/r.md:L2"])[0] is False
+
+
+def test_large_files_persist_offsets(repo, monkeypatch):
+    """Test that offsets of large files are reused from disk by a new process."""
+    monkeypatch.setattr(line_index, "PERSIST_MIN_BYTES", 1)
+    assert ssot_scan.verify_sources(["reports/r.md:L4"]) == (True, [])
+    saved = list((repo / ".ssot_index" / "lines").glob("*.npy"))
+    assert len(saved) == 1
+
+    monkeypatch.setattr(line_index, "_CACHE", {})
+    monkeypatch.setattr(
+        line_index.LineIndex, "scan", classmethod(lambda *a: pytest.fail("rescanned"))
+    )
+    assert ssot_scan.cited_text("reports/r.md:L1") == "line1\n"
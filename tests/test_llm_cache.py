@@ -0,0 +1,165 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT / "src"))
+from libs import llm_cache, llm_client  # noqa: E402
+from tests.fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+OLD = "hakone-e2:decision:old"
+NEW = "hakone-e2:decision:new"
+
+
+def _messages(text: str):
+    return [{"role": "user", "content": text}]
+
+
+def test_record_then_replay_without_network(tmp_path):
+    """Test record stores responses keyed by request and replay needs no server."""
+    cache_dir = tmp_path / "cache"
+    with FakeOpenAIServer() as server:
+        client = llm_client.LLMClient(
+            server.base_url, "k", cache=llm_cache.LLMCache(cache_dir, "record")
+        )
+        try:
+            first = client.complete(_messages("a"), "m", temperature=0)
+            again = client.complete(_messages("a"), "m", temperature=0)
+            client.complete(_messages("a"), "m", temperature=1)
+            client.complete(_messages("a"), "m2", temperature=0)
+        finally:
+            client.close()
+        assert first == again
+        assert server.requests == 3
+        assert client.cache.stats()["hits"] == 1
+
+    replay = llm_client.LLMClient(
+        "http://127.0.0.1:9/v1", "", cache=llm_cache.LLMCache(cache_dir, "replay")
+    )
+    try:
+        assert replay.complete(_messages("a"), "m", temperature=0) == first
+        with pytest.raises(llm_client.LLMError, match="No recorded response"):
+            replay.complete(_messages("b"), "m", temperature=0)
+    finally:
+        replay.close()
+    assert replay.stats()["requests"] == 0
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    """Test LRU eviction by total size, with hits refreshing recency."""
+    cache = llm_cache.LLMCache(tmp_path, "record")
+    keys = [llm_cache.request_key(f"req{i}".encode()) for i in range(4)]
+    body = json.dumps({"choices": [], "pad": "x" * 200}).encode()
+    for i, key in enumerate(keys[:3]):
+        cache.put(key, "m", body)
+        os.utime(cache._path(key), (i, i))
+    # Room for three entries
+    cache.max_bytes = int(cache._path(keys[0]).stat().st_size * 3.5)
+    assert cache.get(keys[0]) is not None  # now the most recent
+    cache.put(keys[3], "m", body)
+
+    assert cache.evicted == 1
+    assert cache.get(keys[1]) is None
+    assert all(cache.get(k) is not None for k in (keys[0], keys[2], keys[3]))
+
+
+def _responder(body):
+    system = body["messages"][0]["content"]
+    if "info_source_bundle_v1" in system:
+        node = {
+            "id": NEW,
+            "project_id": "hakone-e2",
+            "kind": "decision",
+            "title": "Adopt the new route",
+            "summary": "Replaces the old route decision.",
+        }
+        return json.dumps({"aya_output": {"info_nodes": [node], "info_relations": []}})
+    return json.dumps(
+        {
+            "supersedes": [{"new": NEW, "old": [OLD], "confidence": 0.95}],
+            "questions": [],
+            "matches": [{"new": NEW, "existing": [OLD]}],
+            "obsolete_relations": [],
+        }
+    )
+
+
+def _cycle(tmp_path, name, mode, env):
+    run_dir = tmp_path / name
+    result = subprocess.run(
+        [
+            sys.executable,
+            "tools/info_network/run_update_cycle_v1_1.py",
+            "--bundle",
+            str(tmp_path / "bundle.json"),
+            "--canonical-nodes",
+            str(tmp_path / "nodes.json"),
+            "--canonical-relations",
+            str(tmp_path / "relations.json"),
+            "--run-dir",
+            str(run_dir),
+            "--llm-cache",
+            mode,
+            "--llm-cache-dir",
+            str(tmp_path / "cache"),
+        ],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    return result, run_dir
+
+
+def _outputs(run_dir):
+    out = {}
+    for name in (
+        "snapshot_raw.json",
+        "seed_plan_v0_1.json",
+        "suggestion_plan_v1_1.json",
+    ):
+        data = json.loads((run_dir / name).read_text(encoding="utf-8"))
+        data.pop("generated_at", None)
+        out[name] = data
+    return out
+
+
+def test_update_cycle_replays_offline(tmp_path):
+    """Test a recorded update cycle reruns from the cache with no key or server."""
+    bundle = {
+        "project_id": "hakone-e2",
+        "source_type": "chat",
+        "source_id": "S-1",
+        "raw_text": "We decided to take the new route.",
+    }
+    (tmp_path / "bundle.json").write_text(json.dumps(bundle), encoding="utf-8")
+    old = {"id": OLD, "kind": "decision", "title": "Old route", "summary": "old"}
+    (tmp_path / "nodes.json").write_text(json.dumps([old]), encoding="utf-8")
+    (tmp_path / "relations.json").write_text("[]", encoding="utf-8")
+    env = {k: v for k, v in os.environ.items() if not k.startswith("LLM_CACHE")}
+
+    with FakeOpenAIServer(responder=_responder) as server:
+        online = dict(env, OPENAI_API_KEY="k", OPENAI_BASE_URL=server.base_url)
+        result, recorded = _cycle(tmp_path, "run1", "record", online)
+        assert result.returncode == 0, result.stderr
+        assert server.requests == 2
+        result, rerun = _cycle(tmp_path, "run2", "record", online)
+        assert result.returncode == 0, result.stderr
+        assert server.requests == 2
+
+    offline = {k: v for k, v in env.items() if k != "OPENAI_API_KEY"}
+    offline["OPENAI_BASE_URL"] = "http://127.0.0.1:9/v1"
+    result, replayed = _cycle(tmp_path, "run3", "replay", offline)
+    assert result.returncode == 0, result.stderr
+    assert _outputs(replayed) == _outputs(recorded) == _outputs(rerun)
+    assert _outputs(replayed)["suggestion_plan_v1_1.json"]["obsolete"] == [OLD]
+
+    bundle["raw_text"] = "Something else entirely."
+    (tmp_path / "bundle.json").write_text(json.dumps(bundle), encoding="utf-8")
+    result, _ = _cycle(tmp_path, "run4", "replay", offline)
+    assert result.returncode != 0
+    assert "No recorded response" in result.stderr
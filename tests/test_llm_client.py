@@ -0,0 +1,118 @@
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from libs import llm_client
+from tests.fake_openai_server import FakeOpenAIServer
+
+
+def _messages(text: str):
+    return [{"role": "user", "content": text}]
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    monkeypatch.setattr(llm_client, "BACKOFF_BASE_SEC", 0.01)
+
+
+def test_batch_is_concurrent_bounded_and_pooled():
+    """Test ordering, per-model concurrency limit and connection reuse."""
+    with FakeOpenAIServer(latency=0.05) as server:
+        client = llm_client.LLMClient(server.base_url, "k", max_concurrency=4)
+        try:
+            batch = [{"messages": _messages(f"n{i}"), "model": "m"} for i in range(20)]
+            t0 = time.perf_counter()
+            results = client.complete_many(batch)
+            elapsed = time.perf_counter() - t0
+            again = client.complete(_messages("last"), "m")
+        finally:
+            client.close()
+
+    assert [json.loads(r)["echo"] for r in results] == [f"n{i}" for i in range(20)]
+    assert json.loads(again)["echo"] == "last"
+    assert server.max_active <= 4
+    assert server.connections <= 4
+    assert elapsed < 20 * 0.05 / 2
+    assert client.stats()["requests"] == 21
+
+
+def test_identical_inflight_requests_are_coalesced():
+    """Test that concurrent identical requests hit the server once."""
+    with FakeOpenAIServer(latency=0.1) as server:
+        client = llm_client.LLMClient(server.base_url, "k")
+        try:
+            batch = [{"messages": _messages("same"), "model": "m"}] * 10
+            results = client.complete_many(batch)
+            # Not in flight any more: sent again
+            client.complete(_messages("same"), "m")
+        finally:
+            client.close()
+
+    assert len(set(results)) == 1
+    assert server.requests == 2
+    assert client.stats()["coalesced"] == 9
+
+
+def test_retries_transient_errors_and_not_client_errors():
+    """Test jittered retries on 5xx/429 and immediate failure on 400."""
+    with FakeOpenAIServer(failures=[500, 429]) as server:
+        client = llm_client.LLMClient(server.base_url, "k", max_retries=3)
+        try:
+            assert json.loads(client.complete(_messages("x"), "m"))["echo"] == "x"
+            assert client.stats()["retries"] == 2
+
+            server.failures = [400]
+            with pytest.raises(llm_client.LLMError) as excinfo:
+                client.complete(_messages("y"), "m")
+            assert excinfo.value.status == 400
+            assert server.requests == 4
+
+            server.failures = [503, 503, 503]
+            with pytest.raises(llm_client.LLMError, match="503"):
+                client.complete(_messages("z"), "m")
+        finally:
+            client.close()
+    assert server.requests == 7
+    assert client.stats()["failures"] == 2
+
+
+def test_rate_limit_and_async_api():
+    """Test the token bucket from an unrelated event loop."""
+    with FakeOpenAIServer() as server:
+        client = llm_client.LLMClient(server.base_url, "k", rate_per_sec=20)
+        try:
+
+            async def run():
+                return await asyncio.gather(
+                    *(client.acomplete(_messages(f"a{i}"), "m") for i in range(30))
+                )
+
+            t0 = time.perf_counter()
+            results = asyncio.run(run())
+            elapsed = time.perf_counter() - t0
+        finally:
+            client.close()
+
+    assert len(results) == 30
+    # 20 burst tokens, then 10 more at 20/s
+    assert elapsed >= 0.4
+
+
+def test_ask_openai_json_uses_shared_client(monkeypatch):
+    """Test the core JSON helper end to end against the fake server."""
+    from core import ask_json
+
+    with FakeOpenAIServer() as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+        try:
+            assert ask_json.ask_openai_json("sys", "hello") == {"echo": "hello"}
+            body = server.bodies[-1]
+            assert body["response_format"] == {"type": "json_object"}
+            assert body["messages"][0] == {"role": "system", "content": "sys"}
+        finally:
+            llm_client.get_client(server.base_url).close()
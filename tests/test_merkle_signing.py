@@ -0,0 +1,96 @@
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from ops import merkle
+from ops.signing import ProvSigner
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, 13])
+def test_inclusion_proofs_for_every_tree_shape(size):
+    """Test every leaf's proof rebuilds the root and has O(log n) length."""
+    leaves = [merkle.leaf_hash(bytes([i]) * 32) for i in range(size)]
+    levels = merkle.build_levels(leaves)
+    root = levels[-1][0]
+    for i, leaf in enumerate(leaves):
+        proof = merkle.inclusion_proof(levels, i)
+        assert len(proof) <= max(size - 1, 0).bit_length()
+        assert merkle.root_from_proof(leaf, i, size, proof) == root
+        if size > 1:
+            # The same proof does not work for another position
+            try:
+                moved = merkle.root_from_proof(leaf, (i + 1) % size, size, proof)
+            except ValueError:
+                moved = None
+            assert moved != root
+
+
+def test_merkle_batch_sign_and_verify(keys, make_records):
+    """Test one signature per batch and per-record verification."""
+    signer = ProvSigner(*keys, mode="merkle")
+    signed = signer.batch_sign_records(make_records(7))
+    headers = [r["vpm:signature"]["batch"] for r in signed]
+    assert len({h["root"] for h in headers}) == 1 and headers[0]["size"] == 7
+    assert len({r["vpm:signature"]["signature"] for r in signed}) == 1
+    for record in signed:
+        assert signer.verify_merkle_record(record) == (
+            True,
+            "Signature valid - record included in signed batch",
+        )
+
+    tampered = copy.deepcopy(signed[3])
+    tampered["entity"]["entity:x"]["n"] = 99
+    assert "Content hash mismatch" in signer.verify_merkle_record(tampered)[1]
+
+    # Moving a record to another position in the batch
+    moved = copy.deepcopy(signed[3])
+    moved["vpm:signature"]["leaf_index"] = 4
+    assert "Merkle root mismatch" in signer.verify_merkle_record(moved)[1]
+
+    # Claiming a smaller batch (records dropped from the end)
+    shrunk = copy.deepcopy(signed[0])
+    shrunk["vpm:signature"]["batch"]["size"] = 4
+    assert not signer.verify_merkle_record(shrunk)[0]
+
+    forged = copy.deepcopy(signed[0])
+    forged["vpm:signature"]["batch"]["prev_root"] = "AAAA"
+    assert "Invalid signature" in signer.verify_merkle_record(forged)[1]
+
+
+def test_batches_chain_across_restarts(keys, make_records, tmp_path, monkeypatch):
+    """Test batch headers chain to the previous root, including after restart."""
+    chain = tmp_path / "state" / "chain.json"
+    signer = ProvSigner(*keys, chain_path=str(chain))
+    first = signer.batch_sign_records(make_records(3))
+    second = signer.batch_sign_records(make_records(2, start=3))
+    # The chain state path defaults to the deployment setting
+    monkeypatch.setenv("PROV_CHAIN_STATE_PATH", str(chain))
+    restarted = ProvSigner(*keys)
+    third = restarted.batch_sign_records(make_records(4, start=5))
+
+    headers = [b[0]["vpm:signature"]["batch"] for b in (first, second, third)]
+    assert [h["sequence"] for h in headers] == [0, 1, 2]
+    assert headers[0]["prev_root"] is None
+    assert headers[2]["prev_root"] == headers[1]["root"]
+    assert merkle.chain_breaks(reversed(headers)) == []
+    assert merkle.chain_breaks([headers[0], headers[2]]) == ["Missing batches 1..1"]
+    assert merkle.chain_breaks([headers[1], dict(headers[2], prev_root="x")]) == [
+        "Batch 2 does not chain to batch 1"
+    ]
+
+
+def test_record_mode_keeps_per_record_signatures(keys, make_records, monkeypatch):
+    """Test the per-record mode and the mode setting."""
+    signed = ProvSigner(*keys, mode="record").batch_sign_records(make_records(3))
+    assert len({r["vpm:signature"]["signature"] for r in signed}) == 3
+    assert "scheme" not in signed[0]["vpm:signature"]
+
+    monkeypatch.setenv("PROV_SIGNING_MODE", "record")
+    assert ProvSigner(*keys).mode == "record"
+    with pytest.raises(ValueError, match="Invalid PROV signing mode"):
+        ProvSigner(*keys, mode="tree")
@@ -0,0 +1,151 @@
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.egspace import pgvector_store
+
+
+class FakeCopy:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_types(self, types):
+        self.types = types
+
+    def write_row(self, row):
+        self.conn.stage.append(row)
+
+
+class FakeCursor:
+    """In-process stand-in for the handful of statements pgvector_store uses."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy(self, sql):
+        self.conn.statements.append(sql)
+        return FakeCopy(self.conn)
+
+    def execute(self, sql, params=None):
+        conn = self.conn
+        conn.statements.append(sql)
+        if sql.startswith("INSERT INTO items"):
+            for kind, path, ts, txt, emb in conn.stage:
+                conn.items[(kind, path)] = (ts, txt, pgvector_store._parse_vec(emb))
+            conn.stage = []
+        elif sql.startswith("SELECT avg(emb)"):
+            V = np.stack([e for _, _, e in conn.items.values()])
+            self.result = [(pgvector_store.vec_literal(V.mean(0)), len(V))]
+        elif "ORDER BY emb <#>" in sql:
+            vec = {k: pgvector_store._parse_vec(params[k]) for k in "dgcq"}
+            rows = []
+            for (kind, path), (_, txt, e) in conn.items.items():
+                rows.append(
+                    (
+                        -(e @ vec["q"]),
+                        (kind, path, txt, e @ vec["d"], e @ vec["g"], e @ vec["c"]),
+                    )
+                )
+            rows.sort(key=lambda r: r[0])
+            self.result = [r for _, r in rows[: params["k"]]]
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+
+class FakeConn:
+    def __init__(self):
+        self.items = {}
+        self.stage = []
+        self.statements = []
+        self.commits = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+def _unit_rows(n, dim=8, seed=0):
+    V = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return V / np.linalg.norm(V, axis=1, keepdims=True)
+
+
+def test_bulk_upsert_uses_single_copy():
+    """Test that bulk_upsert streams all rows through one COPY + merge."""
+    conn = FakeConn()
+    items = [
+        ("report", f"reports/{i}.md", "2025-08-18T00:00:00Z", f"t{i}")
+        for i in range(50)
+    ]
+    V = _unit_rows(50)
+
+    assert pgvector_store.bulk_upsert(conn, items, V, dim=8) == 50
+
+    copies = [s for s in conn.statements if s.startswith("COPY")]
+    inserts = [s for s in conn.statements if s.startswith("INSERT")]
+    assert len(copies) == 1 and len(inserts) == 1
+    assert conn.commits == 1
+    assert len(conn.items) == 50
+
+    # Re-upsert with new embeddings updates in place
+    pgvector_store.bulk_upsert(conn, items[:5], _unit_rows(5, seed=1), dim=8)
+    assert len(conn.items) == 50
+
+
+def test_rank_server_side_matches_client_math():
+    """Test that the server-side ranking equals the numpy computation."""
+    conn = FakeConn()
+    V = _unit_rows(20)
+    items = [("report", f"r{i}", "2025-08-18T00:00:00Z", f"t{i}") for i in range(20)]
+    pgvector_store.bulk_upsert(conn, items, V, dim=8)
+    goal = _unit_rows(1, seed=7)[0]
+
+    out = pgvector_store.rank_server_side(conn, goal, k=3)
+
+    C = V.mean(0)
+    C /= np.linalg.norm(C) + 1e-9
+    contrib = V @ goal - V @ C
+    order = np.argsort(contrib)
+    expected = [f"r{i}" for i in list(order[-3:][::-1]) + list(order[:3])]
+    assert [r["path"] for r in out["ranking"]] == expected
+    assert out["stat"]["delta"] == round(float(np.linalg.norm(goal - C)), 4)
+    top = out["ranking"][0]
+    assert top["delta_sim"] == pytest.approx(top["simG"] - top["simC"], abs=2e-4)
+
+
+@pytest.mark.skipif(
+    not os.environ.get("EGSPACE_TEST_DSN"),
+    reason="set EGSPACE_TEST_DSN to a pgvector DB",
+)
+def test_against_postgres():
+    """Round-trip against a real pgvector database (e.g. a local container)."""
+    conn = pgvector_store.get_conn(os.environ["EGSPACE_TEST_DSN"])
+    assert pgvector_store.get_conn(os.environ["EGSPACE_TEST_DSN"]) is conn
+    pgvector_store.ensure_schema(conn, index="hnsw")
+    V = _unit_rows(10, dim=pgvector_store.EMB_DIM)
+    items = [("test", f"t{i}", "2025-08-18T00:00:00Z", f"t{i}") for i in range(10)]
+    assert pgvector_store.bulk_upsert(conn, items, V) == 10
+    out = pgvector_store.rank_server_side(conn, V[0], k=3)
+    assert len(out["ranking"]) == 6
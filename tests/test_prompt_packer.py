@@ -0,0 +1,111 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from core import grounded_answer as ga
+from libs import answer_cache, prompt_packer, ssot_index, ssot_scan
+from libs.prompt_packer import Window
+
+
+def test_estimate_tokens_counts_japanese_per_char():
+    """Test that Japanese costs ~1 token per char and English ~4 chars per token."""
+    english = "rolling back the canary deployment"
+    japanese = "カナリア昇格の証跡を保存した"
+    assert prompt_packer.estimate_tokens(english) <= len(english) // 4 + 2
+    assert prompt_packer.estimate_tokens(japanese) == len(japanese)
+    assert prompt_packer.estimate_tokens("") == 0
+
+
+def test_dedupe_drops_overlapping_and_repeated_windows():
+    """Test that overlaps keep the better window and copies are dropped."""
+    windows = [
+        Window("a.md", 0, "alpha beta gamma", 1.0),
+        Window("a.md", 6, "beta gamma delta", 2.0),
+        Window("a.md", 40, "epsilon", 0.5),
+        Window("b.md", 0, "beta  gamma\ndelta", 1.5),
+    ]
+    assert prompt_packer.dedupe(windows) == [windows[1], windows[2]]
+
+
+def test_pack_fills_budget_by_score_per_token():
+    """Test greedy packing by density, input order output and exact token count."""
+    windows = [
+        Window("state.md", 0, "状態" * 60, 1.0),  # long, low density
+        Window("d.md", 0, "decision adopt knative", 0.9),
+        Window("r.md", 0, "canary evidence saved", 0.8),
+    ]
+    packed = prompt_packer.pack(windows, 60)
+    assert [s["path"] for s in packed.snippets] == ["state.md", "d.md", "r.md"]
+    # The state window is cut to what is left after the dense ones
+    assert len(packed.snippets[0]["snippet"]) < 120
+    assert packed.tokens == prompt_packer.estimate_tokens(packed.text) <= 60
+
+    small = prompt_packer.pack(windows, 12)
+    assert [s["path"] for s in small.snippets] == ["d.md"]
+    assert small.text == "[d.md]\ndecision adopt knative"
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    (tmp_path / "STATE").mkdir()
+    (tmp_path / "STATE" / "current_state.md").write_text(
+        "# STATE\n" + "進捗メモ\n" * 300 + "phase=P4 canary gate GREEN\n",
+        encoding="utf-8",
+    )
+    reports = tmp_path / "reports"
+    (reports / "decisions").mkdir(parents=True)
+    (reports / "decisions" / "D-001.yml").write_text(
+        "decision: adopt knative\n", encoding="utf-8"
+    )
+    (reports / "canary.md").write_text(
+        "intro\n" * 40 + "Canary 昇格の証跡を保存した\n", encoding="utf-8"
+    )
+    (reports / "canary_copy.md").write_text(
+        "intro\n" * 40 + "Canary 昇格の証跡を保存した\n", encoding="utf-8"
+    )
+    monkeypatch.setattr(ssot_scan, "REPO_ROOT", tmp_path)
+    monkeypatch.setattr(ssot_index, "REFRESH_INTERVAL", 0)
+    return tmp_path
+
+
+def test_pack_snippets_within_token_budget(corpus):
+    """Test that packed SSOT snippets fit the budget and skip duplicate copies."""
+    packed = ssot_scan.pack_snippets("canary 証跡", 120)
+    paths = [s["path"] for s in packed.snippets]
+    assert packed.tokens == prompt_packer.estimate_tokens(packed.text) <= 120
+    assert "phase=P4 canary" in packed.snippets[0]["snippet"]
+    assert paths.count("reports/canary.md") + paths.count("reports/canary_copy.md") == 1
+    assert any("証跡" in s["snippet"] for s in packed.snippets)
+
+    # The character budget lets the Japanese state window alone exceed it
+    joined, _ = ssot_scan.grep_snippets("canary 証跡", budget=2000)
+    assert prompt_packer.estimate_tokens(joined) > 120
+    assert ssot_scan.grep_snippets("canary 証跡", token_budget=120)[0] == packed.text
+
+
+def test_grounded_answer_reports_context_tokens(corpus, monkeypatch):
+    """Test that grounded_answer packs by tokens and reports the prompt size."""
+    monkeypatch.setattr(answer_cache, "_CACHE", None)
+    monkeypatch.setattr(answer_cache, "DB_PATH", "")
+    prompts = []
+
+    def fake_llm(system, user):
+        prompts.append(user)
+        return {"answer": "GREEN", "sources": ["reports/canary.md"], "confidence": 1}
+
+    monkeypatch.setattr(ga, "ask_openai_json", fake_llm)
+    result = ga.grounded_answer("canary 証跡", use_ai=True, token_budget=80)
+    assert 0 < result["context_tokens"] <= 80
+    assert prompt_packer.estimate_tokens(prompts[0]) < 100
+
+    chars = ga.grounded_answer("canary 証跡", use_ai=True, token_budget=0)
+    assert chars["context_tokens"] > result["context_tokens"]
+    assert len(prompts) == 2
+
+    # Without a token budget the character budget is honored
+    monkeypatch.setattr(ssot_scan, "TOKEN_BUDGET", 0)
+    small = ga.grounded_answer("canary 証跡", use_ai=True, budget=200)
+    assert small["context_tokens"] < chars["context_tokens"]
+    assert len(prompts) == 3
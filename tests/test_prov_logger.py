@@ -0,0 +1,87 @@
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+jsonschema = pytest.importorskip("jsonschema")
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from ops import prov_validation  # noqa: E402
+from ops.prov_logger import ProvLogger  # noqa: E402
+
+
+def _record(logger):
+    return logger.log_admission_decision(
+        pod_name="test-pod",
+        namespace="hyper-swarm",
+        decision="deny",
+        violated_constraints=["require-spire-socket"],
+    )
+
+
+def _mutations(record):
+    """Invalid variants of a valid record, one schema rule broken each."""
+    entity = next(iter(record["entity"]))
+    agent = next(iter(record["agent"]))
+    rel = next(iter(record["used"]))
+    edits = [
+        lambda r: r.pop("agent"),
+        lambda r: r.update({"@id": "prov:NOT-HEX"}),
+        lambda r: r.update({"@context": 1}),
+        lambda r: r.update({"extra": {}}),
+        lambda r: r["entity"][entity].update({"type": "Agent"}),
+        lambda r: r["entity"][entity].update({"hash": "abc"}),
+        lambda r: r["entity"][entity].update({"algorithm": "md5"}),
+        lambda r: r["entity"].update({"entity:XYZ": {"type": "Entity"}}),
+        lambda r: r["agent"][agent].update({"spiffe_id": "https://x"}),
+        lambda r: r["used"][rel].pop("prov:entity"),
+        lambda r: r["used"][rel].update({"prov:time": 5}),
+    ]
+    for edit in edits:
+        bad = copy.deepcopy(record)
+        edit(bad)
+        yield bad
+
+
+def test_fast_path_agrees_with_jsonschema():
+    """Test that the generated checker accepts and rejects what jsonschema does."""
+    logger = ProvLogger(validation="full")
+    record = _record(logger)
+    fast = logger.validator._fast
+    assert fast is not None and fast(record)
+    assert logger.validator.validator.is_valid(record)
+    for bad in _mutations(record):
+        assert not logger.validator.validator.is_valid(bad)
+        assert not fast(bad)
+
+
+def test_modes_and_shared_validator(monkeypatch):
+    """Test fast/sample/off modes and that compiled validators are shared."""
+    full = ProvLogger(validation="full")
+    fast = ProvLogger(validation="fast")
+    assert fast.validator.validator is full.validator.validator
+    bad = next(_mutations(_record(full)))
+    with pytest.raises(
+        jsonschema.ValidationError, match="'agent' is a required property"
+    ):
+        fast.validator.validate(bad)
+
+    sampled = prov_validation.RecordValidator(
+        fast.schema_path, mode="sample", sample_rate=0.25
+    )
+    errors = 0
+    for _ in range(8):
+        try:
+            sampled.validate(bad)
+        except jsonschema.ValidationError:
+            errors += 1
+    # Records 1 and 5 are checked
+    assert (sampled.seen, sampled.checked, errors) == (8, 2, 2)
+
+    monkeypatch.setenv("PROV_VALIDATION", "off")
+    off = ProvLogger()
+    off.validator.validate(bad)
+    assert off.validator.checked == 0
+    with pytest.raises(ValueError, match="Invalid PROV validation mode"):
+        ProvLogger(validation="sometimes")
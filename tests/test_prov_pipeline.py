@@ -0,0 +1,172 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("cryptography")
+pytest.importorskip("boto3")
+pytest.importorskip("dateutil")
+pytest.importorskip("moto")
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from ops import merkle, prov_pipeline  # noqa: E402
+from ops.prov_pipeline import ProvPipeline  # noqa: E402
+from ops.signing import ProvSigner  # noqa: E402
+
+
+@pytest.fixture
+def signer(keys):
+    return ProvSigner(*keys)
+
+
+class FlakyUploader:
+    """Fails while ``down`` is set, otherwise delegates to the real uploader."""
+
+    def __init__(self, inner, down=True):
+        self.inner = inner
+        self.down = down
+        self.calls = 0
+
+    def upload_jsonl(self, *args, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise RuntimeError("object store unavailable")
+        return self.inner.upload_jsonl(*args, **kwargs)
+
+
+def _record(i):
+    return {"@id": f"prov:{i:08x}", "entity": {}, "activity": {}, "agent": {}}
+
+
+def _stored(uploader):
+    listing = uploader.s3_client.list_objects_v2(
+        Bucket=uploader.bucket_name, Prefix="audit-logs/"
+    )
+    records = []
+    for obj in listing.get("Contents", []):
+        records.extend(uploader.download_batch(obj["Key"]))
+    return len(listing.get("Contents", [])), records
+
+
+def test_batches_are_signed_compressed_and_uploaded(tmp_path, signer, uploader):
+    """Test size- and timeout-triggered flushes end up as signed S3 batches."""
+    spool = tmp_path / "spool"
+    with ProvPipeline(
+        signer, uploader, spool, batch_size=10, batch_timeout_seconds=0.2
+    ) as pipeline:
+        for i in range(25):
+            pipeline.submit(_record(i))
+        # 20 records go out by size, the last 5 by timeout (no flush needed)
+        deadline = time.monotonic() + 5
+        while pipeline.stats()["uploaded_records"] < 25 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        stats = pipeline.stats()
+
+    assert stats["uploaded_batches"] == 3 and stats["uploaded_records"] == 25
+    batches, records = _stored(uploader)
+    assert batches == 3
+    assert sorted(r["@id"] for r in records) == [f"prov:{i:08x}" for i in range(25)]
+    assert all(r["vpm:signature"]["algorithm"] == "Ed25519" for r in records)
+    assert [p.name for p in spool.iterdir()] == [".lock"]
+
+
+def test_spool_survives_store_outage_and_crash(tmp_path, signer, uploader):
+    """Test records stay spooled while S3 is down or after a crash, then upload."""
+    spool = tmp_path / "spool"
+    flaky = FlakyUploader(uploader)
+    pipeline = ProvPipeline(
+        signer, flaky, spool, batch_size=4, max_retries=2, retry_backoff=0.01
+    ).start()
+    for i in range(10):
+        pipeline.submit(_record(i))
+    assert pipeline.close(timeout=0.5) is False
+    stats = pipeline.stats()
+    assert stats["upload_errors"] >= 2 and stats["upload_retries"] >= 1
+    assert stats["uploaded_records"] == 0 and stats["spool_batches"] == 3
+
+    # A process that dies mid-batch leaves its write-ahead segment behind
+    crashed = ProvPipeline(signer, flaky, spool, batch_size=100)
+    for i in range(10, 13):
+        crashed.submit(_record(i))
+    crashed._open_file.close()
+
+    flaky.down = False
+    with ProvPipeline(signer, flaky, spool, batch_size=4) as pipeline:
+        assert pipeline.flush(timeout=5)
+        assert pipeline.stats()["recovered_batches"] == 4
+
+    _, records = _stored(uploader)
+    assert sorted(r["@id"] for r in records) == [f"prov:{i:08x}" for i in range(13)]
+    assert [p.name for p in spool.iterdir()] == [".lock"]
+
+
+def test_backpressure_when_signing_falls_behind(tmp_path, signer, uploader):
+    """Test submit() blocks on the bounded queue and the wait is reported."""
+    gate = threading.Event()
+    sign = signer.batch_sign_records
+
+    def slow_sign(records, **kwargs):
+        gate.wait(5)
+        return sign(records, **kwargs)
+
+    signer.batch_sign_records = slow_sign
+    pipeline = ProvPipeline(
+        signer, uploader, tmp_path / "spool", batch_size=1, queue_size=1, sign_workers=1
+    ).start()
+    threading.Timer(0.3, gate.set).start()
+    for i in range(4):
+        pipeline.submit(_record(i))
+    assert pipeline.close(timeout=5)
+    stats = pipeline.stats()
+    assert stats["backpressure_waits"] >= 1 and stats["backpressure_seconds"] > 0.1
+    assert stats["queue_capacity"] == 1 and stats["uploaded_records"] == 4
+
+
+def test_failed_batch_write_leaves_no_chain_gap(tmp_path, keys, uploader, monkeypatch):
+    """Test a batch file that fails to write does not use up a chain sequence."""
+    priv, pub = keys
+    chain = tmp_path / "chain.json"
+    spool = tmp_path / "spool"
+    flaky = FlakyUploader(uploader)
+    write_jsonl = prov_pipeline._write_jsonl
+    calls = []
+
+    def failing_write(f, records):
+        calls.append(len(records))
+        if len(calls) == 2:
+            raise OSError("No space left on device")
+        write_jsonl(f, records)
+
+    monkeypatch.setattr(prov_pipeline, "_write_jsonl", failing_write)
+    pipeline = ProvPipeline(
+        ProvSigner(priv, pub, chain_path=str(chain)),
+        flaky,
+        spool,
+        batch_size=1,
+        sign_workers=1,
+        max_retries=1,
+        retry_backoff=0.01,
+    ).start()
+    for i in range(3):
+        pipeline.submit(_record(i))
+    assert pipeline.close(timeout=1) is False
+    assert pipeline.stats()["sign_errors"] == 1
+    assert json.loads(chain.read_text())["sequence"] == 1
+
+    # A crash between writing the last batch and saving the chain head
+    chain.write_text(json.dumps({"sequence": 0, "root": "stale"}))
+    monkeypatch.setattr(prov_pipeline, "_write_jsonl", write_jsonl)
+    flaky.down = False
+    with ProvPipeline(
+        ProvSigner(priv, pub, chain_path=str(chain)), flaky, spool, batch_size=1
+    ) as restarted:
+        assert restarted.flush(timeout=5)
+
+    _, records = _stored(uploader)
+    assert sorted(r["@id"] for r in records) == [f"prov:{i:08x}" for i in range(3)]
+    headers = [r["vpm:signature"]["batch"] for r in records]
+    assert sorted(h["sequence"] for h in headers) == [0, 1, 2]
+    assert merkle.chain_breaks(headers) == []
@@ -0,0 +1,220 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from libs import ssot_index, ssot_scan
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    (tmp_path / "STATE").mkdir()
+    (tmp_path / "STATE" / "current_state.md").write_text(
+        "# STATE\n" + "filler line\n" * 50 + "phase=P4 canary gate GREEN\n",
+        encoding="utf-8",
+    )
+    reports = tmp_path / "reports"
+    (reports / "decisions").mkdir(parents=True)
+    (reports / "decisions" / "D-001.yml").write_text(
+        "decision: adopt knative\n", encoding="utf-8"
+    )
+    (reports / "canary.md").write_text(
+        "intro\n" * 40 + "Canary 昇格の証跡を保存した\n", encoding="utf-8"
+    )
+    (reports / "grafana.md").write_text("grafana dashboards\n", encoding="utf-8")
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "runbook.md").write_text("監視の手順\n", encoding="utf-8")
+    (tmp_path / "inventory").mkdir()
+    (tmp_path / "inventory" / "inventory.csv").write_text(
+        "asset_id,name\nA-1,dwh\n", encoding="utf-8"
+    )
+    return tmp_path
+
+
+def test_tokenize_ascii_words_and_japanese_bigrams():
+    """Test that ASCII words and Japanese bi-grams carry char offsets."""
+    assert ssot_index.tokenize("Canary 昇格する") == [
+        ("canary", 0),
+        ("昇格", 7),
+        ("格す", 8),
+        ("する", 9),
+    ]
+
+
+def test_search_ranks_and_windows(corpus):
+    """Test BM25 ranking, category filters and best-window snippets."""
+    index = ssot_index.build(corpus)
+    query = index.query_terms("canary の証跡")
+
+    hits = index.search(query, categories=("reports",))
+    assert [index.docs[h.doc]["path"] for h in hits] == ["reports/canary.md"]
+    snippet = index.snippet(hits[0].doc, query, 40)
+    assert "証跡" in snippet and "Canary" in snippet
+
+    jp = index.search(index.query_terms("監視"))
+    assert [index.docs[h.doc]["category"] for h in jp] == ["docs"]
+    assert index.search(index.query_terms("unrelated")) == []
+
+
+def test_get_index_rebuilds_on_change(corpus, monkeypatch):
+    """Test that added files are picked up once the refresh interval passes."""
+    monkeypatch.setattr(ssot_index, "REFRESH_INTERVAL", 0)
+    index = ssot_index.get_index(corpus)
+    assert not index.search(index.query_terms("argocd"))
+
+    (corpus / "reports" / "argocd.md").write_text("argocd sync\n", encoding="utf-8")
+    index = ssot_index.get_index(corpus)
+    hits = index.search(index.query_terms("argocd"))
+    assert index.docs[hits[0].doc]["path"] == "reports/argocd.md"
+    # Only the committed generation is kept on disk
+    gens = {p.name.split(".")[0] for p in (corpus / ".ssot_index").glob("g*")}
+    assert gens == {index.meta["generation"]}
+
+
+def test_get_index_keeps_unwritable_index_in_memory(corpus, tmp_path, monkeypatch):
+    """Test that SSOT_INDEX_DIR is honored and persist errors are not fatal."""
+    monkeypatch.setattr(ssot_index, "REFRESH_INTERVAL", 0)
+    monkeypatch.setenv("SSOT_INDEX_DIR", str(tmp_path / "cache"))
+    index = ssot_index.get_index(corpus)
+    assert index.index_dir == tmp_path / "cache"
+    assert (tmp_path / "cache" / "meta.json").exists()
+    assert not (corpus / ".ssot_index").exists()
+
+    # A directory below a regular file can never be created
+    (tmp_path / "blocker").write_text("", encoding="utf-8")
+    monkeypatch.setenv("SSOT_INDEX_DIR", str(tmp_path / "blocker" / "idx"))
+    index = ssot_index.get_index(corpus)
+    hits = index.search(index.query_terms("canary"))
+    assert index.docs[hits[0].doc]["path"] == "reports/canary.md"
+
+    (corpus / "reports" / "argocd.md").write_text("argocd sync\n", encoding="utf-8")
+    index = ssot_index.get_index(corpus)
+    assert index.meta["refresh"]["changed"] == 1
+    hits = index.search(index.query_terms("argocd"))
+    assert index.docs[hits[0].doc]["path"] == "reports/argocd.md"
+
+
+def test_grep_snippets_uses_index_within_budgets(corpus, monkeypatch):
+    """Test that grep_snippets returns ranked windows within the budget."""
+    monkeypatch.setattr(ssot_scan, "REPO_ROOT", corpus)
+    joined, snippets = ssot_scan.grep_snippets("canary 証跡", budget=2000)
+
+    paths = [s["path"] for s in snippets]
+    assert paths[0] == os.path.join("STATE", "current_state.md")
+    assert "phase=P4 canary" in snippets[0]["snippet"]
+    assert "reports/canary.md" in paths
+    assert "reports/decisions/D-001.yml" in paths  # recent-file fallback
+    assert len(joined) <= 2000 + 200  # snippets plus [path] headers
+
+
+def test_refresh_reindexes_only_changed_files(corpus, monkeypatch):
+    """Test that refresh() skips unchanged and touched-only files."""
+    index = ssot_index.build(corpus)
+    gen = index.meta["generation"]
+    assert ssot_index.refresh(corpus, current=index) is index
+    assert index.meta["refresh"]["changed"] == 0
+
+    grafana = corpus / "reports" / "grafana.md"
+    os.utime(grafana, (1, 1))
+    touched = ssot_index.refresh(corpus, current=index)
+    assert touched.meta["generation"] == gen
+    assert touched.meta["refresh"]["touched"] == 1
+
+    tokenized = []
+    tokenize = ssot_index.tokenize
+    monkeypatch.setattr(
+        ssot_index, "tokenize", lambda text: tokenized.append(text) or tokenize(text)
+    )
+    grafana.write_text("grafana argocd\n", encoding="utf-8")
+    (corpus / "docs" / "runbook.md").unlink()
+    index = ssot_index.refresh(corpus, current=touched)
+    assert tokenized == ["grafana argocd\n"]
+    assert index.meta["generation"] != gen
+    assert index.meta["refresh"]["removed"] == 1
+    hits = index.search(index.query_terms("argocd"))
+    assert [index.docs[h.doc]["path"] for h in hits] == ["reports/grafana.md"]
+    # Kept files are still searchable with their original offsets
+    query = index.query_terms("証跡")
+    assert "証跡" in index.snippet(index.search(query)[0].doc, query, 20)
+    assert index.search(index.query_terms("監視")) == []
+
+    full = ssot_index.build(corpus)
+    assert [d["path"] for d in index.docs] != [d["path"] for d in full.docs]
+    for q in ("canary 証跡", "grafana argocd", "phase gate", "adopt knative"):
+        got = {
+            index.docs[h.doc]["path"]: h.score
+            for h in index.search(index.query_terms(q))
+        }
+        want = {
+            full.docs[h.doc]["path"]: h.score for h in full.search(full.query_terms(q))
+        }
+        assert got == pytest.approx(want)
+
+
+def test_large_files_are_chunked(corpus, monkeypatch):
+    """Test that files above CHUNK_CHARS are split and searched per chunk."""
+    monkeypatch.setattr(ssot_index, "CHUNK_CHARS", 200)
+    (corpus / "reports" / "big.md").write_text(
+        "filler text\n" * 100 + "gatekeeper policy\n" + "filler text\n" * 100,
+        encoding="utf-8",
+    )
+    index = ssot_index.build(corpus)
+    big = [d for d in index.docs if d["path"] == "reports/big.md"]
+    assert len(big) > 5 and big[0]["start"] == 0
+
+    # Every chunk matches "filler", but each file is returned once
+    hits = index.search(index.query_terms("filler"), categories=("reports",))
+    assert [index.docs[h.doc]["path"] for h in hits] == ["reports/big.md"]
+
+    query = index.query_terms("gatekeeper")
+    (top,) = index.search(query)
+    assert index.docs[top.doc]["chunk"] > 0
+    assert "gatekeeper" in index.snippet(top.doc, query, 40)
+
+
+def test_list_ssot_targets_from_manifest(corpus, monkeypatch):
+    """Test that list_ssot_targets() orders files from the index manifest."""
+    monkeypatch.setattr(ssot_scan, "REPO_ROOT", corpus)
+    os.utime(corpus / "reports" / "canary.md", (1, 1))
+    targets = [str(p.relative_to(corpus)) for p in ssot_scan.list_ssot_targets()]
+    assert targets == [
+        "STATE/current_state.md",
+        "reports/decisions/D-001.yml",
+        "reports/grafana.md",
+        "reports/canary.md",
+        "inventory/inventory.csv",
+    ]
+
+
+def test_watch_keeps_index_current(corpus, monkeypatch):
+    """Test that a watcher refreshes the index and get_index() follows it."""
+    monkeypatch.setattr(ssot_index._Inotify, "create", classmethod(lambda cls: None))
+    monkeypatch.setattr(ssot_index, "REFRESH_INTERVAL", 3600)
+    index_dir = corpus / ".ssot_index"
+    stop = threading.Event()
+    t = threading.Thread(
+        target=ssot_index.watch, args=(corpus,), kwargs={"interval": 0.05, "stop": stop}
+    )
+    t.start()
+    try:
+        while not (index_dir / "meta.json").exists():
+            time.sleep(0.01)
+        assert ssot_index.watcher_alive(index_dir)
+        ssot_index.get_index(corpus)
+
+        (corpus / "reports" / "spire.md").write_text("spire ids\n", encoding="utf-8")
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            index = ssot_index.get_index(corpus)
+            if index.search(index.query_terms("spire")):
+                break
+            time.sleep(0.05)
+        assert index.search(index.query_terms("spire"))
+    finally:
+        stop.set()
+        t.join()
+    assert not ssot_index.watcher_alive(index_dir)
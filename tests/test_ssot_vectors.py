@@ -0,0 +1,147 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+from libs import ssot_index, ssot_scan, ssot_vectors
+
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr(ssot_vectors, "MODEL", "hash")
+    monkeypatch.setattr(ssot_vectors, "_CACHE", {})
+    (tmp_path / "STATE").mkdir()
+    (tmp_path / "STATE" / "current_state.md").write_text(
+        "phase=P4 canary GREEN\n", encoding="utf-8"
+    )
+    reports = tmp_path / "reports"
+    reports.mkdir()
+    (reports / "rollback.md").write_text(
+        "# Rollback procedure\nRevert the deployment manifests to the previous tag.\n",
+        encoding="utf-8",
+    )
+    (reports / "grafana.md").write_text(
+        "grafana dashboards for latency alerts\n", encoding="utf-8"
+    )
+    (reports / "long.md").write_text(
+        "".join(f"section {i}: filler about metrics\n" for i in range(200)),
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+def _search(index, vectors, question, **kw):
+    emb, _ = ssot_vectors.resolve_embedder("hash")
+    qvec = emb([question])[0]
+    return ssot_vectors.hybrid_search(
+        index, vectors, index.query_terms(question), qvec, **kw
+    )
+
+
+def test_hybrid_finds_paraphrase(corpus):
+    """Test that cosine candidates surface files BM25 alone misses."""
+    index = ssot_index.build(corpus)
+    vectors = ssot_vectors.update(index, model="hash")
+    question = "rolling back deployments"
+    assert index.search(index.query_terms(question)) == []
+
+    hits = _search(index, vectors, question)
+    assert hits[0].path == "reports/rollback.md"
+    assert len({h.path for h in hits}) == len(hits)  # best passage per file
+    assert "Rollback procedure" in ssot_vectors.snippet(corpus, hits[0], 60)
+
+
+def test_update_reembeds_changed_files_only(corpus):
+    """Test incremental updates keyed on the manifest content hashes."""
+    index = ssot_index.build(corpus)
+    vectors = ssot_vectors.update(index, model="hash")
+    n_long = len(vectors.rows_of("reports/long.md"))
+    assert n_long > 1
+
+    (corpus / "reports" / "grafana.md").write_text("grafana SLO burn\n", "utf-8")
+    (corpus / "reports" / "rollback.md").unlink()
+    index = ssot_index.refresh(corpus, current=index)
+    updated = ssot_vectors.update(index, model="hash", current=vectors)
+    assert updated.meta["update"]["embedded"] == 1
+    assert updated.meta["update"]["kept"] == len(vectors) - 2
+    assert not len(updated.rows_of("reports/rollback.md"))
+    np.testing.assert_array_equal(
+        updated.arrays["vecs"][updated.rows_of("reports/long.md")],
+        vectors.arrays["vecs"][vectors.rows_of("reports/long.md")],
+    )
+    # Unchanged BM25 generation: nothing to do
+    assert ssot_vectors.update(index, model="hash", current=updated) is updated
+
+
+def test_ivf_matches_flat_when_probing_all_lists(corpus, monkeypatch):
+    """Test the IVF path, incremental assignment included."""
+    monkeypatch.setattr(ssot_vectors, "IVF_MIN_ROWS", 10)
+    monkeypatch.setattr(ssot_vectors, "PASSAGE_CHARS", 64)
+    index = ssot_index.build(corpus)
+    vectors = ssot_vectors.update(index, model="hash")
+    nlist = vectors.meta["ivf"]["nlist"]
+    assert nlist > 1 and len(vectors.arrays["assign"]) == len(vectors)
+
+    (corpus / "reports" / "new.md").write_text("metrics section 7\n", "utf-8")
+    index = ssot_index.refresh(corpus, current=index)
+    vectors = ssot_vectors.update(index, model="hash", current=vectors)
+    assert vectors.meta["ivf"]["nlist"] == nlist  # quantizer reused
+
+    emb, _ = ssot_vectors.resolve_embedder("hash")
+    qvec = emb(["metrics section 7"])[0]
+    monkeypatch.setattr(ssot_vectors, "IVF_NPROBE", nlist)
+    rows, sims = vectors.ann(qvec, None, 5)
+    flat = np.argsort(-(np.asarray(vectors.arrays["vecs"]) @ qvec))[:5]
+    assert set(rows.tolist()) == set(flat.tolist())
+
+
+def test_grep_snippets_hybrid(corpus, monkeypatch):
+    """Test that hybrid retrieval keeps the snippet budget logic."""
+    monkeypatch.setattr(ssot_scan, "REPO_ROOT", corpus)
+    _, snippets = ssot_scan.grep_snippets(
+        "rolling back deployments", budget=600, retrieval="hybrid"
+    )
+    paths = [s["path"] for s in snippets]
+    assert paths[0] == "STATE/current_state.md"
+    assert "reports/rollback.md" in paths
+    assert sum(len(s["snippet"]) for s in snippets) <= 600
+
+
+def test_hybrid_with_only_src_on_sys_path(corpus):
+    """Test hybrid retrieval when src/ is the only import root (as in cli.py)."""
+    src = Path(__file__).resolve().parents[1] / "src"
+    code = (
+        "import sys\n"
+        "from libs import ssot_index, ssot_vectors\n"
+        "index = ssot_index.build(sys.argv[1])\n"
+        "vectors, emb = ssot_vectors.get_vectors(index, model='hash')\n"
+        "print(len(vectors), emb(['x']).shape[1])\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(src))
+    out = subprocess.run(
+        [sys.executable, "-c", code, str(corpus)],
+        cwd=corpus,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    passages, dim = out.stdout.split()
+    assert int(passages) > 3 and int(dim) > 0
+
+
+def test_vectors_follow_the_query_embedding_space(corpus):
+    """Test vectors from another embedding space are rebuilt, not queried."""
+    index = ssot_index.build(corpus)
+    emb, space = ssot_vectors.resolve_embedder("hash")
+    other = ssot_vectors.update(index, embedder=(emb, "sbert:other-model"))
+    assert other.meta["model"] == "sbert:other-model"
+
+    vectors, query_emb = ssot_vectors.get_vectors(index, model="hash")
+    assert vectors.meta["model"] == space
+    assert vectors.meta["update"]["kept"] == 0
+    assert ssot_vectors.get_vectors(index, model="hash") == (vectors, query_emb)
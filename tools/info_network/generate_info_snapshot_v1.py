@@ -4,18 +4,18 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import socket
 import sys
 import textwrap
-import time
 from pathlib import Path
 from typing import Any, Dict, List
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from libs.llm_cache import replaying  # noqa: E402
+from libs.llm_client import chat_completion  # noqa: E402
 
 DEFAULT_OPENAI_BASE_URL = "https://api.openai.com/v1"
 DEFAULT_OPENAI_TIMEOUT_SEC = 300
-MAX_OPENAI_RETRIES = 3
 
 
 def read_text(path: Path, label: str) -> str:
@@ -97,70 +97,15 @@ def get_openai_timeout_sec() -> float:
 def call_openai(
     api_key: str, messages: List[Dict[str, str]], model: str, base_url: str
 ) -> str:
-    url = f"{base_url}/chat/completions"
-    timeout_sec = get_openai_timeout_sec()
-    payload = {
-        "model": model,
-        "messages": messages,
-        "response_format": {"type": "json_object"},
-    }
-    data = json.dumps(payload).encode("utf-8")
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {api_key}",
-    }
-    backoff = {1: 1, 2: 3}
-    last_err: Exception | None = None
-
-    for attempt in range(1, MAX_OPENAI_RETRIES + 1):
-        req = Request(url, data=data, headers=headers)
-        try:
-            with urlopen(req, timeout=timeout_sec) as resp:
-                body = resp.read().decode("utf-8")
-            content = json.loads(body)["choices"][0]["message"]["content"]
-            return content
-        except HTTPError as exc:
-            detail = exc.read().decode("utf-8", errors="replace")
-            status = getattr(exc, "code", None)
-            retriable = status is not None and 500 <= int(status) < 600
-            last_err = RuntimeError(
-                f"OpenAI HTTPError (model={model}, attempt={attempt}/{MAX_OPENAI_RETRIES}, timeout={timeout_sec}s): {status} {detail}"
-            )
-        except socket.timeout as exc:
-            retriable = True
-            last_err = RuntimeError(
-                f"OpenAI timeout (model={model}, attempt={attempt}/{MAX_OPENAI_RETRIES}, timeout={timeout_sec}s): {exc}"
-            )
-        except URLError as exc:
-            reason = getattr(exc, "reason", exc)
-            reason_text = str(reason)
-            retriable = (
-                "Remote end closed" in reason_text
-                or "Connection reset" in reason_text
-                or isinstance(reason, socket.timeout)
-            )
-            last_err = RuntimeError(
-                f"OpenAI URLError (model={model}, attempt={attempt}/{MAX_OPENAI_RETRIES}, timeout={timeout_sec}s): {reason_text}"
-            )
-        except Exception as exc:  # noqa: BLE001
-            retriable = False
-            last_err = RuntimeError(
-                f"Unexpected OpenAI response (model={model}, attempt={attempt}/{MAX_OPENAI_RETRIES}): {exc}"
-            )
-
-        if not retriable or attempt == MAX_OPENAI_RETRIES:
-            assert last_err is not None
-            raise last_err
-
-        sleep_sec = backoff.get(attempt, 10)
-        print(
-            f"Warn: OpenAI call failed (attempt={attempt}/{MAX_OPENAI_RETRIES}, retry in {sleep_sec}s): {last_err}",
-            file=sys.stderr,
-        )
-        time.sleep(sleep_sec)
-
-    assert last_err is not None
-    raise last_err
+    """JSON-mode completion via the shared pooled client (retries included)."""
+    return chat_completion(
+        messages,
+        model,
+        api_key=api_key,
+        base_url=base_url,
+        timeout=get_openai_timeout_sec(),
+        response_format={"type": "json_object"},
+    )
 
 
 def parse_snapshot(raw_text: str) -> Dict[str, Any]:
@@ -456,7 +401,7 @@ def main() -> int:
         return 0
 
     api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
+    if not api_key and not replaying():
         print("OPENAI_API_KEY is required", file=sys.stderr)
         return 1
     try:
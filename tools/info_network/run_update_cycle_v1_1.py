@@ -3,16 +3,17 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Optional
 
 
-def run_cmd(cmd: List[str], cwd: Path) -> None:
+def run_cmd(cmd: List[str], cwd: Path, env: Optional[Dict[str, str]] = None) -> None:
     print(f"[run] {' '.join(cmd)}")
-    subprocess.run(cmd, cwd=cwd, check=True)
+    subprocess.run(cmd, cwd=cwd, check=True, env=env)
 
 
 def ensure_dir(path: Path) -> None:
@@ -42,8 +43,24 @@ def main() -> None:
         default="data/hakone-e2/info_relations_v1.json",
         help="Path to canonical relations JSON",
     )
+    ap.add_argument(
+        "--llm-cache",
+        choices=["off", "record", "replay"],
+        help="LLM response cache mode: record reuses/stores responses, replay "
+        "runs offline from recorded responses (default: $LLM_CACHE_MODE or off)",
+    )
+    ap.add_argument(
+        "--llm-cache-dir",
+        help="LLM response cache directory (default: $LLM_CACHE_DIR or .llm_cache/)",
+    )
     args = ap.parse_args()
 
+    env = dict(os.environ)
+    if args.llm_cache:
+        env["LLM_CACHE_MODE"] = args.llm_cache
+    if args.llm_cache_dir:
+        env["LLM_CACHE_DIR"] = str(Path(args.llm_cache_dir).resolve())
+
     run_id = datetime.now().strftime("%Y%m%d-%H%M%S")
     run_dir = (
         Path(args.run_dir)
@@ -73,6 +90,7 @@ def main() -> None:
             str(snapshot_path),
         ],
         cwd=repo_root,
+        env=env,
     )
 
     # 2) seed plan (v0.1 no-op)
@@ -90,6 +108,7 @@ def main() -> None:
             str(seed_path),
         ],
         cwd=repo_root,
+        env=env,
     )
 
     # 3) v1.1 suggestion
@@ -109,6 +128,7 @@ def main() -> None:
             str(suggestion_path),
         ],
         cwd=repo_root,
+        env=env,
     )
 
     # 4) Inspect questions to decide next action
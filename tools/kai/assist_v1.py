@@ -7,8 +7,10 @@ import sys
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+
+from libs.llm_client import chat_completion  # noqa: E402
 
 
 def iso_now() -> str:
@@ -24,28 +26,15 @@ def read_file(path: Path) -> str:
 def call_openai(
     api_key: str, messages: list[dict[str, str]], model: str = "gpt-4o"
 ) -> str:
-    payload = {
-        "model": model,
-        "messages": messages,
-        "temperature": 0.1,
-        "max_tokens": 1200,
-    }
-    data = json.dumps(payload).encode("utf-8")
-    req = Request(
-        "https://api.openai.com/v1/chat/completions",
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
+    return chat_completion(
+        messages,
+        model,
+        api_key=api_key,
+        base_url="https://api.openai.com/v1",
+        timeout=60,
+        temperature=0.1,
+        max_tokens=1200,
     )
-    with urlopen(req, timeout=60) as resp:
-        body = resp.read().decode("utf-8")
-    try:
-        content = json.loads(body)["choices"][0]["message"]["content"]
-    except Exception as exc:  # noqa: BLE001
-        raise RuntimeError(f"Unexpected OpenAI response: {body}") from exc
-    return content
 
 
 def parse_model_output(raw: str) -> tuple[Dict[str, Any], str, list[str]]:
@@ -267,7 +256,7 @@ def main() -> None:
         payload, summary_md, model_notes = parse_model_output(raw_reply)
         status = "ok"
         notes = model_notes
-    except (HTTPError, URLError, RuntimeError, ValueError) as exc:
+    except (RuntimeError, ValueError) as exc:
         status = "error"
         payload = {}
         summary_md = f"Failed to generate task response: {exc}"
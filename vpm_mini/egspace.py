@@ -2,70 +2,253 @@
 from __future__ import annotations
 
 import json
+import os
+import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from itertools import repeat
 from pathlib import Path
+from typing import Iterator
 
+EGSPACE_DIR = Path("egspace")
+FLUSH_EVERY = 1000
 
-def ingest_jsonl(jsonl_path: str) -> list[dict]:
-    """Ingest events from JSONL log file and assign stable IDs."""
-    egspace_dir = Path("egspace")
-    egspace_dir.mkdir(exist_ok=True)
 
-    events_path = egspace_dir / "events.jsonl"
-    index_path = egspace_dir / "index.json"
+def _partitions():
+    """Return src.egspace.partitions if the partitioned layout is enabled."""
+    try:
+        from src.egspace import partitions
+    except ImportError:
+        # Fallback if the partitioned EG-Space layout is not available
+        return None
+    return partitions if partitions.PARTITIONED else None
 
-    # Load current index
-    index = {}
-    if index_path.exists():
-        with open(index_path, "r", encoding="utf-8") as f:
-            index = json.load(f)
 
-    # Read input events
-    input_events = []
-    with open(jsonl_path, "r", encoding="utf-8") as f:
+def _iter_jsonl(path: str | Path) -> Iterator[dict]:
+    """Yield parsed records from a JSONL file without loading it whole."""
+    with open(path, "r", encoding="utf-8") as f:
         for line in f:
             if line.strip():
-                input_events.append(json.loads(line))
-
-    # Process events by date
-    processed = []
-    for event in input_events:
-        # Extract date from timestamp
-        ts = event.get("ts", datetime.now(timezone.utc).timestamp())
-        dt = datetime.fromtimestamp(ts, timezone.utc)
-        date_str = dt.strftime("%Y-%m-%d")
-
-        # Get or initialize counter for this date
-        if date_str not in index:
-            index[date_str] = {"date": date_str, "count": 0, "updated_at": ""}
-
-        # Assign stable ID
-        index[date_str]["count"] += 1
-        event_id = f"E:{date_str}#{index[date_str]['count']}"
-
-        # Add ID to event
-        event_with_id = {"id": event_id, **event}
-        processed.append(event_with_id)
-
-        # Append to events file
-        with open(events_path, "a", encoding="utf-8") as f:
-            json.dump(event_with_id, f, ensure_ascii=False)
-            f.write("\n")
-
-    # Update index timestamps
-    for date_str in index:
-        if index[date_str]["count"] > 0:
-            index[date_str]["updated_at"] = datetime.now(timezone.utc).isoformat()
-
-    # Save index
-    with open(index_path, "w", encoding="utf-8") as f:
+                yield json.loads(line)
+
+
+def _event_date(event: dict, now: float | None = None) -> str:
+    """Date of ``event``; events without ``ts`` fall on ``now`` (default: now)."""
+    ts = event.get("ts")
+    if ts is None:
+        ts = datetime.now(timezone.utc).timestamp() if now is None else now
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+
+def _load_counters(index_path: Path) -> dict:
+    if not index_path.exists():
+        return {}
+    with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _commit_counters(index_path: Path, index: dict, touched: set[str]) -> None:
+    """Stamp touched dates and atomically replace index.json."""
+    now = datetime.now(timezone.utc).isoformat()
+    for date_str in touched:
+        index[date_str]["updated_at"] = now
+    tmp = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
         json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, index_path)
+
+
+def _bump(index: dict, date_str: str, n: int = 1) -> int:
+    """Advance the counter for ``date_str`` by ``n`` and return the new value."""
+    entry = index.setdefault(date_str, {"date": date_str, "count": 0, "updated_at": ""})
+    entry["count"] += n
+    return entry["count"]
+
+
+def ingest_jsonl_iter(
+    jsonl_path: str, flush_every: int = FLUSH_EVERY
+) -> Iterator[dict]:
+    """Stream-ingest a JSONL log, yielding each event with its stable ID.
+
+    Events are buffered in memory and appended to egspace/events.jsonl every
+    ``flush_every`` events. The date counters in index.json are committed
+    before each batch is written, so an interrupted run can at worst skip
+    the IDs of a batch that never reached the file; an ID already on disk is
+    never handed out again. With EGSPACE_PARTITIONED=true each batch is
+    committed to the date/role partitions instead.
+    """
+    partitions = _partitions()
+    if partitions is not None:
+        yield from _ingest_partitioned(jsonl_path, flush_every, partitions)
+        return
+
+    EGSPACE_DIR.mkdir(exist_ok=True)
+    events_path = EGSPACE_DIR / "events.jsonl"
+    index_path = EGSPACE_DIR / "index.json"
+
+    index = _load_counters(index_path)
+    touched: set[str] = set()
+    lines: list[str] = []
+
+    with open(events_path, "a", encoding="utf-8") as out:
+
+        def commit():
+            # Reserve the batch's IDs before any of it can reach the file
+            _commit_counters(index_path, index, touched)
+            out.write("".join(lines))
+            out.flush()
+            lines.clear()
+            touched.clear()
+
+        try:
+            for event in _iter_jsonl(jsonl_path):
+                date_str = _event_date(event)
+                n = _bump(index, date_str)
+                touched.add(date_str)
+
+                event_with_id = {"id": f"E:{date_str}#{n}", **event}
+                lines.append(json.dumps(event_with_id, ensure_ascii=False) + "\n")
+                if len(lines) >= flush_every:
+                    commit()
+                yield event_with_id
+        finally:
+            if lines:
+                commit()
+
 
-    return processed
+def _ingest_partitioned(
+    jsonl_path: str, flush_every: int, partitions
+) -> Iterator[dict]:
+    EGSPACE_DIR.mkdir(exist_ok=True)
+    index_path = EGSPACE_DIR / "index.json"
+    index = _load_counters(index_path)
+    touched: set[str] = set()
+    batch: list[dict] = []
+
+    def commit():
+        _commit_counters(index_path, index, touched)
+        partitions.append_partitioned(batch)
+        batch.clear()
+        touched.clear()
+
+    try:
+        for event in _iter_jsonl(jsonl_path):
+            date_str = _event_date(event)
+            n = _bump(index, date_str)
+            touched.add(date_str)
+            event_with_id = {"id": f"E:{date_str}#{n}", **event}
+            batch.append(event_with_id)
+            if len(batch) >= flush_every:
+                commit()
+            yield event_with_id
+    finally:
+        if batch:
+            commit()
+
+
+def ingest_jsonl(jsonl_path: str, flush_every: int = FLUSH_EVERY) -> list[dict]:
+    """Ingest events from JSONL log file and assign stable IDs."""
+    return list(ingest_jsonl_iter(jsonl_path, flush_every))
+
+
+def _count_dates(path: str, now: float) -> Counter:
+    return Counter(_event_date(ev, now) for ev in _iter_jsonl(path))
+
+
+def _write_part(path: str, start: dict, part_path: str, now: float) -> None:
+    """Write one input file with IDs continuing from ``start`` per date."""
+    counters = dict(start)
+    with open(part_path, "w", encoding="utf-8") as out:
+        for event in _iter_jsonl(path):
+            date_str = _event_date(event, now)
+            counters[date_str] = counters.get(date_str, 0) + 1
+            event_with_id = {"id": f"E:{date_str}#{counters[date_str]}", **event}
+            out.write(json.dumps(event_with_id, ensure_ascii=False) + "\n")
+
+
+def ingest_dir(
+    log_dir: str, pattern: str = "*.jsonl", workers: int | None = None
+) -> dict:
+    """Ingest every ``pattern`` file under ``log_dir`` in parallel.
+
+    Files are taken in sorted path order. A first parallel pass counts events
+    per date in each file; prefix sums over those counts give each file its
+    starting counter per date, so a second parallel pass can assign IDs
+    independently. Parts are concatenated in file order, making the output
+    and every ``E:YYYY-MM-DD#n`` identical to ingesting the files one by one
+    with ingest_jsonl(). Events without ``ts`` get the date the run started,
+    in both passes.
+    """
+    EGSPACE_DIR.mkdir(exist_ok=True)
+    events_path = EGSPACE_DIR / "events.jsonl"
+    index_path = EGSPACE_DIR / "index.json"
+
+    files = [str(p) for p in sorted(Path(log_dir).glob(pattern))]
+    if not files:
+        return {"files": 0, "events": 0}
+
+    index = _load_counters(index_path)
+    # Events without ts are dated once for both passes, so a run that
+    # crosses midnight cannot count them under one date and ID them under
+    # another
+    now = datetime.now(timezone.utc).timestamp()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        per_file = list(pool.map(_count_dates, files, repeat(now)))
+
+        # Deterministic merge: running per-date totals in file order
+        starts = []
+        running = {
+            d: e.get("count", 0) for d, e in index.items() if isinstance(e, dict)
+        }
+        for counts in per_file:
+            starts.append({d: running.get(d, 0) for d in counts})
+            for d, c in counts.items():
+                running[d] = running.get(d, 0) + c
+
+        with tempfile.TemporaryDirectory(dir=EGSPACE_DIR) as tmp:
+            parts = [os.path.join(tmp, f"part-{i}.jsonl") for i in range(len(files))]
+            list(pool.map(_write_part, files, starts, parts, repeat(now)))
+
+            # Reserve every ID of the run before any event is appended
+            touched = set()
+            for counts in per_file:
+                for d, c in counts.items():
+                    _bump(index, d, c)
+                    touched.add(d)
+            _commit_counters(index_path, index, touched)
+
+            partitions = _partitions()
+            if partitions is not None:
+                for part in parts:
+                    batch = []
+                    for event in _iter_jsonl(part):
+                        batch.append(event)
+                        if len(batch) >= FLUSH_EVERY:
+                            partitions.append_partitioned(batch)
+                            batch = []
+                    if batch:
+                        partitions.append_partitioned(batch)
+            else:
+                with open(events_path, "ab") as out:
+                    for part in parts:
+                        with open(part, "rb") as src:
+                            shutil.copyfileobj(src, out, 1 << 20)
+
+    return {"files": len(files), "events": sum(sum(c.values()) for c in per_file)}
 
 
 def get_stats() -> dict:
     """Get EG-Space statistics for digest snapshot."""
+    partitions = _partitions()
+    if partitions is not None:
+        stats = partitions.partition_stats()
+        return {
+            "total_events": stats["ingested_events"],
+            "latest_id": stats["latest_id"],
+        }
+
     index_path = Path("egspace/index.json")
     if not index_path.exists():
         return {"total_events": 0, "latest_id": None}
@@ -73,6 +256,9 @@ def get_stats() -> dict:
     with open(index_path, "r", encoding="utf-8") as f:
         index = json.load(f)
 
+    # vec_id -> raw_ref entries (src.egspace.store) may share the file
+    index = {k: v for k, v in index.items() if isinstance(v, dict)}
+
     total = sum(entry.get("count", 0) for entry in index.values())
 
     # Find latest ID